@@ -0,0 +1,53 @@
+"""add_albums_title_artist_unique
+
+Revision ID: albums_title_artist_unique
+Revises: track_keyset_indexes
+Create Date: 2026-10-16 23:00:00.000000
+
+Index unique (title, album_artist_id) sur albums : cible du
+INSERT ... ON CONFLICT de la mutation upsertAlbums. Les doublons existants
+sont d'abord fusionnés sur le plus petit id (pistes et liens de genres
+repointés, puis suppression des autres lignes).
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'albums_title_artist_unique'
+down_revision: Union[str, None] = 'track_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DUPLICATES = """
+    SELECT id, MIN(id) OVER (PARTITION BY title, album_artist_id) AS keep_id
+    FROM albums
+"""
+
+
+def upgrade() -> None:
+    """Fusionne les albums en double puis crée l'index unique."""
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for table in ('tracks', 'album_genres', 'album_genre_links'):
+        if table in existing_tables:
+            op.execute(f"""
+                UPDATE {table} SET album_id = d.keep_id
+                FROM ({DUPLICATES}) AS d
+                WHERE {table}.album_id = d.id AND d.id <> d.keep_id
+            """)
+    op.execute(f"""
+        DELETE FROM albums USING ({DUPLICATES}) AS d
+        WHERE albums.id = d.id AND d.id <> d.keep_id
+    """)
+    op.create_index(
+        'uq_albums_title_artist',
+        'albums',
+        ['title', 'album_artist_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Supprime l'index unique (les albums fusionnés ne sont pas recréés)."""
+    op.drop_index('uq_albums_title_artist', table_name='albums')
@@ -0,0 +1,37 @@
+"""add_covers_content_store_columns
+
+Revision ID: covers_content_store
+Revises: track_embeddings_hnsw_partial
+Create Date: 2026-10-16 12:00:00.000000
+
+Ajoute à la table covers la référence vers le store d'images adressé par
+contenu (SHA-256 de l'image source) et les dimensions de l'image. Les données
+base64 existantes sont déplacées sur disque par la tâche
+migrate_covers_to_store (backend.workers.covers), qui vide cover_data ligne par ligne.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'covers_content_store'
+down_revision: Union[str, None] = 'track_embeddings_hnsw_partial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Ajoute content_hash, width et height à covers."""
+    op.add_column('covers', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('covers', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('covers', sa.Column('height', sa.Integer(), nullable=True))
+    op.create_index('idx_covers_content_hash', 'covers', ['content_hash'])
+
+
+def downgrade() -> None:
+    """Supprime les colonnes du store de covers."""
+    op.drop_index('idx_covers_content_hash', table_name='covers')
+    op.drop_column('covers', 'height')
+    op.drop_column('covers', 'width')
+    op.drop_column('covers', 'content_hash')
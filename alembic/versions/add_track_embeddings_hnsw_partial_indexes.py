@@ -0,0 +1,46 @@
+"""add_track_embeddings_hnsw_partial_indexes
+
+Revision ID: track_embeddings_hnsw_partial
+Revises: merge_mir_schema_heads
+Create Date: 2026-10-16 10:00:00.000000
+
+Crée un index HNSW partiel par type d'embedding sur track_embeddings
+(WHERE embedding_type = '<type>'). Les recherches de similarité filtrent
+toujours sur embedding_type : sans index dédié elles parcouraient toute la
+table (scan séquentiel des vecteurs 512 dimensions).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'track_embeddings_hnsw_partial'
+down_revision: Union[str, None] = 'merge_mir_schema_heads'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_TYPES = ('semantic', 'audio', 'text', 'combined')
+
+
+def upgrade() -> None:
+    """Crée les index HNSW partiels sans verrouiller les écritures."""
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction
+    with op.get_context().autocommit_block():
+        # Index global déclaré dans le modèle mais jamais migré (selon les bases)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_track_embeddings_vector")
+        for embedding_type in EMBEDDING_TYPES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_track_embeddings_vector_{embedding_type} "
+                f"ON track_embeddings USING hnsw (vector vector_l2_ops) "
+                f"WITH (m = 16, ef_construction = 64) "
+                f"WHERE embedding_type = '{embedding_type}'"
+            )
+
+
+def downgrade() -> None:
+    """Supprime les index HNSW partiels."""
+    with op.get_context().autocommit_block():
+        for embedding_type in EMBEDDING_TYPES:
+            op.execute(
+                f"DROP INDEX CONCURRENTLY IF EXISTS idx_track_embeddings_vector_{embedding_type}"
+            )
@@ -0,0 +1,36 @@
+"""add_track_keyset_indexes
+
+Revision ID: track_keyset_indexes
+Revises: covers_content_store
+Create Date: 2026-10-16 18:00:00.000000
+
+Index composites (clé de tri, id) utilisés par la pagination par curseur
+de la connexion GraphQL tracksConnection : chaque page est une lecture
+d'index bornée, quelle que soit sa profondeur.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'track_keyset_indexes'
+down_revision: Union[str, None] = 'covers_content_store'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Crée les index (titre, id) et (date d'ajout, id) de tracks."""
+    op.create_index(
+        'idx_tracks_title_keyset',
+        'tracks',
+        [sa.text("coalesce(title, '')"), 'id'],
+    )
+    op.create_index('idx_tracks_date_added_keyset', 'tracks', ['date_added', 'id'])
+
+
+def downgrade() -> None:
+    """Supprime les index de pagination par curseur."""
+    op.drop_index('idx_tracks_date_added_keyset', table_name='tracks')
+    op.drop_index('idx_tracks_title_keyset', table_name='tracks')
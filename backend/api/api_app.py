@@ -53,10 +53,18 @@ async def get_context():
     # Use async with to properly manage the async generator lifecycle
     async with asynccontextmanager(get_async_session)() as session:
         lock = asyncio.Lock()
-        loaders = CatalogLoaders(session)
+        # Les loaders partagent la session de la requête : même verrou que
+        # les résolveurs, leurs lots pouvant partir en parallèle.
+        loaders = CatalogLoaders(LockedSession(session, lock))
         yield AppContext(
             settings=settings, _session=session, loaders=loaders, lock=lock
         )
+        stats = loaders.get_stats()
+        if stats["queries"]:
+            logger.debug(
+                f"[GRAPHQL] Loaders: {stats['queries']} requêtes SQL pour {stats['keys']} clés "
+                f"{stats['loaders']}"
+            )
         # Session will be properly closed by the context manager
 
 
@@ -178,8 +186,19 @@ async def lifespan(app: FastAPI):
                 f"WebSocket route enregistrée: {route.path} - Handler: {route.endpoint}"
             )
     yield
-    # Code de nettoyage (shutdown) si nécessaire
-    pass
+    # Code de nettoyage (shutdown) : fermeture des connexions Redis (cache de
+    # recherche, validateurs de covers, hub SSE, caches nom → ID)
+    from backend.api.services.redis_cache_service import redis_cache_service
+    await redis_cache_service.close()
+    from backend.api.services.cover_validator_service import cover_validator_service
+    await cover_validator_service.close()
+    from backend.api.services.sse_hub_service import sse_hub
+    await sse_hub.close()
+    from backend.services.cache_service import cache_service
+    await cache_service.aclose()
+    # Arrêt des processus du pool de transcodage d'images
+    from backend.api.utils.image_transcode_pool import image_transcode_pool
+    image_transcode_pool.shutdown()
 
 
 # Créer l'application FastAPI
@@ -1,3 +1,4 @@
 from backend.api.graphql.dataloader.dataloaders import CatalogLoaders
+from backend.api.graphql.dataloader.track_relations import TrackRelationLoaders
 
-__all__ = ["CatalogLoaders"]
+__all__ = ["CatalogLoaders", "TrackRelationLoaders"]
@@ -1,48 +1,100 @@
-from backend.api.graphql.dataloader.registry import LoaderRegistry
-from backend.api.graphql.dataloader.factories import by_id_loader
-from strawberry.dataloader import DataLoader
+"""
+Loaders du catalogue, créés pour chaque requête GraphQL.
+
+Chaque relation (artiste, album, piste, covers, caractéristiques audio...)
+passe par un DataLoader : les clés demandées pendant un même tick sont
+regroupées en une seule requête « IN ». Une requête imbriquée
+artiste → albums → pistes → caractéristiques coûte ainsi une requête SQL par
+niveau, et non une par objet. get_stats() donne le nombre de requêtes et la
+taille des lots de la requête.
+"""
+
+from typing import Any, Dict
 
-from backend.api.services.track_service import TrackService
-from backend.api.services.covers_service import CoverService
-from backend.api.services.artist_service import ArtistService
-from backend.api.services.album_service import AlbumService
+from sqlalchemy.orm import noload
+
+from backend.api.graphql.dataloader.factories import (
+    column_loader,
+    cover_key,
+    entity_covers_loader,
+)
+from backend.api.graphql.dataloader.registry import LoaderRegistry
+from backend.api.graphql.dataloader.track_relations import TrackRelationLoaders
+from backend.api.models.albums_model import Album
+from backend.api.models.artists_model import Artist
+from backend.api.models.tracks_model import Track
+from backend.api.services.track_service import track_load_options
 
 
 class CatalogLoaders:
+    """Point d'accès aux loaders d'une requête GraphQL (info.context.loaders)."""
+
     def __init__(self, session):
         self.session = session
         self._registry = LoaderRegistry()
+        self.track_relations = TrackRelationLoaders(session, self._registry)
 
-    def artists_by_id(self):
-        self._registry.get(
-            "artist_by_id",
-            lambda: by_id_loader(ArtistService.fetch_artists, self.session),
+    def _column_loader(self, name: str, model, column, many: bool, options=()):
+        return self._registry.get(
+            name,
+            lambda: column_loader(name, self._registry, self.session, model, column, many, options),
         )
 
-    def albums_by_id(self, id):
-        return self._registry.get(
-            "album_by_id",
-            lambda: by_id_loader(AlbumService.fetch_albums_by_artist_ids, self.session),
-        ).load(id)
+    # Entités par identifiant -------------------------------------------------
+
+    def artist_by_id(self, artist_id: int):
+        """Artiste (ou None)."""
+        return self._column_loader(
+            "artist_by_id", Artist, Artist.id, many=False, options=(noload(Artist.covers),)
+        ).load(artist_id)
+
+    def album_by_id(self, album_id: int):
+        """Album (ou None)."""
+        return self._column_loader(
+            "album_by_id", Album, Album.id, many=False, options=(noload(Album.covers),)
+        ).load(album_id)
 
-    def tracks_by_id(self, id):
+    def track_by_id(self, track_id: int):
+        """Piste (ou None), sans relation : elles passent par track_relations."""
+        return self._column_loader(
+            "track_by_id", Track, Track.id, many=False,
+            options=track_load_options(include=(), raise_unloaded=True),
+        ).load(track_id)
+
+    # Relations un-à-plusieurs --------------------------------------------------
+
+    def albums_by_artist(self, artist_id: int):
+        """Albums d'un artiste."""
+        return self._column_loader(
+            "albums_by_artist", Album, Album.album_artist_id, many=True,
+            options=(noload(Album.covers),),
+        ).load(artist_id)
+
+    def tracks_by_album(self, album_id: int):
+        """Pistes d'un album."""
+        return self._column_loader(
+            "tracks_by_album", Track, Track.album_id, many=True,
+            options=track_load_options(include=(), raise_unloaded=True),
+        ).load(album_id)
+
+    def covers_by_entity(self, entity_type: Any, entity_id: int):
+        """Covers d'une entité ; tous les types demandés partagent une requête."""
         return self._registry.get(
-            "track_by_id",
-            lambda: by_id_loader(TrackService.fetch_tracks_by_album_ids, self.session),
-        ).load(id)
-
-    def covers_by_entity_id(self, id, entity_type):
-        async def load(keys):
-            results = []
-            for key in keys:
-                id, entity_type = key
-                covers = await CoverService.fetch_covers(
-                    [id], self.session, entity_type
-                )
-                results.append(covers if covers else [])
-            return results
-
-        loader = self._registry.get(
-            "cover_by_entity_id", lambda: DataLoader(load_fn=load)
-        )
-        return loader.load((id, entity_type))
+            "covers_by_entity", lambda: entity_covers_loader(self._registry, self.session)
+        ).load(cover_key(entity_type, entity_id))
+
+    # Relations de piste -------------------------------------------------------
+
+    def audio_features_by_track(self, track_id: int):
+        """Caractéristiques audio d'une piste (ou None)."""
+        return self.track_relations.load("audio_features", track_id)
+
+    def mir_scores_by_track(self, track_id: int):
+        """Scores MIR d'une piste (ou None)."""
+        return self.track_relations.load("mir_scores", track_id)
+
+    # Instrumentation ----------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requêtes SQL et taille des lots de la requête GraphQL en cours."""
+        return self._registry.get_stats()
@@ -1,6 +1,12 @@
-from typing import Callable, Awaitable, Sequence, Any
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
 from strawberry.dataloader import DataLoader
 
+from backend.api.graphql.dataloader.registry import LoaderRegistry
+from backend.api.models.covers_model import Cover, EntityCoverType
+
 
 def by_id_loader(
     fetch_fn: Callable[[Sequence[int], Any], Awaitable[Sequence[Any]]],
@@ -10,3 +16,73 @@ def by_id_loader(
         return await fetch_fn(ids, session)
 
     return DataLoader(load_fn=load)
+
+
+def column_loader(
+    name: str,
+    registry: LoaderRegistry,
+    session,
+    model,
+    column,
+    many: bool,
+    options: Sequence[Any] = (),
+) -> DataLoader:
+    """
+    Loader groupant les clés en une requête « column IN (...) ».
+
+    Args:
+        name: Nom du loader (statistiques)
+        model: Modèle interrogé
+        column: Colonne portant la clé (id, album_id, track_id...)
+        many: True = liste de lignes par clé, False = une ligne ou None
+        options: Options de chargement (noload des relations, defer...)
+    """
+
+    async def load(keys: Sequence[Hashable]):
+        registry.record(name, keys)
+        query = select(model).where(column.in_(keys))
+        if options:
+            query = query.options(*options)
+        result = await session.execute(query)
+        grouped: Dict[Hashable, Any] = defaultdict(list) if many else {}
+        for row in result.scalars().all():
+            key = getattr(row, column.key)
+            if many:
+                grouped[key].append(row)
+            else:
+                grouped[key] = row
+        return [grouped.get(key, [] if many else None) for key in keys]
+
+    return DataLoader(load_fn=load)
+
+
+def cover_key(entity_type: Any, entity_id: int) -> Tuple[str, int]:
+    """Clé (type normalisé, id) du loader de covers."""
+    value = getattr(entity_type, "value", entity_type)
+    return EntityCoverType(str(value).lower()).value, entity_id
+
+
+def entity_covers_loader(registry: LoaderRegistry, session) -> DataLoader:
+    """Covers par clé (entity_type, entity_id), tous types confondus en une requête."""
+
+    async def load(keys: Sequence[Tuple[str, int]]):
+        registry.record("covers_by_entity", keys)
+        ids_by_type: Dict[str, set] = defaultdict(set)
+        for entity_type, entity_id in keys:
+            ids_by_type[entity_type].add(entity_id)
+        result = await session.execute(
+            select(Cover).where(
+                or_(
+                    *(
+                        and_(Cover.entity_type == EntityCoverType(entity_type), Cover.entity_id.in_(ids))
+                        for entity_type, ids in ids_by_type.items()
+                    )
+                )
+            )
+        )
+        grouped: Dict[Tuple[str, int], list] = defaultdict(list)
+        for cover in result.scalars().all():
+            grouped[cover_key(cover.entity_type, cover.entity_id)].append(cover)
+        return [grouped.get(key, []) for key in keys]
+
+    return DataLoader(load_fn=load)
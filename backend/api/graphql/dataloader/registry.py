@@ -1,12 +1,39 @@
-from typing import Callable, Dict
+from collections import defaultdict
+from typing import Any, Callable, Dict, Sequence
+
 from strawberry.dataloader import DataLoader
 
 
 class LoaderRegistry:
+    """
+    Loaders d'une requête GraphQL, créés à la demande, avec leurs statistiques.
+
+    Chaque fonction de lot appelle record() : on obtient par loader le nombre
+    de lots (une requête SQL chacun) et de clés servies.
+    """
+
     def __init__(self):
         self._loaders: Dict[str, DataLoader] = {}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"batches": 0, "keys": 0, "max_batch": 0}
+        )
 
     def get(self, name: str, factory: Callable[[], DataLoader]) -> DataLoader:
         if name not in self._loaders:
             self._loaders[name] = factory()
         return self._loaders[name]
+
+    def record(self, name: str, keys: Sequence[Any]) -> None:
+        """Enregistre un lot (une requête SQL) de len(keys) clés."""
+        stats = self.stats[name]
+        stats["batches"] += 1
+        stats["keys"] += len(keys)
+        stats["max_batch"] = max(stats["max_batch"], len(keys))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de la requête : total de requêtes SQL et détail par loader."""
+        return {
+            "queries": sum(stats["batches"] for stats in self.stats.values()),
+            "keys": sum(stats["keys"] for stats in self.stats.values()),
+            "loaders": {name: dict(stats) for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,87 @@
+"""
+DataLoaders des relations d'une piste, par requête GraphQL, indexés par track_id.
+
+Les relations lourdes de Track (caractéristiques audio, embeddings, MIR...)
+ne sont plus chargées en selectin avec chaque piste : un résolveur de
+TrackType ne les demande que si le client a sélectionné le champ, et toutes
+les pistes de la réponse sont servies par une seule requête IN par relation.
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy.orm import defer
+
+from backend.api.graphql.dataloader.factories import (
+    column_loader,
+    cover_key,
+    entity_covers_loader,
+)
+from backend.api.graphql.dataloader.registry import LoaderRegistry
+from backend.api.models.track_audio_features_model import TrackAudioFeatures
+from backend.api.models.track_embeddings_model import TrackEmbeddings
+from backend.api.models.track_metadata_model import TrackMetadata
+from backend.api.models.track_mir_normalized_model import TrackMIRNormalized
+from backend.api.models.track_mir_raw_model import TrackMIRRaw
+from backend.api.models.track_mir_scores_model import TrackMIRScores
+from backend.api.models.track_mir_synthetic_tags_model import TrackMIRSyntheticTags
+
+# Relation -> (modèle, une ligne par piste ?)
+TRACK_RELATIONS = {
+    "audio_features": (TrackAudioFeatures, True),
+    "mir_raw": (TrackMIRRaw, True),
+    "mir_normalized": (TrackMIRNormalized, True),
+    "mir_scores": (TrackMIRScores, True),
+    "embeddings": (TrackEmbeddings, False),
+    "metadata_entries": (TrackMetadata, False),
+    "mir_synthetic_tags": (TrackMIRSyntheticTags, False),
+}
+
+# Colonnes jamais exposées par TrackType : non transférées
+DEFERRED_COLUMNS = {
+    "embeddings": (TrackEmbeddings.vector,),
+}
+
+
+class TrackRelationLoaders:
+    """Loaders des relations de piste, un par relation et par requête."""
+
+    def __init__(self, session, registry: LoaderRegistry | None = None):
+        self.session = session
+        self._registry = registry or LoaderRegistry()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return self._registry.stats
+
+    def load(self, relation: str, track_id: int):
+        """Charge une relation d'une piste (regroupée avec les autres pistes de la requête)."""
+        if relation == "covers":
+            return self._covers().load(cover_key("track", track_id))
+        return self._loader(relation).load(track_id)
+
+    def prime(self, relation: str, track_id: int, value: Any) -> None:
+        """Renseigne une valeur déjà chargée (évite une requête)."""
+        if relation == "covers":
+            self._covers().prime(cover_key("track", track_id), value)
+        else:
+            self._loader(relation).prime(track_id, value)
+
+    def _covers(self):
+        # Partagé avec les covers d'albums et d'artistes : une requête pour tous
+        return self._registry.get(
+            "covers_by_entity", lambda: entity_covers_loader(self._registry, self.session)
+        )
+
+    def _loader(self, relation: str):
+        if relation not in TRACK_RELATIONS:
+            raise KeyError(f"Relation de piste inconnue: {relation}")
+        model, single = TRACK_RELATIONS[relation]
+        name = f"track_{relation}"
+        options = [defer(column) for column in DEFERRED_COLUMNS.get(relation, ())]
+        return self._registry.get(
+            name,
+            lambda: column_loader(
+                name, self._registry, self.session, model, model.track_id,
+                many=not single, options=options,
+            ),
+        )
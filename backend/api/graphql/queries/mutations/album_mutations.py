@@ -124,6 +124,40 @@ class AlbumMutations:
             musicbrainz_albumid=album.musicbrainz_albumid,
         )
 
+    @strawberry.mutation
+    async def upsert_albums(
+        self, data: List[AlbumCreateInput], info: Info
+    ) -> List[AlbumType]:
+        """Upsert multiple albums with one lookup query and one bulk insert."""
+        from backend.api.schemas.albums_schema import AlbumCreate
+        from backend.api.services.album_service import AlbumService
+
+        session = info.context.session
+        service = AlbumService(session)
+
+        albums = await service.upsert_albums_batch(
+            [
+                AlbumCreate(
+                    title=album_input.title,
+                    album_artist_id=album_input.album_artist_id,
+                    release_year=album_input.release_year,
+                    musicbrainz_albumid=album_input.musicbrainz_albumid,
+                )
+                for album_input in data
+            ]
+        )
+
+        return [
+            AlbumType(
+                id=album["id"],
+                title=album["title"],
+                album_artist_id=album["album_artist_id"],
+                release_year=album["release_year"],
+                musicbrainz_albumid=album["musicbrainz_albumid"],
+            )
+            for album in albums
+        ]
+
     @strawberry.mutation
     async def update_albums(
         self, filter: str, data: str, info: Info
@@ -110,6 +110,35 @@ class ArtistMutations:
             musicbrainz_artistid=artist.musicbrainz_artistid,
         )
 
+    @strawberry.mutation
+    async def upsert_artists(
+        self, data: list[ArtistCreateInput], info: Info
+    ) -> list[ArtistType]:
+        """Upsert multiple artists with a single INSERT ... ON CONFLICT."""
+        from backend.api.schemas.artists_schema import ArtistCreate
+        from backend.api.services.artist_service import ArtistService
+
+        session = info.context.session
+        service = ArtistService(session)
+
+        artists = await service.upsert_artists_batch(
+            [
+                ArtistCreate(
+                    name=artist_input.name,
+                    musicbrainz_artistid=artist_input.musicbrainz_artistid,
+                )
+                for artist_input in data
+            ]
+        )
+        return [
+            ArtistType(
+                id=artist["id"],
+                name=artist["name"],
+                musicbrainz_artistid=artist["musicbrainz_artistid"],
+            )
+            for artist in artists
+        ]
+
     @strawberry.mutation
     async def update_artists(
         self, filter: str, data: str, info: Info
@@ -5,10 +5,69 @@ from typing import Any, Optional
 import strawberry
 from strawberry.types import Info
 
-from backend.api.graphql.types.covers_type import CoverType
+from backend.api.graphql.selection import selected_fields
+from backend.api.graphql.types.track_connection_type import (
+    PageInfo,
+    TrackConnection,
+    TrackEdge,
+    TrackSortField,
+)
 from backend.api.graphql.types.track_filter_type import TrackFilterInput
 from backend.api.graphql.types.tracks_type import TrackType
-from backend.api.services.track_service import TrackService
+from backend.api.services.track_service import TrackService, encode_track_cursor
+
+# Colonnes de Track exposées telles quelles par TrackType
+TRACK_TYPE_FIELDS = (
+    "id",
+    "title",
+    "path",
+    "track_artist_id",
+    "album_id",
+    "duration",
+    "track_number",
+    "disc_number",
+    "year",
+    "genre",
+    "file_type",
+    "bitrate",
+    "featured_artists",
+    "musicbrainz_id",
+    "musicbrainz_albumid",
+    "musicbrainz_artistid",
+    "musicbrainz_albumartistid",
+    "acoustid_fingerprint",
+)
+# Colonnes toujours lues : identifiant (clé des loaders) et champs non nuls
+REQUIRED_FIELDS = ("id", "path", "track_artist_id")
+
+
+def _track_columns(info: Info, path: tuple[str, ...] = ()) -> list[str]:
+    """Colonnes de TrackType sélectionnées par le client."""
+    selected = selected_fields(info, path)
+    return [
+        field
+        for field in TRACK_TYPE_FIELDS
+        if field in selected or field in REQUIRED_FIELDS
+    ]
+
+
+def _filters(where: Optional[TrackFilterInput]) -> dict[str, Any]:
+    """TrackFilterInput -> critères de TrackService (appliqués en SQL)."""
+    if where is None:
+        return {}
+    return {
+        "artist_id": where.artist_id,
+        "album_id": where.album_id,
+        "genre": where.genre,
+        "year": where.year,
+        "path": where.filePath,
+    }
+
+
+def _track_data(track: Any, columns: list[str]) -> dict[str, Any]:
+    """Champs de base de TrackType ; les colonnes non chargées valent None."""
+    track_data = track.__dict__
+    return {field: track_data.get(field) if field in columns else None for field in TRACK_TYPE_FIELDS}
 
 
 @strawberry.type
@@ -19,77 +78,21 @@ class TrackQueries:
     async def track(self, info: Info, id: int) -> Optional[TrackType]:
         from backend.api.utils.cache_utils import graphql_cache
 
-        cache_params = {"id": id}
-        cached_data = graphql_cache.get("track_v2", **cache_params)
+        columns = _track_columns(info)
+        cache_params = {"id": id, "fields": ",".join(columns)}
+        cached_data = graphql_cache.get("track_v3", **cache_params)
         if cached_data is not None:
             return TrackType(**cached_data)
 
         db = info.context.session
         service = TrackService(db)
-        track = await service.read_track(id)
+        # Relations : aucune ici, les résolveurs de champ les chargent via
+        # les DataLoaders uniquement si le client les a sélectionnées.
+        track = await service.read_track(id, include=(), fields=columns)
         if track:
-            track_data = track.__dict__
-
-            # Extract only constructor fields that exist in TrackType
-            valid_fields = [
-                "id",
-                "title",
-                "path",
-                "track_artist_id",
-                "album_id",
-                "duration",
-                "track_number",
-                "disc_number",
-                "year",
-                "genre",
-                "file_type",
-                "bitrate",
-                "featured_artists",
-                "musicbrainz_id",
-                "musicbrainz_albumid",
-                "musicbrainz_artistid",
-                "musicbrainz_albumartistid",
-                "acoustid_fingerprint",
-            ]
-
-            data = {field: track_data.get(field) for field in valid_fields}
-
-            # Add covers
-            covers = []
-            if hasattr(track, "covers") and track.covers:
-                covers = [
-                    CoverType(
-                        id=c.id,
-                        entity_type=c.entity_type,
-                        entity_id=c.entity_id,
-                        cover_data=c.cover_data,
-                        date_added=str(c.date_added),
-                        date_modified=str(c.date_modified),
-                        mime_type=c.mime_type,
-                    )
-                    for c in track.covers
-                ]
-            data["covers"] = covers
-
-            # Build GraphQL object then attach optional SQLAlchemy relations
-            track_type = TrackType(**data)
-            if hasattr(track, "audio_features"):
-                setattr(track_type, "_audio_features", track.audio_features)
-            if hasattr(track, "embeddings"):
-                setattr(track_type, "_embeddings", track.embeddings)
-            if hasattr(track, "metadata_entries"):
-                setattr(track_type, "_metadata_entries", track.metadata_entries)
-            if hasattr(track, "mir_raw"):
-                setattr(track_type, "_mir_raw", track.mir_raw)
-            if hasattr(track, "mir_normalized"):
-                setattr(track_type, "_mir_normalized", track.mir_normalized)
-            if hasattr(track, "mir_scores"):
-                setattr(track_type, "_mir_scores", track.mir_scores)
-            if hasattr(track, "mir_synthetic_tags"):
-                setattr(track_type, "_mir_synthetic_tags", track.mir_synthetic_tags)
-
-            graphql_cache.set("track_v2", data, 300, **cache_params)
-            return track_type
+            data = _track_data(track, columns)
+            graphql_cache.set("track_v3", data, 300, **cache_params)
+            return TrackType(**data)
         return None
 
     @strawberry.field
@@ -103,7 +106,8 @@ class TrackQueries:
         from backend.api.utils.cache_utils import graphql_cache
 
         # Build cache params
-        cache_params = {"skip": skip, "limit": limit}
+        columns = _track_columns(info)
+        cache_params = {"skip": skip, "limit": limit, "fields": ",".join(columns)}
         if where:
             where_cache_params: dict[str, Any] = {
                 "genre": where.genre,
@@ -116,110 +120,65 @@ class TrackQueries:
                 where_cache_params["album_id"] = where.album_id
             cache_params.update(where_cache_params)
 
-        cached_data = graphql_cache.get("tracks_v2", **cache_params)
+        cached_data = graphql_cache.get("tracks_v3", **cache_params)
         if cached_data is not None:
             return [TrackType(**d) for d in cached_data]
 
         db = info.context.session
         service = TrackService(db)
+        tracks = await service.list_tracks(
+            _filters(where), skip, limit, include=(), fields=columns
+        )
 
-        # Apply filtering if where clause is provided
-        if where:
-            # Convert where dict to filter criteria for the service
-            artist_id = where.artist_id
-            album_id = where.album_id
-
-            if artist_id is None and album_id is None:
-                tracks = await service.read_tracks(skip, limit)
-            else:
-                tracks = await service.get_artist_tracks(
-                    artist_id=artist_id if artist_id is not None else 0,
-                    album_id=album_id,
-                )
-
-            # Apply additional filters if provided
-            if where.genre:
-                tracks = [
-                    t
-                    for t in tracks
-                    if t.genre and where.genre.lower() in t.genre.lower()
-                ]
-            if where.year:
-                tracks = [t for t in tracks if t.year == where.year]
-            if where.filePath:
-                tracks = [t for t in tracks if t.path == where.filePath]
-
-            # Apply pagination
-            tracks = tracks[skip : skip + limit] if limit else tracks[skip:]
-        else:
-            tracks = await service.read_tracks(skip, limit)
-
-        data_list = []
-        for t in tracks:
-            track_data = t.__dict__
-
-            # Extract only constructor fields that exist in TrackType
-            valid_fields = [
-                "id",
-                "title",
-                "path",
-                "track_artist_id",
-                "album_id",
-                "duration",
-                "track_number",
-                "disc_number",
-                "year",
-                "genre",
-                "file_type",
-                "bitrate",
-                "featured_artists",
-                "musicbrainz_id",
-                "musicbrainz_albumid",
-                "musicbrainz_artistid",
-                "musicbrainz_albumartistid",
-                "acoustid_fingerprint",
-            ]
-
-            data = {field: track_data.get(field) for field in valid_fields}
-
-            # Add covers
-            covers = []
-            if hasattr(t, "covers") and t.covers:
-                covers = [
-                    CoverType(
-                        id=c.id,
-                        entity_type=c.entity_type,
-                        entity_id=c.entity_id,
-                        cover_data=c.cover_data,
-                        date_added=str(c.date_added),
-                        date_modified=str(c.date_modified),
-                        mime_type=c.mime_type,
-                    )
-                    for c in t.covers
-                ]
-            data["covers"] = covers
-
-            data_list.append(data)
-
-        graphql_cache.set("tracks_v2", data_list, 60, **cache_params)
-
-        track_types: list[TrackType] = []
-        for t, d in zip(tracks, data_list):
-            track_type = TrackType(**d)
-            if hasattr(t, "audio_features"):
-                setattr(track_type, "_audio_features", t.audio_features)
-            if hasattr(t, "embeddings"):
-                setattr(track_type, "_embeddings", t.embeddings)
-            if hasattr(t, "metadata_entries"):
-                setattr(track_type, "_metadata_entries", t.metadata_entries)
-            if hasattr(t, "mir_raw"):
-                setattr(track_type, "_mir_raw", t.mir_raw)
-            if hasattr(t, "mir_normalized"):
-                setattr(track_type, "_mir_normalized", t.mir_normalized)
-            if hasattr(t, "mir_scores"):
-                setattr(track_type, "_mir_scores", t.mir_scores)
-            if hasattr(t, "mir_synthetic_tags"):
-                setattr(track_type, "_mir_synthetic_tags", t.mir_synthetic_tags)
-            track_types.append(track_type)
-
-        return track_types
+        data_list = [_track_data(t, columns) for t in tracks]
+        graphql_cache.set("tracks_v3", data_list, 60, **cache_params)
+        return [TrackType(**d) for d in data_list]
+
+    @strawberry.field
+    async def tracks_connection(
+        self,
+        info: Info,
+        first: int = 50,
+        after: Optional[str] = None,
+        where: Optional[TrackFilterInput] = None,
+        sort_by: TrackSortField = TrackSortField.ID,
+        descending: bool = False,
+    ) -> TrackConnection:
+        """
+        Pistes paginées par curseur sur (clé de tri, id), filtres en SQL.
+
+        Passer page_info.end_cursor dans after pour la page suivante : le coût
+        d'une page reste constant quelle que soit sa profondeur.
+        """
+        columns = _track_columns(info, ("edges", "node"))
+        sort = sort_by.value
+        filters = _filters(where)
+
+        service = TrackService(info.context.session)
+        # Curseur invalide : ValueError, renvoyée au client comme erreur GraphQL
+        tracks, has_next_page = await service.list_tracks_keyset(
+            filters,
+            sort=sort,
+            descending=descending,
+            first=first,
+            after=after,
+            include=(),
+            fields=columns,
+        )
+
+        edges = [
+            TrackEdge(cursor=encode_track_cursor(sort, t), node=TrackType(**_track_data(t, columns)))
+            for t in tracks
+        ]
+        connection = TrackConnection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next_page,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+        )
+        if "total_count" in selected_fields(info):
+            connection.total_count, connection.total_is_estimate = (
+                await service.estimate_tracks_count(filters)
+            )
+        return connection
@@ -345,6 +345,7 @@ class TrackAudioFeaturesQuery:
         bpm_tolerance: float = 5.0,
         use_compatible_keys: bool = True,
         limit: int = 20,
+        half_double_time: bool = False,
     ) -> List[TrackAudioFeaturesType]:
         """
         Trouve les pistes similaires par BPM et tonalité compatible.
@@ -354,6 +355,7 @@ class TrackAudioFeaturesQuery:
             bpm_tolerance: Tolérance de BPM (±)
             use_compatible_keys: Utiliser les tonalités harmoniquement compatibles
             limit: Nombre maximum de résultats
+            half_double_time: Accepter les pistes à demi-tempo / double tempo
 
         Returns:
             Liste des caractéristiques audio similaires
@@ -365,6 +367,7 @@ class TrackAudioFeaturesQuery:
                 bpm_tolerance=bpm_tolerance,
                 use_compatible_keys=use_compatible_keys,
                 limit=limit,
+                half_double_time=half_double_time,
             )
 
             return [
@@ -359,6 +359,8 @@ class TrackMIRQuery:
         self,
         track_id: int,
         limit: int = 20,
+        bpm_tolerance: Optional[float] = None,
+        harmonic: bool = False,
     ) -> List[TrackMIRScoresType]:
         """
         Trouve les pistes similaires basées sur les caractéristiques MIR.
@@ -366,6 +368,8 @@ class TrackMIRQuery:
         Args:
             track_id: ID de la piste de référence
             limit: Nombre maximum de résultats
+            bpm_tolerance: Écart de BPM maximal (±) avec la piste de référence
+            harmonic: Limiter aux clés Camelot compatibles (mix harmonique)
 
         Returns:
             Liste des scores MIR des pistes similaires
@@ -380,6 +384,8 @@ class TrackMIRQuery:
             scores_list = await service.get_similar_tracks(
                 track_id=track_id,
                 limit=limit,
+                bpm_tolerance=bpm_tolerance,
+                harmonic=harmonic,
             )
             return [_mir_scores_to_type(scores) for scores in scores_list]
 
@@ -0,0 +1,50 @@
+"""
+Lecture de l'ensemble de sélection d'un résolveur GraphQL.
+
+Permet à un résolveur de requête de ne charger que les colonnes demandées par
+le client (les relations, elles, passent par les DataLoaders des résolveurs
+de champ et ne sont chargées que si elles sont sélectionnées).
+"""
+
+import re
+from typing import Iterable, Sequence, Set
+
+from strawberry.types import Info
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField
+
+_CAMEL_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def to_snake_case(name: str) -> str:
+    """Nom GraphQL (camelCase) -> nom Python (snake_case)."""
+    return _CAMEL_BOUNDARY.sub("_", name).lower()
+
+
+def _children(selections: Iterable) -> Iterable[SelectedField]:
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        elif isinstance(selection, (FragmentSpread, InlineFragment)):
+            yield from _children(selection.selections)
+
+
+def selected_fields(info: Info, path: Sequence[str] = ()) -> Set[str]:
+    """
+    Champs sélectionnés sous le champ résolu (fragments inclus).
+
+    Args:
+        info: Info du résolveur
+        path: Chemin vers un sous-champ, ex. ("edges", "node") pour une connexion
+
+    Returns:
+        Noms snake_case des champs enfants, ex. {"id", "title", "audio_features"}
+    """
+    fields = list(info.selected_fields)
+    for name in path:
+        fields = [
+            child
+            for field in fields
+            for child in _children(field.selections)
+            if to_snake_case(child.name) == name
+        ]
+    return {to_snake_case(child.name) for field in fields for child in _children(field.selections)}
@@ -5,6 +5,12 @@ from .genres_type import GenreType
 from .tags_type import MoodTagType, GenreTagType
 from .tracks_type import TrackType, TrackCreateInput, TrackUpdateInput
 from .track_vectors_type import TrackVectorType
+from .track_connection_type import (
+    PageInfo,
+    TrackConnection,
+    TrackEdge,
+    TrackSortField,
+)
 from .track_audio_features_type import (
     TrackAudioFeaturesType,
     TrackAudioFeaturesInput,
@@ -57,6 +63,11 @@ __all__ = [
     "TrackCreateInput",
     "TrackUpdateInput",
     "TrackVectorType",
+    # Track pagination
+    "PageInfo",
+    "TrackConnection",
+    "TrackEdge",
+    "TrackSortField",
     # Track Audio Features
     "TrackAudioFeaturesType",
     "TrackAudioFeaturesInput",
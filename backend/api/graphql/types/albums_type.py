@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Annotated
+
 import strawberry
 
 from backend.api.graphql.types.covers_type import CoverType
 from backend.api.graphql.types.tracks_type import TrackType
 
+if TYPE_CHECKING:
+    from backend.api.graphql.types.artist_type import ArtistType
+
 
 @strawberry.type
 class AlbumType:
@@ -17,13 +22,20 @@ class AlbumType:
     @strawberry.field
     async def covers(self, info: strawberry.types.Info) -> list[CoverType]:
         """Get all covers for this album."""
-        return await info.context.loaders.covers_by_entity_id(self.id, "album")
+        covers = await info.context.loaders.covers_by_entity("album", self.id)
+        return [CoverType.from_model(cover) for cover in covers]
 
     @strawberry.field
     async def tracks(self, info: strawberry.types.Info) -> list[TrackType]:
         """Get all tracks for this album."""
-        result = await info.context.loaders.tracks_by_id(self.id)
-        return result if result is not None else []
+        return await info.context.loaders.tracks_by_album(self.id)
+
+    @strawberry.field
+    async def artist(
+        self, info: strawberry.types.Info
+    ) -> Annotated["ArtistType", strawberry.lazy("backend.api.graphql.types.artist_type")] | None:
+        """Album artist."""
+        return await info.context.loaders.artist_by_id(self.album_artist_id)
 
 
 @strawberry.input
@@ -15,14 +15,13 @@ class ArtistType:
     @strawberry.field
     async def albums(self, info: strawberry.types.Info) -> list[AlbumType]:
         """Get all albums for this artist."""
-        return await info.context.loaders.albums_by_id(self.id)
+        return await info.context.loaders.albums_by_artist(self.id)
 
     @strawberry.field
     async def covers(self, info: strawberry.types.Info) -> list[CoverType]:
         """Get all covers for this artist."""
-        return await info.context.loaders.covers_by_entity_id(
-            self.id, entity_type="artist"
-        )
+        covers = await info.context.loaders.covers_by_entity("artist", self.id)
+        return [CoverType.from_model(cover) for cover in covers]
 
 
 @strawberry.input
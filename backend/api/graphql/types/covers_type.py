@@ -12,7 +12,28 @@ class CoverType:
     date_added: str
     date_modified: str
     mime_type: str | None = strawberry.field(name="mimeType")
+    content_hash: str | None = strawberry.field(name="contentHash", default=None)
+    width: int | None = None
+    height: int | None = None
 
     @strawberry.field
     def url(self) -> str:
+        if self.content_hash:
+            return f"/api/covers/content/{self.content_hash}/256"
         return f"/covers/{self.entity_type}/{self.entity_id}"
+
+    @classmethod
+    def from_model(cls, cover) -> "CoverType":
+        """Construit le type GraphQL depuis un modèle Cover."""
+        return cls(
+            id=cover.id,
+            entity_type=cover.entity_type,
+            entity_id=cover.entity_id,
+            cover_data=cover.cover_data,
+            date_added=str(cover.date_added),
+            date_modified=str(cover.date_modified),
+            mime_type=cover.mime_type,
+            content_hash=cover.content_hash,
+            width=cover.width,
+            height=cover.height,
+        )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from enum import Enum
+
+import strawberry
+
+from backend.api.graphql.types.tracks_type import TrackType
+
+
+@strawberry.enum
+class TrackSortField(Enum):
+    """Clés de tri de la pagination par curseur des pistes."""
+
+    ID = "id"
+    TITLE = "title"
+    DATE_ADDED = "date_added"
+
+
+@strawberry.type
+class PageInfo:
+    """Informations de pagination (style Relay)."""
+
+    has_next_page: bool
+    end_cursor: str | None
+
+
+@strawberry.type
+class TrackEdge:
+    """Piste d'une page et son curseur."""
+
+    cursor: str
+    node: TrackType
+
+
+@strawberry.type
+class TrackConnection:
+    """
+    Page de pistes paginée par curseur.
+
+    Attributes:
+        edges: Pistes de la page avec leur curseur
+        page_info: Curseur de fin et présence d'une page suivante
+        total_count: Total (estimé sans filtre, plafonné avec filtres) ;
+            calculé seulement si le champ est demandé
+        total_is_estimate: True si total_count n'est pas un comptage exact
+    """
+
+    edges: list[TrackEdge]
+    page_info: PageInfo
+    total_count: int | None = None
+    total_is_estimate: bool = False
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Annotated, Any
 
 import strawberry
+from strawberry.types import Info
 
 from backend.api.graphql.types.covers_type import CoverType
 from backend.api.graphql.types.track_audio_features_type import (
@@ -19,6 +20,8 @@ from backend.api.graphql.types.track_mir_type import (
 
 
 if TYPE_CHECKING:
+    from backend.api.graphql.types.albums_type import AlbumType
+    from backend.api.graphql.types.artist_type import ArtistType
     TrackAudioFeatures = Any
     TrackEmbeddings = Any
     TrackMetadata = Any
@@ -28,6 +31,36 @@ if TYPE_CHECKING:
     TrackMIRSyntheticTags = Any
 
 
+# Relation pas encore chargée (distincte de None : relation absente)
+NOT_LOADED: Any = object()
+
+
+async def _relation(track: Any, info: Info, name: str) -> Any:
+    """
+    Valeur d'une relation de piste.
+
+    `track` est un TrackType ou, pour les mutations et les relations
+    imbriquées, directement un modèle Track : on prend la valeur
+    pré-renseignée, sinon la relation déjà chargée par l'ORM, sinon le
+    loader de la requête.
+    """
+    value = getattr(track, f"_{name}", NOT_LOADED)
+    if value is NOT_LOADED:
+        value = vars(track).get(name, NOT_LOADED)
+    if value is NOT_LOADED:
+        value = await info.context.loaders.track_relations.load(name, track.id)
+        try:
+            setattr(track, f"_{name}", value)
+        except AttributeError:
+            pass
+    return value
+
+
+async def _feature(track: Any, info: Info, field: str) -> Any:
+    features = await _relation(track, info, "audio_features")
+    return getattr(features, field) if features else None
+
+
 @strawberry.type
 class TrackType:
     """
@@ -89,136 +122,116 @@ class TrackType:
     musicbrainz_albumartistid: str | None
     acoustid_fingerprint: str | None
 
-    # Relations
-    covers: list[CoverType] = strawberry.field(default_factory=list)
+    # Relations chargées à la demande (champ sélectionné -> DataLoader par
+    # track_id) ; les résolveurs de requête peuvent les pré-renseigner.
+    # Un résolveur peut aussi recevoir directement un modèle Track (mutations) :
+    # les attributs privés sont alors absents et la relation passe par le loader.
+    _covers: strawberry.Private[Any] = NOT_LOADED
+    _audio_features: strawberry.Private[Any] = NOT_LOADED
+    _embeddings: strawberry.Private[Any] = NOT_LOADED
+    _metadata_entries: strawberry.Private[Any] = NOT_LOADED
+    _mir_raw: strawberry.Private[Any] = NOT_LOADED
+    _mir_normalized: strawberry.Private[Any] = NOT_LOADED
+    _mir_scores: strawberry.Private[Any] = NOT_LOADED
+    _mir_synthetic_tags: strawberry.Private[Any] = NOT_LOADED
+
+    @strawberry.field
+    async def artist(
+        self, info: Info
+    ) -> Annotated["ArtistType", strawberry.lazy("backend.api.graphql.types.artist_type")] | None:
+        """Artiste principal (regroupé avec les autres pistes de la requête)."""
+        return await info.context.loaders.artist_by_id(self.track_artist_id)
+
+    @strawberry.field
+    async def album(
+        self, info: Info
+    ) -> Annotated["AlbumType", strawberry.lazy("backend.api.graphql.types.albums_type")] | None:
+        """Album (regroupé avec les autres pistes de la requête)."""
+        if self.album_id is None:
+            return None
+        return await info.context.loaders.album_by_id(self.album_id)
 
-    # Attributs internes injectés depuis les query resolvers
-    # (déclarés pour satisfaire l'analyse statique Pylance)
-    _audio_features: strawberry.Private[Optional[Any]] = None
-    _embeddings: strawberry.Private[Optional[list[Any]]] = None
-    _metadata_entries: strawberry.Private[Optional[list[Any]]] = None
-    _mir_raw: strawberry.Private[Optional[Any]] = None
-    _mir_normalized: strawberry.Private[Optional[Any]] = None
-    _mir_scores: strawberry.Private[Optional[Any]] = None
-    _mir_synthetic_tags: strawberry.Private[Optional[list[Any]]] = None
+    @strawberry.field
+    async def covers(self, info: Info) -> list[CoverType]:
+        """Pochettes associées."""
+        return [CoverType.from_model(cover) for cover in await _relation(self, info, "covers") or []]
 
     # Propriétés calculées pour la rétrocompatibilité
     @strawberry.field
-    def bpm(self) -> float | None:
+    async def bpm(self, info: Info) -> float | None:
         """Tempo en BPM (depuis audio_features)."""
-        features = getattr(self, "_audio_features", None)
-        if features:
-            return features.bpm
-        return None
+        return await _feature(self, info, "bpm")
 
     @strawberry.field
-    def key(self) -> str | None:
+    async def key(self, info: Info) -> str | None:
         """Tonalité musicale (depuis audio_features)."""
-        features = getattr(self, "_audio_features", None)
-        if features:
-            return features.key
-        return None
+        return await _feature(self, info, "key")
 
     @strawberry.field
-    def scale(self) -> str | None:
+    async def scale(self, info: Info) -> str | None:
         """Mode (major/minor) (depuis audio_features)."""
-        features = getattr(self, "_audio_features", None)
-        if features:
-            return features.scale
-        return None
+        return await _feature(self, info, "scale")
 
     @strawberry.field
-    def danceability(self) -> float | None:
+    async def danceability(self, info: Info) -> float | None:
         """Score de dansabilité (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.danceability
-        return None
+        return await _feature(self, info, "danceability")
 
     @strawberry.field
-    def mood_happy(self) -> float | None:
+    async def mood_happy(self, info: Info) -> float | None:
         """Score mood happy (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.mood_happy
-        return None
+        return await _feature(self, info, "mood_happy")
 
     @strawberry.field
-    def mood_aggressive(self) -> float | None:
+    async def mood_aggressive(self, info: Info) -> float | None:
         """Score mood aggressive (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.mood_aggressive
-        return None
+        return await _feature(self, info, "mood_aggressive")
 
     @strawberry.field
-    def mood_party(self) -> float | None:
+    async def mood_party(self, info: Info) -> float | None:
         """Score mood party (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.mood_party
-        return None
+        return await _feature(self, info, "mood_party")
 
     @strawberry.field
-    def mood_relaxed(self) -> float | None:
+    async def mood_relaxed(self, info: Info) -> float | None:
         """Score mood relaxed (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.mood_relaxed
-        return None
+        return await _feature(self, info, "mood_relaxed")
 
     @strawberry.field
-    def instrumental(self) -> float | None:
+    async def instrumental(self, info: Info) -> float | None:
         """Score instrumental (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.instrumental
-        return None
+        return await _feature(self, info, "instrumental")
 
     @strawberry.field
-    def acoustic(self) -> float | None:
+    async def acoustic(self, info: Info) -> float | None:
         """Score acoustic (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.acoustic
-        return None
+        return await _feature(self, info, "acoustic")
 
     @strawberry.field
-    def tonal(self) -> float | None:
+    async def tonal(self, info: Info) -> float | None:
         """Score tonal (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.tonal
-        return None
+        return await _feature(self, info, "tonal")
 
     @strawberry.field
-    def camelot_key(self) -> str | None:
+    async def camelot_key(self, info: Info) -> str | None:
         """Clé Camelot pour DJ (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.camelot_key
-        return None
+        return await _feature(self, info, "camelot_key")
 
     @strawberry.field
-    def genre_main(self) -> str | None:
+    async def genre_main(self, info: Info) -> str | None:
         """Genre principal détecté (depuis audio_features)."""
-        features = self._audio_features
-        if features:
-            return features.genre_main
-        return None
+        return await _feature(self, info, "genre_main")
 
     # Résolveurs pour les nouvelles relations
     @strawberry.field
-    def audio_features(self) -> TrackAudioFeaturesType | None:
+    async def audio_features(self, info: Info) -> TrackAudioFeaturesType | None:
         """
         Récupère les caractéristiques audio détaillées de la piste.
 
         Returns:
             Les caractéristiques audio ou None si non analysées
         """
-        # Le résolveur sera appelé avec l'instance SQLAlchemy
-        # La relation est chargée via lazy='selectin' dans le modèle
-        features = self._audio_features
+        features = await _relation(self, info, "audio_features")
         if features:
             return TrackAudioFeaturesType(
                 id=features.id,
@@ -244,56 +257,52 @@ class TrackType:
         return None
 
     @strawberry.field
-    def embeddings(self) -> list[TrackEmbeddingsType]:
+    async def embeddings(self, info: Info) -> list[TrackEmbeddingsType]:
         """
-        Récupère les embeddings vectoriels de la piste.
+        Récupère les embeddings vectoriels de la piste (sans les vecteurs).
 
         Returns:
             Liste des embeddings (peut être vide)
         """
-        if hasattr(self, "_embeddings"):
-            return [
-                TrackEmbeddingsType(
-                    id=emb.id,
-                    track_id=emb.track_id,
-                    embedding_type=emb.embedding_type,
-                    embedding_source=emb.embedding_source,
-                    embedding_model=emb.embedding_model,
-                    created_at=emb.created_at,
-                    date_added=emb.date_added,
-                    date_modified=emb.date_modified,
-                )
-                for emb in self._embeddings or []
-            ]
-        return []
+        return [
+            TrackEmbeddingsType(
+                id=emb.id,
+                track_id=emb.track_id,
+                embedding_type=emb.embedding_type,
+                embedding_source=emb.embedding_source,
+                embedding_model=emb.embedding_model,
+                created_at=emb.created_at,
+                date_added=emb.date_added,
+                date_modified=emb.date_modified,
+            )
+            for emb in await _relation(self, info, "embeddings") or []
+        ]
 
     @strawberry.field
-    def metadata(self) -> list[TrackMetadataType]:
+    async def metadata(self, info: Info) -> list[TrackMetadataType]:
         """
         Récupère les métadonnées enrichies de la piste.
 
         Returns:
             Liste des métadonnées (peut être vide)
         """
-        if hasattr(self, "_metadata_entries"):
-            return [
-                TrackMetadataType(
-                    id=meta.id,
-                    track_id=meta.track_id,
-                    metadata_key=meta.metadata_key,
-                    metadata_value=meta.metadata_value,
-                    metadata_source=meta.metadata_source,
-                    created_at=meta.created_at,
-                    date_added=meta.date_added,
-                    date_modified=meta.date_modified,
-                )
-                for meta in self._metadata_entries or []
-            ]
-        return []
+        return [
+            TrackMetadataType(
+                id=meta.id,
+                track_id=meta.track_id,
+                metadata_key=meta.metadata_key,
+                metadata_value=meta.metadata_value,
+                metadata_source=meta.metadata_source,
+                created_at=meta.created_at,
+                date_added=meta.date_added,
+                date_modified=meta.date_modified,
+            )
+            for meta in await _relation(self, info, "metadata_entries") or []
+        ]
 
     # Résolveurs pour les relations MIR
     @strawberry.field
-    def mir_raw(self) -> TrackMIRRawType | None:
+    async def mir_raw(self, info: Info) -> TrackMIRRawType | None:
         """
         Récupère les tags MIR bruts de la piste.
 
@@ -303,8 +312,8 @@ class TrackType:
         Returns:
             Les tags MIR bruts ou None si non disponibles
         """
-        if hasattr(self, "_mir_raw") and self._mir_raw:
-            raw = self._mir_raw
+        raw = await _relation(self, info, "mir_raw")
+        if raw:
             # Extraire les champs individuels depuis le blob JSON features_raw
             features: dict = raw.features_raw or {}
             return TrackMIRRawType(
@@ -333,15 +342,15 @@ class TrackType:
         return None
 
     @strawberry.field
-    def mir_normalized(self) -> TrackMIRNormalizedType | None:
+    async def mir_normalized(self, info: Info) -> TrackMIRNormalizedType | None:
         """
         Récupère les tags MIR normalisés de la piste.
 
         Returns:
             Les tags MIR normalisés ou None si non disponibles
         """
-        if hasattr(self, "_mir_normalized") and self._mir_normalized:
-            norm = self._mir_normalized
+        norm = await _relation(self, info, "mir_normalized")
+        if norm:
             return TrackMIRNormalizedType(
                 id=norm.id,
                 track_id=norm.track_id,
@@ -370,15 +379,15 @@ class TrackType:
         return None
 
     @strawberry.field
-    def mir_scores(self) -> TrackMIRScoresType | None:
+    async def mir_scores(self, info: Info) -> TrackMIRScoresType | None:
         """
         Récupère les scores MIR calculés de la piste.
 
         Returns:
             Les scores MIR ou None si non calculés
         """
-        if hasattr(self, "_mir_scores") and self._mir_scores:
-            scores = self._mir_scores
+        scores = await _relation(self, info, "mir_scores")
+        if scores:
             return TrackMIRScoresType(
                 id=scores.id,
                 track_id=scores.track_id,
@@ -395,29 +404,27 @@ class TrackType:
         return None
 
     @strawberry.field
-    def mir_synthetic_tags(self) -> list[TrackMIRSyntheticTagType]:
+    async def mir_synthetic_tags(self, info: Info) -> list[TrackMIRSyntheticTagType]:
         """
         Récupère les tags synthétiques de la piste.
 
         Returns:
             Liste des tags synthétiques (peut être vide)
         """
-        if hasattr(self, "_mir_synthetic_tags"):
-            return [
-                TrackMIRSyntheticTagType(
-                    id=tag.id,
-                    track_id=tag.track_id,
-                    tag_name=tag.tag_name,
-                    tag_category=tag.tag_category,
-                    tag_score=tag.tag_score,
-                    generation_source=tag.generation_source,
-                    created_at=tag.created_at,
-                    date_added=tag.date_added,
-                    date_modified=tag.date_modified,
-                )
-                for tag in self._mir_synthetic_tags or []
-            ]
-        return []
+        return [
+            TrackMIRSyntheticTagType(
+                id=tag.id,
+                track_id=tag.track_id,
+                tag_name=tag.tag_name,
+                tag_category=tag.tag_category,
+                tag_score=tag.tag_score,
+                generation_source=tag.generation_source,
+                created_at=tag.created_at,
+                date_added=tag.date_added,
+                date_modified=tag.date_modified,
+            )
+            for tag in await _relation(self, info, "mir_synthetic_tags") or []
+        ]
 
 
 @strawberry.input
@@ -452,6 +459,8 @@ class TrackCreateInput:
     musicbrainz_artistid: str | None = None
     musicbrainz_albumartistid: str | None = None
     acoustid_fingerprint: str | None = None
+    file_mtime: float | None = None
+    file_size: int | None = None
 
 
 @strawberry.input
@@ -487,3 +496,5 @@ class TrackUpdateInput:
     musicbrainz_artistid: str | None = None
     musicbrainz_albumartistid: str | None = None
     acoustid_fingerprint: str | None = None
+    file_mtime: float | None = None
+    file_size: int | None = None
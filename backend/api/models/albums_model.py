@@ -31,6 +31,8 @@ class Album(Base, TimestampMixin):
     __table_args__ = (
         # Index pour les recherches par titre d'album
         Index("idx_album_title", "title"),
+        # Cible du ON CONFLICT de upsertAlbums
+        Index("uq_albums_title_artist", "title", "album_artist_id", unique=True),
     )
 
     def __repr__(self):
@@ -21,7 +21,12 @@ class Cover(Base):
         Enum(EntityCoverType, name="covertype"), nullable=False
     )
     entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Historique : base64 en base, vidé par la migration vers le store de fichiers
     cover_data: Mapped[str] = mapped_column(String, nullable=True)
+    # SHA-256 de l'image source dans le store adressé par contenu (cover_store_service)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    width: Mapped[int] = mapped_column(Integer, nullable=True)
+    height: Mapped[int] = mapped_column(Integer, nullable=True)
     mime_type: Mapped[str] = mapped_column(String, nullable=True)
     url: Mapped[str] = mapped_column(String, nullable=True)
     date_added: Mapped[datetime] = mapped_column(
@@ -34,6 +39,7 @@ class Cover(Base):
     __table_args__ = (
         UniqueConstraint("entity_type", "entity_id", name="uq_entity_cover"),
         Index("idx_entity_lookup", "entity_type", "entity_id"),
+        Index("idx_covers_content_hash", "content_hash"),
     )
 
     def __repr__(self):
@@ -21,7 +21,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from pgvector.sqlalchemy import Vector
 
@@ -31,6 +31,19 @@ if TYPE_CHECKING:
     from backend.api.models.tracks_model import Track
 
 
+# Types d'embeddings disposant d'un index HNSW partiel
+TRACK_EMBEDDING_TYPES = ("semantic", "audio", "text", "combined")
+
+# Paramètres de construction HNSW par défaut (pgvector)
+HNSW_DEFAULT_M = 16
+HNSW_DEFAULT_EF_CONSTRUCTION = 64
+
+
+def hnsw_index_name(embedding_type: str) -> str:
+    """Nom de l'index HNSW partiel d'un type d'embedding."""
+    return f"idx_track_embeddings_vector_{embedding_type}"
+
+
 class TrackEmbeddings(Base, TimestampMixin):
     """
     Embeddings vectoriels pour une piste musicale.
@@ -97,12 +110,18 @@ class TrackEmbeddings(Base, TimestampMixin):
         Index(
             "uq_track_embeddings_track_type", "track_id", "embedding_type", unique=True
         ),
-        # Index HNSW pour recherche vectorielle rapide
-        Index(
-            "idx_track_embeddings_vector",
-            "vector",
-            postgresql_using="hnsw",
-            postgresql_with={"m": 16, "ef_construction": 64},
+        # Index HNSW partiels, un par type d'embedding : les recherches filtrent
+        # toujours sur embedding_type, un index global perdrait en rappel
+        *(
+            Index(
+                hnsw_index_name(embedding_type),
+                "vector",
+                postgresql_using="hnsw",
+                postgresql_with={"m": HNSW_DEFAULT_M, "ef_construction": HNSW_DEFAULT_EF_CONSTRUCTION},
+                postgresql_ops={"vector": "vector_l2_ops"},
+                postgresql_where=text(f"embedding_type = '{embedding_type}'"),
+            )
+            for embedding_type in TRACK_EMBEDDING_TYPES
         ),
     )
 
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import String, Integer, ForeignKey, Float, Index
+from sqlalchemy import String, Integer, ForeignKey, Float, Index, func, text
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -78,26 +78,27 @@ class Track(Base, TimestampMixin):
     )
 
     # Nouvelles relations vers les tables dédiées (Plan d'évolution Track)
+    # Chargement paresseux : les listes de pistes ne transfèrent plus vecteurs
+    # et JSON MIR pour chaque ligne. Les résolveurs GraphQL passent par les
+    # DataLoaders de backend/api/graphql/dataloader/track_relations.py, les
+    # services par selectinload() explicite (TrackService include=).
     # Relation 1:1 avec TrackAudioFeatures
     audio_features: Mapped["TrackAudioFeatures"] = relationship(
         "TrackAudioFeatures",
         back_populates="track",
         uselist=False,
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
     # Relation 1:N avec TrackEmbeddings (plusieurs embeddings par piste)
     embeddings: Mapped[list["TrackEmbeddings"]] = relationship(
         "TrackEmbeddings",
         back_populates="track",
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
     # Relation 1:N avec TrackMetadata (métadonnées extensibles)
     metadata_entries: Mapped[list["TrackMetadata"]] = relationship(
         "TrackMetadata",
         back_populates="track",
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
 
@@ -107,7 +108,6 @@ class Track(Base, TimestampMixin):
         "TrackMIRRaw",
         back_populates="track",
         uselist=False,
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
     # Relation 1:1 avec TrackMIRNormalized (données MIR normalisées)
@@ -115,7 +115,6 @@ class Track(Base, TimestampMixin):
         "TrackMIRNormalized",
         back_populates="track",
         uselist=False,
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
     # Relation 1:1 avec TrackMIRScores (scores globaux calculés)
@@ -123,14 +122,12 @@ class Track(Base, TimestampMixin):
         "TrackMIRScores",
         back_populates="track",
         uselist=False,
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
     # Relation 1:N avec TrackMIRSyntheticTags (tags synthétiques)
     mir_synthetic_tags: Mapped[list["TrackMIRSyntheticTags"]] = relationship(
         "TrackMIRSyntheticTags",
         back_populates="track",
-        lazy="selectin",
         cascade="all, delete-orphan",
     )
 
@@ -141,4 +138,7 @@ class Track(Base, TimestampMixin):
         Index("idx_tracks_genre", "genre"),
         Index("idx_tracks_dates", "date_added", "date_modified"),
         Index("idx_tracks_search", "search", postgresql_using="gin"),
+        # Pagination par curseur (clé de tri, id) de TrackService.list_tracks_keyset
+        Index("idx_tracks_title_keyset", func.coalesce(text("title"), ""), "id"),
+        Index("idx_tracks_date_added_keyset", "date_added", "id"),
     )
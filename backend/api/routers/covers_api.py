@@ -1,15 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, List, Optional
 from backend.api.utils.database import get_async_session
 from backend.api.schemas.covers_schema import CoverCreate, Cover as CoverSchema
 from backend.api.services.covers_service import CoverService
+from backend.api.services.cover_store_service import (
+    cover_store,
+    nearest_variant_size,
+    sprite_key,
+    variant_etag,
+)
+from backend.api.services.cover_validator_service import CoverValidator, cover_validator_service
+from backend.api.utils.image_transcode_pool import TranscodeQueueFull, image_transcode_pool
 from backend.api.models.covers_model import EntityCoverType
 from backend.api.utils.logging import logger
 from backend.api.utils.taskiq_broker import taskiq_broker
-import asyncio
-import base64
 from pathlib import Path
 
 router = APIRouter(prefix="/covers", tags=["covers"])
@@ -19,74 +26,244 @@ PLACEHOLDER_PATH = (
     Path(__file__).resolve().parent.parent.parent / "data" / "static" / "logo.png"
 )
 
+COVER_CACHE_CONTROL = "public, max-age=86400"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Une page de grille de la bibliothèque
+MAX_SPRITE_ITEMS = 200
+
+
+def _is_not_modified(request: Request, etag: str, modified: Optional[int] = None) -> bool:
+    """
+    Évalue If-None-Match (prioritaire) puis If-Modified-Since.
+
+    Comparaison faible des ETags (RFC 9110 §13.1.2) : un préfixe W/ est ignoré.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _validator_headers(
+    etag: str, modified: Optional[int] = None, cache_control: str = COVER_CACHE_CONTROL
+) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    return headers
+
+
+def _not_modified_response(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
 
 @router.post("/", response_model=CoverSchema)
 async def create_cover(
     cover: CoverCreate, db: AsyncSession = Depends(get_async_session)
 ):
-    """Crée une cover et la convertit en WebP."""
+    """Crée une cover ; l'image base64 est stockée sur disque (store adressé par contenu)."""
     service = CoverService(db)
     try:
-        # Conversion base64 → WebP
-        binary = base64.b64decode(cover.cover_data)
-        webp_bytes = service.normalize_cover(binary, size=256)
+        return await service.create_or_update_cover(cover)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Stockage WebP sur disque
-        service.store_entity_cover(cover.entity_type, cover.entity_id, webp_bytes)
 
-        cover.url = f"/covers/{cover.entity_type}/{cover.entity_id}"
-        return await service.create_or_update_cover(cover)
+@router.get("/content/{content_hash}/{size}")
+async def serve_cover_content(content_hash: str, size: int, request: Request):
+    """
+    Sert une variante du store adressé par contenu.
+
+    Le contenu d'un hash ne change jamais : la réponse est cachable sans limite
+    et une revalidation est résolue par l'ETag seul, sans accès disque.
+    """
+    headers = _validator_headers(
+        variant_etag(content_hash, nearest_variant_size(size)),
+        cache_control=IMMUTABLE_CACHE_CONTROL,
+    )
+    if _is_not_modified(request, headers["ETag"]):
+        return _not_modified_response(headers)
+    variant_path = cover_store.get_variant(content_hash, size)
+    if variant_path is None:
+        raise HTTPException(status_code=404, detail="Cover non trouvée")
+    return FileResponse(variant_path, media_type="image/webp", headers=headers)
+
+
+@router.post("/store/migrate")
+async def migrate_covers_to_store(
+    after_id: int = Query(0, ge=0),
+    batch_size: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Déplace un lot de covers base64 de la base vers le store de fichiers."""
+    service = CoverService(db)
+    try:
+        return await service.migrate_base64_covers(after_id=after_id, batch_size=batch_size)
     except Exception as e:
+        logger.error(f"[COVER API] Erreur migration covers base64: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/transcode/metrics")
+async def get_transcode_metrics():
+    """Profondeur de file et latences du pool de transcodage d'images."""
+    return image_transcode_pool.get_metrics()
+
+
+@router.get("/sprite/{entity_type}")
+async def serve_cover_sprite(
+    entity_type: EntityCoverType,
+    request: Request,
+    ids: str = Query(..., description="IDs des entités, séparés par des virgules"),
+    size: int = Query(128, ge=1, le=512),
+    columns: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Planche WebP des vignettes d'une page de grille (une seule requête HTTP).
+
+    La cellule i (ordre de `ids`) est en (i % colonnes, i // colonnes), de côté
+    X-Sprite-Cell. Les entités sans cover du store sont listées dans
+    X-Sprite-Missing (cellule vide) : le client utilise alors la route par
+    entité. L'ETag dérive des hashes de contenu : une revalidation est
+    résolue depuis Redis, sans requête SQL.
+    """
+    try:
+        entity_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids doit être une liste d'entiers")
+    if not entity_ids or len(entity_ids) > MAX_SPRITE_ITEMS:
+        raise HTTPException(
+            status_code=422, detail=f"Entre 1 et {MAX_SPRITE_ITEMS} ids par planche"
+        )
+
+    cell = nearest_variant_size(size)
+    validators = await cover_validator_service.get_many(entity_type.value, entity_ids)
+    unknown = [entity_id for entity_id in entity_ids if entity_id not in validators]
+    if unknown:
+        found = await CoverService(db).get_content_hashes(entity_type.value, unknown)
+        entries = [
+            (entity_type.value, entity_id, *found.get(entity_id, (None, None)))
+            for entity_id in unknown
+        ]
+        await cover_validator_service.remember_many(entries)
+        for _, entity_id, hash_value, modified in entries:
+            validators[entity_id] = CoverValidator(
+                hash_value or "", int(modified.timestamp()) if modified else 0
+            )
+
+    hashes = [validators[entity_id].content_hash or None for entity_id in entity_ids]
+    key = sprite_key(list(zip(entity_ids, hashes)), cell, columns)
+    headers = _validator_headers(
+        f'"{key}"', max(validator.modified for validator in validators.values())
+    )
+    headers["X-Sprite-Cell"] = str(cell)
+    headers["X-Sprite-Columns"] = str(min(columns, len(entity_ids)))
+    headers["X-Sprite-Missing"] = ",".join(
+        str(entity_id) for entity_id, hash_value in zip(entity_ids, hashes) if not hash_value
+    )
+    if _is_not_modified(request, headers["ETag"]):
+        return _not_modified_response(headers)
+
+    try:
+        sprite_path = await cover_store.abuild_sprite(key, hashes, cell, columns)
+    except TranscodeQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Pool de transcodage saturé",
+            headers={"Retry-After": "5"},
+        )
+    return FileResponse(sprite_path, media_type="image/webp", headers=headers)
+
+
 @router.get("/{entity_type}/{entity_id}")
 async def serve_cover(
-    entity_type: str, entity_id: int, db: AsyncSession = Depends(get_async_session)
+    entity_type: str,
+    entity_id: int,
+    request: Request,
+    size: Optional[int] = Query(None, ge=1, le=2048),
+    db: AsyncSession = Depends(get_async_session),
 ):
     """
     Sert une cover WebP.
-    - Si WebP existe sur disque → renvoie directement
-    - Sinon si base64 en DB → convertit à la volée, stocke en WebP, renvoie
+    - Si le validateur Redis est connu → 304 ou variante servie sans requête SQL
+    - Si la cover est dans le store → renvoie la variante de la taille demandée
+    - Sinon si WebP historique sur disque → renvoie directement
+    - Sinon si base64 en DB (non encore migrée) → déplace vers le store, renvoie
     - Sinon → placeholder
+
+    Les covers du store portent un ETag fort (hash de contenu + taille) et un
+    Last-Modified ; If-None-Match / If-Modified-Since donnent un 304. Les
+    requêtes Range sont gérées par FileResponse.
     """
+    headers = {"Cache-Control": COVER_CACHE_CONTROL}
+    variant_size = nearest_variant_size(size)
+
+    # 0️⃣ Validateur en cache : revalidation sans base de données
+    validator = await cover_validator_service.get(entity_type, entity_id)
+    if validator and validator.has_cover:
+        validator_headers = _validator_headers(
+            variant_etag(validator.content_hash, variant_size), validator.modified
+        )
+        if _is_not_modified(request, validator_headers["ETag"], validator.modified):
+            return _not_modified_response(validator_headers)
+        variant_path = cover_store.get_variant(validator.content_hash, size)
+        if variant_path:
+            return FileResponse(variant_path, media_type="image/webp", headers=validator_headers)
+
     service = CoverService(db)
 
-    # 1️⃣ Vérifie si WebP existe sur disque
-    logger.info(
-        f"[COVER API] Appel de get_cover_path avec entity_type={entity_type}, entity_id={entity_id}"
-    )
+    # 1️⃣ Cover référencée dans le store adressé par contenu
+    cover_db = await service.get_cover(entity_type, entity_id)
+    if cover_db and cover_db.content_hash:
+        await service.remember_validator(cover_db)
+        modified = int(cover_db.date_modified.timestamp()) if cover_db.date_modified else None
+        validator_headers = _validator_headers(
+            variant_etag(cover_db.content_hash, variant_size), modified
+        )
+        if _is_not_modified(request, validator_headers["ETag"], modified):
+            return _not_modified_response(validator_headers)
+        variant_path = cover_store.get_variant(cover_db.content_hash, size)
+        if variant_path:
+            return FileResponse(variant_path, media_type="image/webp", headers=validator_headers)
+
+    # 2️⃣ WebP historique sur disque
     webp_path = service.get_cover_path(entity_type, entity_id)
-    logger.info(f"[COVER API] Résultat get_cover_path: {webp_path}")
     if webp_path:
-        return FileResponse(
-            webp_path,
-            media_type="image/webp",
-            headers={"Cache-Control": "public, max-age=86400"},
-        )
+        return FileResponse(webp_path, media_type="image/webp", headers=headers)
 
-    # 2️⃣ Fallback base64
-    logger.info(f"[COVER API] Tentative fallback base64 pour {entity_type}/{entity_id}")
-    cover_db = await service.get_cover(entity_type, entity_id)
-    logger.info(f"[COVER API] Résultat get_cover DB: {cover_db}")
+    # 3️⃣ Base64 pas encore migré : déplacement vers le store à la première lecture
     if cover_db and getattr(cover_db, "cover_data", None):
+        logger.info(
+            f"[COVER API] Migration à la volée vers le store pour {entity_type}/{entity_id}"
+        )
         try:
-            logger.info(
-                f"[COVER API] Conversion base64 → WebP pour {entity_type}/{entity_id}"
-            )
-            binary = base64.b64decode(cover_db.cover_data)
-            webp_bytes = service.normalize_cover(binary, size=256)
-            service.store_entity_cover(entity_type, entity_id, webp_bytes)
-            return Response(
-                content=webp_bytes,
-                media_type="image/webp",
-                headers={"Cache-Control": "public, max-age=86400"},
-            )
-        except Exception as e:
-            logger.error(f"[COVER API] Erreur conversion WebP: {str(e)}")
+            if await service.migrate_cover_to_store(cover_db):
+                await service.remember_validator(cover_db)
+                etag = variant_etag(cover_db.content_hash, variant_size)
+                await db.commit()
+                variant_path = cover_store.get_variant(cover_db.content_hash, size)
+                return FileResponse(
+                    variant_path, media_type="image/webp", headers={**headers, "ETag": etag}
+                )
             raise HTTPException(
-                status_code=500, detail=f"Erreur conversion WebP: {str(e)}"
+                status_code=500, detail=f"Cover illisible pour {entity_type}/{entity_id}"
+            )
+        except TranscodeQueueFull:
+            # Pool saturé : placeholder non caché, la migration sera retentée
+            logger.warning(
+                f"[COVER API] Pool de transcodage saturé, placeholder pour {entity_type}/{entity_id}"
             )
+            headers = {"Cache-Control": "no-store", "Retry-After": "5"}
 
     # Fallback placeholder
     logger.warning(
@@ -95,11 +272,10 @@ async def serve_cover(
 
     # Vérifier si le fichier placeholder existe
     if PLACEHOLDER_PATH.exists():
-        logger.info(f"[COVER API] Placeholder trouvé: {PLACEHOLDER_PATH}")
         return FileResponse(
             str(PLACEHOLDER_PATH),
             media_type="image/png",
-            headers={"Cache-Control": "public, max-age=86400"},
+            headers=headers,
         )
     else:
         # Si le fichier n'existe pas, retourner une erreur 404 explicite
@@ -31,6 +31,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from backend.api.utils.database import get_async_session
 from backend.api.utils.logging import logger
 from backend.api.services.mir_llm_service import MIRLLMService
+from backend.api.services.harmonic_mix_index_service import harmonic_mix_index_service
+from backend.api.services.mir_score_index_service import mir_score_index_service
 
 # Import des schémas MIR
 from backend.api.schemas.mir_schema import (
@@ -235,6 +237,14 @@ async def store_track_mir(
         # Commit des changements
         await db.commit()
 
+        # Index de similarité en mémoire : prend en compte l'écriture sans attendre
+        mir_score_index_service.on_scores_written(track_id, scores_data)
+        mir_score_index_service.on_normalized_written(
+            track_id, norm_data.bpm, norm_data.camelot_key
+        )
+        if existing_audio:
+            harmonic_mix_index_service.on_features_written(track_id, existing_audio)
+
         logger.info(f"[MIR] Stockage MIR réussi pour track_id={track_id}")
 
         return MIRStorageResponse(
@@ -5,7 +5,7 @@ Gère les connexions SSE et WebSocket pour les événements temps réel.
 """
 
 from fastapi import APIRouter, WebSocket
-from backend.api.services.realtime_service import realtime_service
+from backend.api.services.sse_hub_service import sse_hub
 from backend.api.utils.logging import logger
 
 router = APIRouter(prefix="", tags=["realtime"])
@@ -20,18 +20,21 @@ async def global_ws(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket accepté avec succès")
 
+    # Même hub que /events : pas de connexion Redis par WebSocket
+    client = await sse_hub.register()
     try:
-        async for event in realtime_service.listen_to_channels(
-            ["notifications", "progress"]
-        ):
-            # Pour WebSocket, on envoie le message brut (sans format SSE)
-            message_data = event.replace("data: ", "").replace("\n\n", "")
-            try:
-                await websocket.send_text(message_data)
-            except Exception as e:
-                logger.error(f"WebSocket send error: {e}")
-                break
+        while not client.closed:
+            for event in await client.next_frames():
+                # Pour WebSocket, on envoie le message brut (sans format SSE)
+                message_data = event[len("data: "):-2]
+                try:
+                    await websocket.send_text(message_data)
+                except Exception as e:
+                    logger.error(f"WebSocket send error: {e}")
+                    client.close("disconnected")
+                    break
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        await sse_hub.unregister(client)
         logger.info("WebSocket disconnected.")
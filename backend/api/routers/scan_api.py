@@ -24,8 +24,16 @@ async def launch_scan(
     try:
         directory = request.directory if request and request.directory else None
         cleanup_deleted = request.cleanup_deleted if request else False
+        incremental = request.incremental if request else False
+        force_delete = request.force_delete if request else False
         try:
-            result = await ScanService.launch_scan(directory, db, cleanup_deleted)
+            result = await ScanService.launch_scan(
+                directory,
+                db,
+                cleanup_deleted,
+                incremental=incremental,
+                force_delete=force_delete,
+            )
         except FileNotFoundError as e:
             raise HTTPException(status_code=400, detail=str(e))
         except PermissionError as e:
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.api.schemas.search_schema import SearchQuery, SearchResult
@@ -11,14 +13,22 @@ router = APIRouter(prefix="/search", tags=["search"])
 
 @router.get("/typeahead")
 async def typeahead_search(
-    q: str = None, limit: int = 10, db: AsyncSession = Depends(get_async_session)
+    q: str = None,
+    limit: int = 10,
+    types: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session),
 ):
-    """Recherche typeahead pour la barre de recherche."""
+    """
+    Recherche typeahead pour la barre de recherche.
+
+    types: liste séparée par des virgules parmi artist, album, track (tous par défaut).
+    """
     try:
         if not q or not q.strip():
             return {"items": []}
 
-        results = await SearchService.typeahead_search(q, limit, db)
+        type_list = [t.strip() for t in types.split(",") if t.strip()] if types else None
+        results = await SearchService.typeahead_search(q, limit, db, types=type_list)
         return {"items": results}
 
     except Exception as e:
@@ -130,7 +140,7 @@ async def get_cache_stats():
     try:
         from backend.api.services.redis_cache_service import redis_cache_service
 
-        stats = redis_cache_service.get_cache_stats()
+        stats = await redis_cache_service.get_cache_stats()
         return stats
     except Exception as e:
         logger.error(f"Erreur récupération stats cache: {e}")
@@ -145,10 +155,11 @@ async def clear_search_cache():
     try:
         from backend.api.services.redis_cache_service import redis_cache_service
 
-        deleted_count = redis_cache_service.invalidate_search_cache()
+        generation = await redis_cache_service.invalidate_search_cache()
         return {
-            "message": f"Cache de recherche vidé: {deleted_count} clés supprimées",
-            "status": "success",
+            "message": f"Cache de recherche invalidé (génération {generation})",
+            "generation": generation,
+            "status": "success" if generation else "warning",
         }
     except Exception as e:
         logger.error(f"Erreur vidage cache recherche: {e}")
@@ -163,7 +174,7 @@ async def clear_facets_cache():
     try:
         from backend.api.services.redis_cache_service import redis_cache_service
 
-        success = redis_cache_service.invalidate_facets_cache()
+        success = await redis_cache_service.invalidate_facets_cache()
         return {
             "message": "Cache des facettes vidé",
             "status": "success" if success else "warning",
@@ -181,7 +192,7 @@ async def clear_all_cache():
     try:
         from backend.api.services.redis_cache_service import redis_cache_service
 
-        success = redis_cache_service.clear_all_cache()
+        success = await redis_cache_service.clear_all_cache()
         return {
             "message": "Cache complètement vidé",
             "status": "success" if success else "warning",
@@ -217,3 +228,11 @@ async def api_add_to_index():
     """Endpoint déprécié - données indexées automatiquement."""
     logger.warning("Endpoint /add déprécié - indexation automatique")
     return {"message": "Indexation automatique", "deprecated": True}
+
+
+@router.get("/typeahead/stats")
+async def get_typeahead_stats():
+    """Taille de l'index typeahead du processus et compteurs de requêtes."""
+    from backend.api.services.typeahead_service import typeahead_service
+
+    return typeahead_service.get_stats()
@@ -1,87 +1,56 @@
-from fastapi import APIRouter, Request
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import StreamingResponse
 import json
-import asyncio
-import redis.asyncio as redis
+from backend.api.services.sse_hub_service import DEFAULT_MAX_RATE, format_sse, sse_hub
 from backend.api.utils.logging import logger
 
 router = APIRouter(prefix="", tags=["sse"])
 
+# Intervalle des commentaires keep-alive et de la détection de déconnexion
+HEARTBEAT_SECONDS = 15.0
+
 
 @router.get("/events")
-async def sse_endpoint(request: Request):
+async def sse_endpoint(
+    request: Request,
+    task_id: Optional[str] = Query(None, description="Ne suivre que cette tâche (ou ce batch)"),
+    scan_id: Optional[str] = Query(None, description="Ne suivre que ce scan"),
+    max_rate: float = Query(DEFAULT_MAX_RATE, gt=0, le=50,
+                            description="Mises à jour de progression par seconde"),
+):
     """
     Endpoint Server-Sent Events pour streamer la progression du scan.
 
-    Écoute les canaux Redis "notifications" et "progress" et retransmet
-    les événements SSE aux clients connectés. Gère les déconnexions Redis de manière robuste.
+    Les événements des canaux Redis "notifications" et "progress" arrivent
+    par le hub SSE du processus (un seul abonnement Redis quel que soit le
+    nombre d'onglets). Avec task_id ou scan_id, seuls les événements de ce
+    sujet et les événements globaux sont transmis ; la progression est
+    fusionnée à max_rate mises à jour par seconde.
     """
 
     async def event_generator():
-        redis_client = None
-        pubsub = None
-        retry_count = 0
-        max_retries = 5
-
-        while retry_count < max_retries:
-            try:
-                logger.info(
-                    f"SSE attempting Redis connection (attempt {retry_count + 1}/{max_retries})"
-                )
-                redis_client = await redis.from_url(
-                    "redis://redis:6379", max_connections=5, retry_on_timeout=True
-                )
-                pubsub = redis_client.pubsub()
-                await pubsub.subscribe("notifications", "progress")
-
-                logger.info("SSE client connected, listening for Redis events")
-
-                # Send initial connection event
-                yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE connection established'})}\n\n"
+        client = await sse_hub.register(topics=(task_id, scan_id), max_rate=max_rate)
+        try:
+            logger.info("SSE client connected, listening for hub events")
+            # Send initial connection event
+            yield format_sse(json.dumps({'type': 'connected', 'message': 'SSE connection established'}))
 
-                async for message in pubsub.listen():
-                    logger.debug(f"SSE received message: {message}")
-                    if message["type"] == "message":
-                        data = message["data"]
-                        if isinstance(data, bytes):
-                            try:
-                                decoded_data = data.decode("utf-8")
-                                logger.debug(f"SSE sending data: {decoded_data}")
-                                # Format SSE: data: <json>\n\n
-                                yield f"data: {decoded_data}\n\n"
-                            except Exception as e:
-                                logger.error(f"SSE send error: {e}")
-                                break
-
-            except redis.ConnectionError as e:
-                logger.warning(
-                    f"Redis connection failed (attempt {retry_count + 1}): {e}"
-                )
-                retry_count += 1
-                if retry_count < max_retries:
-                    # Send retry message to client
-                    yield f"data: {json.dumps({'type': 'retry', 'message': f'Redis connection failed, retrying... ({retry_count}/{max_retries})'})}\n\n"
-                    await asyncio.sleep(2)  # Wait before retry
-                    continue
-                else:
-                    logger.error("Max Redis connection retries reached")
-                    yield f"data: {json.dumps({'type': 'error', 'message': 'Redis connection failed permanently'})}\n\n"
+            while not client.closed:
+                frames = await client.next_frames(timeout=HEARTBEAT_SECONDS)
+                for frame in frames:
+                    yield frame
+                if await request.is_disconnected():
                     break
+                if not frames and not client.closed:
+                    yield ": keep-alive\n\n"
 
-            except Exception as e:
-                logger.error(f"Unexpected SSE error: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'message': f'Unexpected error: {str(e)}'})}\n\n"
-                break
-
-        # Cleanup
-        if pubsub:
-            try:
-                await pubsub.unsubscribe("notifications", "progress")
-            except Exception as e:
-                logger.error(f"Error unsubscribing SSE: {e}")
-        if redis_client:
-            await redis_client.close()
-        logger.info("SSE client disconnected")
+            if client.close_reason == "overflow":
+                yield format_sse(json.dumps({'type': 'error', 'message': 'Client too slow, reconnect to resume'}))
+        finally:
+            await sse_hub.unregister(client)
+            logger.info("SSE client disconnected")
 
     return StreamingResponse(
         event_generator(),
@@ -93,3 +62,9 @@ async def sse_endpoint(request: Request):
             "Access-Control-Allow-Headers": "Cache-Control",
         },
     )
+
+
+@router.get("/events/stats")
+async def sse_stats():
+    """Clients connectés, événements reçus et clients déconnectés par le hub SSE."""
+    return sse_hub.get_stats()
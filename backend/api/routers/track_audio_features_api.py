@@ -18,13 +18,15 @@ Endpoints:
     - PUT /tracks/{track_id}/audio-features - Mettre à jour les caractéristiques audio
     - DELETE /tracks/{track_id}/audio-features - Supprimer les caractéristiques audio
     - GET /audio-features/search - Rechercher par BPM, key, camelot_key, etc.
+    - GET /audio-features/harmonic-neighbours - Pistes suivantes pour une playlist
+    - GET /tracks/{track_id}/harmonic-mix - Mix harmonique automatique
 
 Auteur: SoniqueBay Team
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -412,6 +414,9 @@ async def get_similar_tracks_by_features(
         True, description="Utiliser les tonalités harmoniquement compatibles"
     ),
     limit: int = Query(20, ge=1, le=100, description="Nombre maximum de résultats"),
+    half_double_time: bool = Query(
+        False, description="Accepter les pistes à demi-tempo / double tempo"
+    ),
     db: AsyncSession = Depends(get_async_session),
 ) -> List[TrackAudioFeaturesCompact]:
     """
@@ -422,6 +427,7 @@ async def get_similar_tracks_by_features(
         bpm_tolerance: Tolérance de BPM
         use_compatible_keys: Utiliser les tonalités compatibles
         limit: Nombre maximum de résultats
+        half_double_time: Accepter les pistes à demi-tempo / double tempo
         db: Session de base de données
 
     Returns:
@@ -434,6 +440,7 @@ async def get_similar_tracks_by_features(
             bpm_tolerance=bpm_tolerance,
             use_compatible_keys=use_compatible_keys,
             limit=limit,
+            half_double_time=half_double_time,
         )
         return [TrackAudioFeaturesCompact.model_validate(s) for s in similar]
     except Exception as e:
@@ -442,3 +449,105 @@ async def get_similar_tracks_by_features(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la recherche de pistes similaires: {str(e)}",
         )
+
+
+@router.get(
+    "/audio-features/harmonic-neighbours",
+    response_model=Dict[int, List[TrackAudioFeaturesCompact]],
+    summary="Pistes suivantes compatibles pour une playlist",
+    description="Pour chaque piste, les pistes mixables (clé Camelot compatible, BPM proche).",
+)
+async def get_harmonic_neighbours(
+    track_ids: List[int] = Query(..., description="Pistes de référence"),
+    bpm_tolerance: float = Query(
+        5.0, ge=0.5, le=20.0, description="Tolérance de BPM (±)"
+    ),
+    use_compatible_keys: bool = Query(
+        True, description="Utiliser les tonalités harmoniquement compatibles"
+    ),
+    half_double_time: bool = Query(
+        False, description="Accepter les pistes à demi-tempo / double tempo"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Nombre maximum de résultats par piste"),
+    db: AsyncSession = Depends(get_async_session),
+) -> Dict[int, List[TrackAudioFeaturesCompact]]:
+    """
+    Calcule les transitions possibles de toute une playlist en un appel.
+
+    Args:
+        track_ids: Pistes de référence
+        bpm_tolerance: Tolérance de BPM
+        use_compatible_keys: Utiliser les tonalités compatibles
+        half_double_time: Accepter les pistes à demi-tempo / double tempo
+        limit: Nombre maximum de résultats par piste
+        db: Session de base de données
+
+    Returns:
+        Caractéristiques audio des pistes suivantes possibles, par piste
+    """
+    service = TrackAudioFeaturesService(db)
+    try:
+        neighbours = await service.get_next_tracks_batch(
+            track_ids=track_ids,
+            bpm_tolerance=bpm_tolerance,
+            use_compatible_keys=use_compatible_keys,
+            limit=limit,
+            half_double_time=half_double_time,
+        )
+        return {
+            track_id: [TrackAudioFeaturesCompact.model_validate(f) for f in found]
+            for track_id, found in neighbours.items()
+        }
+    except Exception as e:
+        logger.error(f"Erreur recherche des transitions pour {len(track_ids)} pistes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la recherche des transitions: {str(e)}",
+        )
+
+
+@router.get(
+    "/tracks/{track_id}/harmonic-mix",
+    response_model=List[TrackAudioFeaturesCompact],
+    summary="Construire un mix harmonique automatique",
+    description="Enchaîne des pistes de clés compatibles et de tempo proche à partir d'une piste.",
+)
+async def get_harmonic_mix(
+    track_id: int,
+    length: int = Query(20, ge=2, le=200, description="Nombre de pistes du mix"),
+    bpm_tolerance: float = Query(
+        5.0, ge=0.5, le=20.0, description="Tolérance de BPM (±) par transition"
+    ),
+    half_double_time: bool = Query(
+        False, description="Accepter les transitions demi-tempo / double tempo"
+    ),
+    db: AsyncSession = Depends(get_async_session),
+) -> List[TrackAudioFeaturesCompact]:
+    """
+    Construit un mix automatique à partir d'une piste.
+
+    Args:
+        track_id: Piste de départ
+        length: Nombre de pistes du mix (piste de départ comprise)
+        bpm_tolerance: Tolérance de BPM par transition
+        half_double_time: Accepter les transitions demi-tempo / double tempo
+        db: Session de base de données
+
+    Returns:
+        Caractéristiques audio des pistes du mix, dans l'ordre
+    """
+    service = TrackAudioFeaturesService(db)
+    try:
+        mix = await service.build_harmonic_mix(
+            seed_track_id=track_id,
+            length=length,
+            bpm_tolerance=bpm_tolerance,
+            half_double_time=half_double_time,
+        )
+        return [TrackAudioFeaturesCompact.model_validate(f) for f in mix]
+    except Exception as e:
+        logger.error(f"Erreur construction du mix pour track {track_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la construction du mix: {str(e)}",
+        )
@@ -16,9 +16,13 @@ Endpoints:
     - GET /tracks/{track_id}/embeddings - Récupérer tous les embeddings d'une piste
     - GET /tracks/{track_id}/embeddings/{embedding_type} - Récupérer un embedding spécifique
     - POST /tracks/{track_id}/embeddings - Créer un embedding
+    - POST /tracks/embeddings/batch - Créer ou mettre à jour les embeddings d'un lot de pistes
+    - GET /tracks/embeddings/texts - Page (keyset) des métadonnées de pistes à vectoriser
     - PUT /tracks/{track_id}/embeddings/{embedding_type} - Mettre à jour un embedding
     - DELETE /tracks/{track_id}/embeddings/{embedding_type} - Supprimer un embedding
     - POST /embeddings/search - Recherche vectorielle (similarité cosine)
+    - GET /embeddings/indexes - Lister les index HNSW par type d'embedding
+    - POST /embeddings/indexes/rebuild - Reconstruire les index HNSW
 
 Auteur: SoniqueBay Team
 """
@@ -39,6 +43,7 @@ from backend.api.schemas.track_embeddings_schema import (
     TrackSimilarityResult,
 )
 from backend.api.services.track_embeddings_service import TrackEmbeddingsService
+from backend.api.services.vector_index_service import VectorIndexService
 from backend.api.utils.database import get_async_session
 from backend.api.utils.logging import logger
 
@@ -74,6 +79,12 @@ class VectorSearchRequest(BaseModel):
         default=None,
         description="IDs de pistes à exclure",
     )
+    ef_search: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=1000,
+        description="Candidats explorés dans l'index HNSW (rappel vs latence)",
+    )
 
 
 class SimilaritySearchByTrackRequest(BaseModel):
@@ -93,6 +104,133 @@ class SimilaritySearchByTrackRequest(BaseModel):
         default=True,
         description="Exclure la piste de référence des résultats",
     )
+    ef_search: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=1000,
+        description="Candidats explorés dans l'index HNSW (rappel vs latence)",
+    )
+
+
+class VectorIndexRebuildRequest(BaseModel):
+    """Requête de reconstruction des index HNSW."""
+
+    embedding_types: Optional[List[str]] = Field(
+        default=None,
+        description="Types d'embeddings à réindexer (tous les types présents par défaut)",
+    )
+    m: Optional[int] = Field(
+        default=None,
+        ge=2,
+        le=100,
+        description="Paramètre m de HNSW (VECTOR_HNSW_M par défaut)",
+    )
+    ef_construction: Optional[int] = Field(
+        default=None,
+        ge=4,
+        le=1000,
+        description="Paramètre ef_construction de HNSW (VECTOR_HNSW_EF_CONSTRUCTION par défaut)",
+    )
+
+
+class TrackEmbeddingBatchItem(BaseModel):
+    """Vecteur d'une piste dans un lot."""
+
+    track_id: int = Field(..., description="ID de la piste")
+    embedding: List[float] = Field(
+        ...,
+        description="Vecteur d'embedding (512 dimensions, validé ligne par ligne)",
+    )
+
+
+class TrackEmbeddingsBatchRequest(BaseModel):
+    """Requête d'écriture groupée d'embeddings."""
+
+    items: List[TrackEmbeddingBatchItem] = Field(
+        ...,
+        max_length=5000,
+        description="Vecteurs à écrire",
+    )
+    embedding_type: str = Field(default="semantic", description="Type d'embedding")
+    embedding_source: Optional[str] = Field(default=None, description="Source de vectorisation")
+    embedding_model: Optional[str] = Field(default=None, description="Modèle utilisé")
+
+
+@router.post(
+    "/tracks/embeddings/batch",
+    summary="Écrire les embeddings d'un lot de pistes",
+    description="Crée ou met à jour les embeddings d'un lot de pistes en une seule requête SQL.",
+)
+async def batch_upsert_track_embeddings(
+    request: TrackEmbeddingsBatchRequest,
+    db: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Crée ou met à jour les embeddings d'un lot de pistes.
+
+    Args:
+        request: Vecteurs et métadonnées de vectorisation
+        db: Session de base de données
+
+    Returns:
+        Compteurs successful/failed/total
+    """
+    from backend.api.services.vector_search_service import VectorSearchService
+
+    result = await VectorSearchService(db).batch_add_track_embeddings_async(
+        [item.model_dump() for item in request.items],
+        embedding_type=request.embedding_type,
+        embedding_source=request.embedding_source,
+        embedding_model=request.embedding_model,
+    )
+    if "error" in result:
+        logger.error(f"Erreur écriture batch embeddings: {result['error']}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de l'écriture des embeddings: {result['error']}",
+        )
+    return result
+
+
+@router.get(
+    "/tracks/embeddings/texts",
+    summary="Métadonnées des pistes à vectoriser",
+    description="Retourne une page (keyset sur l'ID) des métadonnées utilisées pour la vectorisation.",
+)
+async def get_track_texts_page(
+    after_id: int = Query(0, ge=0, description="Dernier ID traité"),
+    limit: int = Query(500, ge=1, le=2000, description="Taille de la page"),
+    embedding_type: str = Query("semantic", description="Type d'embedding visé"),
+    only_missing: bool = Query(False, description="Uniquement les pistes sans cet embedding"),
+    db: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Récupère une page de métadonnées de pistes pour la vectorisation.
+
+    Args:
+        after_id: Dernier ID traité (point de reprise)
+        limit: Taille de la page
+        embedding_type: Type d'embedding visé
+        only_missing: Filtrer les pistes déjà vectorisées
+        db: Session de base de données
+
+    Returns:
+        Dict avec 'items' et 'next_after_id'
+    """
+    service = TrackEmbeddingsService(db)
+    try:
+        return await service.get_track_texts_page(
+            after_id=after_id,
+            limit=limit,
+            embedding_type=embedding_type,
+            only_missing=only_missing,
+        )
+    except Exception as e:
+        logger.error(f"Erreur récupération page de pistes à vectoriser: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la récupération: {str(e)}",
+        )
 
 
 @router.get(
@@ -379,6 +517,7 @@ async def search_embeddings(
             limit=request.limit,
             min_similarity=request.min_similarity,
             exclude_track_ids=request.exclude_track_ids,
+            ef_search=request.ef_search,
         )
 
         # Convertir les résultats en TrackSimilarityResult
@@ -439,6 +578,7 @@ async def find_similar_tracks(
             embedding_type=request.embedding_type,
             limit=request.limit,
             exclude_self=request.exclude_self,
+            ef_search=request.ef_search,
         )
 
         # Convertir les résultats en TrackSimilarityResult
@@ -492,6 +632,114 @@ async def get_embeddings_statistics(
         )
 
 
+@router.get(
+    "/embeddings/indexes",
+    summary="Lister les index HNSW",
+    description="Retourne les index HNSW partiels de track_embeddings (paramètres, taille, validité).",
+)
+async def list_embedding_indexes(
+    db: AsyncSession = Depends(get_async_session),
+) -> List[dict]:
+    """
+    Liste les index HNSW des embeddings.
+
+    Args:
+        db: Session de base de données
+
+    Returns:
+        Liste des index avec leur définition et leur taille
+    """
+    service = VectorIndexService(db)
+    try:
+        return await service.list_indexes()
+    except Exception as e:
+        logger.error(f"Erreur listing index HNSW: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors du listing des index: {str(e)}",
+        )
+
+
+@router.post(
+    "/embeddings/indexes/ensure",
+    summary="Créer les index HNSW manquants",
+    description="Crée CONCURRENTLY les index HNSW partiels absents (nouveaux types d'embeddings).",
+)
+async def ensure_embedding_indexes(
+    request: VectorIndexRebuildRequest,
+    db: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Crée les index HNSW manquants sans toucher aux index existants.
+
+    Args:
+        request: Types à indexer et paramètres de construction
+        db: Session de base de données
+
+    Returns:
+        Noms des index garantis
+    """
+    service = VectorIndexService(db)
+    try:
+        indexes = await service.ensure_indexes(
+            embedding_types=request.embedding_types,
+            m=request.m,
+            ef_construction=request.ef_construction,
+        )
+        return {"indexes": indexes}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Erreur création index HNSW: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la création des index: {str(e)}",
+        )
+
+
+@router.post(
+    "/embeddings/indexes/rebuild",
+    summary="Reconstruire les index HNSW",
+    description="Reconstruit sans interruption les index HNSW partiels par type d'embedding.",
+)
+async def rebuild_embedding_indexes(
+    request: VectorIndexRebuildRequest,
+    db: AsyncSession = Depends(get_async_session),
+) -> dict:
+    """
+    Reconstruit les index HNSW des embeddings.
+
+    Args:
+        request: Types à réindexer et paramètres de construction
+        db: Session de base de données
+
+    Returns:
+        Résumé de la reconstruction par index
+    """
+    service = VectorIndexService(db)
+    try:
+        rebuilt = await service.rebuild_indexes(
+            embedding_types=request.embedding_types,
+            m=request.m,
+            ef_construction=request.ef_construction,
+        )
+        return {"rebuilt": rebuilt}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Erreur reconstruction index HNSW: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la reconstruction des index: {str(e)}",
+        )
+
+
 @router.get(
     "/tracks/without-embeddings",
     summary="Obtenir les pistes sans embeddings",
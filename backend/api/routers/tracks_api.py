@@ -1,4 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_cache import FastAPICache
@@ -10,15 +12,71 @@ from backend.api.schemas.tracks_schema import (
     TrackCreate,
     TrackUpdate,
     Track,
+    TrackBatchDelete,
+    TrackScanManifest,
     TrackWithRelations,
 )
 from backend.api.utils.logging import logger
 from backend.api.utils.validation_logger import log_validation_error
-from backend.api.services.track_service import TrackService
+from backend.api.services.track_service import TRACK_COLUMNS, TrackService
+from backend.api.services.covers_service import CoverService
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
 
+def _parse_projection(value: Optional[str]) -> Optional[List[str]]:
+    """Paramètre « a,b,c » -> ["a", "b", "c"] (None si absent)."""
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _serialize_relation(name: str, value):
+    """Sérialise une relation de piste chargée via include=."""
+    if value is None:
+        return None
+    if name in ("genre_tags", "mood_tags"):
+        return [tag.name for tag in value]
+    if name == "genres":
+        return [{"id": g.id, "name": g.name} for g in value]
+    if name == "album":
+        return {"id": value.id, "title": value.title, "musicbrainz_albumid": value.musicbrainz_albumid}
+    if name == "artist":
+        return {"id": value.id, "name": value.name, "musicbrainz_artistid": value.musicbrainz_artistid}
+    if name == "covers":
+        return [
+            {
+                "id": cover.id,
+                "entity_type": "track",
+                "entity_id": cover.entity_id,
+                "content_hash": cover.content_hash,
+                "width": cover.width,
+                "height": cover.height,
+                "mime_type": cover.mime_type,
+                "url": CoverService.cover_url(cover),
+                "date_added": cover.date_added,
+                "date_modified": cover.date_modified,
+            }
+            for cover in value
+        ]
+    if isinstance(value, list):
+        return [item.to_dict() for item in value]
+    return value.to_dict()
+
+
+def _project_tracks(tracks, fields: Optional[List[str]], include: Optional[List[str]]) -> JSONResponse:
+    """Réponse projetée : colonnes demandées (toutes si fields absent) + relations incluses."""
+    columns = ["id"] + [f for f in fields if f != "id"] if fields is not None else list(TRACK_COLUMNS)
+    result = []
+    for track in tracks:
+        loaded = track.__dict__
+        item = {column: loaded.get(column) for column in columns}
+        for name in include or ():
+            item[name] = _serialize_relation(name, loaded.get(name))
+        result.append(item)
+    return JSONResponse(content=jsonable_encoder(result))
+
+
 @router.get("/count")
 async def get_tracks_count(db: AsyncSession = Depends(get_async_session)):
     """Get the total number of tracks in the database."""
@@ -27,6 +85,21 @@ async def get_tracks_count(db: AsyncSession = Depends(get_async_session)):
     return {"count": count}
 
 
+@router.get("/scan-manifest", response_model=TrackScanManifest)
+async def get_scan_manifest(
+    path_prefix: Optional[str] = Query(None, description="Répertoire scanné"),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Manifeste path → (mtime, size, id) pour le scan incrémental."""
+    service = TrackService(db)
+    try:
+        entries = await service.get_scan_manifest(path_prefix)
+        return {"entries": entries, "count": len(entries)}
+    except Exception as e:
+        logger.error(f"Erreur manifeste de scan: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/search", response_model=List[Track])
 async def search_tracks(
     title: Optional[str] = Query(None),
@@ -128,6 +201,21 @@ async def create_or_update_tracks_batch(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch/delete")
+async def delete_tracks_batch(
+    payload: TrackBatchDelete,
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Supprime un lot de pistes (fichiers disparus de la bibliothèque)."""
+    service = TrackService(db)
+    try:
+        deleted = await service.delete_tracks_batch(payload.track_ids)
+        return {"deleted": deleted}
+    except Exception as e:
+        logger.error(f"Erreur suppression batch pistes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/", response_model=Track)
 async def create_track(
     track: TrackCreate,
@@ -159,12 +247,32 @@ async def create_track(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+PROJECTION_FIELDS_DOC = "Colonnes à renvoyer, séparées par des virgules (ex: id,title,duration)"
+PROJECTION_INCLUDE_DOC = "Relations à charger, séparées par des virgules (ex: covers,audio_features)"
+
+
 @router.get("/", response_model=List[TrackWithRelations])
 async def read_tracks(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_session)
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description=PROJECTION_FIELDS_DOC),
+    include: Optional[str] = Query(None, description=PROJECTION_INCLUDE_DOC),
+    db: AsyncSession = Depends(get_async_session),
 ):
-    """Récupère une liste de pistes avec leurs relations."""
+    """
+    Récupère une liste de pistes avec leurs relations.
+
+    Avec fields= ou include=, seules les colonnes et relations demandées sont
+    chargées et renvoyées (sans include, aucune relation).
+    """
     service = TrackService(db)
+    if fields is not None or include is not None:
+        field_list, include_list = _parse_projection(fields), _parse_projection(include)
+        try:
+            tracks = await service.read_tracks(skip, limit, include=include_list or (), fields=field_list)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _project_tracks(tracks, field_list, include_list)
     try:
         tracks = await service.read_tracks(skip, limit)
         result = []
@@ -202,9 +310,11 @@ async def read_tracks(
                             "id": cover.id,
                             "entity_type": "track",
                             "entity_id": cover.entity_id,
-                            "cover_data": cover.cover_data,
+                            "content_hash": cover.content_hash,
+                            "width": cover.width,
+                            "height": cover.height,
                             "mime_type": cover.mime_type,
-                            "url": cover.url,
+                            "url": CoverService.cover_url(cover),
                             "date_added": cover.date_added,
                             "date_modified": cover.date_modified,
                         }
@@ -273,9 +383,11 @@ async def read_track(track_id: int, db: AsyncSession = Depends(get_async_session
                         "id": cover.id,
                         "entity_type": "track",
                         "entity_id": cover.entity_id,
-                        "cover_data": cover.cover_data,
+                        "content_hash": cover.content_hash,
+                        "width": cover.width,
+                        "height": cover.height,
                         "mime_type": cover.mime_type,
-                        "url": cover.url,
+                        "url": CoverService.cover_url(cover),
                         "date_added": cover.date_added,
                         "date_modified": cover.date_modified,
                     }
@@ -322,10 +434,22 @@ async def read_artist_tracks_by_album(
 
 @router.get("/artists/{artist_id}", response_model=List[TrackWithRelations])
 async def read_artist_tracks(
-    artist_id: int, db: AsyncSession = Depends(get_async_session)
+    artist_id: int,
+    fields: Optional[str] = Query(None, description=PROJECTION_FIELDS_DOC),
+    include: Optional[str] = Query(None, description=PROJECTION_INCLUDE_DOC),
+    db: AsyncSession = Depends(get_async_session),
 ):
-    """Récupère toutes les pistes d'un artiste."""
+    """Récupère toutes les pistes d'un artiste (projection possible via fields=/include=)."""
     service = TrackService(db)
+    if fields is not None or include is not None:
+        field_list, include_list = _parse_projection(fields), _parse_projection(include)
+        try:
+            tracks = await service.get_artist_tracks(
+                artist_id, include=include_list or (), fields=field_list
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _project_tracks(tracks, field_list, include_list)
     tracks = await service.get_artist_tracks(artist_id)
     return [TrackWithRelations.model_validate(t).model_dump() for t in tracks]
 
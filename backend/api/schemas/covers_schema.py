@@ -17,7 +17,14 @@ class CoverBase(BaseModel):
     entity_type: CoverType
     entity_id: int
     url: Optional[str] = Field(None, description="URL web ou chemin local de l'image")
-    cover_data: Optional[str] = Field(None, description="Données de l'image en Base64")
+    cover_data: Optional[str] = Field(
+        None, description="Données de l'image en Base64 (entrée uniquement, stockée sur disque)"
+    )
+    content_hash: Optional[str] = Field(
+        None, description="SHA-256 de l'image dans le store de covers"
+    )
+    width: Optional[int] = Field(None, description="Largeur de l'image source")
+    height: Optional[int] = Field(None, description="Hauteur de l'image source")
     mime_type: Optional[str] = Field(
         None, pattern="^image/[a-z]+$", description="Type MIME de l'image"
     )
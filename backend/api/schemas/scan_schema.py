@@ -8,3 +8,5 @@ class ScanRequest(BaseModel):
 
     directory: Optional[str] = None
     cleanup_deleted: bool = False
+    incremental: bool = False
+    force_delete: bool = False
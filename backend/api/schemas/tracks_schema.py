@@ -1,4 +1,4 @@
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -135,3 +135,19 @@ class TrackWithRelations(Track):
 
     covers: Optional[List[Cover]] = []
     album_title: Optional[str] = Field(None, description="Album title")
+
+
+class TrackScanManifest(BaseModel):
+    """Manifeste compact des pistes connues, utilisé par le scan incrémental."""
+
+    entries: List[Tuple[str, Optional[float], Optional[int], int]] = Field(
+        default_factory=list,
+        description="Tuples (path, file_mtime, file_size, track_id)",
+    )
+    count: int = Field(0, description="Nombre d'entrées du manifeste")
+
+
+class TrackBatchDelete(BaseModel):
+    """Schéma pour la suppression d'un lot de pistes."""
+
+    track_ids: List[int] = Field(..., description="IDs des pistes à supprimer")
@@ -9,10 +9,12 @@ from collections import defaultdict
 from typing import Any, List, Optional, TYPE_CHECKING, Union, cast
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from backend.api.models import Album, Track
+from backend.api.services.typeahead_service import typeahead_service
 
 if TYPE_CHECKING:
     from backend.api.schemas.albums_schema import AlbumCreate
@@ -151,8 +153,14 @@ class AlbumService:
         if not album:
             return False
 
+        title, album_artist_id = album.title, album.album_artist_id
         await self._delete(album)
         await self._commit()
+        # Import tardif : backend.services charge les modules du worker
+        from backend.services.cache_service import cache_service
+
+        await cache_service.forget_album(title, album_artist_id)
+        typeahead_service.on_deleted("album", [album_id])
         return True
 
     async def search_albums(self, query: str, limit: int = 20) -> List[Album]:
@@ -278,6 +286,81 @@ class AlbumService:
 
         return results
 
+    async def upsert_albums_batch(self, albums_data: List["AlbumCreate"]) -> List[dict]:
+        """
+        Crée ou récupère un lot d'albums de façon ensembliste.
+
+        Une requête de préchargement reprend la casse des titres déjà stockés
+        (correspondance insensible à la casse, comme get_or_create_album), puis
+        tout le lot passe par un seul INSERT ... ON CONFLICT (title,
+        album_artist_id) DO UPDATE ... RETURNING, sûr face aux scans concurrents.
+
+        Returns:
+            Liste de dicts {id, title, album_artist_id, release_year, musicbrainz_albumid},
+            un par couple (artiste, titre) distinct
+        """
+        wanted: dict[tuple[int, str], dict] = {}
+        for album_create in albums_data:
+            title = (album_create.title or "").strip()
+            if not title:
+                continue
+            entry = wanted.setdefault(
+                (album_create.album_artist_id, title.lower()),
+                {
+                    "title": title,
+                    "album_artist_id": album_create.album_artist_id,
+                    "release_year": None,
+                    "musicbrainz_albumid": None,
+                },
+            )
+            if entry["release_year"] is None and album_create.release_year is not None:
+                release_year = self._coerce_release_year(album_create.release_year)
+                entry["release_year"] = str(release_year) if release_year is not None else None
+            if not entry["musicbrainz_albumid"]:
+                entry["musicbrainz_albumid"] = album_create.musicbrainz_albumid
+
+        if not wanted:
+            return []
+
+        existing = await self._execute(
+            select(Album.title, Album.album_artist_id).where(
+                Album.album_artist_id.in_({artist_id for artist_id, _ in wanted}),
+                func.lower(Album.title).in_({title for _, title in wanted}),
+            )
+        )
+        for stored_title, artist_id in existing.all():
+            entry = wanted.get((artist_id, stored_title.lower()))
+            if entry is not None:
+                entry["title"] = stored_title
+
+        stmt = pg_insert(Album).values(list(wanted.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Album.title, Album.album_artist_id],
+            set_={
+                "release_year": func.coalesce(Album.release_year, stmt.excluded.release_year),
+                "musicbrainz_albumid": func.coalesce(
+                    Album.musicbrainz_albumid, stmt.excluded.musicbrainz_albumid
+                ),
+            },
+        ).returning(
+            Album.id,
+            Album.title,
+            Album.album_artist_id,
+            Album.release_year,
+            Album.musicbrainz_albumid,
+        )
+
+        result = await self._execute(stmt)
+        found = {
+            (row.album_artist_id, row.title.lower()): dict(row._mapping)
+            for row in result.all()
+        }
+        await self._commit()
+
+        albums = [found[key] for key in wanted if key in found]
+        typeahead_service.on_albums_upserted(albums)
+        return albums
+
     async def get_albums_with_stats(
         self, skip: int = 0, limit: int = 100
     ) -> List[dict]:
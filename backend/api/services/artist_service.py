@@ -8,11 +8,13 @@ separating concerns from the API layer.
 from typing import Any, List, Optional, Union, cast
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from backend.api.models import Album, Artist, Track
 from backend.api.schemas.artists_schema import ArtistCreate
+from backend.api.services.typeahead_service import typeahead_service
 
 SessionType = Union[AsyncSession, Session]
 
@@ -117,8 +119,24 @@ class ArtistService:
         if not artist:
             return False
 
+        # Albums et pistes supprimés en cascade : retirés des caches et du typeahead aussi
+        albums = (
+            await self._execute(select(Album.id, Album.title).where(Album.album_artist_id == artist_id))
+        ).all()
+        track_ids = (
+            await self._execute(select(Track.id).where(Track.track_artist_id == artist_id))
+        ).scalars().all()
+        name = artist.name
+
         await self._delete(artist)
         await self._commit()
+        # Import tardif : backend.services charge les modules du worker
+        from backend.services.cache_service import cache_service
+
+        await cache_service.forget_artist(name, [album.title for album in albums], artist_id)
+        typeahead_service.on_deleted("artist", [artist_id])
+        typeahead_service.on_deleted("album", [album.id for album in albums])
+        typeahead_service.on_deleted("track", track_ids)
         return True
 
     async def search_artists(
@@ -216,6 +234,61 @@ class ArtistService:
 
         return artists
 
+    async def upsert_artists_batch(
+        self, artists_data: List[ArtistCreate]
+    ) -> List[dict]:
+        """
+        Crée ou récupère un lot d'artistes en une seule instruction INSERT ... ON CONFLICT.
+
+        Les noms sont rapprochés des artistes existants sans tenir compte de la
+        casse (comme get_or_create_artist) via une seule requête de préchargement ;
+        le nom stocké est alors réutilisé pour que ON CONFLICT (name) retourne la
+        ligne existante. Un MBID manquant en base est complété.
+
+        Returns:
+            Liste de dicts {id, name, musicbrainz_artistid}, un par nom distinct
+        """
+        by_name: dict[str, dict] = {}
+        for data in artists_data:
+            name = (data.name or "").strip()
+            if not name:
+                continue
+            entry = by_name.setdefault(
+                name.lower(), {"name": name, "musicbrainz_artistid": None}
+            )
+            if not entry["musicbrainz_artistid"]:
+                entry["musicbrainz_artistid"] = data.musicbrainz_artistid
+
+        if not by_name:
+            return []
+
+        existing = await self._execute(
+            select(Artist.name).where(func.lower(Artist.name).in_(list(by_name)))
+        )
+        for (stored_name,) in existing.all():
+            by_name[stored_name.lower()]["name"] = stored_name
+
+        stmt = pg_insert(Artist).values(list(by_name.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Artist.name],
+            set_={
+                "musicbrainz_artistid": func.coalesce(
+                    Artist.musicbrainz_artistid, stmt.excluded.musicbrainz_artistid
+                )
+            },
+        ).returning(Artist.id, Artist.name, Artist.musicbrainz_artistid)
+
+        result = await self._execute(stmt)
+        rows = result.all()
+        await self._commit()
+
+        artists = [
+            {"id": row.id, "name": row.name, "musicbrainz_artistid": row.musicbrainz_artistid}
+            for row in rows
+        ]
+        typeahead_service.on_artists_upserted(artists)
+        return artists
+
     async def get_artists_with_stats(
         self, skip: int = 0, limit: int = 100
     ) -> List[dict]:
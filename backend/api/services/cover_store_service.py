@@ -0,0 +1,222 @@
+"""
+Stockage des images de covers adressé par contenu.
+
+Chaque image source est identifiée par le SHA-256 de ses octets. Le fichier
+original n'est pas conservé : l'image est décodée une seule fois puis déclinée
+en variantes WebP pré-rendues (une par taille) :
+
+    {racine}/{hash[:2]}/{hash}/{taille}.webp
+
+Les planches de vignettes (grilles d'albums) sont mises en cache sous
+{racine}/sprites/{clé}.webp, la clé dérivant des hashes qu'elles contiennent.
+
+Deux covers identiques (même album sur plusieurs pistes, même photo d'artiste)
+partagent les mêmes fichiers ; la base ne conserve que le hash et les
+dimensions. Les fichiers sont immuables, ce qui permet un cache HTTP illimité.
+
+Depuis une coroutine, utiliser aput() : le rendu s'exécute dans le pool de
+transcodage (image_transcode_pool) et ne bloque pas la boucle d'événements.
+
+Auteur : SoniqueBay Team
+Dépendances : Pillow
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from backend.api.utils.image_transcode_pool import compose_sprite, image_transcode_pool, render_variants
+from backend.api.utils.logging import logger
+
+COVER_STORE_ROOT = Path(os.getenv("COVER_STORE_PATH", "./backend/data/img/store"))
+
+# Tailles pré-rendues (côté le plus long, en pixels) ; 256 est la taille historique
+COVER_VARIANT_SIZES: Tuple[int, ...] = (64, 128, 256, 512)
+DEFAULT_VARIANT_SIZE = 256
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass(frozen=True)
+class StoredCover:
+    """Résultat d'une insertion dans le store."""
+
+    content_hash: str
+    width: int
+    height: int
+    mime_type: str = "image/webp"
+
+
+def content_hash(binary: bytes) -> str:
+    """SHA-256 hexadécimal des octets de l'image source."""
+    return hashlib.sha256(binary).hexdigest()
+
+
+def cover_content_url(hash_value: str, size: int = DEFAULT_VARIANT_SIZE) -> str:
+    """URL API d'une variante (servie par GET /covers/content/{hash}/{size})."""
+    return f"/api/covers/content/{hash_value}/{size}"
+
+
+def variant_etag(hash_value: str, size: int) -> str:
+    """ETag fort d'une variante : le contenu d'un hash ne change jamais."""
+    return f'"{hash_value}-{size}"'
+
+
+def sprite_key(entries: Sequence[Tuple[int, Optional[str]]], size: int, columns: int) -> str:
+    """Clé d'une planche : taille, colonnes et (id, hash) de chaque cellule, dans l'ordre."""
+    cells = ",".join(f"{entity_id}:{hash_value or '-'}" for entity_id, hash_value in entries)
+    return hashlib.sha256(f"{size}|{columns}|{cells}".encode()).hexdigest()
+
+
+def nearest_variant_size(size: Optional[int]) -> int:
+    """Plus petite variante couvrant la taille demandée (la plus grande sinon)."""
+    if size is None:
+        return DEFAULT_VARIANT_SIZE
+    for variant in COVER_VARIANT_SIZES:
+        if variant >= size:
+            return variant
+    return COVER_VARIANT_SIZES[-1]
+
+
+class CoverStore:
+    """Store de fichiers WebP adressés par le SHA-256 de l'image source."""
+
+    def __init__(self, root: Optional[Path] = None, sizes: Tuple[int, ...] = COVER_VARIANT_SIZES):
+        self.root = Path(root) if root is not None else COVER_STORE_ROOT
+        self.sizes = tuple(sorted(sizes))
+
+    def _entry_dir(self, hash_value: str) -> Path:
+        if not _HASH_RE.match(hash_value):
+            raise ValueError(f"Hash de cover invalide: {hash_value}")
+        return self.root / hash_value[:2] / hash_value
+
+    def variant_path(self, hash_value: str, size: int = DEFAULT_VARIANT_SIZE) -> Path:
+        """Chemin d'une variante (qu'elle existe ou non)."""
+        return self._entry_dir(hash_value) / f"{size}.webp"
+
+    def get_variant(self, hash_value: str, size: Optional[int] = None) -> Optional[Path]:
+        """Chemin de la variante la plus proche de la taille demandée, si présente."""
+        try:
+            path = self.variant_path(hash_value, nearest_variant_size(size))
+        except ValueError:
+            return None
+        return path if path.exists() else None
+
+    def exists(self, hash_value: str) -> bool:
+        """Indique si toutes les variantes d'une image sont présentes."""
+        return all(self.variant_path(hash_value, size).exists() for size in self.sizes)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def render_variants(self, binary: bytes) -> Tuple[Tuple[int, int], dict]:
+        """
+        Décode l'image une fois et produit toutes les variantes WebP.
+
+        Returns:
+            ((largeur, hauteur) de la source, {taille: octets WebP})
+        """
+        return render_variants(binary, self.sizes, "WEBP", 80)
+
+    def put(self, binary: bytes) -> StoredCover:
+        """
+        Ajoute une image au store (idempotent).
+
+        Args:
+            binary: Octets de l'image source (tout format lisible par Pillow)
+
+        Returns:
+            Hash et dimensions de la source
+        """
+        hash_value = content_hash(binary)
+        entry_dir = self._entry_dir(hash_value)
+
+        if self.exists(hash_value):
+            with Image.open(BytesIO(binary)) as source:
+                width, height = source.size
+            return StoredCover(hash_value, width, height)
+
+        (width, height), variants = self.render_variants(binary)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        for size, data in variants.items():
+            self._write_atomic(self.variant_path(hash_value, size), data)
+
+        logger.info(f"[COVER STORE] Image {hash_value[:12]} stockée ({width}x{height}, {len(variants)} variantes)")
+        return StoredCover(hash_value, width, height)
+
+    def sprite_path(self, key: str) -> Path:
+        """Chemin d'une planche de vignettes en cache."""
+        if not _HASH_RE.match(key):
+            raise ValueError(f"Clé de planche invalide: {key}")
+        return self.root / "sprites" / f"{key}.webp"
+
+    def build_sprite(
+        self, key: str, hashes: List[Optional[str]], size: int, columns: int
+    ) -> Path:
+        """
+        Assemble (ou réutilise) la planche des variantes de taille `size`.
+
+        Les hash None ou absents du store laissent leur cellule vide.
+        """
+        path = self.sprite_path(key)
+        if path.exists():
+            return path
+        paths = []
+        for hash_value in hashes:
+            variant = self.get_variant(hash_value, size) if hash_value else None
+            paths.append(str(variant) if variant else None)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(path, compose_sprite(paths, size, columns))
+        return path
+
+    async def abuild_sprite(
+        self, key: str, hashes: List[Optional[str]], size: int, columns: int
+    ) -> Path:
+        """build_sprite() exécuté dans le pool de transcodage si la planche n'existe pas."""
+        path = self.sprite_path(key)
+        if path.exists():
+            return path
+        return Path(
+            await image_transcode_pool.run(
+                _build_sprite_in_store, str(self.root), key, list(hashes), size, columns
+            )
+        )
+
+    async def aput(self, binary: bytes) -> StoredCover:
+        """
+        put() exécuté dans le pool de transcodage, hors de la boucle asyncio.
+
+        Raises:
+            TranscodeQueueFull: Le pool est saturé
+        """
+        return await image_transcode_pool.run(_put_in_store, str(self.root), self.sizes, binary)
+
+
+def _build_sprite_in_store(
+    root: str, key: str, hashes: List[Optional[str]], size: int, columns: int
+) -> str:
+    """Point d'entrée du processus fils : assemblage et écriture d'une planche."""
+    return str(CoverStore(Path(root)).build_sprite(key, hashes, size, columns))
+
+
+def _put_in_store(root: str, sizes: Tuple[int, ...], binary: bytes) -> StoredCover:
+    """Point d'entrée du processus fils : décodage, variantes et écriture."""
+    return CoverStore(Path(root), sizes).put(binary)
+
+
+cover_store = CoverStore()
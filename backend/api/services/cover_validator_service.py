@@ -0,0 +1,176 @@
+# -*- coding: UTF-8 -*-
+"""
+Validateurs HTTP des covers (ETag / Last-Modified) conservés dans Redis.
+
+Pour répondre 304 à une revalidation sans interroger PostgreSQL, l'API garde
+pour chaque entité le hash de contenu de sa cover et sa date de modification
+dans un hash Redis :
+
+    covers:validators  {type}:{id} -> "{content_hash}:{epoch}"
+
+Une entité sans cover servable est mémorisée avec un hash vide (cache
+négatif) pour que les grilles contenant des albums sans pochette ne
+retombent pas sur la base à chaque chargement. Les écritures de covers
+(création, mise à jour, migration, suppression) mettent l'entrée à jour.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+
+from backend.api.utils.logging import logger
+
+VALIDATORS_KEY = "covers:validators"
+
+# Après une erreur de connexion, Redis est ignoré pendant ce délai : les
+# requêtes retombent sur la base au lieu de payer un timeout chacune
+RETRY_AFTER_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class CoverValidator:
+    """Hash de contenu (vide si aucune cover) et date de modification (epoch)."""
+
+    content_hash: str
+    modified: int
+
+    @property
+    def has_cover(self) -> bool:
+        return bool(self.content_hash)
+
+    def encode(self) -> str:
+        return f"{self.content_hash}:{self.modified}"
+
+    @classmethod
+    def decode(cls, value: str) -> Optional["CoverValidator"]:
+        content_hash, _, modified = value.partition(":")
+        try:
+            return cls(content_hash, int(modified))
+        except ValueError:
+            return None
+
+
+def _field(entity_type: str, entity_id: int) -> str:
+    entity_type = getattr(entity_type, "value", entity_type)
+    return f"{str(entity_type).lower()}:{entity_id}"
+
+
+def _epoch(modified: Optional[datetime]) -> int:
+    return int(modified.timestamp()) if modified is not None else int(time.time())
+
+
+class CoverValidatorService:
+    """Lecture et mise à jour des validateurs de covers dans Redis."""
+
+    def __init__(self, redis_url: str = None):
+        if redis_url is None:
+            redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+        self.redis_url = redis_url
+        self.redis_client: Optional[redis.Redis] = None
+        self._unavailable_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _client(self) -> Optional[redis.Redis]:
+        if time.monotonic() < self._unavailable_until:
+            return None
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=1.0,
+                    socket_timeout=1.0,
+                )
+            except Exception as e:
+                logger.warning(f"[COVER VALIDATORS] Initialisation Redis échouée: {e}")
+                self._on_error(e)
+                return None
+        return self.redis_client
+
+    def _on_error(self, error: Exception) -> None:
+        self.errors += 1
+        self._unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+        logger.warning(f"[COVER VALIDATORS] Redis indisponible: {error}")
+
+    async def get(self, entity_type: str, entity_id: int) -> Optional[CoverValidator]:
+        """Validateur d'une entité, None si inconnu (ou Redis indisponible)."""
+        return (await self.get_many(entity_type, [entity_id])).get(entity_id)
+
+    async def get_many(
+        self, entity_type: str, entity_ids: Iterable[int]
+    ) -> Dict[int, CoverValidator]:
+        """Validateurs connus d'un lot d'entités, en un seul HMGET."""
+        entity_ids = list(entity_ids)
+        client = self._client()
+        if client is None or not entity_ids:
+            return {}
+        try:
+            values = await client.hmget(
+                VALIDATORS_KEY, [_field(entity_type, entity_id) for entity_id in entity_ids]
+            )
+        except Exception as e:
+            self._on_error(e)
+            return {}
+
+        validators = {}
+        for entity_id, value in zip(entity_ids, values):
+            validator = CoverValidator.decode(value) if value else None
+            if validator is not None:
+                validators[entity_id] = validator
+        self.hits += len(validators)
+        self.misses += len(entity_ids) - len(validators)
+        return validators
+
+    async def remember(
+        self,
+        entity_type: str,
+        entity_id: int,
+        content_hash: Optional[str],
+        modified: Optional[datetime] = None,
+    ) -> None:
+        """Enregistre le validateur d'une entité (hash vide : pas de cover)."""
+        await self.remember_many([(entity_type, entity_id, content_hash, modified)])
+
+    async def remember_many(
+        self, entries: Iterable[Tuple[str, int, Optional[str], Optional[datetime]]]
+    ) -> None:
+        """Enregistre plusieurs validateurs (type, id, hash, modification) en un HSET."""
+        client = self._client()
+        mapping = {
+            _field(entity_type, entity_id): CoverValidator(content_hash or "", _epoch(modified)).encode()
+            for entity_type, entity_id, content_hash, modified in entries
+        }
+        if client is None or not mapping:
+            return
+        try:
+            await client.hset(VALIDATORS_KEY, mapping=mapping)
+        except Exception as e:
+            self._on_error(e)
+
+    async def forget(self, entity_type: str, entity_id: int) -> None:
+        """Supprime le validateur d'une entité."""
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.hdel(VALIDATORS_KEY, _field(entity_type, entity_id))
+        except Exception as e:
+            self._on_error(e)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    async def close(self) -> None:
+        """Ferme la connexion Redis (arrêt de l'API)."""
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+
+cover_validator_service = CoverValidatorService()
@@ -5,11 +5,18 @@ Auteur : GitHub Copilot
 Dépendances : backend.api.models.covers_model, backend.api.schemas.covers_schema
 """
 
+import asyncio
+import base64
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from sqlalchemy import select
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import exists, select
 from backend.api.models.covers_model import Cover as CoverModel, EntityCoverType
 from backend.api.schemas.covers_schema import CoverCreate
+from backend.api.services.cover_store_service import cover_content_url, cover_store
+from backend.api.services.cover_validator_service import cover_validator_service
+from backend.api.utils.image_transcode_pool import TranscodeQueueFull, image_transcode_pool
+from backend.api.utils.logging import logger
 from PIL import Image
 from io import BytesIO
 from pathlib import Path
@@ -21,22 +28,68 @@ class CoverService:
     def __init__(self, db: AsyncSession):
         self.session = db
 
+    @staticmethod
+    def decode_cover_data(cover_data: str) -> bytes:
+        """Décode une cover base64 (avec ou sans préfixe data:image/...)."""
+        if cover_data.startswith("data:image/"):
+            cover_data = cover_data.split(",", 1)[1]
+        return base64.b64decode(cover_data)
+
+    @staticmethod
+    async def apply_cover_payload(db_cover: CoverModel, cover: CoverCreate) -> None:
+        """
+        Reporte les champs d'une cover sur la ligne en base.
+
+        Une image fournie en base64 est écrite dans le store adressé par
+        contenu (rendu dans le pool de transcodage) : la ligne ne garde que le
+        hash, les dimensions et l'URL.
+        """
+        for key, value in cover.model_dump(
+            exclude={"entity_type", "entity_id", "cover_data", "content_hash", "width", "height"}
+        ).items():
+            setattr(db_cover, key, value)
+
+        if cover.cover_data:
+            stored = await cover_store.aput(CoverService.decode_cover_data(cover.cover_data))
+            db_cover.content_hash = stored.content_hash
+            db_cover.width = stored.width
+            db_cover.height = stored.height
+            db_cover.mime_type = stored.mime_type
+            db_cover.url = cover_content_url(stored.content_hash)
+            db_cover.cover_data = None
+
+    @staticmethod
+    async def remember_validator(cover: CoverModel) -> None:
+        """Publie hash et date de la cover pour les réponses 304 sans base."""
+        await cover_validator_service.remember(
+            cover.entity_type, cover.entity_id, cover.content_hash, cover.date_modified
+        )
+
+    @staticmethod
+    def cover_url(cover: CoverModel) -> str:
+        """URL de la cover : variante du store si migrée, route par entité sinon."""
+        if cover.content_hash:
+            return cover_content_url(cover.content_hash)
+        entity_type = getattr(cover.entity_type, "value", cover.entity_type)
+        return f"/api/covers/{entity_type}/{cover.entity_id}"
+
     async def create_or_update_cover(self, cover: CoverCreate):
         query = select(CoverModel).where(
             CoverModel.entity_type == EntityCoverType(cover.entity_type.lower()).value,
             CoverModel.entity_id == cover.entity_id,
         )
         result = await self.session.execute(query)
-        existing = result.scalars().first()
-        if existing:
-            for key, value in cover.model_dump().items():
-                setattr(existing, key, value)
-            db_cover = existing
-        else:
-            db_cover = CoverModel(**cover.model_dump())
+        db_cover = result.scalars().first()
+        if not db_cover:
+            db_cover = CoverModel(
+                entity_type=EntityCoverType(cover.entity_type.lower()).value,
+                entity_id=cover.entity_id,
+            )
             self.session.add(db_cover)
+        await self.apply_cover_payload(db_cover, cover)
         await self.session.commit()
         await self.session.refresh(db_cover)
+        await self.remember_validator(db_cover)
         return db_cover
 
     # --- Récupération cover depuis DB ---
@@ -51,6 +104,20 @@ class CoverService:
         result = await self.session.execute(query)
         return result.scalars().first()
 
+    async def get_content_hashes(
+        self, entity_type: str, entity_ids: List[int]
+    ) -> Dict[int, Tuple[Optional[str], Optional[datetime]]]:
+        """Hash de contenu et date de modification d'un lot d'entités, en une requête."""
+        entity_type_val = EntityCoverType(getattr(entity_type, "value", entity_type).lower()).value
+        query = select(
+            CoverModel.entity_id, CoverModel.content_hash, CoverModel.date_modified
+        ).where(
+            CoverModel.entity_type == entity_type_val,
+            CoverModel.entity_id.in_(entity_ids),
+        )
+        result = await self.session.execute(query)
+        return {row.entity_id: (row.content_hash, row.date_modified) for row in result.all()}
+
     async def get_cover_by_id(self, id: int):
         query = select(CoverModel).where(CoverModel.id == id)
         result = await self.session.execute(query)
@@ -76,6 +143,7 @@ class CoverService:
             return False
         await self.session.delete(cover)
         await self.session.commit()
+        await cover_validator_service.forget(entity_type, entity_id)
         return True
 
     async def update_cover(self, entity_type: str, entity_id: int, cover: CoverCreate):
@@ -84,23 +152,113 @@ class CoverService:
             cover_type_val = cover_type.value
         except ValueError:
             return None
+        # Une seule cover par entité (uq_entity_cover)
         query = select(CoverModel).where(
             CoverModel.entity_type == cover_type_val,
             CoverModel.entity_id == entity_id,
-            CoverModel.url == cover.url,
         )
         result = await self.session.execute(query)
         db_cover = result.scalars().first()
         if not db_cover:
             db_cover = CoverModel(entity_type=cover_type_val, entity_id=entity_id)
             self.session.add(db_cover)
-        for key, value in cover.model_dump().items():
-            if key not in ("entity_type", "entity_id"):
-                setattr(db_cover, key, value)
+        await self.apply_cover_payload(db_cover, cover)
         await self.session.commit()
         await self.session.refresh(db_cover)
+        await self.remember_validator(db_cover)
         return db_cover
 
+    async def migrate_cover_to_store(self, db_cover: CoverModel) -> bool:
+        """Déplace le base64 d'une ligne vers le store (sans commit)."""
+        try:
+            stored = await cover_store.aput(self.decode_cover_data(db_cover.cover_data))
+        except TranscodeQueueFull:
+            raise
+        except Exception as e:
+            logger.warning(
+                f"[COVER STORE] Cover {db_cover.id} illisible, conservée en base: {e}"
+            )
+            return False
+        db_cover.content_hash = stored.content_hash
+        db_cover.width = stored.width
+        db_cover.height = stored.height
+        db_cover.mime_type = stored.mime_type
+        db_cover.url = cover_content_url(stored.content_hash)
+        db_cover.cover_data = None
+        return True
+
+    async def migrate_base64_covers(
+        self, after_id: int = 0, batch_size: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Vide un lot de covers base64 vers le store adressé par contenu.
+
+        Parcours par ID croissant : les lignes illisibles sont laissées en
+        place sans bloquer les lots suivants. Les lignes refusées par un pool
+        de transcodage saturé sont comptées 'deferred' et le parcours reprend
+        avant la première d'entre elles.
+
+        Args:
+            after_id: Dernier ID traité
+            batch_size: Nombre de lignes par lot
+
+        Returns:
+            Compteurs du lot et 'next_after_id' (None quand il ne reste rien)
+        """
+        query = (
+            select(CoverModel)
+            .where(CoverModel.cover_data.is_not(None), CoverModel.id > after_id)
+            .order_by(CoverModel.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(query)
+        covers = result.scalars().all()
+
+        # Rendus en parallèle, au plus un par processus du pool de transcodage :
+        # la migration ne remplit pas la file partagée avec les requêtes API.
+        slots = asyncio.Semaphore(image_transcode_pool.max_workers)
+
+        async def migrate(db_cover: CoverModel) -> Optional[bool]:
+            async with slots:
+                try:
+                    return await self.migrate_cover_to_store(db_cover)
+                except TranscodeQueueFull:
+                    return None
+
+        results = await asyncio.gather(*(migrate(db_cover) for db_cover in covers))
+        migrated = sum(1 for ok in results if ok)
+        # Lignes repoussées par un pool saturé : reprises au lot suivant
+        deferred = [db_cover.id for db_cover, ok in zip(covers, results) if ok is None]
+        await cover_validator_service.remember_many(
+            (db_cover.entity_type, db_cover.entity_id, db_cover.content_hash, db_cover.date_modified)
+            for db_cover, ok in zip(covers, results)
+            if ok
+        )
+        await self.session.commit()
+
+        # Un lot incomplet ne signifie pas la fin : skip_locked a pu écarter des
+        # lignes verrouillées par un autre migrateur. On s'arrête seulement
+        # quand plus aucune ligne base64 ne suit le dernier ID vu.
+        if deferred:
+            last_id = min(deferred) - 1
+        else:
+            last_id = covers[-1].id if covers else after_id
+        remaining = await self.session.scalar(
+            select(
+                exists().where(CoverModel.cover_data.is_not(None), CoverModel.id > last_id)
+            )
+        )
+
+        logger.info(f"[COVER STORE] Migration base64: {migrated}/{len(covers)} covers déplacées")
+        return {
+            "processed": len(covers),
+            "migrated": migrated,
+            "failed": len(covers) - migrated - len(deferred),
+            "deferred": len(deferred),
+            "next_after_id": last_id if remaining else None,
+        }
+
     @staticmethod
     def get_cover_path(entity_type: str, entity_id: int) -> Path:
         """Renvoie le chemin WebP si existe, sinon None."""
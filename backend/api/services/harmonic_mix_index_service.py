@@ -0,0 +1,292 @@
+# -*- coding: UTF-8 -*-
+"""
+Index de mix harmonique : voisins « DJ » par clé Camelot et BPM.
+
+get_similar_by_bpm_and_key filtrait une plage de BPM puis triait par
+abs(bpm - référence), ce qu'aucun index PostgreSQL ne sert, et un mix
+automatique payait cette requête à chaque transition. Ici, chaque processus
+API range les pistes analysées (track_audio_features) dans 24 seaux, un par
+clé Camelot (plus un seau pour les clés inconnues) ; chaque seau garde ses
+BPM triés :
+
+- « piste suivante » : pour chaque clé compatible, deux recherches
+  dichotomiques délimitent la tranche [bpm - tolérance, bpm + tolérance] ;
+- demi-tempo et double tempo : les mêmes tranches autour de bpm / 2 et
+  bpm * 2 (tolérance à l'échelle), classées par écart ramené au tempo de
+  référence ;
+- les requêtes par lot (toute une playlist) et l'enchaînement d'un mix
+  automatique ne touchent plus la base que pour charger les résultats.
+
+Les écritures de TrackAudioFeaturesService mettent l'index à jour ; le
+rafraîchissement et la reconstruction sont ceux de RefreshingIndexService.
+"""
+
+import bisect
+import heapq
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from backend.api.services.refreshing_index_service import Execute, RefreshingIndexService
+from backend.api.utils.camelot import NO_KEY, camelot_code, compatible_codes
+
+# Intervalle des rafraîchissements incrémentaux (écritures des autres processus)
+HARMONIC_INDEX_REFRESH_SECONDS = float(os.getenv("HARMONIC_INDEX_REFRESH_SECONDS", "60"))
+# Intervalle des reconstructions complètes (suppressions)
+HARMONIC_INDEX_REBUILD_SECONDS = float(os.getenv("HARMONIC_INDEX_REBUILD_SECONDS", "3600"))
+
+# Facteurs de tempo acceptés en plus du tempo identique
+HALF_DOUBLE_FACTORS = (0.5, 2.0)
+
+FEATURES_SQL = """
+    SELECT track_id, bpm, camelot_key
+    FROM track_audio_features
+    {where}
+"""
+
+class _Bucket:
+    """Pistes d'une clé Camelot, triées par (bpm, track_id)."""
+
+    __slots__ = ("bpms", "track_ids")
+
+    def __init__(self):
+        self.bpms: List[float] = []
+        self.track_ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.bpms)
+
+    def add(self, bpm: float, track_id: int) -> None:
+        i = bisect.bisect_right(self.bpms, bpm)
+        self.bpms.insert(i, bpm)
+        self.track_ids.insert(i, track_id)
+
+    def discard(self, bpm: float, track_id: int) -> None:
+        i = bisect.bisect_left(self.bpms, bpm)
+        while i < len(self.bpms) and self.bpms[i] == bpm:
+            if self.track_ids[i] == track_id:
+                del self.bpms[i]
+                del self.track_ids[i]
+                return
+            i += 1
+
+    def between(self, low: float, high: float) -> Iterable[Tuple[float, int]]:
+        start = bisect.bisect_left(self.bpms, low)
+        stop = bisect.bisect_right(self.bpms, high)
+        return zip(self.bpms[start:stop], self.track_ids[start:stop])
+
+
+class HarmonicMixIndex:
+    """Seaux Camelot de BPM triés, avec la position de chaque piste."""
+
+    def __init__(self):
+        self._buckets: Dict[int, _Bucket] = {}
+        self._tracks: Dict[int, Tuple[float, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._tracks
+
+    def get(self, track_id: int) -> Optional[Tuple[float, int]]:
+        """(bpm, code Camelot) d'une piste indexée, sinon None."""
+        return self._tracks.get(track_id)
+
+    def upsert(self, track_id: int, bpm: Optional[float], camelot_key: Optional[str]) -> None:
+        """Indexe une piste ; sans BPM exploitable, elle est retirée."""
+        self.remove(track_id)
+        if bpm is None or not math.isfinite(bpm) or bpm <= 0:
+            return
+        code = camelot_code(camelot_key)
+        bucket = self._buckets.get(code)
+        if bucket is None:
+            bucket = self._buckets[code] = _Bucket()
+        bucket.add(float(bpm), track_id)
+        self._tracks[track_id] = (float(bpm), code)
+
+    def remove(self, track_id: int) -> None:
+        entry = self._tracks.pop(track_id, None)
+        if entry is not None:
+            bpm, code = entry
+            self._buckets[code].discard(bpm, track_id)
+
+    def candidates(
+        self,
+        bpm: float,
+        code: int,
+        bpm_tolerance: float,
+        harmonic: bool = True,
+        half_double_time: bool = False,
+    ) -> List[Tuple[float, int]]:
+        """
+        Pistes mixables après un tempo et une clé donnés.
+
+        Args:
+            bpm: Tempo de référence
+            code: Code Camelot de référence (NO_KEY : aucune clé compatible)
+            bpm_tolerance: Écart de BPM maximal (±), à l'échelle du facteur de tempo
+            harmonic: Limiter aux clés compatibles sur la roue de Camelot
+            half_double_time: Accepter aussi les pistes à demi-tempo / double tempo
+
+        Returns:
+            [(écart de BPM ramené au tempo de référence, track_id)], non triée
+        """
+        if harmonic:
+            codes = compatible_codes(code)
+        else:
+            codes = list(self._buckets)
+        factors = (1.0,) + (HALF_DOUBLE_FACTORS if half_double_time else ())
+
+        found: Dict[int, float] = {}
+        for bucket_code in codes:
+            bucket = self._buckets.get(bucket_code)
+            if not bucket:
+                continue
+            for factor in factors:
+                target = bpm * factor
+                tolerance = bpm_tolerance * factor
+                for candidate_bpm, track_id in bucket.between(target - tolerance, target + tolerance):
+                    gap = abs(candidate_bpm / factor - bpm)
+                    if gap < found.get(track_id, math.inf):
+                        found[track_id] = gap
+        return [(gap, track_id) for track_id, gap in found.items()]
+
+    def neighbours(
+        self,
+        track_id: int,
+        limit: int,
+        bpm_tolerance: float,
+        harmonic: bool = True,
+        half_double_time: bool = False,
+        exclude: Optional[Set[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Pistes suivantes possibles pour une piste, par écart de BPM croissant.
+
+        Une piste sans clé Camelot n'a aucune clé compatible : le filtre
+        harmonique est levé pour elle plutôt que de ne rien proposer.
+
+        Returns:
+            [(track_id, écart de BPM)] ; vide si la piste n'est pas indexée
+        """
+        entry = self._tracks.get(track_id)
+        if entry is None:
+            return []
+        bpm, code = entry
+        harmonic = harmonic and code != NO_KEY
+        skip = {track_id} | (exclude or set())
+        found = [
+            (gap, candidate)
+            for gap, candidate in self.candidates(bpm, code, bpm_tolerance, harmonic, half_double_time)
+            if candidate not in skip
+        ]
+        return [(candidate, gap) for gap, candidate in heapq.nsmallest(limit, found)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracks": len(self._tracks),
+            "buckets": {
+                ("unknown" if code == NO_KEY else code): len(bucket)
+                for code, bucket in sorted(self._buckets.items())
+            },
+        }
+
+
+class HarmonicMixIndexService(RefreshingIndexService):
+    """Index de mix harmonique du processus, alimenté depuis PostgreSQL."""
+
+    index_class = HarmonicMixIndex
+    refresh_seconds = HARMONIC_INDEX_REFRESH_SECONDS
+    rebuild_seconds = HARMONIC_INDEX_REBUILD_SECONDS
+    log_tag = "HARMONIC_INDEX"
+
+    async def next_tracks(
+        self,
+        execute: Execute,
+        track_ids: List[int],
+        limit: int = 20,
+        bpm_tolerance: float = 5.0,
+        harmonic: bool = True,
+        half_double_time: bool = False,
+    ) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Pistes suivantes pour chaque piste d'une liste (une playlist entière).
+
+        Args:
+            execute: Coroutine d'exécution SQL de l'appelant (session async ou sync)
+            track_ids: Pistes de référence
+
+        Returns:
+            {track_id: [(track_id voisin, écart de BPM)]}
+        """
+        await self.ensure_fresh(execute)
+        return {
+            track_id: self.index.neighbours(
+                track_id, limit, bpm_tolerance, harmonic, half_double_time
+            )
+            for track_id in track_ids
+        }
+
+    async def build_mix(
+        self,
+        execute: Execute,
+        seed_track_id: int,
+        length: int,
+        bpm_tolerance: float = 5.0,
+        half_double_time: bool = False,
+    ) -> List[int]:
+        """
+        Enchaîne un mix harmonique à partir d'une piste.
+
+        Chaque transition choisit la piste compatible la plus proche en tempo
+        qui n'est pas déjà dans le mix ; le mix s'arrête plus tôt si aucune
+        piste ne convient.
+
+        Returns:
+            Identifiants des pistes, graine comprise
+        """
+        await self.ensure_fresh(execute)
+        if seed_track_id not in self.index:
+            return []
+        mix = [seed_track_id]
+        used = {seed_track_id}
+        while len(mix) < length:
+            following = self.index.neighbours(
+                mix[-1], 1, bpm_tolerance, True, half_double_time, exclude=used
+            )
+            if not following:
+                break
+            mix.append(following[0][0])
+            used.add(following[0][0])
+        return mix
+
+    async def _fetch_watermark(self, execute: Execute):
+        result = await execute(text("SELECT MAX(date_modified) FROM track_audio_features"))
+        return result.scalar()
+
+    async def _load(self, execute: Execute, index: HarmonicMixIndex, since) -> int:
+        if since is None:
+            statement = text(FEATURES_SQL.format(where=""))
+        else:
+            statement = text(
+                FEATURES_SQL.format(where="WHERE date_modified > :since")
+            ).bindparams(since=since)
+        rows = (await execute(statement)).fetchall()
+        for track_id, bpm, camelot_key in rows:
+            index.upsert(track_id, bpm, camelot_key)
+        return len(rows)
+
+    def on_features_written(self, track_id: int, features: Any) -> None:
+        """Callback après écriture des caractéristiques audio d'une piste (bpm, camelot_key)."""
+        bpm, camelot_key = features.bpm, features.camelot_key
+        self._apply(lambda index: index.upsert(track_id, bpm, camelot_key))
+
+    def on_features_deleted(self, track_id: int) -> None:
+        self._apply(lambda index: index.remove(track_id))
+
+
+# Instance globale de l'index
+harmonic_mix_index_service = HarmonicMixIndexService()
@@ -0,0 +1,96 @@
+"""
+Fusion de classements pour la recherche hybride (texte + vecteur).
+
+Chaque étape de recherche (plein texte, similarité vectorielle, ...) produit
+une liste de résultats avec son propre score. HybridScorer fusionne ces listes
+en un classement unique, soit par somme pondérée des scores (comportement
+historique de SearchService : 70 % texte, 30 % vecteur), soit par Reciprocal
+Rank Fusion (RRF), insensible à l'échelle des scores de chaque étape.
+
+Auteur : SoniqueBay Team
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_WEIGHTS = {"text": 0.7, "vector": 0.3}
+
+
+def default_result_key(result: Dict[str, Any]) -> str:
+    """Clé de dédoublonnage d'un résultat : type + id (ou titre si pas d'id)."""
+    return f"{result['type']}_{result['id'] or result['title']}"
+
+
+class HybridScorer:
+    """Fusionne les résultats de plusieurs étapes de recherche en un classement unique."""
+
+    MODES = ("weighted", "rrf")
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        mode: str = "weighted",
+        rrf_k: int = 60,
+        key: Callable[[Dict[str, Any]], str] = default_result_key,
+    ):
+        """
+        Args:
+            weights: Poids par étape (nom d'étape → poids)
+            mode: "weighted" (somme pondérée des scores) ou "rrf" (rangs réciproques)
+            rrf_k: Constante de lissage RRF
+            key: Fonction de dédoublonnage des résultats entre étapes
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Mode de fusion inconnu: {mode}")
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.mode = mode
+        self.rrf_k = rrf_k
+        self.key = key
+
+    def _contribution(self, stage: str, rank: int, score: float) -> float:
+        weight = self.weights.get(stage, 0.0)
+        if self.mode == "rrf":
+            return weight / (self.rrf_k + rank)
+        return weight * score
+
+    def fuse(
+        self,
+        stages: Dict[str, List[Dict[str, Any]]],
+        keep_stage_scores: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fusionne les résultats des étapes et les trie par score hybride.
+
+        Chaque résultat d'une étape "<nom>" porte son score dans "<nom>_score"
+        et doit être trié par pertinence décroissante (le rang sert en mode RRF).
+
+        Args:
+            stages: Résultats par étape, dans l'ordre de priorité des métadonnées
+            keep_stage_scores: Conserver les scores par étape dans la réponse
+
+        Returns:
+            Résultats dédoublonnés triés par "hybrid_score" décroissant
+        """
+        combined: Dict[str, Dict[str, Any]] = {}
+
+        for stage, results in stages.items():
+            score_field = f"{stage}_score"
+            for rank, result in enumerate(results, start=1):
+                score = float(result.get(score_field) or 0.0)
+                contribution = self._contribution(stage, rank, score)
+                key = self.key(result)
+                if key in combined:
+                    combined[key][score_field] = score
+                    combined[key]["hybrid_score"] += contribution
+                else:
+                    merged = dict(result)
+                    merged["hybrid_score"] = contribution
+                    combined[key] = merged
+
+        ranked = sorted(combined.values(), key=lambda r: r["hybrid_score"], reverse=True)
+
+        if not keep_stage_scores:
+            for result in ranked:
+                for stage in stages:
+                    result.pop(f"{stage}_score", None)
+
+        return ranked
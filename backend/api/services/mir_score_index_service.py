@@ -0,0 +1,338 @@
+# -*- coding: UTF-8 -*-
+"""
+Index en mémoire des scores MIR pour la recherche de pistes similaires.
+
+get_similar_tracks lisait limit*3 lignes quelconques de track_mir_scores puis
+les triait en Python : les vrais voisins n'étaient presque jamais dans
+l'échantillon. Ici, chaque processus API garde une matrice NumPy float32 des
+six scores (énergie, valence, danse, acousticité, complexité, intensité) de
+toutes les pistes, avec leur BPM et leur clé Camelot :
+
+- une requête calcule la distance euclidienne à toutes les lignes en une
+  opération vectorisée, puis extrait les k plus proches avec argpartition
+  (recherche exacte, sans échantillonnage) ;
+- les scores absents (NULL) sont ignorés dimension par dimension, comme
+  l'ancien calcul ; une piste sans aucun score commun est exclue ;
+- des masques optionnels restreignent les candidats à une plage de BPM et
+  aux clés Camelot compatibles.
+
+La matrice est mise à jour à chaque écriture de scores par TrackMIRService ;
+le rafraîchissement et la reconstruction sont ceux de RefreshingIndexService.
+"""
+
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.services.refreshing_index_service import Execute, RefreshingIndexService
+from backend.api.utils.camelot import NO_KEY, camelot_code, compatible_codes
+
+SCORE_FIELDS = (
+    "energy_score",
+    "mood_valence",
+    "dance_score",
+    "acousticness",
+    "complexity_score",
+    "emotional_intensity",
+)
+
+# Intervalle des rafraîchissements incrémentaux (écritures des autres processus)
+MIR_INDEX_REFRESH_SECONDS = float(os.getenv("MIR_INDEX_REFRESH_SECONDS", "60"))
+# Intervalle des reconstructions complètes (suppressions)
+MIR_INDEX_REBUILD_SECONDS = float(os.getenv("MIR_INDEX_REBUILD_SECONDS", "3600"))
+
+INITIAL_CAPACITY = 1024
+
+SCORES_SQL = """
+    SELECT s.track_id, s.energy_score, s.mood_valence, s.dance_score, s.acousticness,
+           s.complexity_score, s.emotional_intensity, n.bpm, n.camelot_key
+    FROM track_mir_scores s
+    LEFT JOIN track_mir_normalized n ON n.track_id = s.track_id
+    {where}
+"""
+
+# Valeur « ne pas modifier » pour upsert (None signifie « absent »)
+_KEEP: Any = object()
+
+
+def _as_float(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+class MIRScoreMatrix:
+    """
+    Matrice (n, 6) des scores MIR, avec BPM et code Camelot par ligne.
+
+    Les lignes sont ajoutées en fin de tableau (capacité doublée au besoin) ;
+    une suppression marque la ligne morte, compactée quand elles dominent.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._track_ids = np.zeros(capacity, dtype=np.int64)
+        self._scores = np.full((capacity, len(SCORE_FIELDS)), np.nan, dtype=np.float32)
+        self._bpm = np.full(capacity, np.nan, dtype=np.float32)
+        self._keys = np.full(capacity, NO_KEY, dtype=np.int8)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._rows
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._track_ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - len(self._track_ids)
+        self._track_ids = np.concatenate([self._track_ids, np.zeros(extra, dtype=np.int64)])
+        self._scores = np.concatenate(
+            [self._scores, np.full((extra, len(SCORE_FIELDS)), np.nan, dtype=np.float32)]
+        )
+        self._bpm = np.concatenate([self._bpm, np.full(extra, np.nan, dtype=np.float32)])
+        self._keys = np.concatenate([self._keys, np.full(extra, NO_KEY, dtype=np.int8)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+
+    def _row(self, track_id: int) -> int:
+        row = self._rows.get(track_id)
+        if row is None:
+            self._grow(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._rows[track_id] = row
+            self._track_ids[row] = track_id
+            self._scores[row] = np.nan
+            self._bpm[row] = np.nan
+            self._keys[row] = NO_KEY
+            self._alive[row] = True
+        return row
+
+    def upsert(self, track_id: int, scores: Any = _KEEP, bpm: Any = _KEEP,
+               camelot_key: Any = _KEEP) -> None:
+        """
+        Ajoute ou met à jour une piste ; les arguments omis sont conservés.
+
+        Args:
+            scores: Six scores dans l'ordre de SCORE_FIELDS (None = absent)
+            bpm: Tempo (None = inconnu)
+            camelot_key: Clé Camelot ("8B"), None = inconnue
+        """
+        row = self._row(track_id)
+        if scores is not _KEEP:
+            self._scores[row] = [_as_float(value) for value in scores]
+        if bpm is not _KEEP:
+            self._bpm[row] = _as_float(bpm)
+        if camelot_key is not _KEEP:
+            self._keys[row] = camelot_code(camelot_key)
+
+    def upsert_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        """Charge des lignes (track_id, 6 scores, bpm, camelot_key) en bloc."""
+        count = 0
+        for row in rows:
+            self.upsert(row[0], scores=row[1:7], bpm=row[7], camelot_key=row[8])
+            count += 1
+        return count
+
+    def remove(self, track_id: int) -> None:
+        row = self._rows.pop(track_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        if self._size > INITIAL_CAPACITY and len(self._rows) < self._size // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive[: self._size])
+        size = len(keep)
+        self._track_ids[:size] = self._track_ids[keep]
+        self._scores[:size] = self._scores[keep]
+        self._bpm[:size] = self._bpm[keep]
+        self._keys[:size] = self._keys[keep]
+        self._alive[:size] = True
+        self._alive[size:] = False
+        self._size = size
+        self._rows = {int(track_id): row for row, track_id in enumerate(self._track_ids[:size])}
+
+    def get(self, track_id: int) -> Optional[Tuple[np.ndarray, float, int]]:
+        """(scores, bpm, code Camelot) d'une piste indexée, sinon None."""
+        row = self._rows.get(track_id)
+        if row is None:
+            return None
+        return self._scores[row].copy(), float(self._bpm[row]), int(self._keys[row])
+
+    def top_k(
+        self,
+        query: Sequence[Optional[float]],
+        k: int,
+        exclude: Iterable[int] = (),
+        bpm_range: Optional[Tuple[float, float]] = None,
+        key_codes: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Les k pistes les plus proches de `query` (distance euclidienne exacte).
+
+        Args:
+            query: Six scores de référence (None/NaN = dimension ignorée)
+            k: Nombre de résultats
+            exclude: Pistes à écarter (la référence elle-même)
+            bpm_range: (min, max) inclusifs ; les pistes sans BPM sont écartées
+            key_codes: Codes Camelot acceptés ; les pistes sans clé sont écartées
+
+        Returns:
+            [(track_id, distance)] par distance croissante
+        """
+        size = self._size
+        q = np.asarray([_as_float(value) for value in query], dtype=np.float32)
+        dims = np.flatnonzero(~np.isnan(q))
+        if k <= 0 or size == 0 or len(dims) == 0:
+            return []
+
+        mask = self._alive[:size].copy()
+        if bpm_range is not None:
+            bpm = self._bpm[:size]
+            mask &= (bpm >= bpm_range[0]) & (bpm <= bpm_range[1])
+        if key_codes is not None:
+            mask &= np.isin(self._keys[:size], np.fromiter(key_codes, dtype=np.int8))
+        for track_id in exclude:
+            row = self._rows.get(track_id)
+            if row is not None:
+                mask[row] = False
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+
+        scores = self._scores[candidates][:, dims]
+        present = ~np.isnan(scores)
+        diff = np.where(present, scores - q[dims], 0.0)
+        distances = np.einsum("ij,ij->i", diff, diff)
+        # Aucune dimension commune avec la référence : pas comparable
+        distances[~present.any(axis=1)] = np.inf
+
+        if k < len(distances):
+            nearest = np.argpartition(distances, k - 1)[:k]
+        else:
+            nearest = np.arange(len(distances))
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        nearest = nearest[np.isfinite(distances[nearest])]
+        return [
+            (int(self._track_ids[candidates[i]]), float(np.sqrt(distances[i])))
+            for i in nearest
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracks": len(self._rows),
+            "rows": self._size,
+            "capacity": len(self._track_ids),
+            "memory_bytes": int(
+                self._track_ids.nbytes + self._scores.nbytes + self._bpm.nbytes
+                + self._keys.nbytes + self._alive.nbytes
+            ),
+        }
+
+
+class MIRScoreIndexService(RefreshingIndexService):
+    """Matrice des scores MIR du processus, alimentée depuis PostgreSQL."""
+
+    index_class = MIRScoreMatrix
+    refresh_seconds = MIR_INDEX_REFRESH_SECONDS
+    rebuild_seconds = MIR_INDEX_REBUILD_SECONDS
+    log_tag = "MIR_INDEX"
+
+    async def similar(
+        self,
+        db: AsyncSession,
+        track_id: int,
+        limit: int = 20,
+        bpm_tolerance: Optional[float] = None,
+        harmonic: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """
+        Pistes les plus proches d'une piste par scores MIR.
+
+        Args:
+            track_id: Piste de référence
+            limit: Nombre de résultats
+            bpm_tolerance: Écart de BPM maximal (±) avec la référence
+            harmonic: Limiter aux clés Camelot compatibles avec la référence
+
+        Returns:
+            [(track_id, distance)] ; vide si la référence n'a pas de scores
+        """
+        await self.ensure_fresh(db.execute)
+        reference = self.index.get(track_id)
+        if reference is None:
+            return []
+        scores, bpm, key = reference
+
+        bpm_range = None
+        if bpm_tolerance is not None:
+            if math.isnan(bpm):
+                return []
+            bpm_range = (bpm - bpm_tolerance, bpm + bpm_tolerance)
+        key_codes = None
+        if harmonic:
+            key_codes = compatible_codes(key)
+            if not key_codes:
+                return []
+
+        return self.index.top_k(
+            scores, limit, exclude=(track_id,), bpm_range=bpm_range, key_codes=key_codes
+        )
+
+    async def _fetch_watermark(self, execute: Execute):
+        result = await execute(text(
+            "SELECT GREATEST("
+            "(SELECT MAX(date_modified) FROM track_mir_scores), "
+            "(SELECT MAX(date_modified) FROM track_mir_normalized))"
+        ))
+        return result.scalar()
+
+    async def _load(self, execute: Execute, matrix: MIRScoreMatrix, since) -> int:
+        if since is None:
+            rows = await execute(text(SCORES_SQL.format(where="")))
+        else:
+            rows = await execute(
+                text(SCORES_SQL.format(
+                    where="WHERE s.date_modified > :since OR n.date_modified > :since"
+                )),
+                {"since": since},
+            )
+        return matrix.upsert_rows(rows.fetchall())
+
+    def on_scores_written(self, track_id: int, scores: Any) -> None:
+        """
+        Callback après écriture des scores d'une piste.
+
+        `scores` expose les attributs de SCORE_FIELDS (modèle ou schéma).
+        """
+        values = [getattr(scores, field) for field in SCORE_FIELDS]
+        self._apply(lambda matrix: matrix.upsert(track_id, scores=values))
+
+    def on_normalized_written(
+        self, track_id: int, bpm: Optional[float], camelot_key: Optional[str]
+    ) -> None:
+        """Callback après écriture des données normalisées (BPM, clé Camelot)."""
+        def change(matrix: MIRScoreMatrix) -> None:
+            if track_id in matrix:
+                matrix.upsert(track_id, bpm=bpm, camelot_key=camelot_key)
+
+        self._apply(change)
+
+    def on_normalized_deleted(self, track_id: int) -> None:
+        self.on_normalized_written(track_id, None, None)
+
+    def on_scores_deleted(self, track_id: int) -> None:
+        self._apply(lambda matrix: matrix.remove(track_id))
+
+
+# Instance globale de l'index
+mir_score_index_service = MIRScoreIndexService()
@@ -347,7 +347,9 @@ class MIRSynonymService:
             Résultat mis en cache ou None
         """
         try:
-            cached = redis_cache_service.redis_client.get(cache_key)
+            if not redis_cache_service.redis_client:
+                return None
+            cached = await redis_cache_service.redis_client.get(cache_key)
             if cached:
                 return json.loads(cached)
             return None
@@ -365,7 +367,7 @@ class MIRSynonymService:
         """
         try:
             if redis_cache_service.redis_client:
-                redis_cache_service.redis_client.setex(
+                await redis_cache_service.redis_client.setex(
                     cache_key, self.CACHE_TTL, json.dumps(result)
                 )
                 logger.debug(f"[MIR_SYNONYM] Résultat mis en cache: {cache_key}")
@@ -379,9 +381,11 @@ class MIRSynonymService:
         try:
             if redis_cache_service.redis_client:
                 pattern = "mir_synonym:*"
-                keys = redis_cache_service.redis_client.keys(pattern)
+                keys = [
+                    key async for key in redis_cache_service.redis_client.scan_iter(match=pattern, count=500)
+                ]
                 if keys:
-                    redis_cache_service.redis_client.delete(*keys)
+                    await redis_cache_service.redis_client.delete(*keys)
                     logger.debug(f"[MIR_SYNONYM] Cache invalidé: {len(keys)} clés")
         except Exception as e:
             logger.warning(f"[MIR_SYNONYM] Erreur invalidation cache: {e}")
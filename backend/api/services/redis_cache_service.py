@@ -2,40 +2,143 @@
 """
 Service de cache Redis pour optimiser les requêtes répétitives
 Utilise Redis pour mettre en cache les résultats de recherche fréquents.
+
+Le client est asynchrone (redis.asyncio) sur un pool de connexions partagé :
+un accès au cache ne bloque plus la boucle d'événements de l'API.
+
+Invalidation par génération : les clés de recherche embarquent un compteur
+(search:v{génération}:{hash}). Invalider revient à incrémenter ce compteur
+(O(1), sans SCAN/KEYS) ; les entrées des générations précédentes ne sont plus
+lues et expirent d'elles-mêmes via leur TTL.
 """
 
-import json
 import hashlib
+import json
 import os
-from typing import Any, Optional, Dict
+import time
+from typing import Any, Dict, Optional
+
+import redis.asyncio as redis
+
 from backend.api.utils.logging import logger
-import redis
+
+GENERATION_KEY = "search:generation"
+
+# La génération courante est relue au plus une fois par intervalle et par
+# processus : une invalidation faite par un autre worker est vue sous 1 s
+GENERATION_REFRESH_SECONDS = float(os.environ.get("SEARCH_CACHE_GENERATION_REFRESH", 1.0))
+
+# Après une erreur de connexion, Redis est ignoré pendant ce délai pour ne pas
+# faire payer un timeout de connexion à chaque recherche
+RETRY_AFTER_SECONDS = 5.0
+
+
+class CacheStats:
+    """Compteurs de hits/misses et latences des opérations du cache."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.errors = 0
+        self.invalidations = 0
+        self._latency: Dict[str, Dict[str, float]] = {}
+
+    def record_latency(self, operation: str, seconds: float) -> None:
+        stats = self._latency.setdefault(operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        ms = seconds * 1000
+        stats["count"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            "latency_ms": {
+                operation: {
+                    "count": int(stats["count"]),
+                    "avg": round(stats["total_ms"] / stats["count"], 3),
+                    "max": round(stats["max_ms"], 3),
+                }
+                for operation, stats in self._latency.items()
+            },
+        }
 
 
 class RedisCacheService:
-    """Service de cache Redis pour les requêtes de recherche."""
+    """Service de cache Redis asynchrone pour les requêtes de recherche."""
 
-    def __init__(self, redis_url: str = None):
+    def __init__(self, redis_url: str = None, max_connections: int = None):
         if redis_url is None:
             redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+        if max_connections is None:
+            max_connections = int(os.environ.get("REDIS_CACHE_MAX_CONNECTIONS", 50))
         self.redis_url = redis_url
-        self.redis_client = None
+        self.max_connections = max_connections
+        self.redis_client: Optional[redis.Redis] = None
+        self.stats = CacheStats()
+        self._generation = 0
+        self._generation_checked_at = 0.0
+        self._unavailable_until = 0.0
         self._connect()
 
     def _connect(self):
-        """Établit la connexion Redis."""
+        """Crée le pool de connexions (les connexions sont ouvertes à la demande)."""
         try:
-            self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
-            self.redis_client.ping()
-            logger.info("[REDIS CACHE] Connexion établie")
+            pool = redis.ConnectionPool.from_url(
+                self.redis_url,
+                decode_responses=True,
+                max_connections=self.max_connections,
+                socket_connect_timeout=1.0,
+                socket_timeout=1.0,
+            )
+            self.redis_client = redis.Redis(connection_pool=pool)
+            logger.info(f"[REDIS CACHE] Pool initialisé ({self.max_connections} connexions max)")
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Connexion échouée: {e}")
+            logger.warning(f"[REDIS CACHE] Initialisation du pool échouée: {e}")
             self.redis_client = None
 
+    async def close(self) -> None:
+        """Ferme le pool de connexions (arrêt de l'API)."""
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+
+    def _available(self) -> bool:
+        return self.redis_client is not None and time.monotonic() >= self._unavailable_until
+
+    def _on_error(self, operation: str, error: Exception) -> None:
+        self.stats.errors += 1
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._unavailable_until = time.monotonic() + RETRY_AFTER_SECONDS
+        logger.warning(f"[REDIS CACHE] Erreur {operation}: {error}")
+
+    async def _get_generation(self) -> int:
+        """Retourne la génération courante du cache de recherche."""
+        now = time.monotonic()
+        if now - self._generation_checked_at >= GENERATION_REFRESH_SECONDS:
+            value = await self.redis_client.get(GENERATION_KEY)
+            self._generation = int(value or 0)
+            self._generation_checked_at = now
+        return self._generation
+
     def _get_cache_key(
-        self, query: str, page: int, page_size: int, filters: Optional[Dict] = None
+        self,
+        query: str,
+        page: int,
+        page_size: int,
+        filters: Optional[Dict] = None,
+        generation: int = 0,
     ) -> str:
-        """Génère une clé de cache unique pour une requête."""
+        """Génère une clé de cache unique pour une requête et une génération."""
         # Créer un hash des paramètres pour la clé
         params = {
             "query": query,
@@ -44,14 +147,14 @@ class RedisCacheService:
             "filters": filters or {},
         }
         params_str = json.dumps(params, sort_keys=True)
-        params_hash = hashlib.md5(params_str.encode()).hexdigest()[:8]
-        return f"search:{params_hash}"
+        params_hash = hashlib.md5(params_str.encode()).hexdigest()[:16]
+        return f"search:v{generation}:{params_hash}"
 
     def _get_facets_cache_key(self) -> str:
         """Clé de cache pour les facettes."""
         return "facets:latest"
 
-    def get_cached_search_result(
+    async def get_cached_search_result(
         self, query: str, page: int, page_size: int, filters: Optional[Dict] = None
     ) -> Optional[Dict]:
         """
@@ -66,25 +169,30 @@ class RedisCacheService:
         Returns:
             Résultat mis en cache ou None
         """
-        if not self.redis_client:
+        if not self._available():
             return None
 
+        start = time.perf_counter()
         try:
-            cache_key = self._get_cache_key(query, page, page_size, filters)
-            cached_data = self.redis_client.get(cache_key)
-
-            if cached_data:
-                logger.debug(f"[REDIS CACHE] Hit pour clé: {cache_key}")
-                return json.loads(cached_data)
-            else:
-                logger.debug(f"[REDIS CACHE] Miss pour clé: {cache_key}")
-                return None
-
+            generation = await self._get_generation()
+            cache_key = self._get_cache_key(query, page, page_size, filters, generation)
+            cached_data = await self.redis_client.get(cache_key)
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur récupération cache: {e}")
+            self._on_error("récupération cache", e)
             return None
+        finally:
+            self.stats.record_latency("get", time.perf_counter() - start)
+
+        if cached_data:
+            self.stats.hits += 1
+            logger.debug(f"[REDIS CACHE] Hit pour clé: {cache_key}")
+            return json.loads(cached_data)
 
-    def cache_search_result(
+        self.stats.misses += 1
+        logger.debug(f"[REDIS CACHE] Miss pour clé: {cache_key}")
+        return None
+
+    async def cache_search_result(
         self,
         query: str,
         page: int,
@@ -107,48 +215,53 @@ class RedisCacheService:
         Returns:
             True si mis en cache avec succès
         """
-        if not self.redis_client:
+        if not self._available():
             return False
 
+        start = time.perf_counter()
         try:
-            cache_key = self._get_cache_key(query, page, page_size, filters)
-            result_json = json.dumps(result)
+            generation = await self._get_generation()
+            cache_key = self._get_cache_key(query, page, page_size, filters, generation)
 
             # Mise en cache avec TTL
-            self.redis_client.setex(cache_key, ttl, result_json)
+            await self.redis_client.setex(cache_key, ttl, json.dumps(result))
+            self.stats.sets += 1
             logger.debug(f"[REDIS CACHE] Mis en cache: {cache_key} (TTL: {ttl}s)")
             return True
 
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur mise en cache: {e}")
+            self._on_error("mise en cache", e)
             return False
+        finally:
+            self.stats.record_latency("set", time.perf_counter() - start)
 
-    def get_cached_facets(self) -> Optional[Dict]:
+    async def get_cached_facets(self) -> Optional[Dict]:
         """
         Récupère les facettes depuis le cache.
 
         Returns:
             Facettes mises en cache ou None
         """
-        if not self.redis_client:
+        if not self._available():
             return None
 
+        start = time.perf_counter()
         try:
-            cache_key = self._get_facets_cache_key()
-            cached_data = self.redis_client.get(cache_key)
-
-            if cached_data:
-                logger.debug("[REDIS CACHE] Hit pour facettes")
-                return json.loads(cached_data)
-            else:
-                logger.debug("[REDIS CACHE] Miss pour facettes")
-                return None
-
+            cached_data = await self.redis_client.get(self._get_facets_cache_key())
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur récupération facettes: {e}")
+            self._on_error("récupération facettes", e)
             return None
+        finally:
+            self.stats.record_latency("get_facets", time.perf_counter() - start)
+
+        if cached_data:
+            logger.debug("[REDIS CACHE] Hit pour facettes")
+            return json.loads(cached_data)
+
+        logger.debug("[REDIS CACHE] Miss pour facettes")
+        return None
 
-    def cache_facets(self, facets: Dict, ttl: int = 600) -> bool:
+    async def cache_facets(self, facets: Dict, ttl: int = 600) -> bool:
         """
         Met en cache les facettes.
 
@@ -159,113 +272,108 @@ class RedisCacheService:
         Returns:
             True si mis en cache avec succès
         """
-        if not self.redis_client:
+        if not self._available():
             return False
 
         try:
-            cache_key = self._get_facets_cache_key()
-            facets_json = json.dumps(facets)
-
-            self.redis_client.setex(cache_key, ttl, facets_json)
+            await self.redis_client.setex(
+                self._get_facets_cache_key(), ttl, json.dumps(facets)
+            )
             logger.debug(f"[REDIS CACHE] Facettes mises en cache (TTL: {ttl}s)")
             return True
 
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur mise en cache facettes: {e}")
+            self._on_error("mise en cache facettes", e)
             return False
 
-    def invalidate_search_cache(self, pattern: str = "search:*") -> int:
+    async def invalidate_search_cache(self) -> int:
         """
-        Invalide le cache de recherche selon un pattern.
-
-        Args:
-            pattern: Pattern Redis pour les clés à supprimer
+        Invalide tout le cache de recherche en incrémentant la génération.
 
         Returns:
-            Nombre de clés supprimées
+            Nouvelle génération (0 si Redis est indisponible)
         """
-        if not self.redis_client:
+        if not self._available():
             return 0
 
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                deleted_count = self.redis_client.delete(*keys)
-                logger.info(
-                    f"[REDIS CACHE] {deleted_count} clés supprimées (pattern: {pattern})"
-                )
-                return deleted_count
-            return 0
-
+            generation = await self.redis_client.incr(GENERATION_KEY)
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur invalidation cache: {e}")
+            self._on_error("invalidation cache", e)
             return 0
 
-    def invalidate_facets_cache(self) -> bool:
+        self._generation = int(generation)
+        self._generation_checked_at = time.monotonic()
+        self.stats.invalidations += 1
+        logger.info(f"[REDIS CACHE] Cache de recherche invalidé (génération {generation})")
+        return self._generation
+
+    async def invalidate_facets_cache(self) -> bool:
         """
         Invalide le cache des facettes.
 
         Returns:
             True si invalidé avec succès
         """
-        if not self.redis_client:
+        if not self._available():
             return False
 
         try:
-            cache_key = self._get_facets_cache_key()
-            result = self.redis_client.delete(cache_key)
+            result = await self.redis_client.delete(self._get_facets_cache_key())
             logger.debug(f"[REDIS CACHE] Cache facettes invalidé: {bool(result)}")
             return bool(result)
 
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur invalidation facettes: {e}")
+            self._on_error("invalidation facettes", e)
             return False
 
-    def get_cache_stats(self) -> Dict[str, Any]:
+    async def get_cache_stats(self) -> Dict[str, Any]:
         """
         Récupère les statistiques du cache.
 
         Returns:
-            Statistiques du cache
+            Compteurs hits/misses/latences du processus et état de Redis
         """
-        if not self.redis_client:
-            return {"status": "disconnected"}
+        stats = self.stats.snapshot()
+        stats["generation"] = self._generation
+
+        if not self._available():
+            stats["status"] = "disconnected"
+            return stats
 
         try:
-            info = self.redis_client.info()
-            search_keys = len(self.redis_client.keys("search:*"))
-            facets_keys = len(self.redis_client.keys("facets:*"))
-
-            return {
-                "status": "connected",
-                "used_memory": info.get("used_memory_human", "unknown"),
-                "connected_clients": info.get("connected_clients", 0),
-                "search_cache_keys": search_keys,
-                "facets_cache_keys": facets_keys,
-                "total_cache_keys": search_keys + facets_keys,
-            }
+            info = await self.redis_client.info("memory")
+            stats["generation"] = await self._get_generation()
+            stats["status"] = "connected"
+            stats["used_memory"] = info.get("used_memory_human", "unknown")
+            stats["pool_max_connections"] = self.max_connections
+            return stats
 
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur récupération stats: {e}")
-            return {"status": "error", "error": str(e)}
+            self._on_error("récupération stats", e)
+            stats["status"] = "error"
+            stats["error"] = str(e)
+            return stats
 
-    def clear_all_cache(self) -> bool:
+    async def clear_all_cache(self) -> bool:
         """
         Vide complètement le cache.
 
         Returns:
             True si vidé avec succès
         """
-        if not self.redis_client:
+        if not self._available():
             return False
 
         try:
-            self.redis_client.flushdb()
+            await self.redis_client.flushdb()
+            self._generation = 0
+            self._generation_checked_at = 0.0
             logger.info("[REDIS CACHE] Cache complètement vidé")
             return True
 
         except Exception as e:
-            logger.warning(f"[REDIS CACHE] Erreur vidage cache: {e}")
+            self._on_error("vidage cache", e)
             return False
 
 
@@ -0,0 +1,154 @@
+# -*- coding: UTF-8 -*-
+"""
+Base des index en mémoire alimentés depuis PostgreSQL.
+
+Typeahead, mix harmonique et scores MIR suivent le même cycle de vie :
+
+- construction complète au premier appel ;
+- rafraîchissement par delta : seules les lignes dont date_modified dépasse
+  le dernier filigrane sont rechargées, pour voir les écritures des autres
+  processus ;
+- reconstruction complète périodique, qui élimine les suppressions
+  manquées. Elle part en tâche de fond sur sa propre session : la requête qui
+  la déclenche, et les suivantes, sont servies par l'index courant ;
+- mises à jour immédiates par les callbacks des services d'écriture. Celles
+  qui surviennent pendant une reconstruction sont rejouées sur le nouvel
+  index avant sa publication.
+
+Une sous-classe fournit la classe d'index, ses intervalles et les deux
+requêtes _fetch_watermark / _load.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.api.utils.logging import logger
+
+Execute = Callable[..., Awaitable[Any]]
+Change = Callable[[Any], None]
+
+
+class RefreshingIndexService:
+    """Index du processus, rafraîchi par delta et reconstruit périodiquement."""
+
+    index_class: Callable[[], Any]
+    refresh_seconds: float
+    rebuild_seconds: float
+    log_tag: str
+
+    def __init__(self):
+        self.index = self.index_class()
+        self._lock = asyncio.Lock()
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_rebuild = 0.0
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # Modifications à rejouer sur l'index en cours de construction
+        self._pending_changes: Optional[List[Change]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._last_rebuild > 0
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._rebuild_task is not None and not self._rebuild_task.done()
+
+    async def ensure_fresh(self, execute: Execute) -> None:
+        """
+        Construit l'index au premier appel, puis le rafraîchit par delta.
+
+        Args:
+            execute: Coroutine d'exécution SQL de l'appelant (session async ou sync)
+        """
+        now = time.monotonic()
+        if self.loaded and now - self._last_refresh < self.refresh_seconds:
+            return
+        if self.loaded and (self._lock.locked() or self.rebuilding):
+            # Un rafraîchissement est en cours : servir l'index courant
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if not self.loaded:
+                await self.rebuild(execute)
+            elif now - self._last_rebuild >= self.rebuild_seconds:
+                if not self._start_background_rebuild():
+                    await self.rebuild(execute)
+            elif now - self._last_refresh >= self.refresh_seconds:
+                await self.refresh(execute)
+
+    def _start_background_rebuild(self) -> bool:
+        """Lance la reconstruction en tâche de fond (False sans fabrique de sessions)."""
+        from backend.api.utils import database
+
+        if database.AsyncSessionLocal is None:
+            return False
+
+        async def run() -> None:
+            try:
+                async with self._lock:
+                    async with database.AsyncSessionLocal() as session:
+                        await self.rebuild(session.execute)
+            except Exception as e:
+                # L'index courant reste servi ; nouvel essai au prochain intervalle
+                self._last_rebuild = time.monotonic()
+                logger.error(f"[{self.log_tag}] Échec de la reconstruction en tâche de fond: {e}")
+
+        self._rebuild_task = asyncio.create_task(run())
+        return True
+
+    async def rebuild(self, execute: Execute) -> None:
+        """Reconstruction complète de l'index."""
+        start = time.perf_counter()
+        index = self.index_class()
+        self._pending_changes = []
+        try:
+            watermark = await self._fetch_watermark(execute)
+            count = await self._load(execute, index, since=None)
+            for change in self._pending_changes:
+                change(index)
+        finally:
+            self._pending_changes = None
+        self.index = index
+        self._watermark = watermark
+        self._last_refresh = self._last_rebuild = time.monotonic()
+        logger.info(
+            f"[{self.log_tag}] Index construit: {count} entrées "
+            f"en {time.perf_counter() - start:.2f}s"
+        )
+
+    async def refresh(self, execute: Execute) -> int:
+        """Recharge les lignes modifiées depuis le dernier rafraîchissement."""
+        watermark = await self._fetch_watermark(execute)
+        count = 0
+        if self._watermark is None or watermark is None or watermark > self._watermark:
+            count = await self._load(execute, self.index, since=self._watermark)
+        self._watermark = watermark
+        self._last_refresh = time.monotonic()
+        if count:
+            logger.debug(f"[{self.log_tag}] {count} entrées rafraîchies")
+        return count
+
+    def _apply(self, change: Change) -> None:
+        """Applique une écriture à l'index publié et à celui en construction."""
+        if self._pending_changes is not None:
+            self._pending_changes.append(change)
+        if self.loaded:
+            change(self.index)
+
+    async def _fetch_watermark(self, execute: Execute):
+        """Plus grande date_modified des tables indexées."""
+        raise NotImplementedError
+
+    async def _load(self, execute: Execute, index: Any, since) -> int:
+        """Charge dans `index` les lignes modifiées après `since` (toutes si None)."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.index.get_stats(),
+            "loaded": self.loaded,
+            "rebuilding": self.rebuilding,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
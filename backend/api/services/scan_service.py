@@ -1,7 +1,7 @@
 """Service métier pour le scan de la bibliothèque musicale.
 
-Refactorisé pour utiliser la nouvelle architecture de tâches Celery :
-- scan.discovery (au lieu de l'ancienne scan_music_task)
+Refactorisé pour utiliser la nouvelle architecture de tâches TaskIQ :
+- scan.start : pipeline en flux du worker (au lieu de l'ancienne scan_music_task)
 - Pipeline optimisé pour Raspberry Pi
 - Messages structurés et logging amélioré
 """
@@ -107,17 +107,25 @@ class ScanService:
 
     @staticmethod
     async def launch_scan(
-        directory: str = None, db: AsyncSession = None, cleanup_deleted: bool = False
+        directory: str = None,
+        db: AsyncSession = None,
+        cleanup_deleted: bool = False,
+        incremental: bool = False,
+        force_delete: bool = False,
     ):
         """Lance un scan de la bibliothèque musicale.
 
-        Utilise la nouvelle architecture de tâches Celery avec scan.discovery.
+        Envoie la tâche TaskIQ scan.start (pipeline en flux du worker).
         Le paramètre cleanup_deleted est ignoré pour compatibilité (déprécié).
 
         Args:
             directory: Répertoire à scanner (optionnel, utilise MUSIC_PATH si None)
             db: Session de base de données (optionnel)
             cleanup_deleted: Paramètre déprécié, ignoré pour compatibilité
+            incremental: Scan incrémental (seuls les fichiers nouveaux/modifiés
+                sont analysés, les pistes disparues sont supprimées)
+            force_delete: Supprimer les pistes disparues même au-delà du
+                plafond SCAN_MAX_VANISHED_RATIO
 
         Returns:
             Dict avec task_id et status du scan
@@ -192,20 +200,24 @@ class ScanService:
                     "resume": True,
                 }
 
-        # Envoyer la nouvelle tâche scan.discovery via TaskIQ
+        # Envoyer la nouvelle tâche scan.start via TaskIQ
         try:
-            logger.info("[SCAN] Envoi de la tâche scan.discovery vers TaskIQ")
+            logger.info("[SCAN] Envoi de la tâche scan.start vers TaskIQ")
             logger.info("[SCAN] Queue cible: scan")
             logger.info(f"[SCAN] Répertoire: {resolved_docker_directory}")
+            logger.info(f"[SCAN] Mode incrémental: {incremental}")
 
             # Import the task dynamically to avoid circular imports
-            from backend.tasks.scan import discovery_task
+            from backend.workers.scan import start_scan_task
             
             # Send task via TaskIQ
-            task_result = await discovery_task.kiq(resolved_docker_directory)
+            task_result = await start_scan_task.kiq(
+                resolved_docker_directory,
+                incremental=incremental,
+                force_delete=force_delete,
+            )
 
             logger.info(f"[SCAN] Tâche envoyée - ID: {task_result.task_id}")
-            logger.info(f"[SCAN] Tâche envoyée - Status: {task_result.status}")
             logger.info("[SCAN] Tâche envoyée vers queue: scan")
 
             # Créer session de scan
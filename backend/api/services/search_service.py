@@ -5,15 +5,21 @@ Auteur : Kilo Code
 Dépendances : backend.api.schemas.search_schema
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, text
+from sqlalchemy import func, literal, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.schemas.search_schema import SearchQuery, SearchResult
+from backend.api.services.hybrid_scorer import HybridScorer
 from backend.api.services.redis_cache_service import redis_cache_service
+from backend.api.services.typeahead_service import typeahead_service
 from backend.api.utils.logging import logger
 
+# Scorer partagé : somme pondérée 70% texte / 30% vecteur
+hybrid_scorer = HybridScorer(weights={"text": 0.7, "vector": 0.3})
+
 
 class SearchService:
     """Service de recherche hybride PostgreSQL + pgvector."""
@@ -47,7 +53,7 @@ class SearchService:
             )
 
         # Vérifier le cache Redis pour les résultats de recherche
-        cached_result = redis_cache_service.get_cached_search_result(
+        cached_result = await redis_cache_service.get_cached_search_result(
             query.query, query.page, query.page_size, query.filters
         )
 
@@ -56,7 +62,7 @@ class SearchService:
                 f"[SEARCH CACHE] Hit pour requête: '{query.query}' page {query.page}"
             )
             # Vérifier si les facettes sont en cache
-            cached_facets = redis_cache_service.get_cached_facets()
+            cached_facets = await redis_cache_service.get_cached_facets()
             if cached_facets:
                 cached_result["facets"] = cached_facets
             return SearchResult(**cached_result)
@@ -65,11 +71,8 @@ class SearchService:
             f"[SEARCH CACHE] Miss pour requête: '{query.query}' page {query.page}"
         )
 
-        # Recherche textuelle avec TSVECTOR
-        text_results = await SearchService._text_search(query, db)
-
-        # Recherche vectorielle via TrackEmbeddings
-        vector_results = await SearchService._vector_search(query, db)
+        # Recherches textuelle (TSVECTOR) et vectorielle (TrackEmbeddings) en parallèle
+        text_results, vector_results = await SearchService._run_search_stages(query, db)
 
         # Fusionner et scorer hybride
         combined_results = SearchService._combine_results(
@@ -97,12 +100,41 @@ class SearchService:
         # Mettre en cache le résultat (sauf si c'est une requête vide ou trop spécifique)
         if len(query.query.strip()) > 2:  # Éviter de cacher les requêtes trop courtes
             result_dict = result.model_dump()
-            redis_cache_service.cache_search_result(
+            await redis_cache_service.cache_search_result(
                 query.query, query.page, query.page_size, query.filters, result_dict
             )
 
         return result
 
+    @staticmethod
+    async def _run_search_stages(
+        query: SearchQuery, db: AsyncSession
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Exécute les étapes textuelle et vectorielle de la recherche.
+
+        Une AsyncSession ne supporte pas les requêtes concurrentes : chaque étape
+        ouvre sa propre session pour que le plein texte, la génération de
+        l'embedding et la recherche ANN se recouvrent. Sans fabrique de sessions
+        (mode test), les étapes s'exécutent à la suite sur la session fournie.
+        """
+        from backend.api.utils import database
+
+        if database.AsyncSessionLocal is None:
+            text_results = await SearchService._text_search(query, db)
+            vector_results = await SearchService._vector_search(query, db)
+            return text_results, vector_results
+
+        async def run_stage(stage):
+            async with database.AsyncSessionLocal() as session:
+                return await stage(query, session)
+
+        text_results, vector_results = await asyncio.gather(
+            run_stage(SearchService._text_search),
+            run_stage(SearchService._vector_search),
+        )
+        return text_results, vector_results
+
     @staticmethod
     async def _text_search(
         query: SearchQuery, db: AsyncSession
@@ -205,12 +237,15 @@ class SearchService:
         """
         Recherche vectorielle via TrackEmbeddings.
 
-        Utilise TrackEmbeddingsService pour la recherche de similarité sémantique.
+        Les plus proches voisins sémantiques et les infos de piste (artiste,
+        album) sont récupérés par une seule requête jointe.
         """
         try:
-            from backend.api.services.track_embeddings_service import (
-                TrackEmbeddingsService,
-            )
+            from backend.api.models.albums_model import Album
+            from backend.api.models.artists_model import Artist
+            from backend.api.models.track_embeddings_model import TrackEmbeddings
+            from backend.api.models.tracks_model import Track
+            from backend.api.services.vector_index_service import apply_ef_search
 
             # Pour la recherche vectorielle, on génère un embedding des termes de recherche
             # En production, utiliser un modèle d'embedding réel (Ollama, etc.)
@@ -224,32 +259,50 @@ class SearchService:
                 )
                 return []
 
-            # Recherche via TrackEmbeddingsService
-            service = TrackEmbeddingsService(db)
-            results = await service.find_similar(
-                query_vector=embedding_vector, embedding_type="semantic", limit=100
+            # Une seule requête : plus proches voisins (index HNSW partiel du type
+            # "semantic") joints aux pistes, artistes et albums
+            await apply_ef_search(db)
+            distance = TrackEmbeddings.vector.l2_distance(embedding_vector).label(
+                "distance"
+            )
+            vector_query = (
+                select(
+                    Track.id,
+                    Track.title,
+                    Artist.name.label("artist"),
+                    Album.title.label("album"),
+                    Track.genre,
+                    Track.path,
+                    distance,
+                )
+                .select_from(TrackEmbeddings)
+                .join(Track, Track.id == TrackEmbeddings.track_id)
+                .outerjoin(Artist, Track.track_artist_id == Artist.id)
+                .outerjoin(Album, Track.album_id == Album.id)
+                .where(
+                    TrackEmbeddings.embedding_type
+                    == literal("semantic", literal_execute=True)
+                )
+                .order_by(distance)
+                .limit(100)
             )
+            result = await db.execute(vector_query)
 
             # Formater les résultats
-            vector_results = []
-            for embedding, distance in results:
-                # Récupérer les infos de la track
-                track_info = await SearchService._get_track_info(embedding.track_id, db)
-
-                if track_info:
-                    vector_results.append(
-                        {
-                            "id": embedding.track_id,
-                            "title": track_info.get("title", ""),
-                            "artist": track_info.get("artist", ""),
-                            "album": track_info.get("album", ""),
-                            "genre": track_info.get("genre", ""),
-                            "path": track_info.get("path", ""),
-                            "text_score": 0.0,
-                            "vector_score": 1.0 / (1.0 + float(distance)),
-                            "type": "track",
-                        }
-                    )
+            vector_results = [
+                {
+                    "id": row.id,
+                    "title": row.title or "",
+                    "artist": row.artist or "",
+                    "album": row.album or "",
+                    "genre": row.genre or "",
+                    "path": row.path or "",
+                    "text_score": 0.0,
+                    "vector_score": 1.0 / (1.0 + float(row.distance)),
+                    "type": "track",
+                }
+                for row in result.fetchall()
+            ]
 
             logger.debug(
                 f"[SEARCH] Recherche vectorielle: {len(vector_results)} résultats"
@@ -257,7 +310,7 @@ class SearchService:
             return vector_results
 
         except ImportError as e:
-            logger.warning(f"[SEARCH] TrackEmbeddingsService non disponible: {e}")
+            logger.warning(f"[SEARCH] Modèles d'embeddings non disponibles: {e}")
             return []
         except Exception as e:
             logger.error(f"Erreur recherche vectorielle: {e}")
@@ -307,48 +360,6 @@ class SearchService:
             logger.error(f"Erreur génération embedding: {e}")
             return None
 
-    @staticmethod
-    async def _get_track_info(
-        track_id: int, db: AsyncSession
-    ) -> Optional[Dict[str, Any]]:
-        """Récupère les informations d'une track pour les résultats de recherche."""
-        try:
-            track_query = text(
-                """
-                SELECT
-                    t.id,
-                    t.title,
-                    a.name as artist,
-                    al.title as album,
-                    t.genre,
-                    t.path
-                FROM tracks t
-                LEFT JOIN artists a ON t.track_artist_id = a.id
-                LEFT JOIN albums al ON t.album_id = al.id
-                WHERE t.id = :track_id
-                LIMIT 1
-            """
-            )
-
-            result = await db.execute(track_query, {"track_id": track_id})
-            row = result.fetchone()
-
-            if row:
-                return {
-                    "id": row.id,
-                    "title": row.title or "",
-                    "artist": row.artist or "",
-                    "album": row.album or "",
-                    "genre": row.genre or "",
-                    "path": row.path or "",
-                }
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Erreur récupération infos track {track_id}: {e}")
-            return None
-
     @staticmethod
     async def get_track_search_vector(
         track_id: int, db: AsyncSession
@@ -438,46 +449,14 @@ class SearchService:
     def _combine_results(
         text_results: List[Dict], vector_results: List[Dict], query: SearchQuery
     ) -> List[Dict]:
-        """Combiner résultats textuels et vectoriels avec scoring hybride."""
-        # Pondération: 70% texte, 30% vecteur
-        TEXT_WEIGHT = 0.7
-        VECTOR_WEIGHT = 0.3
-
-        combined = {}
-
-        # Ajouter résultats textuels
-        for result in text_results:
-            key = f"{result['type']}_{result['id'] or result['title']}"
-            result["hybrid_score"] = result["text_score"] * TEXT_WEIGHT
-            combined[key] = result
-
-        # Ajouter résultats vectoriels
-        for result in vector_results:
-            key = f"{result['type']}_{result['id'] or result['title']}"
-            if key in combined:
-                combined[key]["vector_score"] = result.get("vector_score", 0)
-                combined[key]["hybrid_score"] += result["vector_score"] * VECTOR_WEIGHT
-            else:
-                result["hybrid_score"] = result.get("vector_score", 0) * VECTOR_WEIGHT
-                combined[key] = result
-
-        # Trier par score hybride
-        sorted_results = sorted(
-            combined.values(), key=lambda x: x["hybrid_score"], reverse=True
-        )
-
-        # Nettoyer les scores pour la réponse
-        for result in sorted_results:
-            result.pop("text_score", None)
-            result.pop("vector_score", None)
-
-        return sorted_results
+        """Combiner résultats textuels et vectoriels avec scoring hybride (70% texte, 30% vecteur)."""
+        return hybrid_scorer.fuse({"text": text_results, "vector": vector_results})
 
     @staticmethod
     async def _get_facets(query: SearchQuery, db: AsyncSession) -> Dict[str, List]:
         """Générer les facettes pour les résultats en utilisant les vues matérialisées et cache Redis."""
         # Vérifier le cache Redis d'abord
-        cached_facets = redis_cache_service.get_cached_facets()
+        cached_facets = await redis_cache_service.get_cached_facets()
         if cached_facets:
             logger.debug("[FACETS CACHE] Hit")
             return cached_facets
@@ -532,7 +511,7 @@ class SearchService:
             facets = {"genres": genres, "artists": artists, "decades": decades}
 
             # Mettre en cache les facettes
-            redis_cache_service.cache_facets(facets)
+            await redis_cache_service.cache_facets(facets)
 
             return facets
 
@@ -541,7 +520,7 @@ class SearchService:
             # Fallback vers requêtes classiques si vues matérialisées indisponibles
             facets = await SearchService._get_facets_fallback(query, db)
             # Essayer de mettre en cache même le fallback
-            redis_cache_service.cache_facets(facets)
+            await redis_cache_service.cache_facets(facets)
             return facets
 
     @staticmethod
@@ -613,9 +592,18 @@ class SearchService:
 
     @staticmethod
     async def typeahead_search(
-        q: str, limit: int = 10, db: Optional[AsyncSession] = None
+        q: str,
+        limit: int = 10,
+        db: Optional[AsyncSession] = None,
+        types: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Recherche typeahead pour suggestions en temps réel."""
+        """
+        Recherche typeahead pour suggestions en temps réel.
+
+        Sert l'index de préfixes en mémoire (artistes, albums, pistes, classés
+        par pertinence et popularité) ; en cas d'erreur de l'index, repli sur
+        la recherche FTS des pistes.
+        """
         if not db:
             from backend.api.utils.database import get_async_db
 
@@ -624,6 +612,16 @@ class SearchService:
         if not q or not q.strip():
             return []
 
+        try:
+            return await typeahead_service.search(db, q, limit, types)
+        except Exception as e:
+            logger.error(f"Erreur index typeahead, repli FTS: {e}")
+
+        return await SearchService._typeahead_fts(q, limit, db)
+
+    @staticmethod
+    async def _typeahead_fts(q: str, limit: int, db: AsyncSession) -> List[Dict[str, Any]]:
+        """Typeahead par recherche FTS sur les pistes (sans préfixes)."""
         try:
             search_terms = func.plainto_tsquery("english", q)
 
@@ -0,0 +1,298 @@
+# -*- coding: UTF-8 -*-
+"""
+Hub de diffusion SSE : un seul abonné Redis par processus.
+
+Chaque onglet ouvert sur /events ouvrait sa propre connexion Redis et son
+propre SUBSCRIBE, puis recevait tous les messages bruts. Ici, un seul abonné
+pub/sub par processus API décode chaque message une fois et le distribue aux
+files en mémoire des clients connectés :
+
+- filtrage par sujet : un client abonné à un scan ou à une tâche ne reçoit
+  que les événements portant cet identifiant (task_id, batch_id ou scan_id),
+  plus les événements globaux qui n'en portent aucun ;
+- coalescence : les événements de progression sont fusionnés par sujet (seul
+  le dernier compte) et envoyés au plus max_rate fois par seconde et par client ;
+- contre-pression : les autres événements passent par une file bornée ; un
+  client qui ne la vide pas assez vite est déconnecté (le navigateur se
+  reconnecte et repart de l'état courant).
+
+L'abonnement Redis n'existe que tant qu'au moins un client est connecté.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import redis.asyncio as redis
+
+from backend.api.utils.logging import logger
+
+SSE_REDIS_URL = os.getenv("SSE_REDIS_URL", os.getenv("REDIS_URL", "redis://redis:6379"))
+SSE_CHANNELS = ("notifications", "progress")
+
+# Mises à jour de progression envoyées par seconde et par client
+DEFAULT_MAX_RATE = float(os.getenv("SSE_MAX_PROGRESS_RATE", "4"))
+# Événements non fusionnables en attente avant déconnexion du client
+DEFAULT_MAX_QUEUE = int(os.getenv("SSE_MAX_CLIENT_QUEUE", "200"))
+
+# Champs identifiant le sujet d'un événement
+TOPIC_FIELDS = ("task_id", "batch_id", "scan_id")
+# Types d'événements dont seul le dernier état importe
+COALESCED_TYPES = frozenset({"progress", "vectorization_progress", "scan_progress"})
+
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+
+def format_sse(data: str) -> str:
+    """Formate une charge utile en trame SSE."""
+    return f"data: {data}\n\n"
+
+
+def event_topics(event: Dict[str, Any]) -> Set[str]:
+    """Identifiants de sujet portés par un événement."""
+    return {str(event[field]) for field in TOPIC_FIELDS if event.get(field) is not None}
+
+
+class SSEClient:
+    """File d'un client SSE : événements discrets bornés + progression fusionnée."""
+
+    def __init__(self, topics: Optional[Iterable[str]] = None,
+                 max_rate: float = DEFAULT_MAX_RATE, max_queue: int = DEFAULT_MAX_QUEUE):
+        """
+        Args:
+            topics: Identifiants de scan/tâche suivis (None ou vide = tout)
+            max_rate: Mises à jour de progression par seconde
+            max_queue: Événements discrets en attente avant déconnexion
+        """
+        self.topics = {str(topic) for topic in topics or () if topic}
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.max_queue = max_queue
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self._events: deque = deque()
+        self._progress: "OrderedDict[str, str]" = OrderedDict()
+        self._last_progress_flush = 0.0
+        self._wakeup = asyncio.Event()
+        self.stats = {"delivered": 0, "coalesced": 0, "filtered": 0}
+
+    def wants(self, event: Optional[Dict[str, Any]]) -> bool:
+        """True si l'événement concerne ce client."""
+        if not self.topics or event is None:
+            return True
+        topics = event_topics(event)
+        return not topics or bool(topics & self.topics)
+
+    def offer(self, data: str, event: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Met un événement en file.
+
+        Returns:
+            False si le client a pris trop de retard et doit être déconnecté
+        """
+        if self.closed:
+            return False
+        if not self.wants(event):
+            self.stats["filtered"] += 1
+            return True
+
+        if event is not None and event.get("type") in COALESCED_TYPES:
+            key = f"{event.get('type')}:{'|'.join(sorted(event_topics(event)))}"
+            if key in self._progress:
+                self.stats["coalesced"] += 1
+                self._progress.move_to_end(key)
+            self._progress[key] = data
+        else:
+            if len(self._events) >= self.max_queue:
+                self.close("overflow")
+                return False
+            self._events.append(data)
+        self._wakeup.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        self.closed = True
+        self.close_reason = reason
+        self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._events) + len(self._progress)
+
+    async def next_frames(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Attend les prochaines trames à envoyer.
+
+        Les événements discrets partent immédiatement ; la progression
+        fusionnée attend que l'intervalle minimal soit écoulé.
+
+        Returns:
+            Trames SSE (vide si le délai expire ou si le client est fermé)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.closed:
+            frames = [format_sse(data) for data in self._drain_events()]
+            wait = None
+            if self._progress:
+                wait = self._last_progress_flush + self.min_interval - time.monotonic()
+                if wait <= 0:
+                    frames.extend(format_sse(data) for data in self._progress.values())
+                    self._progress.clear()
+                    self._last_progress_flush = time.monotonic()
+                    wait = None
+            if frames:
+                self.stats["delivered"] += len(frames)
+                return frames
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                wait = remaining if wait is None else min(wait, remaining)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return []
+
+    def _drain_events(self) -> List[str]:
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+
+class SSEHub:
+    """Abonné Redis unique du processus, qui distribue aux clients SSE."""
+
+    def __init__(self, redis_url: str = SSE_REDIS_URL, channels: Iterable[str] = SSE_CHANNELS):
+        self.redis_url = redis_url
+        self.channels = tuple(channels)
+        self.clients: Set[SSEClient] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.stats = {
+            "received": 0,
+            "dropped_clients": 0,
+            "reconnects": 0,
+            "decode_errors": 0,
+        }
+
+    async def register(self, topics: Optional[Iterable[str]] = None,
+                       max_rate: float = DEFAULT_MAX_RATE) -> SSEClient:
+        """Inscrit un client et démarre l'abonné Redis si nécessaire."""
+        client = SSEClient(topics=topics, max_rate=max_rate)
+        async with self._lock:
+            self.clients.add(client)
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._listen())
+        logger.debug(f"[SSE_HUB] Client inscrit ({len(self.clients)} connectés, sujets: {client.topics or 'tous'})")
+        return client
+
+    async def unregister(self, client: SSEClient) -> None:
+        """Désinscrit un client ; l'abonnement Redis s'arrête avec le dernier."""
+        client.close(client.close_reason or "disconnected")
+        async with self._lock:
+            self.clients.discard(client)
+            task = self._task if not self.clients else None
+            if task is not None:
+                self._task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        logger.debug(f"[SSE_HUB] Client désinscrit ({len(self.clients)} connectés)")
+
+    def dispatch(self, raw: Any) -> None:
+        """Décode un message une seule fois et le distribue aux clients."""
+        self.stats["received"] += 1
+        data = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else str(raw)
+        try:
+            event = json.loads(data)
+            if not isinstance(event, dict):
+                event = None
+        except ValueError:
+            self.stats["decode_errors"] += 1
+            event = None
+
+        for client in list(self.clients):
+            if not client.offer(data, event):
+                self._drop(client)
+
+    def broadcast_status(self, status: Dict[str, Any]) -> None:
+        """Envoie un événement d'état du hub (reconnexion, erreur) à tous les clients."""
+        data = json.dumps(status)
+        for client in list(self.clients):
+            if not client.offer(data):
+                self._drop(client)
+
+    def _drop(self, client: SSEClient) -> None:
+        if client in self.clients:
+            self.clients.discard(client)
+            self.stats["dropped_clients"] += 1
+            logger.warning(f"[SSE_HUB] Client trop lent déconnecté ({client.pending} événements en attente)")
+
+    async def _listen(self) -> None:
+        delay = RECONNECT_BASE_DELAY
+        while True:
+            redis_client = None
+            pubsub = None
+            try:
+                redis_client = redis.from_url(self.redis_url, retry_on_timeout=True)
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(*self.channels)
+                logger.info(f"[SSE_HUB] Abonné à {self.channels} pour {len(self.clients)} clients")
+                delay = RECONNECT_BASE_DELAY
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["reconnects"] += 1
+                logger.warning(f"[SSE_HUB] Connexion Redis perdue, nouvelle tentative dans {delay:.0f}s: {e}")
+                self.broadcast_status({"type": "retry", "message": "Redis connection lost, retrying..."})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+                if redis_client is not None:
+                    try:
+                        await redis_client.aclose()
+                    except Exception:
+                        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "clients": len(self.clients),
+            "subscribed": self._task is not None and not self._task.done(),
+            "pending_events": sum(client.pending for client in self.clients),
+        }
+
+    async def close(self) -> None:
+        """Déconnecte tous les clients et arrête l'abonné (arrêt de l'API)."""
+        for client in list(self.clients):
+            client.close("shutdown")
+        async with self._lock:
+            self.clients.clear()
+            task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+# Instance globale du hub
+sse_hub = SSEHub()
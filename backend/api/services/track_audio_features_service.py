@@ -19,11 +19,14 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple, Union, cast
 
 from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.api.models.track_audio_features_model import TrackAudioFeatures
+from backend.api.services.harmonic_mix_index_service import harmonic_mix_index_service
+from backend.api.utils.camelot import NO_KEY
 from backend.api.utils.logging import logger
 
 
@@ -209,6 +212,7 @@ class TrackAudioFeaturesService:
             self.session.add(features)
             await self._commit()
             await self._refresh(features)
+            harmonic_mix_index_service.on_features_written(track_id, features)
             logger.info(f"[AUDIO_FEATURES] Créées pour track_id={track_id}")
             return features
         except IntegrityError as e:
@@ -290,6 +294,60 @@ class TrackAudioFeaturesService:
                 analysis_source=analysis_source,
             )
 
+    async def upsert_many(
+        self,
+        rows: List[Dict[str, Any]],
+        analysis_source: Optional[str] = None,
+    ) -> List[TrackAudioFeatures]:
+        """
+        Crée ou met à jour les caractéristiques audio de plusieurs pistes en une requête.
+
+        INSERT ... ON CONFLICT (track_id) DO UPDATE ... RETURNING : comme pour
+        create_or_update, une valeur None conserve la valeur existante. Le
+        commit est laissé à l'appelant (même transaction que les pistes) ;
+        l'index harmonique est à notifier après le commit.
+
+        Args:
+            rows: Dictionnaires {"track_id": ..., "bpm": ..., ...}
+            analysis_source: Source d'analyse appliquée à toutes les lignes
+
+        Returns:
+            Les caractéristiques audio écrites
+        """
+        if not rows:
+            return []
+
+        fields = sorted({field for row in rows for field in row if field != "track_id"})
+        analyzed_at = datetime.now(timezone.utc)
+        values = [
+            {
+                "track_id": row["track_id"],
+                **{field: row.get(field) for field in fields},
+                "analysis_source": analysis_source,
+                "analyzed_at": analyzed_at,
+            }
+            for row in rows
+        ]
+
+        stmt = pg_insert(TrackAudioFeatures).values(values)
+        table = TrackAudioFeatures.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TrackAudioFeatures.track_id],
+            set_={
+                **{
+                    field: func.coalesce(stmt.excluded[field], table.c[field])
+                    for field in [*fields, "analysis_source"]
+                },
+                "analyzed_at": stmt.excluded.analyzed_at,
+                "date_modified": func.now(),
+            },
+        ).returning(TrackAudioFeatures)
+
+        result = await self._execute(stmt.execution_options(populate_existing=True))
+        features = list(result.scalars().all())
+        logger.info(f"[AUDIO_FEATURES] {len(features)} lignes écrites en un upsert")
+        return features
+
     async def update(
         self,
         track_id: int,
@@ -352,6 +410,7 @@ class TrackAudioFeaturesService:
 
         await self._commit()
         await self._refresh(features)
+        harmonic_mix_index_service.on_features_written(track_id, features)
         logger.info(f"[AUDIO_FEATURES] Mises à jour pour track_id={track_id}")
         return features
 
@@ -371,6 +430,7 @@ class TrackAudioFeaturesService:
 
         await self._delete(features)
         await self._commit()
+        harmonic_mix_index_service.on_features_deleted(track_id)
         logger.info(f"[AUDIO_FEATURES] Supprimées pour track_id={track_id}")
         return True
 
@@ -390,6 +450,7 @@ class TrackAudioFeaturesService:
 
         await self._delete(features)
         await self._commit()
+        harmonic_mix_index_service.on_features_deleted(features.track_id)
         logger.info(f"[AUDIO_FEATURES] Supprimées id={features_id}")
         return True
 
@@ -537,59 +598,144 @@ class TrackAudioFeaturesService:
         bpm_tolerance: float = 5.0,
         use_compatible_keys: bool = True,
         limit: int = 20,
+        half_double_time: bool = False,
     ) -> List[TrackAudioFeatures]:
         """
         Trouve les pistes similaires par BPM et tonalité compatible.
 
+        Les voisins viennent de l'index de mix harmonique en mémoire
+        (harmonic_mix_index_service) ; seule la piste de référence sans clé
+        Camelot repasse par une requête filtrée sur la tonalité brute.
+
         Args:
             track_id: ID de la piste de référence
             bpm_tolerance: Tolérance de BPM (±)
             use_compatible_keys: Utiliser les tonalités harmoniquement compatibles
             limit: Nombre maximum de résultats
+            half_double_time: Accepter aussi les pistes à demi-tempo / double tempo
 
         Returns:
-            Liste des caractéristiques audio similaires
+            Liste des caractéristiques audio similaires, par écart de BPM croissant
         """
-        reference = await self.get_by_track_id(track_id)
-        if not reference or not reference.bpm:
+        await harmonic_mix_index_service.ensure_fresh(self._execute)
+        entry = harmonic_mix_index_service.index.get(track_id)
+        if entry is None:
             return []
 
-        # Recherche par plage de BPM
-        min_bpm = reference.bpm - bpm_tolerance
-        max_bpm = reference.bpm + bpm_tolerance
+        if use_compatible_keys and entry[1] == NO_KEY:
+            reference = await self.get_by_track_id(track_id)
+            if reference and reference.key:
+                return await self._similar_by_raw_key(reference, bpm_tolerance, limit)
+            use_compatible_keys = False
 
-        query = select(TrackAudioFeatures).where(
-            and_(
-                TrackAudioFeatures.track_id != track_id,
-                TrackAudioFeatures.bpm >= min_bpm,
-                TrackAudioFeatures.bpm <= max_bpm,
-            )
+        neighbours = harmonic_mix_index_service.index.neighbours(
+            track_id, limit, bpm_tolerance, use_compatible_keys, half_double_time
+        )
+        return await self._features_in_order([tid for tid, _ in neighbours])
+
+    async def get_next_tracks_batch(
+        self,
+        track_ids: List[int],
+        bpm_tolerance: float = 5.0,
+        use_compatible_keys: bool = True,
+        limit: int = 20,
+        half_double_time: bool = False,
+    ) -> Dict[int, List[TrackAudioFeatures]]:
+        """
+        Pistes suivantes compatibles pour chaque piste d'une playlist.
+
+        Toutes les transitions sont calculées sur l'index en mémoire, puis
+        une seule requête charge les caractéristiques audio des résultats.
+        Comme pour get_similar_by_bpm_and_key, une référence sans clé
+        Camelot repasse par la tonalité brute quand elle en a une.
+
+        Args:
+            track_ids: Pistes de référence (une playlist)
+            bpm_tolerance: Tolérance de BPM (±)
+            use_compatible_keys: Utiliser les tonalités harmoniquement compatibles
+            limit: Nombre maximum de résultats par piste
+            half_double_time: Accepter aussi les pistes à demi-tempo / double tempo
+
+        Returns:
+            {track_id: caractéristiques audio des pistes suivantes possibles}
+        """
+        neighbours = await harmonic_mix_index_service.next_tracks(
+            self._execute, track_ids, limit, bpm_tolerance,
+            use_compatible_keys, half_double_time,
         )
+        by_raw_key: Dict[int, List[TrackAudioFeatures]] = {}
+        if use_compatible_keys:
+            keyless = []
+            for track_id in neighbours:
+                entry = harmonic_mix_index_service.index.get(track_id)
+                if entry is not None and entry[1] == NO_KEY:
+                    keyless.append(track_id)
+            for reference in await self.get_by_track_ids(keyless):
+                if reference.key:
+                    by_raw_key[reference.track_id] = await self._similar_by_raw_key(
+                        reference, bpm_tolerance, limit
+                    )
+
+        wanted = {
+            tid for track_id, found in neighbours.items()
+            if track_id not in by_raw_key for tid, _ in found
+        }
+        by_track = {f.track_id: f for f in await self.get_by_track_ids(list(wanted))}
+        return {
+            track_id: by_raw_key[track_id] if track_id in by_raw_key
+            else [by_track[tid] for tid, _ in found if tid in by_track]
+            for track_id, found in neighbours.items()
+        }
+
+    async def build_harmonic_mix(
+        self,
+        seed_track_id: int,
+        length: int = 20,
+        bpm_tolerance: float = 5.0,
+        half_double_time: bool = False,
+    ) -> List[TrackAudioFeatures]:
+        """
+        Construit un mix automatique à partir d'une piste.
 
-        # Filtre par tonalité compatible si demandé et si key existe
-        if use_compatible_keys and reference.camelot_key:
-            # Tonalités compatibles (même nombre, lettre adjacente ou ±1)
-            camelot_num = int(reference.camelot_key[:-1])
-            camelot_letter = reference.camelot_key[-1]
+        Chaque transition prend la piste de clé compatible la plus proche en
+        tempo, sans répéter de piste ; depuis une piste sans clé Camelot,
+        toutes les clés sont acceptées.
 
-            compatible_keys = [
-                f"{camelot_num}{camelot_letter}",  # Même tonalité
-                f"{((camelot_num) % 12) or 12}{camelot_letter}",  # +1
-                f"{((camelot_num - 2) % 12) + 1}{camelot_letter}",  # -1
-            ]
+        Args:
+            seed_track_id: Piste de départ
+            length: Nombre de pistes du mix (graine comprise)
+            bpm_tolerance: Tolérance de BPM (±) par transition
+            half_double_time: Accepter aussi les transitions demi-tempo / double tempo
 
-            # Ajouter tonalité relative (même nombre, lettre opposée)
-            relative_letter = "B" if camelot_letter == "A" else "A"
-            compatible_keys.append(f"{camelot_num}{relative_letter}")
+        Returns:
+            Caractéristiques audio des pistes du mix, dans l'ordre
+        """
+        mix = await harmonic_mix_index_service.build_mix(
+            self._execute, seed_track_id, length, bpm_tolerance, half_double_time
+        )
+        return await self._features_in_order(mix)
 
-            query = query.where(TrackAudioFeatures.camelot_key.in_(compatible_keys))
-        elif reference.key:
-            query = query.where(TrackAudioFeatures.key == reference.key)
+    async def _features_in_order(self, track_ids: List[int]) -> List[TrackAudioFeatures]:
+        by_track = {f.track_id: f for f in await self.get_by_track_ids(track_ids)}
+        return [by_track[tid] for tid in track_ids if tid in by_track]
 
+    async def _similar_by_raw_key(
+        self, reference: TrackAudioFeatures, bpm_tolerance: float, limit: int
+    ) -> List[TrackAudioFeatures]:
+        # Référence sans clé Camelot : même tonalité brute, plus proches en BPM
+        track_id, bpm = reference.track_id, reference.bpm
         result = await self._execute(
-            query.limit(limit).order_by(
-                func.abs(TrackAudioFeatures.bpm - reference.bpm)
+            select(TrackAudioFeatures)
+            .where(
+                and_(
+                    TrackAudioFeatures.track_id != track_id,
+                    TrackAudioFeatures.bpm >= bpm - bpm_tolerance,
+                    TrackAudioFeatures.bpm <= bpm + bpm_tolerance,
+                    TrackAudioFeatures.key == reference.key,
+                )
             )
+            .order_by(func.abs(TrackAudioFeatures.bpm - bpm))
+            .limit(limit)
         )
         return list(result.scalars().all())
 
@@ -732,6 +878,7 @@ class TrackAudioFeaturesService:
             self.session.add(features)
             await self._commit()
             await self._refresh(features)
+            harmonic_mix_index_service.on_features_written(track_id, features)
             logger.info(
                 f"[AUDIO_FEATURES] Créées avec MIR pour track_id={track_id}: "
                 f"source={mir_source}, confidence={confidence_score}"
@@ -815,6 +962,7 @@ class TrackAudioFeaturesService:
 
         await self._commit()
         await self._refresh(features)
+        harmonic_mix_index_service.on_features_written(track_id, features)
         logger.info(
             f"[AUDIO_FEATURES] Mises à jour avec MIR pour track_id={track_id}: "
             f"confidence={confidence_score}"
@@ -19,11 +19,13 @@ Auteur: SoniqueBay Team
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.models.track_embeddings_model import TrackEmbeddings
+from backend.api.services.vector_index_service import apply_ef_search, validate_embedding_type
 from backend.api.utils.logging import logger
 
 
@@ -226,6 +228,168 @@ class TrackEmbeddingsService:
                 embedding_model=embedding_model,
             )
 
+    async def bulk_upsert(
+        self,
+        embeddings_data: List[Dict[str, Any]],
+        embedding_type: str = "semantic",
+        embedding_source: Optional[str] = None,
+        embedding_model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Crée ou met à jour les embeddings d'un lot de pistes en une requête.
+
+        Les pistes inexistantes et les vecteurs de mauvaise dimension sont
+        écartés (comptés en échec) avant l'INSERT ... ON CONFLICT unique sur
+        (track_id, embedding_type).
+
+        Args:
+            embeddings_data: Dicts avec 'track_id' et 'embedding'
+            embedding_type: Type d'embedding
+            embedding_source: Source de vectorisation
+            embedding_model: Modèle utilisé
+
+        Returns:
+            Compteurs successful/failed/total et IDs en échec
+        """
+        from backend.api.models.tracks_model import Track
+
+        # Dédoublonnage par piste : le dernier vecteur reçu l'emporte
+        vectors: Dict[int, List[float]] = {}
+        failed_ids: List[int] = []
+        for data in embeddings_data:
+            track_id = data.get("track_id")
+            embedding = data.get("embedding")
+            if track_id is None or not embedding or len(embedding) != 512:
+                failed_ids.append(track_id)
+                continue
+            vectors[int(track_id)] = embedding
+
+        if vectors:
+            result = await self.session.execute(
+                select(Track.id).where(Track.id.in_(list(vectors)))
+            )
+            existing_ids = set(result.scalars().all())
+            failed_ids.extend(tid for tid in vectors if tid not in existing_ids)
+            vectors = {tid: vec for tid, vec in vectors.items() if tid in existing_ids}
+
+        if vectors:
+            now = datetime.utcnow()
+            stmt = pg_insert(TrackEmbeddings).values([
+                {
+                    "track_id": track_id,
+                    "vector": vector,
+                    "embedding_type": embedding_type,
+                    "embedding_source": embedding_source,
+                    "embedding_model": embedding_model,
+                    "created_at": now,
+                }
+                for track_id, vector in vectors.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["track_id", "embedding_type"],
+                set_={
+                    "vector": stmt.excluded.vector,
+                    "embedding_source": stmt.excluded.embedding_source,
+                    "embedding_model": stmt.excluded.embedding_model,
+                    "created_at": stmt.excluded.created_at,
+                },
+            )
+            try:
+                await self.session.execute(stmt)
+                await self.session.commit()
+            except Exception:
+                await self.session.rollback()
+                raise
+
+        logger.info(
+            f"[EMBEDDINGS] Upsert batch type={embedding_type}: "
+            f"{len(vectors)} succès, {len(failed_ids)} échecs"
+        )
+        return {
+            "successful": len(vectors),
+            "failed": len(failed_ids),
+            "total": len(embeddings_data),
+            "failed_track_ids": failed_ids,
+        }
+
+    async def get_track_texts_page(
+        self,
+        after_id: int = 0,
+        limit: int = 500,
+        embedding_type: str = "semantic",
+        only_missing: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Page (keyset sur l'ID) des métadonnées de pistes à vectoriser.
+
+        Deux requêtes par page : pistes jointes à l'artiste, l'album et aux
+        caractéristiques audio, puis tags de mood de la page.
+
+        Args:
+            after_id: Dernier ID traité (point de reprise)
+            limit: Taille de la page
+            embedding_type: Type d'embedding visé
+            only_missing: Ne retourner que les pistes sans cet embedding
+
+        Returns:
+            Dict avec 'items' et 'next_after_id' (None en fin de parcours)
+        """
+        from backend.api.models.albums_model import Album
+        from backend.api.models.artists_model import Artist
+        from backend.api.models.tags_model import MoodTag, track_mood_tags
+        from backend.api.models.track_audio_features_model import TrackAudioFeatures
+        from backend.api.models.tracks_model import Track
+
+        query = (
+            select(
+                Track.id,
+                Track.title,
+                Track.genre,
+                Track.duration,
+                Artist.name.label("artist_name"),
+                Album.title.label("album_title"),
+                TrackAudioFeatures.bpm,
+                TrackAudioFeatures.key,
+                TrackAudioFeatures.genre_main,
+            )
+            .select_from(Track)
+            .outerjoin(Artist, Artist.id == Track.track_artist_id)
+            .outerjoin(Album, Album.id == Track.album_id)
+            .outerjoin(TrackAudioFeatures, TrackAudioFeatures.track_id == Track.id)
+            .where(Track.id > after_id)
+            .order_by(Track.id)
+            .limit(limit)
+        )
+        if only_missing:
+            query = query.where(
+                ~select(TrackEmbeddings.id)
+                .where(
+                    TrackEmbeddings.track_id == Track.id,
+                    TrackEmbeddings.embedding_type == embedding_type,
+                )
+                .exists()
+            )
+
+        rows = (await self.session.execute(query)).all()
+        items = [dict(row._mapping) for row in rows]
+
+        if items:
+            tags_result = await self.session.execute(
+                select(track_mood_tags.c.track_id, MoodTag.name)
+                .join(MoodTag, MoodTag.id == track_mood_tags.c.tag_id)
+                .where(track_mood_tags.c.track_id.in_([item["id"] for item in items]))
+            )
+            mood_tags: Dict[int, List[str]] = {}
+            for track_id, name in tags_result.all():
+                mood_tags.setdefault(track_id, []).append(name)
+            for item in items:
+                item["mood_tags"] = mood_tags.get(item["id"], [])
+
+        return {
+            "items": items,
+            "next_after_id": items[-1]["id"] if len(items) == limit else None,
+        }
+
     async def update(
         self,
         track_id: int,
@@ -336,6 +500,7 @@ class TrackEmbeddingsService:
         limit: int = 10,
         min_similarity: Optional[float] = None,
         exclude_track_ids: Optional[List[int]] = None,
+        ef_search: Optional[int] = None,
     ) -> List[Tuple[TrackEmbeddings, float]]:
         """
         Recherche les embeddings les plus similaires à un vecteur donné.
@@ -349,6 +514,8 @@ class TrackEmbeddingsService:
             limit: Nombre maximum de résultats
             min_similarity: Distance maximale (similarité minimale)
             exclude_track_ids: IDs de pistes à exclure des résultats
+            ef_search: Candidats explorés dans l'index HNSW (rappel vs latence),
+                VECTOR_HNSW_EF_SEARCH par défaut
 
         Returns:
             Liste de tuples (embedding, distance) ordonnée par similarité
@@ -360,10 +527,15 @@ class TrackEmbeddingsService:
 
         # Construction de la requête avec distance euclidienne
         # pgvector utilise l'opérateur <-> pour la distance L2
+        # Le type est rendu en littéral pour que le planner retienne l'index HNSW
+        # partiel du type, y compris avec un plan générique (statement préparé)
         query = select(
             TrackEmbeddings,
             TrackEmbeddings.vector.l2_distance(query_vector).label("distance"),
-        ).where(TrackEmbeddings.embedding_type == embedding_type)
+        ).where(
+            TrackEmbeddings.embedding_type
+            == literal(validate_embedding_type(embedding_type), literal_execute=True)
+        )
 
         if exclude_track_ids:
             query = query.where(~TrackEmbeddings.track_id.in_(exclude_track_ids))
@@ -371,6 +543,7 @@ class TrackEmbeddingsService:
         # Ordonner par distance croissante (plus proche d'abord)
         query = query.order_by("distance").limit(limit)
 
+        await apply_ef_search(self.session, ef_search)
         result = await self.session.execute(query)
         results = result.all()
 
@@ -386,6 +559,7 @@ class TrackEmbeddingsService:
         embedding_type: str = "semantic",
         limit: int = 10,
         exclude_self: bool = True,
+        ef_search: Optional[int] = None,
     ) -> List[Tuple[TrackEmbeddings, float]]:
         """
         Trouve les pistes similaires à une piste donnée.
@@ -395,6 +569,7 @@ class TrackEmbeddingsService:
             embedding_type: Type d'embedding à utiliser
             limit: Nombre maximum de résultats
             exclude_self: Exclure la piste de référence des résultats
+            ef_search: Candidats explorés dans l'index HNSW
 
         Returns:
             Liste de tuples (embedding, distance) ordonnée par similarité
@@ -414,6 +589,7 @@ class TrackEmbeddingsService:
             embedding_type=embedding_type,
             limit=limit,
             exclude_track_ids=exclude_ids,
+            ef_search=ef_search,
         )
 
     async def find_similar_batch(
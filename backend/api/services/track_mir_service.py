@@ -31,6 +31,7 @@ from backend.api.models.track_mir_raw_model import TrackMIRRaw
 from backend.api.models.track_mir_normalized_model import TrackMIRNormalized
 from backend.api.models.track_mir_scores_model import TrackMIRScores
 from backend.api.models.track_mir_synthetic_tags_model import TrackMIRSyntheticTags
+from backend.api.services.mir_score_index_service import mir_score_index_service
 from backend.api.utils.logging import logger
 
 
@@ -258,6 +259,9 @@ class TrackMIRService:
 
         await self.session.commit()
         await self.session.refresh(mir_norm)
+        mir_score_index_service.on_normalized_written(
+            track_id, mir_norm.bpm, mir_norm.camelot_key
+        )
 
         logger.info(
             f"[MIR_SERVICE] Normalized créé/mis à jour pour track_id={track_id}"
@@ -284,6 +288,7 @@ class TrackMIRService:
 
         await self.session.delete(existing)
         await self.session.commit()
+        mir_score_index_service.on_normalized_deleted(track_id)
         logger.info(f"[MIR_SERVICE] Normalized supprimé pour track_id={track_id}")
         return True
 
@@ -360,6 +365,7 @@ class TrackMIRService:
 
         await self.session.commit()
         await self.session.refresh(mir_scores)
+        mir_score_index_service.on_scores_written(track_id, mir_scores)
 
         logger.info(f"[MIR_SERVICE] Scores créés/mis à jour pour track_id={track_id}")
         return mir_scores
@@ -384,6 +390,7 @@ class TrackMIRService:
 
         await self.session.delete(existing)
         await self.session.commit()
+        mir_score_index_service.on_scores_deleted(track_id)
         logger.info(f"[MIR_SERVICE] Scores supprimés pour track_id={track_id}")
         return True
 
@@ -712,61 +719,40 @@ class TrackMIRService:
         self,
         track_id: int,
         limit: int = 20,
+        bpm_tolerance: Optional[float] = None,
+        harmonic: bool = False,
     ) -> List[TrackMIRScores]:
         """
         Trouve les pistes similaires basées sur les caractéristiques MIR.
 
+        La recherche est exacte sur toutes les pistes : elle passe par la
+        matrice des scores en mémoire (mir_score_index_service), puis une
+        seule requête charge les scores des pistes retenues.
+
         Args:
             track_id: ID de la piste de référence
             limit: Nombre maximum de résultats
+            bpm_tolerance: Écart de BPM maximal (±) avec la piste de référence
+            harmonic: Limiter aux clés Camelot compatibles avec la référence
 
         Returns:
-            Liste des scores MIR des pistes similaires
+            Liste des scores MIR des pistes similaires, de la plus proche à la
+            plus éloignée
         """
-        # Récupérer les scores de la piste de référence
-        source_scores = await self.get_scores_by_track_id(track_id)
-        if not source_scores:
-            logger.warning(f"[MIR_SERVICE] Pas de scores MIR pour track_id={track_id}")
+        neighbours = await mir_score_index_service.similar(
+            self.session, track_id, limit, bpm_tolerance=bpm_tolerance, harmonic=harmonic
+        )
+        if not neighbours:
+            if track_id not in mir_score_index_service.index:
+                logger.warning(f"[MIR_SERVICE] Pas de scores MIR pour track_id={track_id}")
             return []
 
-        # Calculer la similarité basée sur les scores
-        # On cherche des pistes avec des scores proches
+        track_ids = [neighbour_id for neighbour_id, _ in neighbours]
         result = await self.session.execute(
-            select(TrackMIRScores)
-            .where(TrackMIRScores.track_id != track_id)
-            .limit(limit * 3)  # On prend plus pour filtrer après
+            select(TrackMIRScores).where(TrackMIRScores.track_id.in_(track_ids))
         )
-        candidates = result.scalars().all()
-
-        # Calculer la distance euclidienne simple
-        def score_distance(scores: TrackMIRScores) -> float:
-            if not scores:
-                return float("inf")
-            dist = 0.0
-            if (
-                source_scores.energy_score is not None
-                and scores.energy_score is not None
-            ):
-                dist += abs(source_scores.energy_score - scores.energy_score) ** 2
-            if (
-                source_scores.mood_valence is not None
-                and scores.mood_valence is not None
-            ):
-                dist += abs(source_scores.mood_valence - scores.mood_valence) ** 2
-            if source_scores.dance_score is not None and scores.dance_score is not None:
-                dist += abs(source_scores.dance_score - scores.dance_score) ** 2
-            if (
-                source_scores.acousticness is not None
-                and scores.acousticness is not None
-            ):
-                dist += abs(source_scores.acousticness - scores.acousticness) ** 2
-            return dist**0.5
-
-        # Trier par distance et limiter
-        scored = [(s, score_distance(s)) for s in candidates if s]
-        scored.sort(key=lambda x: x[1])
-
-        return [s for s, _ in scored[:limit]]
+        by_track = {scores.track_id: scores for scores in result.scalars().all()}
+        return [by_track[tid] for tid in track_ids if tid in by_track]
 
     async def get_statistics(self) -> Dict[str, Any]:
         """
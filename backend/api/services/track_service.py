@@ -1,25 +1,170 @@
+import base64
+import datetime
+import json
 from collections import defaultdict
-from typing import Any, List, Optional, Union, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
 
-from sqlalchemy import func, select
+from sqlalchemy import String, any_, bindparam, func, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, load_only, noload, raiseload, selectinload
 
 from backend.api.models.genres_model import Genre
 from backend.api.models.tags_model import GenreTag, MoodTag
+from backend.api.models.track_embeddings_model import TrackEmbeddings
 from backend.api.models.tracks_model import Track as TrackModel
 from backend.api.schemas.tracks_schema import TrackCreate
 from backend.api.utils.logging import logger
 
 
 # Import des nouveaux services pour l'intégration
+from backend.api.services.harmonic_mix_index_service import harmonic_mix_index_service
 from backend.api.services.track_audio_features_service import TrackAudioFeaturesService
 from backend.api.services.track_embeddings_service import TrackEmbeddingsService
 from backend.api.services.track_metadata_service import TrackMetadataService
+from backend.api.services.typeahead_service import typeahead_service
 
 SessionType = Union[AsyncSession, Session]
 
+# Relations de Track qu'un appelant peut demander explicitement (include=)
+TRACK_INCLUDES = (
+    "album",
+    "artist",
+    "genres",
+    "genre_tags",
+    "mood_tags",
+    "covers",
+    "audio_features",
+    "embeddings",
+    "metadata_entries",
+    "mir_raw",
+    "mir_normalized",
+    "mir_scores",
+    "mir_synthetic_tags",
+)
+TRACK_COLUMNS = tuple(column.key for column in TrackModel.__table__.columns)
+
+
+def track_load_options(
+    include: Optional[Iterable[str]] = None,
+    fields: Optional[Iterable[str]] = None,
+    raise_unloaded: bool = False,
+) -> list:
+    """
+    Options de chargement d'une projection de pistes.
+
+    Args:
+        include: Relations à charger (selectinload) ; toutes les autres sont
+            désactivées (noload), y compris celles déclarées en selectin
+        fields: Colonnes à charger (id toujours inclus) ; None = toutes
+        raise_unloaded: Désactiver les autres relations par raiseload plutôt
+            que noload : noload les renseigne à vide ([]/None) dans l'instance,
+            raiseload les laisse absentes, ce qui permet aux loaders GraphQL
+            de les distinguer d'une relation réellement chargée
+
+    Returns:
+        Options SQLAlchemy à passer à query.options()
+
+    Raises:
+        ValueError: Relation ou colonne inconnue
+    """
+    options = []
+    if fields is not None:
+        fields = set(fields) | {"id"}
+        unknown = fields.difference(TRACK_COLUMNS)
+        if unknown:
+            raise ValueError(f"Champs de piste inconnus: {', '.join(sorted(unknown))}")
+        options.append(load_only(*(getattr(TrackModel, name) for name in TRACK_COLUMNS if name in fields)))
+
+    include = set(include or ())
+    unknown = include.difference(TRACK_INCLUDES)
+    if unknown:
+        raise ValueError(f"Relations de piste inconnues: {', '.join(sorted(unknown))}")
+    unloaded = raiseload if raise_unloaded else noload
+    for name in TRACK_INCLUDES:
+        relation = getattr(TrackModel, name)
+        if name not in include:
+            options.append(unloaded(relation))
+        elif name == "embeddings":
+            # Le vecteur (512 floats) n'est jamais renvoyé par les listings
+            options.append(selectinload(relation).defer(TrackEmbeddings.vector))
+        else:
+            options.append(selectinload(relation))
+    return options
+
+
+# Clés de tri de la pagination par curseur : expression SQL de tri (couverte
+# par un index composite avec id, cf. migration track_keyset_indexes)
+TRACK_SORT_KEYS = {
+    "id": TrackModel.id,
+    "title": func.coalesce(TrackModel.title, ""),
+    "date_added": TrackModel.date_added,
+}
+MAX_PAGE_SIZE = 500
+# Au-delà, le total d'une liste filtrée est plafonné (et marqué estimé)
+COUNT_CAP = 10000
+
+
+def track_filter_clauses(
+    artist_id: Optional[int] = None,
+    album_id: Optional[int] = None,
+    genre: Optional[str] = None,
+    year: Optional[str] = None,
+    path: Optional[str] = None,
+) -> list:
+    """
+    Prédicats SQL des filtres de liste de pistes.
+
+    Le genre est une recherche insensible à la casse sur une sous-chaîne,
+    comme l'ancien filtrage en mémoire ; les autres critères sont exacts.
+    """
+    clauses = []
+    if artist_id is not None:
+        clauses.append(TrackModel.track_artist_id == artist_id)
+    if album_id is not None:
+        clauses.append(TrackModel.album_id == album_id)
+    if genre:
+        clauses.append(TrackModel.genre.icontains(genre, autoescape=True))
+    if year:
+        clauses.append(TrackModel.year == year)
+    if path:
+        clauses.append(TrackModel.path == path)
+    return clauses
+
+
+def encode_track_cursor(sort: str, track: Any) -> str:
+    """Curseur opaque d'une piste : clé de tri et id (base64 JSON)."""
+    if sort == "id":
+        value = None
+    elif sort == "title":
+        value = track.title or ""
+    else:
+        value = getattr(track, sort)
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+    payload = json.dumps([sort, value, track.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_track_cursor(sort: str, cursor: str) -> Tuple[Any, int]:
+    """
+    Décode un curseur produit par encode_track_cursor.
+
+    Raises:
+        ValueError: Curseur invalide ou produit pour un autre tri
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, track_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+    if cursor_sort != sort or not isinstance(track_id, int):
+        raise ValueError(f"Curseur invalide pour le tri {sort}")
+    if sort == "date_added" and value is not None:
+        value = datetime.datetime.fromisoformat(value)
+    return value, track_id
+
 
 class TrackService:
     """
@@ -58,7 +203,8 @@ class TrackService:
         self.metadata_service = TrackMetadataService(session)
 
     def _is_async_session(self) -> bool:
-        return isinstance(self.session, AsyncSession)
+        # AsyncSession ou LockedSession (contexte GraphQL) : API asynchrone
+        return not isinstance(self.session, Session)
 
     async def _execute(self, stmt) -> Any:
         if self._is_async_session():
@@ -111,13 +257,21 @@ class TrackService:
         """Retourne le service de gestion des métadonnées enrichies."""
         return self.metadata_service
 
-    async def get_artist_tracks(self, artist_id: int, album_id: Optional[int] = None):
+    async def get_artist_tracks(
+        self,
+        artist_id: int,
+        album_id: Optional[int] = None,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
         """
         Retourne les pistes d'un artiste, optionnellement filtrées par album.
 
         Args:
             artist_id: ID de l'artiste
             album_id: ID de l'album (optionnel)
+            include: Relations à charger (None = relations historiques)
+            fields: Colonnes à charger (None = toutes)
 
         Returns:
             Liste des pistes de l'artiste
@@ -125,13 +279,16 @@ class TrackService:
         query = select(TrackModel).where(TrackModel.track_artist_id == artist_id)
         if album_id:
             query = query.where(TrackModel.album_id == album_id)
-        query = query.options(
-            joinedload(TrackModel.genre_tags),
-            joinedload(TrackModel.mood_tags),
-            joinedload(TrackModel.album),
-            joinedload(TrackModel.genres),
-            joinedload(TrackModel.covers),
-        )
+        if include is None and fields is None:
+            query = query.options(
+                joinedload(TrackModel.genre_tags),
+                joinedload(TrackModel.mood_tags),
+                joinedload(TrackModel.album),
+                joinedload(TrackModel.genres),
+                joinedload(TrackModel.covers),
+            )
+        else:
+            query = query.options(*track_load_options(include, fields))
         result = await self._execute(query)
         return result.scalars().unique().all()
 
@@ -147,6 +304,68 @@ class TrackService:
         result = await self._execute(select(func.count(TrackModel.id)))
         return result.scalar()
 
+    async def get_scan_manifest(
+        self, path_prefix: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Retourne le manifeste compact utilisé par le scan incrémental.
+
+        Seules les colonnes nécessaires à la détection des changements sont
+        chargées (pas d'ORM, pas de relations), afin que le manifeste d'une
+        bibliothèque de plusieurs centaines de milliers de pistes reste léger.
+
+        Args:
+            path_prefix: Préfixe de chemin optionnel (répertoire scanné)
+
+        Returns:
+            Liste de tuples (path, file_mtime, file_size, id)
+        """
+        query = select(
+            TrackModel.path,
+            TrackModel.file_mtime,
+            TrackModel.file_size,
+            TrackModel.id,
+        )
+        if path_prefix:
+            prefix = path_prefix.rstrip("/\\") + "/"
+            query = query.where(TrackModel.path.startswith(prefix, autoescape=True))
+
+        result = await self._execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def delete_tracks_batch(self, track_ids: List[int]) -> int:
+        """
+        Supprime un lot de pistes (fichiers disparus lors d'un scan incrémental).
+
+        Les suppressions passent par l'ORM pour conserver les cascades
+        déclarées sur les relations (covers, audio features, embeddings...).
+
+        Args:
+            track_ids: IDs des pistes à supprimer
+
+        Returns:
+            Nombre de pistes supprimées
+        """
+        if not track_ids:
+            return 0
+
+        try:
+            result = await self._execute(
+                select(TrackModel).where(TrackModel.id.in_(track_ids))
+            )
+            tracks = result.scalars().all()
+            deleted_ids = [track.id for track in tracks]
+            for track in tracks:
+                await self._delete(track)
+            await self._commit()
+            typeahead_service.on_deleted("track", deleted_ids)
+            logger.info(f"[TRACK_BATCH] {len(tracks)} pistes supprimées en batch")
+            return len(tracks)
+        except Exception as e:
+            await self._rollback()
+            logger.error(f"[TRACK_BATCH] Erreur suppression batch: {e}")
+            raise
+
     async def create_track(self, data: TrackCreate):
         """
         Crée une nouvelle piste dans la base de données.
@@ -234,32 +453,10 @@ class TrackService:
 
         logger.info(f"[TRACK_BATCH] Traitement de {len(tracks_data)} pistes en batch")
 
-        # Étape 1: Récupérer tous les paths et musicbrainz_id existants
-        paths = [data.path for data in tracks_data if data.path]
-        mbid_values = [
-            data.musicbrainz_id for data in tracks_data if data.musicbrainz_id
-        ]
-
-        existing_tracks_by_path = {}
-        existing_tracks_by_mbid = {}
-
-        # Requête pour récupérer les tracks existantes par path
-        if paths:
-            result = await self._execute(
-                select(TrackModel).where(TrackModel.path.in_(paths))
-            )
-            existing_tracks = result.scalars().all()
-            existing_tracks_by_path = {track.path: track for track in existing_tracks}
-
-        # Requête pour récupérer les tracks existantes par musicbrainz_id
-        if mbid_values:
-            result = await self._execute(
-                select(TrackModel).where(TrackModel.musicbrainz_id.in_(mbid_values))
-            )
-            existing_mbid_tracks = result.scalars().all()
-            existing_tracks_by_mbid = {
-                track.musicbrainz_id: track for track in existing_mbid_tracks
-            }
+        # Étape 1: Récupérer les pistes existantes (path ou musicbrainz_id) en une requête
+        existing_tracks_by_path, existing_tracks_by_mbid = (
+            await self._prefetch_existing_tracks(tracks_data)
+        )
 
         # Étape 2: Séparer les tracks en évitant les doublons de musicbrainz_id
         tracks_to_create = []
@@ -316,160 +513,101 @@ class TrackService:
             updated_tracks = await self._update_tracks_batch_optimized(tracks_to_update)
             result.extend(updated_tracks)
 
+        # Indexer les pistes créées ou modifiées pour le typeahead
+        typeahead_service.on_tracks_upserted(result)
+
         # Étape 5: Ajouter les pistes inchangées directement (pas besoin de requête DB)
         result.extend(tracks_to_return_unchanged)
 
         logger.info(f"[TRACK_BATCH] Batch terminé: {len(result)} pistes traitées")
         return result
 
+    async def _prefetch_existing_tracks(
+        self, tracks_data: List[TrackCreate]
+    ) -> tuple[dict, dict]:
+        """
+        Charge en une seule requête les pistes existantes d'un lot.
+
+        Returns:
+            (pistes indexées par path, pistes indexées par musicbrainz_id)
+        """
+        paths = [data.path for data in tracks_data if data.path]
+        mbid_values = [
+            data.musicbrainz_id for data in tracks_data if data.musicbrainz_id
+        ]
+        if not paths and not mbid_values:
+            return {}, {}
+
+        result = await self._execute(
+            select(TrackModel).where(
+                or_(
+                    TrackModel.path == any_(bindparam("paths", paths, type_=ARRAY(String))),
+                    TrackModel.musicbrainz_id
+                    == any_(bindparam("mbids", mbid_values, type_=ARRAY(String))),
+                )
+            )
+        )
+        existing_tracks = result.scalars().all()
+
+        existing_by_path = {track.path: track for track in existing_tracks}
+        existing_by_mbid = {
+            track.musicbrainz_id: track
+            for track in existing_tracks
+            if track.musicbrainz_id
+        }
+        return existing_by_path, existing_by_mbid
+
     async def _create_tracks_batch_optimized(self, tracks_data: List[TrackCreate]):
-        """Crée plusieurs pistes en une seule transaction avec gestion robuste des contraintes d'unicité."""
+        """
+        Crée plusieurs pistes avec un seul INSERT ... ON CONFLICT (path) DO UPDATE ... RETURNING.
+
+        Les pistes existantes ont déjà été écartées par le préchargement de
+        create_or_update_tracks_batch ; ON CONFLICT couvre les insertions
+        concurrentes sur le même chemin. Les pistes sont retournées par RETURNING,
+        sans refresh ligne à ligne.
+        """
         try:
-            # Préparer les objets TrackModel avec dédoublonnage préalable
-            tracks_to_insert = []
-            seen_paths = set()
+            # Dédoublonnage dans le lot (path et musicbrainz_id sont uniques)
+            rows = []
+            data_by_path = {}
             seen_mbids = set()
 
             for data in tracks_data:
-                # Éviter les doublons par path
-                if data.path and data.path in seen_paths:
+                if data.path in data_by_path:
                     logger.warning(
                         f"[TRACK_BATCH] Path déjà présent dans le batch: {data.path}"
                     )
                     continue
 
-                # Éviter les doublons par musicbrainz_id
                 if data.musicbrainz_id and data.musicbrainz_id in seen_mbids:
                     logger.warning(
                         f"[TRACK_BATCH] MBID déjà présent dans le batch: {data.musicbrainz_id}"
                     )
                     continue
 
-                # Vérifier si la track existe déjà en base (path ou MBID)
-                existing = None
-                if data.musicbrainz_id:
-                    result = await self._execute(
-                        select(TrackModel).where(
-                            TrackModel.musicbrainz_id == data.musicbrainz_id
-                        )
-                    )
-                    existing = result.scalars().first()
-
-                if not existing and data.path:
-                    result = await self._execute(
-                        select(TrackModel).where(TrackModel.path == data.path)
-                    )
-                    existing = result.scalars().first()
-
-                if existing:
-                    logger.warning(
-                        f"[TRACK_BATCH] Track déjà existante ignorée: {data.title} (ID: {existing.id})"
-                    )
-                    continue
-
-                # Créer la nouvelle track (sans les champs audio → TrackAudioFeatures)
-                track = TrackModel(
-                    title=data.title,
-                    path=data.path,
-                    track_artist_id=data.track_artist_id,
-                    album_id=data.album_id,
-                    genre=data.genre,
-                    # Note: bpm, key, scale, danceability, mood_*, etc. → TrackAudioFeatures
-                    duration=data.duration,
-                    track_number=data.track_number,
-                    disc_number=data.disc_number,
-                    musicbrainz_id=data.musicbrainz_id,
-                    year=data.year,
-                    featured_artists=data.featured_artists,
-                    file_type=data.file_type,
-                    bitrate=data.bitrate,
-                    file_mtime=getattr(data, "file_mtime", None),
-                    file_size=getattr(data, "file_size", None),
-                )
-                tracks_to_insert.append(track)
-
-                # Marquer comme vu
-                if data.path:
-                    seen_paths.add(data.path)
+                rows.append(self._track_row(data))
+                data_by_path[data.path] = data
                 if data.musicbrainz_id:
                     seen_mbids.add(data.musicbrainz_id)
 
-            if not tracks_to_insert:
+            if not rows:
                 logger.warning("[TRACK_BATCH] Aucune track valide à insérer")
                 return []
 
-            # Insertion en batch avec gestion d'erreur spécifique
             try:
-                self.session.add_all(tracks_to_insert)
-                await self._commit()
+                tracks_to_insert = await self._insert_track_rows(rows)
             except IntegrityError as e:
+                # ON CONFLICT n'accepte qu'une seule cible (path) : un conflit sur
+                # musicbrainz_id vient d'une insertion concurrente depuis le préchargement
                 await self._rollback()
-
-                # Gestion spécifique des violations de contrainte
-                if "UNIQUE constraint failed: tracks.musicbrainz_id" in str(e):
-                    logger.error(
-                        "[TRACK_BATCH] Violation contrainte musicbrainz_id. Vérification des doublons..."
-                    )
-                    # Vérifier quels MBIDs causent problème
-                    for track_data in tracks_data:
-                        if track_data.musicbrainz_id:
-                            result = await self._execute(
-                                select(TrackModel).where(
-                                    TrackModel.musicbrainz_id
-                                    == track_data.musicbrainz_id
-                                )
-                            )
-                            existing = result.scalars().first()
-                            if existing:
-                                logger.warning(
-                                    f"[TRACK_BATCH] MBID existant: {track_data.musicbrainz_id} → Track ID: {existing.id}"
-                                )
-
-                    # Réessayer l'insertion sans les MBIDs problématiques
-                    tracks_without_mbid = []
-                    for track in tracks_to_insert:
-                        if not track.musicbrainz_id:
-                            tracks_without_mbid.append(track)
-
-                    if tracks_without_mbid:
-                        logger.info(
-                            f"[TRACK_BATCH] Réinsertion sans MBIDs: {len(tracks_without_mbid)} tracks"
-                        )
-                        try:
-                            self.session.add_all(tracks_without_mbid)
-                            await self._commit()
-                            tracks_to_insert = tracks_without_mbid
-                        except Exception as retry_e:
-                            await self._rollback()
-                            logger.error(
-                                f"[TRACK_BATCH] Erreur lors de la réinsertion: {retry_e}"
-                            )
-                            raise retry_e
-                    else:
-                        raise e
-
-                elif "UNIQUE constraint failed: tracks.path" in str(e):
-                    logger.error(
-                        "[TRACK_BATCH] Violation contrainte path. Vérification des doublons..."
-                    )
-                    raise Exception(
-                        "Conflit de chemin détecté - certaines tracks existent déjà"
-                    )
-                else:
-                    logger.error(
-                        f"[TRACK_BATCH] Violation de contrainte non gérée: {e}"
-                    )
-                    raise e
-            except Exception as e:
-                await self._rollback()
-                logger.error(f"[TRACK_BATCH] Erreur création batch: {e}")
-                raise
-
-            # Refresh pour récupérer les IDs générés
-            for track in tracks_to_insert:
-                await self._refresh(track)
-
-            # Créer les caractéristiques audio (TrackAudioFeatures) pour chaque track
+                if "musicbrainz_id" not in str(e):
+                    raise
+                rows = await self._drop_conflicting_mbids(rows)
+                if not rows:
+                    return []
+                tracks_to_insert = await self._insert_track_rows(rows)
+
+            # Caractéristiques audio (TrackAudioFeatures) des pistes créées : un seul upsert
             _audio_fields = [
                 "bpm",
                 "key",
@@ -485,71 +623,31 @@ class TrackService:
                 "camelot_key",
                 "genre_main",
             ]
-            for i, track in enumerate(tracks_to_insert):
-                # Récupérer les données source correspondantes (en tenant compte du dédoublonnage)
-                # tracks_to_insert peut être plus court que tracks_data si des doublons ont été ignorés
-                # On utilise l'index seulement si disponible, sinon on skip
-                if i < len(tracks_data):
-                    af_data = tracks_data[i]
-                    if any(
-                        getattr(af_data, f, None) is not None for f in _audio_fields
-                    ):
-                        try:
-                            await self.audio_features_service.create_or_update(
-                                track_id=track.id,
-                                bpm=getattr(af_data, "bpm", None),
-                                key=getattr(af_data, "key", None),
-                                scale=getattr(af_data, "scale", None),
-                                danceability=getattr(af_data, "danceability", None),
-                                mood_happy=getattr(af_data, "mood_happy", None),
-                                mood_aggressive=getattr(
-                                    af_data, "mood_aggressive", None
-                                ),
-                                mood_party=getattr(af_data, "mood_party", None),
-                                mood_relaxed=getattr(af_data, "mood_relaxed", None),
-                                instrumental=getattr(af_data, "instrumental", None),
-                                acoustic=getattr(af_data, "acoustic", None),
-                                tonal=getattr(af_data, "tonal", None),
-                                camelot_key=getattr(af_data, "camelot_key", None),
-                                genre_main=getattr(af_data, "genre_main", None),
-                                analysis_source="tags",
-                            )
-                        except Exception as af_err:
-                            # TODO: surveiller les erreurs audio features en production
-                            logger.warning(
-                                f"[TRACK_BATCH] Impossible de créer TrackAudioFeatures "
-                                f"pour track_id={track.id}: {af_err}"
-                            )
-
-            # Gérer les tags mood et genre pour les tracks créés
-            for i, track in enumerate(tracks_to_insert):
-                data = tracks_data[i]
-                # Gérer les genre tags
-                if hasattr(data, "genre_tags") and data.genre_tags:
-                    for tag_name in data.genre_tags:
-                        result = await self._execute(
-                            select(GenreTag).where(GenreTag.name == tag_name)
-                        )
-                        tag = result.scalars().first()
-                        if not tag:
-                            tag = GenreTag(name=tag_name)
-                            self.session.add(tag)
-                        track.genre_tags.append(tag)
-
-                # Gérer les mood tags
-                if hasattr(data, "mood_tags") and data.mood_tags:
-                    for tag_name in data.mood_tags:
-                        result = await self._execute(
-                            select(MoodTag).where(MoodTag.name == tag_name)
-                        )
-                        tag = result.scalars().first()
-                        if not tag:
-                            tag = MoodTag(name=tag_name)
-                            self.session.add(tag)
-                        track.mood_tags.append(tag)
+            audio_rows = []
+            for track in tracks_to_insert:
+                # RETURNING ne préserve pas l'ordre : rapprochement par path
+                af_data = data_by_path.get(track.path)
+                if af_data is None or not any(
+                    getattr(af_data, f, None) is not None for f in _audio_fields
+                ):
+                    continue
+                audio_rows.append(
+                    {
+                        "track_id": track.id,
+                        **{f: getattr(af_data, f, None) for f in _audio_fields},
+                    }
+                )
+            audio_features = await self.audio_features_service.upsert_many(
+                audio_rows, analysis_source="tags"
+            )
+
+            # Gérer les tags mood et genre pour les tracks créés (une requête par type de tag)
+            await self._attach_tags_batch(tracks_to_insert, data_by_path, GenreTag, "genre_tags")
+            await self._attach_tags_batch(tracks_to_insert, data_by_path, MoodTag, "mood_tags")
 
-            # Commit pour les tags
             await self._commit()
+            for features in audio_features:
+                harmonic_mix_index_service.on_features_written(features.track_id, features)
 
             logger.info(f"[TRACK_BATCH] {len(tracks_to_insert)} pistes créées en batch")
             return tracks_to_insert
@@ -560,58 +658,145 @@ class TrackService:
             logger.error(f"[TRACK_BATCH] Erreur création batch: {e}")
             raise
 
-    async def _update_tracks_batch_optimized(self, tracks_to_update: List[tuple]):
-        """Met à jour plusieurs pistes en une seule transaction."""
-        try:
-            updated_tracks = []
+    @staticmethod
+    def _track_row(data: TrackCreate) -> dict:
+        """Colonnes de la table tracks uniquement (bpm, key, mood_* → TrackAudioFeatures)."""
+        return {
+            "title": data.title,
+            "path": data.path,
+            "track_artist_id": data.track_artist_id,
+            "album_id": data.album_id,
+            "genre": data.genre,
+            "duration": data.duration,
+            "track_number": data.track_number,
+            "disc_number": data.disc_number,
+            "musicbrainz_id": data.musicbrainz_id,
+            "musicbrainz_albumid": data.musicbrainz_albumid,
+            "musicbrainz_artistid": data.musicbrainz_artistid,
+            "musicbrainz_albumartistid": data.musicbrainz_albumartistid,
+            "acoustid_fingerprint": data.acoustid_fingerprint,
+            "year": data.year,
+            "featured_artists": data.featured_artists,
+            "file_type": data.file_type,
+            "bitrate": data.bitrate,
+            "file_mtime": getattr(data, "file_mtime", None),
+            "file_size": getattr(data, "file_size", None),
+        }
+
+    async def _insert_track_rows(
+        self, rows: List[dict], conflict_column=TrackModel.path
+    ) -> List[TrackModel]:
+        """INSERT ... ON CONFLICT (path ou id) DO UPDATE ... RETURNING d'un lot de lignes tracks."""
+        stmt = pg_insert(TrackModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={
+                **{
+                    column: stmt.excluded[column]
+                    for column in rows[0]
+                    if column != conflict_column.key
+                },
+                "date_modified": func.now(),
+            },
+        ).returning(TrackModel)
+        result = await self._execute(stmt.execution_options(populate_existing=True))
+        return list(result.scalars().all())
 
-            for existing, data in tracks_to_update:
-                # Mise à jour des champs
-                update_data = data.model_dump(exclude_unset=True, exclude_none=True)
-                for field, value in update_data.items():
-                    if hasattr(existing, field):
-                        setattr(existing, field, value)
+    async def _drop_conflicting_mbids(self, rows: List[dict]) -> List[dict]:
+        """
+        Écarte les lignes dont le musicbrainz_id appartient déjà à une autre piste.
 
-                existing.date_modified = func.now()
-                updated_tracks.append(existing)
+        Returns:
+            Lignes restantes à insérer
+        """
+        mbids = [row["musicbrainz_id"] for row in rows if row["musicbrainz_id"]]
+        result = await self._execute(
+            select(TrackModel.musicbrainz_id, TrackModel.id).where(
+                TrackModel.musicbrainz_id
+                == any_(bindparam("mbids", mbids, type_=ARRAY(String)))
+            )
+        )
+        existing = dict(result.all())
+        for mbid, track_id in existing.items():
+            logger.warning(f"[TRACK_BATCH] MBID existant: {mbid} → Track ID: {track_id}")
 
-            # Commit unique pour toutes les mises à jour
-            await self._commit()
+        remaining = [row for row in rows if row["musicbrainz_id"] not in existing]
+        logger.info(
+            f"[TRACK_BATCH] Réinsertion sans MBIDs en conflit: {len(remaining)}/{len(rows)} tracks"
+        )
+        return remaining
+
+    async def _attach_tags_batch(
+        self,
+        tracks: List[TrackModel],
+        data_by_path: dict,
+        tag_model,
+        relation: str,
+        replace: bool = False,
+    ) -> None:
+        """
+        Associe les tags (genre ou mood) d'un lot de pistes avec une seule recherche des tags.
 
-            # Gérer les tags mood et genre pour les tracks mises à jour
+        Avec replace, les pistes qui fournissent des tags perdent leurs anciens tags.
+        """
+        names = {
+            tag_name
+            for data in data_by_path.values()
+            for tag_name in (getattr(data, relation, None) or [])
+        }
+        if not names:
+            return
+
+        result = await self._execute(select(tag_model).where(tag_model.name.in_(names)))
+        tags_by_name = {tag.name: tag for tag in result.scalars().all()}
+
+        for track in tracks:
+            data = data_by_path.get(track.path)
+            tag_names = (getattr(data, relation, None) or []) if data else []
+            if replace and tag_names:
+                setattr(track, relation, [])
+            for tag_name in tag_names:
+                tag = tags_by_name.get(tag_name)
+                if tag is None:
+                    tag = tag_model(name=tag_name)
+                    self.session.add(tag)
+                    tags_by_name[tag_name] = tag
+                if tag not in getattr(track, relation):
+                    getattr(track, relation).append(tag)
+
+    async def _update_tracks_batch_optimized(self, tracks_to_update: List[tuple]):
+        """
+        Met à jour plusieurs pistes avec un seul INSERT ... ON CONFLICT (id) DO UPDATE ... RETURNING.
+
+        Même chemin que la création : les valeurs absentes du lot (None)
+        conservent celles de la piste existante, les tags sont résolus en une
+        requête par type de tag et les pistes reviennent par RETURNING, sans
+        refresh ligne à ligne.
+        """
+        try:
+            # Une ligne par piste existante (la dernière donnée l'emporte)
+            rows_by_id = {}
+            data_by_path = {}
             for existing, data in tracks_to_update:
-                # Gérer les genre tags
-                if hasattr(data, "genre_tags") and data.genre_tags:
-                    existing.genre_tags = []
-                    for tag_name in data.genre_tags:
-                        result = await self._execute(
-                            select(GenreTag).where(GenreTag.name == tag_name)
-                        )
-                        tag = result.scalars().first()
-                        if not tag:
-                            tag = GenreTag(name=tag_name)
-                            self.session.add(tag)
-                        existing.genre_tags.append(tag)
-
-                # Gérer les mood tags
-                if hasattr(data, "mood_tags") and data.mood_tags:
-                    existing.mood_tags = []
-                    for tag_name in data.mood_tags:
-                        result = await self._execute(
-                            select(MoodTag).where(MoodTag.name == tag_name)
-                        )
-                        tag = result.scalars().first()
-                        if not tag:
-                            tag = MoodTag(name=tag_name)
-                            self.session.add(tag)
-                        existing.mood_tags.append(tag)
+                row = {
+                    column: value if value is not None else getattr(existing, column)
+                    for column, value in self._track_row(data).items()
+                }
+                rows_by_id[existing.id] = {"id": existing.id, **row}
+                data_by_path[row["path"]] = data
 
-            # Commit pour les tags
-            await self._commit()
+            updated_tracks = await self._insert_track_rows(
+                list(rows_by_id.values()), conflict_column=TrackModel.id
+            )
 
-            # Refresh pour s'assurer que les données sont à jour
-            for track in updated_tracks:
-                await self._refresh(track)
+            await self._attach_tags_batch(
+                updated_tracks, data_by_path, GenreTag, "genre_tags", replace=True
+            )
+            await self._attach_tags_batch(
+                updated_tracks, data_by_path, MoodTag, "mood_tags", replace=True
+            )
+
+            await self._commit()
 
             logger.info(
                 f"[TRACK_BATCH] {len(updated_tracks)} pistes mises à jour en batch"
@@ -687,37 +872,186 @@ class TrackService:
 
         return tracks
 
-    async def read_tracks(self, skip: int = 0, limit: int = 100):
-        query = (
-            select(TrackModel)
-            .options(
+    async def read_tracks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        """
+        Liste paginée des pistes.
+
+        Sans include ni fields, charge les relations historiques (tags,
+        album, genres, covers). Sinon, seules les colonnes et relations
+        demandées sont chargées (voir track_load_options).
+        """
+        if include is None and fields is None:
+            options = [
                 joinedload(TrackModel.genre_tags),
                 joinedload(TrackModel.mood_tags),
                 joinedload(TrackModel.album),
                 joinedload(TrackModel.genres),
-                joinedload(TrackModel.covers),
-            )
+                # Chargement séparé : évite de dupliquer les covers dans le produit des jointures
+                selectinload(TrackModel.covers),
+            ]
+        else:
+            options = track_load_options(include, fields)
+        query = (
+            select(TrackModel)
+            .options(*options)
+            .order_by(TrackModel.id)
             .offset(skip)
             .limit(limit)
         )
         result = await self._execute(query)
         return result.scalars().unique().all()
 
-    async def read_track(self, track_id: int):
-        query = (
-            select(TrackModel)
-            .options(
+    async def read_track(
+        self,
+        track_id: int,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        if include is None and fields is None:
+            options = [
                 joinedload(TrackModel.genre_tags),
                 joinedload(TrackModel.mood_tags),
                 joinedload(TrackModel.covers),
                 joinedload(TrackModel.album),
                 joinedload(TrackModel.genres),
-            )
+            ]
+        else:
+            options = track_load_options(include, fields)
+        query = (
+            select(TrackModel)
+            .options(*options)
             .where(TrackModel.id == track_id)
         )
         result = await self._execute(query)
         return result.scalars().first()
 
+    async def list_tracks(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 100,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ):
+        """
+        Liste paginée par offset avec filtres appliqués en SQL.
+
+        Args:
+            filters: Critères de track_filter_clauses (artist_id, album_id, genre, year, path)
+            skip: Décalage
+            limit: Nombre maximal de pistes
+            include: Relations à charger (voir track_load_options)
+            fields: Colonnes à charger (None = toutes)
+        """
+        query = (
+            select(TrackModel)
+            .where(*track_filter_clauses(**(filters or {})))
+            .options(*track_load_options(include, fields))
+            .order_by(TrackModel.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self._execute(query)
+        return result.scalars().unique().all()
+
+    async def list_tracks_keyset(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "id",
+        descending: bool = False,
+        first: int = 50,
+        after: Optional[str] = None,
+        include: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[list, bool]:
+        """
+        Page de pistes paginée par curseur sur (clé de tri, id).
+
+        Le coût d'une page ne dépend pas de sa profondeur : la page suivante
+        repart de la dernière clé vue au lieu de sauter OFFSET lignes.
+
+        Args:
+            filters: Critères de track_filter_clauses
+            sort: Clé de TRACK_SORT_KEYS
+            descending: Tri décroissant
+            first: Taille de page (plafonnée à MAX_PAGE_SIZE)
+            after: Curseur de la dernière piste de la page précédente
+            include: Relations à charger
+            fields: Colonnes à charger (la clé de tri est toujours lue)
+
+        Returns:
+            (pistes de la page, True s'il reste des pistes après)
+
+        Raises:
+            ValueError: Tri inconnu ou curseur invalide
+        """
+        if sort not in TRACK_SORT_KEYS:
+            raise ValueError(f"Tri de piste inconnu: {sort}")
+        first = max(0, min(first, MAX_PAGE_SIZE))
+        sort_expr = TRACK_SORT_KEYS[sort]
+        if fields is not None and sort != "id":
+            fields = set(fields) | {sort}
+
+        query = (
+            select(TrackModel)
+            .where(*track_filter_clauses(**(filters or {})))
+            .options(*track_load_options(include, fields))
+        )
+        if after:
+            value, track_id = decode_track_cursor(sort, after)
+            if sort == "id":
+                query = query.where(TrackModel.id < track_id if descending else TrackModel.id > track_id)
+            else:
+                key, last = tuple_(sort_expr, TrackModel.id), tuple_(value, track_id)
+                query = query.where(key < last if descending else key > last)
+
+        order = [sort_expr] if sort != "id" else []
+        order.append(TrackModel.id)
+        query = query.order_by(*(column.desc() if descending else column.asc() for column in order))
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        result = await self._execute(query.limit(first + 1))
+        tracks = list(result.scalars().unique().all())
+        return tracks[:first], len(tracks) > first
+
+    async def estimate_tracks_count(self, filters: Optional[Dict[str, Any]] = None) -> Tuple[int, bool]:
+        """
+        Total approximatif d'une liste de pistes, sans parcourir la table.
+
+        Sans filtre, lit l'estimation du planificateur PostgreSQL
+        (pg_class.reltuples). Avec filtres, compte au plus COUNT_CAP lignes.
+
+        Returns:
+            (total, True si le total est une estimation ou un plafond)
+        """
+        clauses = track_filter_clauses(**(filters or {}))
+        if not clauses:
+            try:
+                result = await self._execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name").bindparams(
+                        name=TrackModel.__tablename__
+                    )
+                )
+                estimate = result.scalar()
+                # -1 : table jamais analysée, on retombe sur un comptage
+                if estimate is not None and estimate >= 0:
+                    return int(estimate), True
+            except Exception as e:
+                logger.debug(f"[TRACKS] Estimation pg_class indisponible: {e}")
+
+        capped = select(TrackModel.id).where(*clauses).limit(COUNT_CAP + 1).subquery()
+        result = await self._execute(select(func.count()).select_from(capped))
+        total = result.scalar() or 0
+        if total > COUNT_CAP:
+            return COUNT_CAP, True
+        return total, False
+
     async def update_track(self, track_id: int, track_data):
         from sqlalchemy import func
 
@@ -857,6 +1191,7 @@ class TrackService:
 
         await self._delete(track)
         await self._commit()
+        typeahead_service.on_deleted("track", [track_id])
         return True
 
     async def upsert_track(self, track_data):
@@ -0,0 +1,482 @@
+# -*- coding: UTF-8 -*-
+"""
+Index de typeahead en mémoire pour artistes, albums et pistes.
+
+La recherche FTS (plainto_tsquery) ne fait pas de correspondance par préfixe
+(« radi » ne trouve pas « Radiohead ») et chaque frappe coûtait une requête
+classée jointe sur trois tables. Ici, chaque processus API garde un index de
+préfixes compact :
+
+- les noms sont normalisés (minuscules, sans accents) et découpés en mots ;
+- les mots distincts sont stockés une seule fois dans une liste triée, chacun
+  avec sa liste de postings ; un préfixe correspond à un intervalle contigu
+  de cette liste, trouvé par bisection ;
+- une requête de plusieurs mots exige que chaque mot soit le préfixe d'un mot
+  du nom ;
+- le classement combine la qualité de la correspondance (nom commençant par
+  la requête, mot complet) et une popularité (auditeurs Last.fm, nombre de
+  pistes).
+
+L'index est complété par les callbacks d'insertion et de suppression des
+services artistes/albums/pistes ; le rafraîchissement par delta et la
+reconstruction périodique sont ceux de RefreshingIndexService.
+"""
+
+import bisect
+import heapq
+import math
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.services.refreshing_index_service import Execute, RefreshingIndexService
+
+ENTITY_TYPES = ("artist", "album", "track")
+
+# Rafraîchissement par delta (écritures des autres processus)
+TYPEAHEAD_REFRESH_SECONDS = float(os.getenv("TYPEAHEAD_REFRESH_SECONDS", "60"))
+# Reconstruction complète (prise en compte des suppressions)
+TYPEAHEAD_REBUILD_SECONDS = float(os.getenv("TYPEAHEAD_REBUILD_SECONDS", "3600"))
+
+# Bonus de classement par type : un artiste avant ses albums avant ses pistes
+TYPE_BOOST = {"artist": 1.5, "album": 0.75, "track": 0.0}
+NAME_PREFIX_BOOST = 3.0
+WHOLE_WORD_BOOST = 1.0
+MAX_BOOST = NAME_PREFIX_BOOST + WHOLE_WORD_BOOST
+
+RESULT_CACHE_SIZE = 2048
+# Les préfixes de 1-2 caractères couvrent des milliers de mots : leurs postings
+# classés sont gardés déjà fusionnés
+SHORT_PREFIX_LENGTH = 2
+SHORT_PREFIX_MARKER = "\x00"
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+ARTISTS_SQL = """
+    SELECT a.id, a.name, a.lastfm_listeners, COUNT(t.id) AS track_count
+    FROM artists a
+    LEFT JOIN tracks t ON t.track_artist_id = a.id
+    {where}
+    GROUP BY a.id
+"""
+
+ALBUMS_SQL = """
+    SELECT al.id, al.title, al.album_artist_id, ar.name AS artist, COUNT(t.id) AS track_count
+    FROM albums al
+    LEFT JOIN artists ar ON ar.id = al.album_artist_id
+    LEFT JOIN tracks t ON t.album_id = al.id
+    {where}
+    GROUP BY al.id, ar.name
+"""
+
+TRACKS_SQL = """
+    SELECT t.id, t.title, t.track_artist_id, t.album_id, a.name AS artist, al.title AS album
+    FROM tracks t
+    LEFT JOIN artists a ON a.id = t.track_artist_id
+    LEFT JOIN albums al ON al.id = t.album_id
+    {where}
+"""
+
+
+def normalize(value: Optional[str]) -> str:
+    """Minuscules, sans accents ni ponctuation superflue."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold()
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Mots normalisés d'un nom, dans l'ordre."""
+    return _TOKEN_RE.findall(normalize(value))
+
+
+def index_terms(label: Optional[str]) -> Set[str]:
+    """
+    Termes indexés pour un nom : ses mots, plus la forme collée des noms à
+    plusieurs mots (« acdc » pour « AC/DC », « daftpunk »).
+    """
+    tokens = tokenize(label)
+    terms = set(tokens)
+    if len(tokens) > 1:
+        terms.add("".join(tokens))
+    return terms
+
+
+class TypeaheadEntry:
+    """Entité indexée."""
+
+    __slots__ = ("type", "id", "label", "artist", "album", "artist_id", "popularity",
+                 "norm", "terms", "rank")
+
+    def __init__(self, type: str, id: int, label: str, artist: str = "", album: str = "",
+                 artist_id: Optional[int] = None, popularity: float = 0.0):
+        self.type = type
+        self.id = id
+        self.label = label or ""
+        self.artist = artist or ""
+        self.album = album or ""
+        self.artist_id = artist_id
+        self.popularity = popularity
+        self.norm = " ".join(tokenize(label))
+        self.terms = index_terms(label)
+        # Score indépendant de la requête ; à score égal, les noms courts d'abord
+        self.rank = TYPE_BOOST.get(type, 0.0) + popularity - len(self.norm) * 1e-3
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.type, self.id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.label,
+            "artist": self.artist,
+            "album": self.album,
+            "type": self.type,
+        }
+
+
+class TypeaheadIndex:
+    """
+    Index de préfixes : mots distincts triés + postings par mot.
+
+    Les postings d'un mot sont aussi gardés triés par rang statique (calculés
+    à la demande, invalidés quand le mot change) : une requête d'un seul mot
+    fusionne ces listes par rang décroissant et s'arrête dès qu'aucune entrée
+    restante ne peut plus entrer dans le top, même avec tous les bonus.
+    """
+
+    def __init__(self):
+        self.entries: Dict[Tuple[str, int], TypeaheadEntry] = {}
+        self._terms: List[str] = []
+        self._postings: Dict[str, Set[Tuple[str, int]]] = {}
+        self._ranked: Dict[str, List[Tuple[float, Tuple[str, int]]]] = {}
+        self._pending_terms: Set[str] = set()
+        self._results: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"queries": 0, "cache_hits": 0, "upserts": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def upsert(self, entries: Iterable[TypeaheadEntry]) -> int:
+        """Ajoute ou remplace des entrées ; retourne le nombre traité."""
+        count = 0
+        for entry in entries:
+            if not entry.terms:
+                continue
+            previous = self.entries.get(entry.key)
+            if previous is not None:
+                for term in previous.terms - entry.terms:
+                    self._unlink(term, entry.key)
+            self.entries[entry.key] = entry
+            for term in entry.terms:
+                self._invalidate_ranked(term)
+                postings = self._postings.get(term)
+                if postings is None:
+                    self._postings[term] = postings = set()
+                    self._pending_terms.add(term)
+                postings.add(entry.key)
+            count += 1
+        if count:
+            self.stats["upserts"] += count
+            self._results.clear()
+        return count
+
+    def remove(self, entity_type: str, ids: Iterable[int]) -> None:
+        """Retire des entrées de l'index."""
+        for entity_id in ids:
+            entry = self.entries.pop((entity_type, entity_id), None)
+            if entry is not None:
+                for term in entry.terms:
+                    self._unlink(term, entry.key)
+        self._results.clear()
+
+    def _unlink(self, term: str, key: Tuple[str, int]) -> None:
+        self._invalidate_ranked(term)
+        postings = self._postings.get(term)
+        if postings is not None:
+            postings.discard(key)
+            # Le mot reste dans la liste triée : il est ignoré tant qu'il
+            # n'a pas de postings et purgé à la prochaine fusion
+            if not postings:
+                del self._postings[term]
+
+    def _invalidate_ranked(self, term: str) -> None:
+        self._ranked.pop(term, None)
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            self._ranked.pop(SHORT_PREFIX_MARKER + term[:length], None)
+
+    def _merge_pending(self) -> None:
+        """Fusionne les nouveaux mots dans la liste triée (une fois par lot)."""
+        if not self._pending_terms:
+            return
+        live = {term for term in self._terms if term in self._postings}
+        self._terms = sorted(live | self._pending_terms)
+        self._pending_terms.clear()
+
+    def warm(self) -> None:
+        """Prépare les listes fusionnées des préfixes d'un caractère (après construction)."""
+        self._merge_pending()
+        for initial in sorted({term[0] for term in self._postings}):
+            self._ranked_streams(initial)
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def _prefix_terms(self, prefix: str) -> Iterator[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        # Premier mot qui ne commence plus par le préfixe
+        end = bisect.bisect_left(self._terms, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        for i in range(start, end):
+            term = self._terms[i]
+            if term in self._postings:
+                yield term
+
+    def _prefix_matches(self, prefix: str) -> Set[Tuple[str, int]]:
+        matches: Set[Tuple[str, int]] = set()
+        for term in self._prefix_terms(prefix):
+            matches |= self._postings[term]
+        return matches
+
+    def _ranked_postings(self, term: str) -> List[Tuple[float, Tuple[str, int]]]:
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = sorted((-self.entries[key].rank, key) for key in self._postings[term])
+            self._ranked[term] = ranked
+        return ranked
+
+    def _ranked_streams(self, prefix: str) -> List[List[Tuple[float, Tuple[str, int]]]]:
+        """Listes classées couvrant un préfixe ; une seule, pré-fusionnée, pour les préfixes courts."""
+        if len(prefix) > SHORT_PREFIX_LENGTH:
+            return [self._ranked_postings(term) for term in self._prefix_terms(prefix)]
+        cache_key = SHORT_PREFIX_MARKER + prefix
+        merged = self._ranked.get(cache_key)
+        if merged is None:
+            merged = sorted({
+                item
+                for term in self._prefix_terms(prefix)
+                for item in self._ranked_postings(term)
+            })
+            self._ranked[cache_key] = merged
+        return [merged]
+
+    def search(self, query: str, limit: int = 10,
+               types: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Suggestions classées pour une saisie partielle.
+
+        Args:
+            query: Saisie de l'utilisateur (le dernier mot peut être incomplet)
+            limit: Nombre maximum de suggestions
+            types: Types d'entités retenus (tous par défaut)
+
+        Returns:
+            Liste de dicts {id, title, artist, album, type}
+        """
+        self.stats["queries"] += 1
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        types = tuple(sorted(set(types))) if types else ENTITY_TYPES
+        cache_key = (" ".join(tokens), types, limit)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            self._results.move_to_end(cache_key)
+            return cached
+
+        self._merge_pending()
+        query_norm = " ".join(tokens)
+        if len(set(tokens)) == 1:
+            best = self._top_single(tokens, query_norm, limit, types)
+        else:
+            candidate_sets = sorted((self._prefix_matches(token) for token in set(tokens)), key=len)
+            candidates = candidate_sets[0]
+            for other in candidate_sets[1:]:
+                if not candidates:
+                    break
+                candidates = candidates & other
+            best = heapq.nlargest(limit, (
+                (self._score(self.entries[key], query_norm, tokens), key)
+                for key in candidates
+                if key[0] in types
+            ))
+        results = [self.entries[key].to_dict() for _, key in best]
+
+        self._results[cache_key] = results
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return results
+
+    def _top_single(self, tokens: List[str], query_norm: str, limit: int,
+                    types: Sequence[str]) -> List[Tuple[float, Tuple[str, int]]]:
+        """Top d'une requête d'un mot, par fusion bornée des postings classés."""
+        streams = self._ranked_streams(tokens[0])
+        best: List[Tuple[float, Tuple[str, int]]] = []
+        seen: Set[Tuple[str, int]] = set()
+        for neg_rank, key in heapq.merge(*streams):
+            if len(best) == limit and MAX_BOOST - neg_rank <= best[0][0]:
+                break
+            if key in seen or key[0] not in types:
+                continue
+            seen.add(key)
+            scored = (self._score(self.entries[key], query_norm, tokens), key)
+            if len(best) < limit:
+                heapq.heappush(best, scored)
+            elif scored > best[0]:
+                heapq.heapreplace(best, scored)
+        return sorted(best, reverse=True)
+
+    @staticmethod
+    def _score(entry: TypeaheadEntry, query_norm: str, tokens: List[str]) -> float:
+        score = entry.rank
+        if entry.norm.startswith(query_norm):
+            score += NAME_PREFIX_BOOST
+            if entry.norm == query_norm:
+                score += WHOLE_WORD_BOOST
+        elif len(tokens) > 1 and all(token in entry.terms for token in tokens[:-1]):
+            score += WHOLE_WORD_BOOST
+        return score
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts = {entity_type: 0 for entity_type in ENTITY_TYPES}
+        for entity_type, _ in self.entries:
+            counts[entity_type] += 1
+        return {**self.stats, "entries": counts, "terms": len(self._postings)}
+
+
+def artist_popularity(listeners: Optional[int], track_count: Optional[int]) -> float:
+    return math.log1p(listeners or 0) * 0.25 + math.log1p(track_count or 0)
+
+
+class TypeaheadService(RefreshingIndexService):
+    """Index de typeahead du processus, alimenté depuis PostgreSQL."""
+
+    index_class = TypeaheadIndex
+    refresh_seconds = TYPEAHEAD_REFRESH_SECONDS
+    rebuild_seconds = TYPEAHEAD_REBUILD_SECONDS
+    log_tag = "TYPEAHEAD"
+
+    async def search(self, db: AsyncSession, query: str, limit: int = 10,
+                     types: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Suggestions classées ; construit ou rafraîchit l'index si nécessaire."""
+        await self.ensure_fresh(db.execute)
+        return self.index.search(query, limit, types)
+
+    async def _fetch_watermark(self, execute: Execute):
+        result = await execute(text(
+            "SELECT GREATEST("
+            "(SELECT MAX(date_modified) FROM artists), "
+            "(SELECT MAX(date_modified) FROM albums), "
+            "(SELECT MAX(date_modified) FROM tracks))"
+        ))
+        return result.scalar()
+
+    async def _load(self, execute: Execute, index: TypeaheadIndex, since) -> int:
+        params = {"since": since} if since is not None else {}
+
+        def where(alias: str) -> str:
+            return f"WHERE {alias}.date_modified > :since" if since is not None else ""
+
+        rows = (await execute(text(ARTISTS_SQL.format(where=where("a"))), params)).fetchall()
+        count = index.upsert(
+            TypeaheadEntry("artist", row.id, row.name, artist=row.name,
+                           popularity=artist_popularity(row.lastfm_listeners, row.track_count))
+            for row in rows
+        )
+
+        rows = (await execute(text(ALBUMS_SQL.format(where=where("al"))), params)).fetchall()
+        count += index.upsert(
+            TypeaheadEntry("album", row.id, row.title, artist=row.artist, album=row.title,
+                           artist_id=row.album_artist_id,
+                           popularity=math.log1p(row.track_count or 0) * 0.5
+                           + self._artist_popularity(index, row.album_artist_id) * 0.5)
+            for row in rows
+        )
+
+        rows = (await execute(text(TRACKS_SQL.format(where=where("t"))), params)).fetchall()
+        count += index.upsert(
+            TypeaheadEntry("track", row.id, row.title, artist=row.artist, album=row.album,
+                           artist_id=row.track_artist_id,
+                           popularity=self._artist_popularity(index, row.track_artist_id) * 0.5)
+            for row in rows
+        )
+        if since is None:
+            index.warm()
+        return count
+
+    @staticmethod
+    def _artist_popularity(index: TypeaheadIndex, artist_id: Optional[int]) -> float:
+        artist = index.entries.get(("artist", artist_id))
+        return artist.popularity if artist is not None else 0.0
+
+    # ------------------------------------------------------------------
+    # Callbacks d'insertion (sans effet tant que l'index n'est pas construit)
+    # ------------------------------------------------------------------
+
+    def on_artists_upserted(self, artists: Iterable[Dict[str, Any]]) -> None:
+        """Indexe les artistes retournés par upsert_artists_batch."""
+        if not self.loaded:
+            return
+        entries = [
+            TypeaheadEntry("artist", artist["id"], artist["name"], artist=artist["name"],
+                           popularity=self._artist_popularity(self.index, artist["id"]))
+            for artist in artists
+        ]
+        self._apply(lambda index: index.upsert(entries))
+
+    def on_albums_upserted(self, albums: Iterable[Dict[str, Any]]) -> None:
+        """Indexe les albums retournés par upsert_albums_batch."""
+        if not self.loaded:
+            return
+        entries = []
+        for album in albums:
+            artist = self.index.entries.get(("artist", album.get("album_artist_id")))
+            previous = self.index.entries.get(("album", album["id"]))
+            entries.append(TypeaheadEntry(
+                "album", album["id"], album["title"],
+                artist=artist.label if artist is not None else "", album=album["title"],
+                artist_id=album.get("album_artist_id"),
+                popularity=previous.popularity if previous is not None
+                else self._artist_popularity(self.index, album.get("album_artist_id")) * 0.5,
+            ))
+        self._apply(lambda index: index.upsert(entries))
+
+    def on_tracks_upserted(self, tracks: Iterable[Any]) -> None:
+        """Indexe les pistes (modèles Track) créées ou mises à jour."""
+        if not self.loaded:
+            return
+        entries = []
+        for track in tracks:
+            artist = self.index.entries.get(("artist", track.track_artist_id))
+            album = self.index.entries.get(("album", track.album_id))
+            entries.append(TypeaheadEntry(
+                "track", track.id, track.title,
+                artist=artist.label if artist is not None else "",
+                album=album.label if album is not None else "",
+                artist_id=track.track_artist_id,
+                popularity=artist.popularity * 0.5 if artist is not None else 0.0,
+            ))
+        self._apply(lambda index: index.upsert(entries))
+
+    def on_deleted(self, entity_type: str, ids: Iterable[int]) -> None:
+        """Retire des entités supprimées par ce processus."""
+        ids = list(ids)
+        if ids:
+            self._apply(lambda index: index.remove(entity_type, ids))
+
+
+# Instance globale du service
+typeahead_service = TypeaheadService()
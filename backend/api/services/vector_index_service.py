@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Service de gestion des index ANN (HNSW) de la table track_embeddings.
+
+Rôle:
+    Chaque type d'embedding dispose de son propre index HNSW partiel
+    (WHERE embedding_type = '<type>') : une recherche filtrée sur un type
+    parcourt uniquement le graphe de ce type au lieu de filtrer a posteriori
+    les candidats d'un index global. Le service crée et reconstruit ces index
+    sans bloquer les écritures (CONCURRENTLY) et applique le paramètre de
+    recherche hnsw.ef_search (compromis rappel / latence) par requête.
+
+Configuration (variables d'environnement):
+    - VECTOR_HNSW_M: connexions par nœud du graphe (défaut 16)
+    - VECTOR_HNSW_EF_CONSTRUCTION: taille de la liste de construction (défaut 64)
+    - VECTOR_HNSW_EF_SEARCH: taille de la liste de recherche (défaut 40)
+
+Dépendances:
+    - backend.api.models.track_embeddings_model: TrackEmbeddings
+    - pgvector >= 0.5 (HNSW)
+
+Auteur: SoniqueBay Team
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.models.track_embeddings_model import (
+    HNSW_DEFAULT_EF_CONSTRUCTION,
+    HNSW_DEFAULT_M,
+    TrackEmbeddings,
+    hnsw_index_name,
+)
+from backend.api.utils.logging import logger
+
+HNSW_M = int(os.getenv("VECTOR_HNSW_M", HNSW_DEFAULT_M))
+HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", HNSW_DEFAULT_EF_CONSTRUCTION))
+HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", 40))
+
+# Les types d'embeddings sont interpolés dans le DDL (nom et prédicat d'index)
+_EMBEDDING_TYPE_RE = re.compile(r"^[a-z0-9_]{1,48}$")
+
+
+def validate_embedding_type(embedding_type: str) -> str:
+    """
+    Vérifie qu'un type d'embedding peut être utilisé dans un nom d'index.
+
+    Raises:
+        ValueError: Si le type contient d'autres caractères que [a-z0-9_]
+    """
+    if not _EMBEDDING_TYPE_RE.match(embedding_type or ""):
+        raise ValueError(f"Type d'embedding invalide pour un index: {embedding_type!r}")
+    return embedding_type
+
+
+def build_hnsw_index_sql(
+    embedding_type: str,
+    index_name: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+) -> str:
+    """Construit le DDL CREATE INDEX CONCURRENTLY d'un index HNSW partiel."""
+    embedding_type = validate_embedding_type(embedding_type)
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name or hnsw_index_name(embedding_type)} "
+        f"ON track_embeddings USING hnsw (vector vector_l2_ops) "
+        f"WITH (m = {int(m or HNSW_M)}, ef_construction = {int(ef_construction or HNSW_EF_CONSTRUCTION)}) "
+        f"WHERE embedding_type = '{embedding_type}'"
+    )
+
+
+async def apply_ef_search(session: AsyncSession, ef_search: Optional[int] = None) -> int:
+    """
+    Fixe hnsw.ef_search pour la transaction courante uniquement.
+
+    Args:
+        session: Session dans laquelle la recherche sera exécutée
+        ef_search: Taille de la liste de candidats (VECTOR_HNSW_EF_SEARCH par défaut)
+
+    Returns:
+        Valeur appliquée
+    """
+    value = int(ef_search or HNSW_EF_SEARCH)
+    await session.execute(
+        text("SELECT set_config('hnsw.ef_search', :value, true)"),
+        {"value": str(value)},
+    )
+    return value
+
+
+class VectorIndexService:
+    """Création, reconstruction et inspection des index HNSW partiels de track_embeddings."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _run_ddl(self, statements: Iterable[str]) -> None:
+        """
+        Exécute du DDL en autocommit.
+
+        CREATE/DROP INDEX CONCURRENTLY ne peuvent pas s'exécuter dans une
+        transaction : une connexion dédiée est ouverte sur le moteur de la session.
+        """
+        async with self.session.bind.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            for statement in statements:
+                logger.debug(f"[VECTOR_INDEX] {statement}")
+                await connection.execute(text(statement))
+
+    async def _run_in_transaction(self, statements: Iterable[str]) -> None:
+        """Exécute du DDL dans une seule transaction (renommages atomiques)."""
+        async with self.session.bind.begin() as connection:
+            for statement in statements:
+                logger.debug(f"[VECTOR_INDEX] {statement}")
+                await connection.execute(text(statement))
+
+    async def get_embedding_types(self) -> List[str]:
+        """Retourne les types d'embeddings présents dans la table."""
+        result = await self.session.execute(
+            select(TrackEmbeddings.embedding_type).distinct()
+        )
+        return [row[0] for row in result.all()]
+
+    async def list_indexes(self) -> List[Dict[str, Any]]:
+        """
+        Liste les index HNSW de track_embeddings avec leurs paramètres et leur taille.
+
+        Returns:
+            Liste de dicts {name, definition, options, size_bytes, valid}
+        """
+        result = await self.session.execute(
+            text(
+                """
+                SELECT c.relname AS name,
+                       pg_get_indexdef(c.oid) AS definition,
+                       c.reloptions AS options,
+                       pg_relation_size(c.oid) AS size_bytes,
+                       i.indisvalid AS valid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE i.indrelid = 'track_embeddings'::regclass
+                  AND am.amname = 'hnsw'
+                ORDER BY c.relname
+                """
+            )
+        )
+        return [dict(row._mapping) for row in result.all()]
+
+    async def ensure_indexes(
+        self,
+        embedding_types: Optional[List[str]] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Crée les index HNSW partiels manquants.
+
+        Args:
+            embedding_types: Types à indexer (par défaut ceux présents en base)
+            m: Paramètre m de HNSW
+            ef_construction: Paramètre ef_construction de HNSW
+
+        Returns:
+            Noms des index garantis
+        """
+        embedding_types = embedding_types or await self.get_embedding_types()
+        statements = [
+            build_hnsw_index_sql(embedding_type, m=m, ef_construction=ef_construction)
+            for embedding_type in embedding_types
+        ]
+        await self._run_ddl(statements)
+        names = [hnsw_index_name(embedding_type) for embedding_type in embedding_types]
+        logger.info(f"[VECTOR_INDEX] Index HNSW garantis: {names}")
+        return names
+
+    async def rebuild_index(
+        self,
+        embedding_type: str,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Reconstruit l'index HNSW d'un type d'embedding sans interrompre les recherches.
+
+        Le nouvel index est construit à côté de l'ancien (CONCURRENTLY) sous un
+        nom temporaire, puis les deux sont permutés par renommage dans une même
+        transaction : l'ancien index n'est supprimé qu'après la permutation, les
+        requêtes restent donc servies par un index valide à tout instant.
+
+        Returns:
+            Résumé de la reconstruction
+        """
+        embedding_type = validate_embedding_type(embedding_type)
+        name = hnsw_index_name(embedding_type)
+        staging_name = f"{name}_rebuild"
+        retired_name = f"{name}_old"
+        m = int(m or HNSW_M)
+        ef_construction = int(ef_construction or HNSW_EF_CONSTRUCTION)
+
+        await self._run_ddl(
+            [
+                # Restes d'une reconstruction interrompue (index invalide ou non supprimé)
+                f"DROP INDEX CONCURRENTLY IF EXISTS {staging_name}",
+                f"DROP INDEX CONCURRENTLY IF EXISTS {retired_name}",
+                build_hnsw_index_sql(embedding_type, staging_name, m, ef_construction),
+            ]
+        )
+        await self._run_in_transaction(
+            [
+                f"ALTER INDEX IF EXISTS {name} RENAME TO {retired_name}",
+                f"ALTER INDEX {staging_name} RENAME TO {name}",
+            ]
+        )
+        await self._run_ddl([f"DROP INDEX CONCURRENTLY IF EXISTS {retired_name}"])
+        logger.info(
+            f"[VECTOR_INDEX] Index {name} reconstruit (m={m}, ef_construction={ef_construction})"
+        )
+        return {
+            "index": name,
+            "embedding_type": embedding_type,
+            "m": m,
+            "ef_construction": ef_construction,
+        }
+
+    async def rebuild_indexes(
+        self,
+        embedding_types: Optional[List[str]] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Reconstruit les index HNSW de plusieurs types (par défaut ceux présents en base)."""
+        embedding_types = embedding_types or await self.get_embedding_types()
+        return [
+            await self.rebuild_index(embedding_type, m=m, ef_construction=ef_construction)
+            for embedding_type in embedding_types
+        ]
@@ -125,7 +125,11 @@ class VectorSearchService:
             return False
 
     async def find_similar_tracks(
-        self, query_embedding: List[float], limit: int = 10
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        embedding_type: str = "semantic",
+        ef_search: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find tracks similar to the query embedding using vector search.
@@ -134,33 +138,55 @@ class VectorSearchService:
         Args:
             query_embedding: Query vector
             limit: Maximum number of results
+            embedding_type: Type of embedding to search
+            ef_search: HNSW candidate list size (recall/latency trade-off)
 
         Returns:
             List of similar tracks with distances
         """
         # Try using TrackEmbeddings first
-        results = await self._find_similar_tracks_new(query_embedding, limit)
+        results = await self._find_similar_tracks_new(
+            query_embedding, limit, embedding_type=embedding_type, ef_search=ef_search
+        )
         if results:
             return results
 
         # Fall back to legacy Track.vector
-        return self._find_similar_tracks_legacy(query_embedding, limit)
+        return await self._find_similar_tracks_legacy(query_embedding, limit)
 
     async def _find_similar_tracks_new(
-        self, query_embedding: List[float], limit: int = 10
+        self,
+        query_embedding: List[float],
+        limit: int = 10,
+        embedding_type: str = "semantic",
+        ef_search: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Find similar tracks using TrackEmbeddings table."""
+        """
+        Find similar tracks using TrackEmbeddings table.
+
+        The embedding type is inlined as a literal so the planner picks the
+        partial HNSW index of that type, and hnsw.ef_search is set for the
+        current transaction only.
+        """
         try:
             from sqlalchemy import text
 
+            from backend.api.services.vector_index_service import (
+                apply_ef_search,
+                validate_embedding_type,
+            )
+
+            embedding_type = validate_embedding_type(embedding_type)
+            await apply_ef_search(self.db, ef_search)
+
             # Use pgvector L2 distance
             query = text(
-                """
+                f"""
                 SELECT
                     te.track_id,
                     te.vector <-> :embedding as distance
                 FROM track_embeddings te
-                WHERE te.embedding_type = 'semantic'
+                WHERE te.embedding_type = '{embedding_type}'
                 ORDER BY distance
                 LIMIT :limit
             """
@@ -236,6 +262,7 @@ class VectorSearchService:
         query_embedding: List[float],
         embedding_type: str = "semantic",
         limit: int = 10,
+        ef_search: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find tracks similar to the query embedding using TrackEmbeddingsService.
@@ -244,6 +271,7 @@ class VectorSearchService:
             query_embedding: Query vector
             embedding_type: Type of embedding to search
             limit: Maximum number of results
+            ef_search: HNSW candidate list size (recall/latency trade-off)
 
         Returns:
             List of similar tracks with distances
@@ -259,7 +287,10 @@ class VectorSearchService:
 
             service = TrackEmbeddingsService(self.db)
             results = await service.find_similar(
-                query_vector=query_embedding, embedding_type=embedding_type, limit=limit
+                query_vector=query_embedding,
+                embedding_type=embedding_type,
+                limit=limit,
+                ef_search=ef_search,
             )
 
             return [
@@ -625,14 +656,22 @@ class VectorSearchService:
             }
 
     async def batch_add_track_embeddings_async(
-        self, embeddings_data: List[Dict[str, Any]], embedding_type: str = "semantic"
+        self,
+        embeddings_data: List[Dict[str, Any]],
+        embedding_type: str = "semantic",
+        embedding_source: Optional[str] = None,
+        embedding_model: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Add multiple track embeddings using TrackEmbeddingsService.
 
+        The whole batch is written with a single INSERT ... ON CONFLICT.
+
         Args:
             embeddings_data: List of dicts with 'track_id' and 'embedding'
             embedding_type: Type of embedding
+            embedding_source: Vectorization source
+            embedding_model: Model used
 
         Returns:
             Batch operation results
@@ -644,31 +683,21 @@ class VectorSearchService:
 
         service = TrackEmbeddingsService(self.db)
 
-        successful = 0
-        failed = 0
-
-        for data in embeddings_data:
-            try:
-                track_id = data["track_id"]
-                embedding = data["embedding"]
-
-                await service.create_or_update(
-                    track_id=track_id, vector=embedding, embedding_type=embedding_type
-                )
-                successful += 1
-
-            except Exception as e:
-                logger.warning(
-                    f"Failed to add embedding for track {data.get('track_id', 'unknown')}: {e}"
-                )
-                failed += 1
-
-        logger.info(f"Batch added {successful} track embeddings, {failed} failed")
-        return {
-            "successful": successful,
-            "failed": failed,
-            "total": len(embeddings_data),
-        }
+        try:
+            return await service.bulk_upsert(
+                embeddings_data,
+                embedding_type=embedding_type,
+                embedding_source=embedding_source,
+                embedding_model=embedding_model,
+            )
+        except Exception as e:
+            logger.error(f"Error in batch track embedding addition: {e}")
+            return {
+                "successful": 0,
+                "failed": len(embeddings_data),
+                "total": len(embeddings_data),
+                "error": str(e),
+            }
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Roue de Camelot : codes numériques et tonalités compatibles pour le mix.
+
+Une clé Camelot ("8B", "12A") est codée en entier 0..23 :
+(numéro - 1) * 2 + (0 pour A, 1 pour B). Les clés absentes ou invalides
+(None, "Unknown") valent -1.
+"""
+
+import re
+from typing import List, Optional
+
+_CAMELOT_RE = re.compile(r"^\s*(1[0-2]|[1-9])\s*([AaBb])\s*$")
+
+NO_KEY = -1
+
+
+def camelot_code(camelot_key: Optional[str]) -> int:
+    """Clé Camelot -> code 0..23 (NO_KEY si absente ou invalide)."""
+    match = _CAMELOT_RE.match(camelot_key or "")
+    if not match:
+        return NO_KEY
+    return (int(match.group(1)) - 1) * 2 + (match.group(2).upper() == "B")
+
+
+def camelot_key(code: int) -> Optional[str]:
+    """Code 0..23 -> clé Camelot (None pour NO_KEY)."""
+    if code < 0:
+        return None
+    return f"{code // 2 + 1}{'B' if code % 2 else 'A'}"
+
+
+def compatible_codes(code: int) -> List[int]:
+    """
+    Codes harmoniquement compatibles : même clé, ±1 sur la roue (même
+    lettre) et relative (même numéro, autre lettre). Sans doublon, même
+    aux bords de la roue (12 -> 1).
+    """
+    if code < 0:
+        return []
+    number, letter = divmod(code, 2)
+    codes = [
+        code,
+        ((number + 1) % 12) * 2 + letter,
+        ((number - 1) % 12) * 2 + letter,
+        number * 2 + (1 - letter),
+    ]
+    return list(dict.fromkeys(codes))
+
+
+def compatible_keys(camelot: Optional[str]) -> List[str]:
+    """Clés Camelot compatibles avec une clé (vide si clé invalide)."""
+    return [camelot_key(code) for code in compatible_codes(camelot_code(camelot))]
@@ -0,0 +1,343 @@
+"""
+Pool de transcodage d'images hors de la boucle asyncio.
+
+Le décodage, le redimensionnement et l'encodage Pillow sont CPU-bound : exécutés
+dans une coroutine, ils bloquent la boucle d'événements (API comme worker
+TaskIQ). Ce module les délègue à un pool de processus :
+
+- file d'attente bornée (IMAGE_TRANSCODE_MAX_PENDING) : au-delà, l'appelant
+  attend au plus IMAGE_TRANSCODE_QUEUE_TIMEOUT secondes puis reçoit
+  TranscodeQueueFull au lieu d'empiler du travail sans limite ;
+- un seul décodage par image source, toutes les tailles demandées sont
+  produites à partir de la même image décodée ;
+- métriques : profondeur de file, attente et durée de traitement.
+
+Les fonctions exécutées dans le pool sont définies au niveau module pour être
+sérialisables (pickle) vers les processus fils.
+
+Auteur : SoniqueBay Team
+Dépendances : Pillow
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageFilter, ImageOps
+
+from backend.api.utils.logging import logger
+
+IMAGE_TRANSCODE_WORKERS = int(os.getenv("IMAGE_TRANSCODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+IMAGE_TRANSCODE_MAX_PENDING = int(os.getenv("IMAGE_TRANSCODE_MAX_PENDING", "64"))
+IMAGE_TRANSCODE_QUEUE_TIMEOUT = float(os.getenv("IMAGE_TRANSCODE_QUEUE_TIMEOUT", "10"))
+IMAGE_TRANSCODE_START_METHOD = os.getenv(
+    "IMAGE_TRANSCODE_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+
+class TranscodeQueueFull(Exception):
+    """La file du pool est pleine et aucune place ne s'est libérée à temps."""
+
+
+# ============================================================================
+# FONCTIONS EXÉCUTÉES DANS LES PROCESSUS DU POOL
+# ============================================================================
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Aplatit la transparence sur fond blanc (JPEG/WebP opaque)."""
+    if img.mode in ("RGBA", "LA", "P"):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    return img.convert("RGB")
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    out = BytesIO()
+    fmt = fmt.upper()
+    if fmt == "WEBP":
+        img.save(out, "WEBP", quality=quality, method=6)
+    elif fmt == "JPEG":
+        img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(out, fmt, optimize=True)
+    return out.getvalue()
+
+
+def render_variants(
+    binary: bytes,
+    sizes: Iterable[int],
+    fmt: str = "WEBP",
+    quality: int = 80,
+) -> Tuple[Tuple[int, int], Dict[int, bytes]]:
+    """
+    Décode l'image une fois et produit une variante par taille.
+
+    Args:
+        binary: Octets de l'image source (tout format lisible par Pillow)
+        sizes: Côtés maximum des variantes, en pixels
+        fmt: Format de sortie (WEBP, JPEG, PNG)
+        quality: Qualité de compression
+
+    Returns:
+        ((largeur, hauteur) de la source, {taille: octets encodés})
+    """
+    with Image.open(BytesIO(binary)) as source:
+        dimensions = source.size
+        img = _to_rgb(source) if fmt.upper() in ("WEBP", "JPEG") else source.copy()
+
+    variants = {}
+    # Du plus grand au plus petit : chaque réduction repart de la précédente
+    for size in sorted(set(sizes), reverse=True):
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        variants[size] = _encode(img, fmt, quality)
+    return dimensions, variants
+
+
+def transcode_image(
+    binary: bytes,
+    max_size: Optional[Tuple[int, int]] = None,
+    fmt: str = "JPEG",
+    quality: int = 85,
+    apply_filters: bool = False,
+) -> Dict[str, Any]:
+    """
+    Redimensionne et ré-encode une image en une passe.
+
+    Args:
+        binary: Octets de l'image source
+        max_size: Boîte (largeur, hauteur) maximale, None pour garder la taille
+        fmt: Format de sortie
+        quality: Qualité de compression
+        apply_filters: Autocontraste et léger lissage
+
+    Returns:
+        Octets encodés et métadonnées de la source et du résultat
+    """
+    with Image.open(BytesIO(binary)) as source:
+        exif = source.getexif() if hasattr(source, "getexif") else None
+        metadata = {
+            "original_dimensions": source.size,
+            "original_mode": source.mode,
+            "original_format": source.format,
+            "original_bands": len(source.getbands()),
+            "exif_keys": list(exif.keys()) if exif else [],
+        }
+        img = _to_rgb(source) if fmt.upper() in ("WEBP", "JPEG") else source.copy()
+
+    if max_size:
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    if apply_filters:
+        img = ImageOps.autocontrast(img).filter(ImageFilter.SMOOTH_MORE)
+
+    metadata.update(
+        {
+            "processed_dimensions": img.size,
+            "processed_mode": img.mode,
+            "processed_bands": len(img.getbands()),
+        }
+    )
+    return {"data": _encode(img, fmt, quality), "metadata": metadata}
+
+
+def compose_sprite(
+    paths: List[Optional[str]],
+    cell: int,
+    columns: int,
+    quality: int = 80,
+) -> bytes:
+    """
+    Assemble des vignettes en une planche WebP (grille de cellules carrées).
+
+    La cellule i est en (i % columns, i // columns) ; un chemin None laisse sa
+    cellule transparente. Chaque vignette est centrée dans sa cellule.
+
+    Args:
+        paths: Fichiers image, dans l'ordre des cellules
+        cell: Côté d'une cellule, en pixels
+        columns: Nombre de cellules par ligne
+        quality: Qualité WebP
+
+    Returns:
+        Octets WebP de la planche
+    """
+    columns = max(1, min(columns, len(paths) or 1))
+    rows = max(1, -(-len(paths) // columns))
+    sprite = Image.new("RGBA", (columns * cell, rows * cell), (0, 0, 0, 0))
+    for index, path in enumerate(paths):
+        if not path:
+            continue
+        with Image.open(path) as thumb:
+            thumb = thumb.convert("RGBA")
+            thumb.thumbnail((cell, cell), Image.Resampling.LANCZOS)
+            x = (index % columns) * cell + (cell - thumb.width) // 2
+            y = (index // columns) * cell + (cell - thumb.height) // 2
+            sprite.paste(thumb, (x, y))
+    return _encode(sprite, "WEBP", quality)
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+
+class _LatencyStats:
+    """Moyenne et maximum d'une latence, en millisecondes."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max, 2),
+        }
+
+
+class ImageTranscodePool:
+    """
+    Pool de processus borné pour le travail Pillow.
+
+    Le pool est créé à la première soumission et recréé si un processus fils
+    meurt (BrokenProcessPool).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = IMAGE_TRANSCODE_WORKERS,
+        max_pending: int = IMAGE_TRANSCODE_MAX_PENDING,
+        queue_timeout: float = IMAGE_TRANSCODE_QUEUE_TIMEOUT,
+        executor_factory: Optional[Callable[[int], Executor]] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.queue_timeout = queue_timeout
+        self._executor_factory = executor_factory or self._default_executor
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.wait_latency = _LatencyStats()
+        self.run_latency = _LatencyStats()
+
+    @staticmethod
+    def _default_executor(max_workers: int) -> Executor:
+        context = multiprocessing.get_context(IMAGE_TRANSCODE_START_METHOD)
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory(self.max_workers)
+            logger.info(
+                f"[IMAGE TRANSCODE] Pool démarré ({self.max_workers} processus, file max {self.max_pending})"
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Exécute fn(*args) dans le pool.
+
+        Args:
+            fn: Fonction de niveau module (sérialisable)
+            *args: Arguments sérialisables
+
+        Raises:
+            TranscodeQueueFull: La file est restée pleine au-delà de queue_timeout
+        """
+        slots = self._get_slots()
+        enqueued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning(
+                f"[IMAGE TRANSCODE] File pleine ({self.pending}/{self.max_pending}), tâche rejetée"
+            )
+            raise TranscodeQueueFull(f"File de transcodage pleine ({self.max_pending} tâches)")
+
+        self.submitted += 1
+        self.pending += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), _timed_call, fn, args)
+            run_seconds, result = await future
+            self.wait_latency.record(max(0.0, time.perf_counter() - enqueued_at - run_seconds))
+            self.run_latency.record(run_seconds)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            self.failed += 1
+            logger.error("[IMAGE TRANSCODE] Processus du pool interrompu, recréation du pool")
+            self._reset_executor()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            slots.release()
+
+    def _reset_executor(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Compteurs, profondeur de file et latences (attente / traitement)."""
+        return {
+            "workers": self.max_workers,
+            "started": self._executor is not None,
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending_seen,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_latency": self.wait_latency.snapshot(),
+            "run_latency": self.run_latency.snapshot(),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête les processus du pool (recréé à la prochaine soumission)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("[IMAGE TRANSCODE] Pool arrêté")
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[float, Any]:
+    """Exécute fn dans le processus fils et mesure la durée de traitement."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+image_transcode_pool = ImageTranscodePool()
@@ -66,9 +66,10 @@ class LockedSession:
         """Add sans verrou (opération synchrone)."""
         self._session.add(instance)
 
-    def delete(self, instance: Any):
-        """Delete sans verrou (opération synchrone)."""
-        self._session.delete(instance)
+    async def delete(self, instance: Any):
+        """Delete avec verrou (AsyncSession.delete est une coroutine)."""
+        async with self._lock:
+            await self._session.delete(instance)
 
     @property
     def session(self) -> AsyncSession:
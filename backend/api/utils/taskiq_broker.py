@@ -38,8 +38,8 @@ class TaskIQBrokerCompatibility:
         
         # Import the task dynamically to avoid circular imports
         if name.startswith("scan."):
-            from backend.tasks.scan import discovery_task
-            task_func = discovery_task
+            from backend.workers.scan import start_scan_task
+            task_func = start_scan_task
         elif name.startswith("covers."):
             from backend.tasks.covers import (
                 process_artist_images,
@@ -1,4 +1,4 @@
-from backend.utils.logging import logger
+from backend.api.utils.logging import logger
 import librosa
 import httpx
 import os
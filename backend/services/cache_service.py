@@ -1,16 +1,29 @@
 """
 Cache Service - Service de cache et circuit breaker pour optimiser les appels API externes.
 
-Ce service fournit un cache TTL et un circuit breaker pour éviter les appels répétés
-aux APIs externes et gérer les pannes.
+Ce service fournit un cache à deux niveaux (LRU en mémoire devant Redis) et un
+circuit breaker pour éviter les appels répétés aux APIs externes et gérer les
+pannes. Le niveau Redis est partagé entre workers et survit à leur redémarrage.
 """
 
+import asyncio
+import contextlib
+import os
 import time
-from typing import Any, Callable, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
 
-from cachetools import TTLCache
+import msgpack
+import redis.asyncio as redis
+from cachetools import TLRUCache
 
-from backend.utils.logging import logger
+from backend.api.utils.logging import logger
+
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+CACHE_KEY_PREFIX = "cache:v1"
+# Durée de vie par défaut d'un résultat vide (cache négatif)
+NEGATIVE_TTL_SECONDS = 300
+# Après une erreur Redis, le niveau partagé est ignoré pendant ce délai
+REDIS_RETRY_AFTER_SECONDS = 10.0
 
 
 class CircuitBreaker:
@@ -95,47 +108,139 @@ class CircuitBreaker:
             raise e
 
 
+class CacheNamespace:
+    """Configuration d'un cache nommé (bornes, TTL, partage Redis)."""
+
+    def __init__(self, name: str, maxsize: int, ttl: int,
+                 negative_ttl: int = NEGATIVE_TTL_SECONDS, shared: bool = True):
+        """
+        Args:
+            name: Nom du cache (préfixe des clés Redis)
+            maxsize: Nombre maximum d'entrées du niveau local
+            ttl: Durée de vie d'une entrée (secondes, les deux niveaux)
+            negative_ttl: Durée de vie d'un résultat vide (None)
+            shared: Partager le cache via Redis (les valeurs doivent être
+                sérialisables en msgpack)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.shared = shared
+        self.stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "l2_errors": 0,
+        }
+
+    def entry_ttl(self, value: Any) -> int:
+        return self.negative_ttl if value is None else self.ttl
+
+    def snapshot(self, size: int) -> Dict[str, Any]:
+        lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+        l2_lookups = self.stats["l2_hits"] + self.stats["misses"]
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "shared": self.shared,
+            **self.stats,
+            "l1_hit_ratio": round(self.stats["l1_hits"] / lookups, 3) if lookups else None,
+            "l2_hit_ratio": round(self.stats["l2_hits"] / l2_lookups, 3) if l2_lookups else None,
+            "hit_ratio": round((lookups - self.stats["misses"]) / lookups, 3) if lookups else None,
+        }
+
+
+DEFAULT_NAMESPACES = (
+    # Métadonnées Last.fm
+    CacheNamespace("lastfm", maxsize=1000, ttl=3600),
+    # Images d'artistes et covers d'albums
+    CacheNamespace("artist_images", maxsize=500, ttl=86400),
+    CacheNamespace("album_covers", maxsize=1000, ttl=86400),
+    # Analyses audio
+    CacheNamespace("audio_analysis", maxsize=2000, ttl=604800),
+    # Recherches d'artistes : les réponses HTTP ne sont pas sérialisables
+    CacheNamespace("artist_search", maxsize=1000, ttl=3600, shared=False),
+    # Résolution nom → ID des artistes et albums pendant l'insertion. Les
+    # suppressions invalident Redis (forget_artist/forget_album) ; le TTL court
+    # borne la durée de vie d'un ID supprimé dans le niveau local des workers.
+    CacheNamespace("artist_ids", maxsize=20000, ttl=600),
+    CacheNamespace("album_ids", maxsize=20000, ttl=600),
+)
+
+
+def artist_id_cache_key(name: str) -> str:
+    """Clé du cache artist_ids pour un nom d'artiste."""
+    return f"artist:{name.lower()}"
+
+
+def album_id_cache_key(title: str, album_artist_id: Any) -> str:
+    """Clé du cache album_ids pour un titre d'album et son artiste."""
+    return f"album:{title.lower()}:{album_artist_id}"
+
+
 class CacheService:
     """
-    Service de cache avec TTL et circuit breaker intégré.
+    Cache à deux niveaux avec circuit breaker intégré.
+
+    - niveau 1 : LRU en mémoire du processus (TLRUCache, expiration par entrée) ;
+    - niveau 2 : Redis partagé entre workers, valeurs en msgpack, qui survit
+      aux redémarrages.
 
-    Optimise les appels aux APIs externes en cachant les résultats
-    et protège contre les pannes avec un circuit breaker.
+    Chaque cache nommé a son préfixe Redis, ses bornes, son TTL et un TTL
+    distinct pour les résultats vides (cache négatif). Les méthodes
+    synchrones get/set/invalidate n'utilisent que le niveau local ; les
+    variantes asynchrones (aget, aset, aget_many, aset_many, ainvalidate)
+    passent par les deux niveaux.
     """
 
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(self, default_ttl: int = 3600, redis_url: Optional[str] = CACHE_REDIS_URL,
+                 namespaces: Iterable[CacheNamespace] = DEFAULT_NAMESPACES):
         """
         Initialise le service de cache.
 
         Args:
             default_ttl: TTL par défaut en secondes (1 heure)
+            redis_url: URL du niveau partagé (None pour le désactiver)
+            namespaces: Caches nommés
         """
         self.default_ttl = default_ttl
-        self.caches: Dict[str, TTLCache] = {}
+        self.redis_url = redis_url
+        self.namespaces: Dict[str, CacheNamespace] = {}
+        self.caches: Dict[str, TLRUCache] = {}
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._redis: Optional[redis.Redis] = None
+        self._redis_loop = None
+        self._redis_unavailable_until = 0.0
 
-        # Cache pour les métadonnées Last.fm
-        self.caches["lastfm"] = TTLCache(maxsize=1000, ttl=3600)  # 1h
-        self.circuit_breakers["lastfm"] = CircuitBreaker(failure_threshold=3, recovery_timeout=300)
-
-        # Cache pour les images d'artistes
-        self.caches["artist_images"] = TTLCache(maxsize=500, ttl=86400)  # 24h
+        for namespace in namespaces:
+            self.add_namespace(namespace)
 
-        # Cache pour les covers d'albums
-        self.caches["album_covers"] = TTLCache(maxsize=1000, ttl=86400)  # 24h
+        self.circuit_breakers["lastfm"] = CircuitBreaker(failure_threshold=3, recovery_timeout=300)
+        self.circuit_breakers["artist_search"] = CircuitBreaker(failure_threshold=5, recovery_timeout=60)
 
-        # Cache pour les analyses audio
-        self.caches["audio_analysis"] = TTLCache(maxsize=2000, ttl=604800)  # 1 semaine
+        logger.info(f"CacheService initialisé ({len(self.caches)} caches, Redis: {'oui' if redis_url else 'non'})")
 
-        # Cache pour les appels API de recherche d'artistes (pour éviter les appels répétés)
-        self.caches["artist_search"] = TTLCache(maxsize=1000, ttl=3600)  # 1h
-        self.circuit_breakers["artist_search"] = CircuitBreaker(failure_threshold=5, recovery_timeout=60)
+    def add_namespace(self, namespace: CacheNamespace) -> None:
+        """Déclare (ou remplace) un cache nommé."""
+        self.namespaces[namespace.name] = namespace
+        self.caches[namespace.name] = TLRUCache(
+            maxsize=namespace.maxsize,
+            ttu=lambda _key, value, now, ns=namespace: now + ns.entry_ttl(value),
+            timer=time.monotonic,
+        )
 
-        logger.info("CacheService initialisé avec caches TTL")
+    # ------------------------------------------------------------------
+    # Niveau local (synchrone)
+    # ------------------------------------------------------------------
 
     def get(self, cache_name: str, key: str) -> Optional[Any]:
         """
-        Récupère une valeur du cache.
+        Récupère une valeur du niveau local.
 
         Args:
             cache_name: Nom du cache
@@ -151,22 +256,21 @@ class CacheService:
 
     def set(self, cache_name: str, key: str, value: Any, ttl: Optional[int] = None):
         """
-        Stocke une valeur dans le cache.
+        Stocke une valeur dans le niveau local.
 
         Args:
             cache_name: Nom du cache
             key: Clé de cache
             value: Valeur à stocker
-            ttl: TTL optionnel (utilise le défaut sinon)
+            ttl: Ignoré, le TTL est celui du cache nommé
         """
         cache = self.caches.get(cache_name)
         if cache is not None:
             cache[key] = value
-            # Note: cachetools gère le TTL au niveau du cache, pas par entrée
 
     def invalidate(self, cache_name: str, key: Optional[str] = None):
         """
-        Invalide une entrée ou tout un cache.
+        Invalide une entrée ou tout un cache (niveau local).
 
         Args:
             cache_name: Nom du cache
@@ -180,6 +284,214 @@ class CacheService:
                 cache.clear()
             logger.debug(f"Cache {cache_name} invalidé (key: {key})")
 
+    # ------------------------------------------------------------------
+    # Deux niveaux (asynchrone)
+    # ------------------------------------------------------------------
+
+    async def aget(self, cache_name: str, key: str) -> Optional[Any]:
+        """Valeur du cache (local puis Redis), None si absente ou négative."""
+        _, value = await self._lookup(cache_name, key)
+        return value
+
+    async def aget_many(self, cache_name: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Valeurs présentes pour un lot de clés, en un seul MGET Redis.
+
+        Returns:
+            {clé: valeur} des entrées trouvées (hors entrées négatives)
+        """
+        namespace = self.namespaces.get(cache_name)
+        if namespace is None:
+            return {}
+        cache = self.caches[cache_name]
+        found: Dict[str, Any] = {}
+        remote_keys = []
+        for key in dict.fromkeys(keys):
+            if key in cache:
+                self._count_hit(namespace, "l1_hits", cache[key])
+                if cache[key] is not None:
+                    found[key] = cache[key]
+            else:
+                remote_keys.append(key)
+
+        remote = await self._remote_get_many(namespace, remote_keys)
+        for key in remote_keys:
+            if key not in remote:
+                namespace.stats["misses"] += 1
+                continue
+            value = remote[key]
+            cache[key] = value
+            self._count_hit(namespace, "l2_hits", value)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def aset(self, cache_name: str, key: str, value: Any) -> None:
+        """Stocke une valeur dans les deux niveaux (None = entrée négative)."""
+        await self.aset_many(cache_name, {key: value})
+
+    async def aset_many(self, cache_name: str, values: Dict[str, Any]) -> None:
+        """Stocke un lot de valeurs, en un seul pipeline Redis."""
+        namespace = self.namespaces.get(cache_name)
+        if namespace is None or not values:
+            return
+        cache = self.caches[cache_name]
+        for key, value in values.items():
+            cache[key] = value
+        namespace.stats["sets"] += len(values)
+
+        async with self._connection(namespace) as client:
+            if client is None:
+                return
+            try:
+                pipe = client.pipeline(transaction=False)
+                for key, value in values.items():
+                    pipe.set(self._redis_key(cache_name, key), _pack(value), ex=namespace.entry_ttl(value))
+                await pipe.execute()
+            except (TypeError, ValueError) as e:
+                # Valeur non sérialisable : elle reste dans le niveau local
+                logger.debug(f"Cache {cache_name}: valeur non partageable ({e})")
+            except Exception as e:
+                self._on_redis_error(namespace, e)
+
+    async def ainvalidate(self, cache_name: str, key: Optional[str] = None) -> None:
+        """Invalide une entrée ou tout un cache, dans les deux niveaux."""
+        self.invalidate(cache_name, key)
+        namespace = self.namespaces.get(cache_name)
+        async with self._connection(namespace) as client:
+            if client is None:
+                return
+            try:
+                if key:
+                    await client.delete(self._redis_key(cache_name, key))
+                else:
+                    batch = []
+                    async for redis_key in client.scan_iter(match=self._redis_key(cache_name, "*"), count=500):
+                        batch.append(redis_key)
+                        if len(batch) >= 500:
+                            await client.delete(*batch)
+                            batch = []
+                    if batch:
+                        await client.delete(*batch)
+            except Exception as e:
+                self._on_redis_error(namespace, e)
+
+    async def forget_artist(self, name: str, album_titles: Iterable[str] = (), artist_id: Any = None) -> None:
+        """
+        Retire un artiste supprimé (et ses albums) des caches nom → ID.
+
+        Args:
+            name: Nom de l'artiste
+            album_titles: Titres des albums supprimés avec lui
+            artist_id: ID de l'artiste (clé des albums)
+        """
+        await self.ainvalidate("artist_ids", artist_id_cache_key(name))
+        for title in album_titles:
+            await self.forget_album(title, artist_id)
+
+    async def forget_album(self, title: str, album_artist_id: Any) -> None:
+        """Retire un album supprimé du cache nom → ID."""
+        await self.ainvalidate("album_ids", album_id_cache_key(title, album_artist_id))
+
+    async def _lookup(self, cache_name: str, key: str) -> Tuple[bool, Optional[Any]]:
+        """(trouvé, valeur) ; une entrée négative est trouvée avec la valeur None."""
+        namespace = self.namespaces.get(cache_name)
+        if namespace is None:
+            return False, None
+        cache = self.caches[cache_name]
+        if key in cache:
+            value = cache[key]
+            self._count_hit(namespace, "l1_hits", value)
+            return True, value
+
+        remote = await self._remote_get_many(namespace, [key])
+        if key not in remote:
+            namespace.stats["misses"] += 1
+            return False, None
+        value = remote[key]
+        cache[key] = value
+        self._count_hit(namespace, "l2_hits", value)
+        return True, value
+
+    async def _remote_get_many(self, namespace: CacheNamespace, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        async with self._connection(namespace) as client:
+            if client is None:
+                return {}
+            try:
+                raw_values = await client.mget([self._redis_key(namespace.name, key) for key in keys])
+            except Exception as e:
+                self._on_redis_error(namespace, e)
+                return {}
+        values = {}
+        for key, raw in zip(keys, raw_values):
+            if raw is None:
+                continue
+            try:
+                values[key] = msgpack.unpackb(raw, raw=False, strict_map_key=False)
+            except Exception:
+                logger.warning(f"Cache {namespace.name}: entrée Redis illisible ignorée ({key})")
+        return values
+
+    @staticmethod
+    def _count_hit(namespace: CacheNamespace, tier: str, value: Any) -> None:
+        namespace.stats[tier] += 1
+        if value is None:
+            namespace.stats["negative_hits"] += 1
+
+    @staticmethod
+    def _redis_key(cache_name: str, key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:{cache_name}:{key}"
+
+    def _client(self) -> Optional[redis.Redis]:
+        """
+        Client Redis utilisable dans la boucle courante (None si désactivé ou en pause après erreur).
+
+        Un client redis.asyncio est lié à la boucle qui a ouvert ses connexions.
+        Le client partagé appartient à la première boucle qui l'utilise (ou à la
+        suivante une fois celle-ci fermée) ; les autres boucles, créées par
+        certains appelants pour un seul appel, reçoivent un client jetable.
+        """
+        if not self.redis_url or time.monotonic() < self._redis_unavailable_until:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if self._redis is None or self._redis_loop.is_closed():
+            self._redis = self._new_client()
+            self._redis_loop = loop
+        if self._redis_loop is loop:
+            return self._redis
+        return self._new_client()
+
+    def _new_client(self) -> redis.Redis:
+        return redis.Redis.from_url(self.redis_url, socket_connect_timeout=1.0, socket_timeout=1.0)
+
+    @contextlib.asynccontextmanager
+    async def _connection(self, namespace: Optional[CacheNamespace]) -> AsyncIterator[Optional[redis.Redis]]:
+        """Client pour une opération ; un client jetable est fermé dans sa boucle à la sortie."""
+        client = self._client() if namespace is not None and namespace.shared else None
+        try:
+            yield client
+        finally:
+            if client is not None and client is not self._redis:
+                await client.aclose()
+
+    async def aclose(self) -> None:
+        """Ferme le client Redis partagé (arrêt du processus)."""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+            self._redis_loop = None
+
+    def _on_redis_error(self, namespace: Optional[CacheNamespace], error: Exception) -> None:
+        if namespace is not None:
+            namespace.stats["l2_errors"] += 1
+        self._redis_unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        logger.warning(f"Cache Redis indisponible, niveau local seul pendant {REDIS_RETRY_AFTER_SECONDS}s: {error}")
+
     async def call_with_cache_and_circuit_breaker(self,
                                                  cache_name: str,
                                                  key: str,
@@ -190,6 +502,9 @@ class CacheService:
         """
         Appelle une fonction avec cache et circuit breaker.
 
+        Un résultat None est mémorisé comme entrée négative : la fonction
+        n'est pas rappelée avant l'expiration de negative_ttl.
+
         Args:
             cache_name: Nom du cache à utiliser
             key: Clé de cache
@@ -203,8 +518,8 @@ class CacheService:
         """
         # Vérifier le cache d'abord
         if not force_refresh:
-            cached_result = self.get(cache_name, key)
-            if cached_result is not None:
+            found, cached_result = await self._lookup(cache_name, key)
+            if found:
                 logger.debug(f"Cache hit pour {cache_name}:{key}")
                 return cached_result
 
@@ -213,7 +528,6 @@ class CacheService:
         if circuit_breaker:
             try:
                 logger.debug(f"Appel API avec circuit breaker pour {cache_name}:{key}")
-                logger.debug(f"Type de func: {type(func)}, func: {func}")
                 if not callable(func):
                     logger.error(f"Fonction non callable passée à call_with_cache_and_circuit_breaker: {func}")
                     raise TypeError(f"L'objet passé n'est pas callable: {type(func)}")
@@ -221,7 +535,7 @@ class CacheService:
                 result = await circuit_breaker.call(func, *args, **kwargs)
 
                 # Mettre en cache le résultat
-                self.set(cache_name, key, result)
+                await self.aset(cache_name, key, result)
                 logger.debug(f"Cache set pour {cache_name}:{key}")
 
                 return result
@@ -232,7 +546,7 @@ class CacheService:
         else:
             # Pas de circuit breaker, appel direct
             result = await func(*args, **kwargs)
-            self.set(cache_name, key, result)
+            await self.aset(cache_name, key, result)
             return result
 
     def get_cache_stats(self) -> Dict[str, Dict]:
@@ -240,16 +554,12 @@ class CacheService:
         Retourne les statistiques de tous les caches.
 
         Returns:
-            Dictionnaire des statistiques par cache
+            Taille, bornes et taux de succès par niveau, par cache
         """
-        stats = {}
-        for name, cache in self.caches.items():
-            stats[name] = {
-                "size": len(cache),
-                "maxsize": getattr(cache, 'maxsize', None) or len(cache),  # Pour dict, pas de maxsize
-                "ttl": getattr(cache, 'ttl', None) or self.default_ttl
-            }
-        return stats
+        return {
+            name: namespace.snapshot(len(self.caches[name]))
+            for name, namespace in self.namespaces.items()
+        }
 
     def get_circuit_breaker_stats(self) -> Dict[str, Dict]:
         """
@@ -268,6 +578,10 @@ class CacheService:
         return stats
 
 
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
 # Instance globale du service de cache
 cache_service = CacheService()
 
@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
 from backend.utils.logging import logger
 from backend.services.redis_cache import image_cache_service
+from backend.api.utils.image_transcode_pool import image_transcode_pool
 from backend.services.image_processing_service import image_processing_service
 from backend.services.image_priority_service import ImagePriorityService, ProcessingContext, ImageSource
 from backend.services.cover_types import CoverProcessingContext, ImageType, TaskType
@@ -194,6 +195,9 @@ class CoverOrchestratorService:
                             "processing_time": result.get("processing_time", 0) if isinstance(result, dict) else 0
                         })
             
+            # Profondeur de file et latences du pool de transcodage Pillow
+            results["transcode_pool"] = image_transcode_pool.get_metrics()
+
             # Mise à jour des statistiques de priorité
             await self._update_batch_statistics(results)
             
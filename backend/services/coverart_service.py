@@ -4,7 +4,7 @@ from typing import Optional, Tuple
 
 import httpx
 
-from backend.utils.logging import logger
+from backend.api.utils.logging import logger
 
 
 async def get_coverart_image(client: httpx.AsyncClient, mb_release_id: str) -> Optional[Tuple[str, str]]:
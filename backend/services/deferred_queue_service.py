@@ -1,14 +1,146 @@
 """
 Service de Queue Différée - Gestion des tâches lourdes différées
 Utilise Redis pour stocker les tâches en attente et Celery Beat pour les traiter périodiquement.
+
+Structures Redis par queue :
+- deferred_queue:{queue}       sorted set des tâches en attente
+                               (score = priorité * 1e9 + process_at)
+- deferred_processing:{queue}  hash id -> tâche des tâches en cours
+- deferred_leases:{queue}      sorted set id -> expiration du bail
+- deferred_reclaims:{queue}    hash id -> nombre de baux expirés
+- deferred_metrics:{queue}:{minute}  compteurs par minute (débit)
+
+Le défilement est atomique (script Lua) : jusqu'à N tâches échues passent de
+la queue au hash de traitement en un aller-retour, sans qu'un autre consommateur
+puisse prendre la même tâche. Chaque tâche défilée reçoit un bail
+(queue_leases) ; reclaim_expired() remet en attente les tâches dont le bail a
+expiré (worker tué) sans parcourir les clés.
 """
 
 import json
 import os
+import random
 import redis
 import time
-from typing import Dict, List, Any, Optional
+import uuid
+from typing import Dict, List, Any, Optional, Sequence
 from backend.api.utils.logging import logger
+from backend.services.queue_leases import (
+    METRICS_RETENTION_SECONDS,
+    METRICS_WINDOW_MINUTES,
+    RECLAIM_BASE_BACKOFF_SECONDS,
+    RECLAIM_MAX_BACKOFF_SECONDS,
+    VISIBILITY_TIMEOUT_SECONDS,
+    minute_bucket,
+    summarize_throughput,
+)
+
+PRIORITY_SCORES = {"high": 0, "normal": 1, "low": 2}
+PRIORITY_WIDTH = 1000000000
+
+# Fenêtre de score examinée par niveau de priorité : [niveau + now - horizon,
+# niveau + now]. Sans borne basse, la fenêtre "normal" engloberait les tâches
+# "high" non échues (les niveaux sont plus étroits qu'un timestamp).
+DUE_HORIZON_SECONDS = 100000000
+
+# Proportion des enqueue qui journalisent la taille de la queue (diagnostic)
+STATS_SAMPLE_RATE = float(os.environ.get("DEFERRED_QUEUE_STATS_SAMPLE_RATE", "0.01"))
+
+# KEYS = queue, hash de traitement, baux, compteurs de la minute
+# ARGV = now, count, largeur d'un niveau, nombre de niveaux, horizon,
+#        durée du bail, rétention des compteurs
+_POP_DUE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local remaining = tonumber(ARGV[2])
+local width = tonumber(ARGV[3])
+local horizon = tonumber(ARGV[5])
+local lease_until = now + tonumber(ARGV[6])
+local popped = {}
+local corrupt = 0
+for tier = 0, tonumber(ARGV[4]) - 1 do
+    if remaining <= 0 then break end
+    local base = tier * width
+    local members = redis.call('ZRANGEBYSCORE', KEYS[1], base + now - horizon, base + now, 'LIMIT', 0, remaining)
+    for _, member in ipairs(members) do
+        local ok, task = pcall(cjson.decode, member)
+        if not ok or type(task) ~= 'table' or task['id'] == nil then
+            redis.call('ZREM', KEYS[1], member)
+            corrupt = corrupt + 1
+        elseif (tonumber(task['process_at']) or 0) <= now then
+            redis.call('ZREM', KEYS[1], member)
+            redis.call('HSET', KEYS[2], task['id'], member)
+            redis.call('ZADD', KEYS[3], lease_until, task['id'])
+            popped[#popped + 1] = member
+            remaining = remaining - 1
+        end
+    end
+end
+if #popped > 0 then
+    redis.call('HINCRBY', KEYS[4], 'dequeued', #popped)
+    redis.call('EXPIRE', KEYS[4], ARGV[7])
+end
+return {corrupt, popped}
+"""
+
+# KEYS = queue, hash de traitement, baux, compteurs d'expiration, compteurs de la minute
+# ARGV = now, limite, largeur d'un niveau, backoff de base, backoff max,
+#        préfixe des échecs, TTL des échecs, priorités (JSON), rétention des compteurs
+_RECLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+local width = tonumber(ARGV[3])
+local priorities = cjson.decode(ARGV[8])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, tonumber(ARGV[2]))
+local requeued = 0
+local failed = 0
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[3], id)
+    local member = redis.call('HGET', KEYS[2], id)
+    if member then
+        redis.call('HDEL', KEYS[2], id)
+        local attempts = redis.call('HINCRBY', KEYS[4], id, 1)
+        local max_retries = 3
+        local tier = 1
+        local ok, task = pcall(cjson.decode, member)
+        if ok and type(task) == 'table' then
+            max_retries = tonumber(task['max_retries']) or max_retries
+            tier = priorities[task['priority']] or tier
+        end
+        if attempts > max_retries then
+            redis.call('SETEX', ARGV[6] .. id, ARGV[7], member)
+            redis.call('HDEL', KEYS[4], id)
+            failed = failed + 1
+        else
+            local backoff = math.min(tonumber(ARGV[4]) * 2 ^ (attempts - 1), tonumber(ARGV[5]))
+            redis.call('ZADD', KEYS[1], tier * width + now + backoff, member)
+            requeued = requeued + 1
+        end
+    end
+end
+if requeued + failed > 0 then
+    redis.call('HINCRBY', KEYS[5], 'reclaimed', requeued)
+    redis.call('HINCRBY', KEYS[5], 'failed', failed)
+    redis.call('EXPIRE', KEYS[5], ARGV[9])
+end
+return {requeued, failed}
+"""
+
+
+def _score(priority: str, process_at: float) -> float:
+    """Score de tri : priorité puis date de traitement."""
+    return PRIORITY_SCORES.get(priority, 1) * PRIORITY_WIDTH + process_at
+
+
+def _keys(queue_name: str) -> Dict[str, str]:
+    return {
+        "queue": f"deferred_queue:{queue_name}",
+        "processing": f"deferred_processing:{queue_name}",
+        "leases": f"deferred_leases:{queue_name}",
+        "reclaims": f"deferred_reclaims:{queue_name}",
+    }
+
+
+def _metrics_key(queue_name: str, minute: Optional[int] = None) -> str:
+    return f"deferred_metrics:{queue_name}:{minute if minute is not None else minute_bucket()}"
 
 
 class DeferredQueueService:
@@ -22,6 +154,9 @@ class DeferredQueueService:
     def __init__(self, redis_url: str = "redis://redis:6379/0"):
         """Initialise le service avec Redis."""
         # Skip Redis connection in testing mode
+        self.counters = {"enqueued": 0, "dequeued": 0, "corrupt": 0}
+        self._pop_due = None
+        self._reclaim = None
         if os.environ.get("TESTING") == "true":
             logger.info("[DEFERRED_QUEUE] TESTING mode enabled - skipping Redis connection")
             self.redis = None
@@ -32,6 +167,8 @@ class DeferredQueueService:
             logger.info(f"[DEFERRED_QUEUE] Tentative de connexion à Redis: {redis_url}")
             self.redis = redis.from_url(redis_url)
             self.redis.ping()  # Test de connexion
+            self._pop_due = self.redis.register_script(_POP_DUE_SCRIPT)
+            self._reclaim = self.redis.register_script(_RECLAIM_SCRIPT)
             logger.info("[DEFERRED_QUEUE] Connexion Redis établie avec succès")
             
             # DIAGNOSTIC: Informations sur Redis
@@ -49,6 +186,21 @@ class DeferredQueueService:
             logger.error(f"[DEFERRED_QUEUE] URL Redis utilisée: {redis_url}")
             self.redis = None
 
+    @staticmethod
+    def _build_task(queue_name: str, task_data: Dict[str, Any], priority: str,
+                    delay_seconds: float, max_retries: int, now: float) -> Dict[str, Any]:
+        return {
+            "id": f"{queue_name}:{int(now)}:{uuid.uuid4().hex[:12]}",
+            "queue": queue_name,
+            "data": task_data,
+            "priority": priority,
+            "created_at": now,
+            "process_at": now + delay_seconds,
+            "retries": 0,
+            "max_retries": max_retries,
+            "status": "pending"
+        }
+
     def enqueue_task(self, queue_name: str, task_data: Dict[str, Any],
                     priority: str = "normal", delay_seconds: int = 0,
                     max_retries: int = 3) -> bool:
@@ -65,70 +217,76 @@ class DeferredQueueService:
         Returns:
             True si ajout réussi
         """
+        return self.enqueue_many(
+            queue_name, [task_data], priority, delay_seconds, max_retries
+        ) == 1
+
+    def enqueue_many(self, queue_name: str, tasks_data: Sequence[Dict[str, Any]],
+                     priority: str = "normal", delay_seconds: int = 0,
+                     max_retries: int = 3, delays: Optional[Sequence[float]] = None,
+                     chunk_size: int = 1000) -> int:
+        """
+        Ajoute un lot de tâches en un pipeline (un ZADD par tranche).
+
+        Args:
+            queue_name: Nom de la queue
+            tasks_data: Données de chaque tâche
+            priority: Priorité commune ('high', 'normal', 'low')
+            delay_seconds: Délai commun avant traitement
+            max_retries: Nombre maximum de tentatives
+            delays: Délai propre à chaque tâche (remplace delay_seconds)
+            chunk_size: Nombre de membres par ZADD
+
+        Returns:
+            Nombre de tâches ajoutées
+        """
         if not self.redis:
             logger.error("[DEFERRED_QUEUE] Redis non disponible")
-            return False
+            return 0
+        if not tasks_data:
+            return 0
 
         try:
-            # Clé Redis pour la queue
             queue_key = f"deferred_queue:{queue_name}"
+            now = time.time()
+            mapping = {}
+            for index, task_data in enumerate(tasks_data):
+                delay = delays[index] if delays is not None else delay_seconds
+                task = self._build_task(queue_name, task_data, priority, delay, max_retries, now)
+                mapping[json.dumps(task)] = _score(priority, task["process_at"])
+
+            members = list(mapping.items())
+            pipe = self.redis.pipeline(transaction=False)
+            for offset in range(0, len(members), chunk_size):
+                pipe.zadd(queue_key, dict(members[offset:offset + chunk_size]))
+            metrics_key = _metrics_key(queue_name)
+            pipe.hincrby(metrics_key, "enqueued", len(members))
+            pipe.expire(metrics_key, METRICS_RETENTION_SECONDS)
+            added = sum(pipe.execute()[:-2])
+
+            self.counters["enqueued"] += added
+            logger.debug(f"[DEFERRED_QUEUE] {added} tâche(s) ajoutée(s) dans {queue_name}")
+            self._sample_stats(queue_name)
+            return added
 
-            # Structure de la tâche
-            task = {
-                "id": f"{queue_name}:{int(time.time())}:{hash(str(task_data))}",
-                "queue": queue_name,
-                "data": task_data,
-                "priority": priority,
-                "created_at": time.time(),
-                "process_at": time.time() + delay_seconds,
-                "retries": 0,
-                "max_retries": max_retries,
-                "status": "pending"
-            }
-
-            # Score pour tri par priorité et timestamp
-            priority_scores = {"high": 0, "normal": 1, "low": 2}
-            score = priority_scores.get(priority, 1) * 1000000000 + task["process_at"]
-
-            # DIAGNOSTIC: Log des données avant sérialisation
-            logger.debug(f"[DEFERRED_QUEUE DIAGNOSTIC] Données avant sérialisation: {task}")
-            logger.debug(f"[DEFERRED_QUEUE DIAGNOSTIC] Taille des données JSON: {len(json.dumps(task))} caractères")
-            
-            # Ajout dans Redis Sorted Set
-            self.redis.zadd(queue_key, {json.dumps(task): score})
-
-            logger.info(f"[DEFERRED_QUEUE] Tâche ajoutée avec succès: {queue_name} -> {task['id']}")
-            
-            # DIAGNOSTIC: Vérification post-ajout
-            try:
-                queue_size = self.redis.zcard(queue_key)
-                logger.info(f"[DEFERRED_QUEUE DIAGNOSTIC] Taille de la queue {queue_name} après ajout: {queue_size}")
-                
-                # Vérifier la mémoire utilisée
-                info = self.redis.info()
-                used_memory = info.get('used_memory', 0)
-                logger.info(f"[DEFERRED_QUEUE DIAGNOSTIC] Mémoire Redis utilisée: {used_memory} bytes")
-                
-            except Exception as post_check_error:
-                logger.warning(f"[DEFERRED_QUEUE] Erreur lors du diagnostic post-ajout: {post_check_error}")
-                
-            return True
+        except Exception as e:
+            logger.error(f"[DEFERRED_QUEUE] Erreur ajout de {len(tasks_data)} tâche(s) dans {queue_name}: {str(e)}")
+            return 0
 
+    def _sample_stats(self, queue_name: str) -> None:
+        """Journalise la taille de la queue pour une fraction des enqueue."""
+        if random.random() >= STATS_SAMPLE_RATE:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zcard(f"deferred_queue:{queue_name}")
+            pipe.hlen(f"deferred_processing:{queue_name}")
+            pending, processing = pipe.execute()
+            logger.info(
+                f"[DEFERRED_QUEUE DIAGNOSTIC] {queue_name}: {pending} en attente, {processing} en cours"
+            )
         except Exception as e:
-            # DIAGNOSTIC: Log détaillé de l'erreur
-            logger.error(f"[DEFERRED_QUEUE] Erreur ajout tâche: {str(e)}")
-            logger.error(f"[DEFERRED_QUEUE DIAGNOSTIC] Type d'erreur: {type(e).__name__}")
-            logger.error(f"[DEFERRED_QUEUE DIAGNOSTIC] Queue: {queue_name}")
-            logger.error(f"[DEFERRED_QUEUE DIAGNOSTIC] Données de la tâche: {task_data}")
-            
-            # Vérifier l'état de Redis lors de l'erreur
-            try:
-                info = self.redis.info()
-                logger.error(f"[DEFERRED_QUEUE DIAGNOSTIC] État Redis lors de l'erreur: used_memory={info.get('used_memory', 'N/A')}")
-            except Exception as info_error:
-                logger.error(f"[DEFERRED_QUEUE DIAGNOSTIC] Impossible d'obtenir info Redis lors de l'erreur: {info_error}")
-                
-            return False
+            logger.warning(f"[DEFERRED_QUEUE] Diagnostic échantillonné impossible: {e}")
 
     def dequeue_task(self, queue_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -140,61 +298,55 @@ class DeferredQueueService:
         Returns:
             Tâche à traiter ou None
         """
-        if not self.redis:
-            return None
-
-        try:
-            queue_key = f"deferred_queue:{queue_name}"
-            processing_key = f"deferred_processing:{queue_name}"
-
-            # Récupère la tâche avec le score le plus bas (priorité + timestamp)
-            tasks = self.redis.zrange(queue_key, 0, 0, withscores=True)
+        tasks = self.dequeue_tasks(queue_name, 1)
+        return tasks[0] if tasks else None
 
-            if not tasks:
-                return None
+    def dequeue_tasks(self, queue_name: str, count: int = 10) -> List[Dict[str, Any]]:
+        """
+        Défile atomiquement jusqu'à `count` tâches échues.
 
-            # Debug: Vérifie le format des données Redis
-            logger.debug(f"[DEFERRED_QUEUE] Tasks raw data: {tasks}")
-            logger.debug(f"[DEFERRED_QUEUE] Task[0] type: {type(tasks[0])}, content: {tasks[0]}")
+        Les tâches sont prises par priorité puis date de traitement et placées
+        dans le hash de traitement, sous bail, par le même script : deux
+        consommateurs ne peuvent pas obtenir la même tâche.
 
-            # Vérification de sécurité avant dépaquetage
-            if not isinstance(tasks[0], (list, tuple)) or len(tasks[0]) != 2:
-                logger.error(f"[DEFERRED_QUEUE] Format inattendu pour task[0]: {tasks[0]}")
-                return None
+        Args:
+            queue_name: Nom de la queue
+            count: Nombre maximum de tâches
 
-            task_json, score = tasks[0]
-            logger.debug(f"[DEFERRED_QUEUE] Dépaquetage réussi: task_json length={len(task_json)}, score={score}")
+        Returns:
+            Tâches à traiter (éventuellement vide)
+        """
+        if not self.redis or count <= 0:
+            return []
 
-            try:
-                task = json.loads(task_json)
-                logger.debug(f"[DEFERRED_QUEUE] Tâche désérialisée: {task.get('id', 'ID inconnu')}")
-            except json.JSONDecodeError as e:
-                logger.error(f"[DEFERRED_QUEUE] Erreur JSON decode pour task {task_json[:100]}...: {str(e)}")
-                # Nettoie la tâche corrompue
-                self.redis.zrem(queue_key, task_json)
-                return None
-
-            # Vérifie si c'est le moment de traiter
-            if task["process_at"] > time.time():
-                return None  # Pas encore le moment
-
-            # Déplace vers processing
-            self.redis.zrem(queue_key, task_json)
-            task["status"] = "processing"
-            task["processing_started_at"] = time.time()
-
-            self.redis.setex(
-                f"{processing_key}:{task['id']}",
-                3600,  # Expire après 1 heure si pas terminé
-                json.dumps(task)
+        try:
+            now = time.time()
+            keys = _keys(queue_name)
+            corrupt, members = self._pop_due(
+                keys=[keys["queue"], keys["processing"], keys["leases"], _metrics_key(queue_name)],
+                args=[now, count, PRIORITY_WIDTH, len(PRIORITY_SCORES), DUE_HORIZON_SECONDS,
+                      VISIBILITY_TIMEOUT_SECONDS, METRICS_RETENTION_SECONDS],
             )
-
-            logger.info(f"[DEFERRED_QUEUE] Tâche défilée: {queue_name} -> {task['id']}")
-            return task
+            if corrupt:
+                self.counters["corrupt"] += int(corrupt)
+                logger.error(f"[DEFERRED_QUEUE] {corrupt} tâche(s) illisible(s) retirée(s) de {queue_name}")
+
+            tasks = []
+            for member in members:
+                task = json.loads(member)
+                task["status"] = "processing"
+                task["processing_started_at"] = now
+                task["lease_expires_at"] = now + VISIBILITY_TIMEOUT_SECONDS
+                tasks.append(task)
+
+            self.counters["dequeued"] += len(tasks)
+            if tasks:
+                logger.debug(f"[DEFERRED_QUEUE] {len(tasks)} tâche(s) défilée(s) de {queue_name}")
+            return tasks
 
         except Exception as e:
-            logger.error(f"[DEFERRED_QUEUE] Erreur défilement tâche: {str(e)}")
-            return None
+            logger.error(f"[DEFERRED_QUEUE] Erreur défilement tâches: {str(e)}")
+            return []
 
     def complete_task(self, queue_name: str, task_id: str, success: bool = True,
                       error_message: Optional[str] = None) -> bool:
@@ -214,11 +366,13 @@ class DeferredQueueService:
             return False
 
         try:
-            processing_key = f"deferred_processing:{queue_name}:{task_id}"
+            keys = _keys(queue_name)
+            # Clé individuelle des tâches défilées avant le hash de traitement
+            legacy_key = f"{keys['processing']}:{task_id}"
 
-            task_json = self.redis.get(processing_key)
+            task_json = self.redis.hget(keys["processing"], task_id) or self.redis.get(legacy_key)
             if not task_json:
-                logger.warning(f"[DEFERRED_QUEUE] Tâche non trouvée: {task_id}")
+                logger.warning(f"[DEFERRED_QUEUE] Tâche non trouvée (bail expiré ?): {task_id}")
                 return False
 
             task = json.loads(task_json)
@@ -229,13 +383,18 @@ class DeferredQueueService:
             if error_message:
                 task["error"] = error_message
 
-            # Supprime de processing et archive
-            self.redis.delete(processing_key)
+            # Supprime de processing (tâche et bail) et archive
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hdel(keys["processing"], task_id)
+            pipe.zrem(keys["leases"], task_id)
+            pipe.hdel(keys["reclaims"], task_id)
+            pipe.delete(legacy_key)
 
             if success:
                 # Archive les succès (expire après 7 jours)
                 archive_key = f"deferred_archive:{queue_name}"
-                self.redis.setex(f"{archive_key}:{task_id}", 604800, json.dumps(task))
+                pipe.setex(f"{archive_key}:{task_id}", 604800, json.dumps(task))
+                event = "completed"
             else:
                 # Retry si possible
                 if task["retries"] < task["max_retries"]:
@@ -244,24 +403,134 @@ class DeferredQueueService:
                     task["last_error"] = error_message
                     task["process_at"] = time.time() + (60 * task["retries"])  # Backoff
 
-                    queue_key = f"deferred_queue:{queue_name}"
-                    priority_scores = {"high": 0, "normal": 1, "low": 2}
-                    score = priority_scores.get(task["priority"], 1) * 1000000000 + task["process_at"]
-                    self.redis.zadd(queue_key, {json.dumps(task): score})
+                    pipe.zadd(keys["queue"], {json.dumps(task): _score(task["priority"], task["process_at"])})
+                    event = "retried"
 
                     logger.info(f"[DEFERRED_QUEUE] Tâche retry: {task_id} (tentative {task['retries']})")
                 else:
                     # Archive les échecs définitifs
                     failed_key = f"deferred_failed:{queue_name}"
-                    self.redis.setex(f"{failed_key}:{task_id}", 2592000, json.dumps(task))  # 30 jours
+                    pipe.setex(f"{failed_key}:{task_id}", 2592000, json.dumps(task))  # 30 jours
+                    event = "failed"
                     logger.error(f"[DEFERRED_QUEUE] Tâche failed définitivement: {task_id}")
 
+            metrics_key = _metrics_key(queue_name)
+            pipe.hincrby(metrics_key, event, 1)
+            pipe.expire(metrics_key, METRICS_RETENTION_SECONDS)
+            pipe.execute()
             return True
 
         except Exception as e:
             logger.error(f"[DEFERRED_QUEUE] Erreur completion tâche: {str(e)}")
             return False
 
+    def extend_lease(self, queue_name: str, task_id: str,
+                     seconds: Optional[int] = None) -> bool:
+        """
+        Prolonge le bail d'une tâche en cours (traitements longs).
+
+        Args:
+            queue_name: Nom de la queue
+            task_id: ID de la tâche
+            seconds: Nouvelle durée à partir de maintenant (défaut : visibility timeout)
+
+        Returns:
+            False si le bail n'existe plus (tâche déjà récupérée ou terminée)
+        """
+        if not self.redis:
+            return False
+        try:
+            lease_until = time.time() + (seconds or VISIBILITY_TIMEOUT_SECONDS)
+            # XX : ne recrée jamais un bail déjà récupéré ; CH : compte la mise à jour
+            return bool(self.redis.zadd(_keys(queue_name)["leases"], {task_id: lease_until}, xx=True, ch=True))
+        except Exception as e:
+            logger.error(f"[DEFERRED_QUEUE] Erreur prolongation bail {task_id}: {str(e)}")
+            return False
+
+    def reclaim_expired(self, queue_name: str, limit: int = 500) -> Dict[str, Any]:
+        """
+        Remet en attente les tâches dont le bail a expiré.
+
+        La tâche repart avec un délai croissant (queue_leases.reclaim_backoff) ;
+        au-delà de max_retries expirations elle est archivée en échec.
+
+        Args:
+            queue_name: Nom de la queue
+            limit: Nombre maximum de baux traités par appel
+
+        Returns:
+            {"requeued": n, "failed": n}
+        """
+        if not self.redis:
+            return {"error": 1}
+        try:
+            keys = _keys(queue_name)
+            requeued, failed = self._reclaim(
+                keys=[keys["queue"], keys["processing"], keys["leases"], keys["reclaims"],
+                      _metrics_key(queue_name)],
+                args=[time.time(), limit, PRIORITY_WIDTH, RECLAIM_BASE_BACKOFF_SECONDS,
+                      RECLAIM_MAX_BACKOFF_SECONDS, f"deferred_failed:{queue_name}:", 2592000,
+                      json.dumps(PRIORITY_SCORES), METRICS_RETENTION_SECONDS],
+            )
+            if requeued or failed:
+                logger.warning(
+                    f"[DEFERRED_QUEUE] Baux expirés sur {queue_name}: {requeued} remise(s) en attente, {failed} échec(s)"
+                )
+            return {"requeued": int(requeued), "failed": int(failed)}
+        except Exception as e:
+            logger.error(f"[DEFERRED_QUEUE] Erreur récupération des baux: {str(e)}")
+            return {"error": str(e)}
+
+    def get_queue_metrics(self, queue_name: str,
+                          window_minutes: int = METRICS_WINDOW_MINUTES) -> Dict[str, Any]:
+        """
+        Débit et retard d'une queue (sans parcours de clés).
+
+        Returns:
+            pending, due (échues), in_flight, expired_leases, lag_seconds
+            (âge de la plus ancienne tâche échue) et débit par minute
+        """
+        if not self.redis:
+            return {"error": 1}
+        try:
+            keys = _keys(queue_name)
+            now = time.time()
+            current = minute_bucket(now)
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zcard(keys["queue"])
+            pipe.zcard(keys["leases"])
+            pipe.zcount(keys["leases"], "-inf", now)
+            for tier in range(len(PRIORITY_SCORES)):
+                base = tier * PRIORITY_WIDTH
+                window = (base + now - DUE_HORIZON_SECONDS, base + now)
+                pipe.zcount(keys["queue"], *window)
+                pipe.zrangebyscore(keys["queue"], *window, start=0, num=1, withscores=True)
+            for minute in range(current - window_minutes + 1, current + 1):
+                pipe.hgetall(_metrics_key(queue_name, minute))
+            results = pipe.execute()
+
+            pending, in_flight, expired = results[:3]
+            tiers = results[3:3 + 2 * len(PRIORITY_SCORES)]
+            due = sum(tiers[0::2])
+            oldest_due = [
+                score - tier * PRIORITY_WIDTH
+                for tier, first in enumerate(tiers[1::2])
+                for _, score in first
+            ]
+            return {
+                "queue_name": queue_name,
+                "backend": "redis",
+                "pending": pending,
+                "due": due,
+                "in_flight": in_flight,
+                "expired_leases": expired,
+                "lag_seconds": round(now - min(oldest_due), 3) if oldest_due else 0.0,
+                "throughput": summarize_throughput(results[3 + 2 * len(PRIORITY_SCORES):], window_minutes),
+            }
+        except Exception as e:
+            logger.error(f"[DEFERRED_QUEUE] Erreur métriques queue: {str(e)}")
+            return {"error": str(e)}
+
     def get_queue_stats(self, queue_name: str) -> Dict[str, Any]:
         """
         Retourne les statistiques d'une queue.
@@ -284,16 +553,13 @@ class DeferredQueueService:
             # Compte les tâches en attente
             pending_count = self.redis.zcard(queue_key)
 
-            # Compte les tâches en cours
-            processing_keys = self.redis.keys(f"{processing_key}:*")
-            processing_count = len(processing_keys) if processing_keys else 0
-
-            # Compte les archives
-            archive_keys = self.redis.keys(f"{archive_key}:*")
-            archive_count = len(archive_keys) if archive_keys else 0
+            # Compte les tâches en cours et les baux expirés non encore récupérés
+            processing_count = self.redis.hlen(processing_key)
+            expired_leases = self.redis.zcount(f"deferred_leases:{queue_name}", "-inf", time.time())
 
-            failed_keys = self.redis.keys(f"{failed_key}:*")
-            failed_count = len(failed_keys) if failed_keys else 0
+            # Compte les archives (SCAN incrémental plutôt que KEYS bloquant)
+            archive_count = sum(1 for _ in self.redis.scan_iter(f"{archive_key}:*", count=1000))
+            failed_count = sum(1 for _ in self.redis.scan_iter(f"{failed_key}:*", count=1000))
 
             # Tâches les plus anciennes
             oldest_pending = None
@@ -310,7 +576,9 @@ class DeferredQueueService:
                 "completed": archive_count,
                 "failed": failed_count,
                 "total": pending_count + processing_count + archive_count + failed_count,
-                "oldest_pending_seconds": oldest_pending
+                "oldest_pending_seconds": oldest_pending,
+                "expired_leases": expired_leases,
+                "counters": dict(self.counters)
             }
 
         except Exception as e:
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de vectorisation par lots de la bibliothèque.
+
+Rôle:
+    Revectorise toute la bibliothèque (ou les pistes sans embedding) sans
+    un appel HTTP par piste :
+        - lecture des métadonnées par pages (keyset sur l'ID) via
+          GET /api/tracks/embeddings/texts ;
+        - encodage en micro-batches sur un thread dédié, hors boucle asyncio ;
+        - écriture d'une page entière via POST /api/tracks/embeddings/batch ;
+        - point de reprise (dernier ID écrit) stocké dans Redis après chaque
+          page, pour reprendre une revectorisation interrompue.
+
+    Les étapes se recouvrent : la page suivante est lue et la page précédente
+    écrite pendant l'encodage de la page courante.
+
+Dépendances:
+    - backend.services.ollama_embedding_service: modèle et formatage du texte
+    - redis.asyncio: points de reprise
+    - httpx: appels à l'API
+
+Auteur: SoniqueBay Team
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import httpx
+import redis.asyncio as redis
+
+from backend.api.utils.logging import logger
+
+DEFAULT_PAGE_SIZE = int(os.getenv("EMBEDDING_PIPELINE_PAGE_SIZE", "500"))
+DEFAULT_MICRO_BATCH_SIZE = int(os.getenv("EMBEDDING_PIPELINE_MICRO_BATCH_SIZE", "32"))
+
+
+class EmbeddingCheckpointStore:
+    """Points de reprise de la revectorisation, un par type d'embedding."""
+
+    KEY_PREFIX = "embedding_pipeline:checkpoint"
+
+    def __init__(self, redis_url: Optional[str] = None) -> None:
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379")
+        self._client: Optional[redis.Redis] = None
+
+    def _key(self, embedding_type: str) -> str:
+        return f"{self.KEY_PREFIX}:{embedding_type}"
+
+    async def _get_client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, decode_responses=True)
+        return self._client
+
+    async def load(self, embedding_type: str) -> Optional[Dict[str, Any]]:
+        """Retourne le dernier point de reprise ou None."""
+        try:
+            client = await self._get_client()
+            raw = await client.get(self._key(embedding_type))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"[EMBEDDING PIPELINE] Lecture checkpoint impossible: {e}")
+            return None
+
+    async def save(self, embedding_type: str, checkpoint: Dict[str, Any]) -> None:
+        """Enregistre le point de reprise (échec non bloquant)."""
+        try:
+            client = await self._get_client()
+            await client.set(self._key(embedding_type), json.dumps(checkpoint))
+        except Exception as e:
+            logger.warning(f"[EMBEDDING PIPELINE] Écriture checkpoint impossible: {e}")
+
+    async def clear(self, embedding_type: str) -> None:
+        """Supprime le point de reprise (parcours terminé)."""
+        try:
+            client = await self._get_client()
+            await client.delete(self._key(embedding_type))
+        except Exception as e:
+            logger.warning(f"[EMBEDDING PIPELINE] Suppression checkpoint impossible: {e}")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class EmbeddingPipelineService:
+    """
+    Revectorisation de la bibliothèque par pages et micro-batches.
+
+    Exemple:
+        >>> pipeline = EmbeddingPipelineService()
+        >>> summary = await pipeline.run(embedding_type="semantic", resume=True)
+    """
+
+    def __init__(
+        self,
+        embedding_service=None,
+        library_api_url: Optional[str] = None,
+        page_size: Optional[int] = None,
+        micro_batch_size: Optional[int] = None,
+        checkpoint_store: Optional[EmbeddingCheckpointStore] = None,
+    ) -> None:
+        """
+        Args:
+            embedding_service: Service d'embeddings (OllamaEmbeddingService par défaut)
+            library_api_url: URL de l'API library
+            page_size: Pistes lues et écrites par requête HTTP
+            micro_batch_size: Textes encodés par passe du modèle
+            checkpoint_store: Stockage des points de reprise
+        """
+        if embedding_service is None:
+            from backend.services.ollama_embedding_service import OllamaEmbeddingService
+
+            embedding_service = OllamaEmbeddingService()
+        self.embedding_service = embedding_service
+        self.library_api_url = library_api_url or embedding_service.library_api_url
+        self.page_size = page_size or DEFAULT_PAGE_SIZE
+        self.micro_batch_size = micro_batch_size or DEFAULT_MICRO_BATCH_SIZE
+        self.checkpoint_store = checkpoint_store or EmbeddingCheckpointStore()
+        # Un seul thread d'encodage : le modèle n'est pas partagé entre threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-encode")
+
+    def _encode_page(self, texts: List[str]) -> List[List[float]]:
+        """Encode une page de textes par micro-batches (exécuté sur le thread dédié)."""
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.micro_batch_size):
+            chunk = texts[start:start + self.micro_batch_size]
+            encoded = self.embedding_service.model.encode(
+                chunk, batch_size=self.micro_batch_size, convert_to_numpy=True
+            )
+            vectors.extend(encoded.tolist() if hasattr(encoded, "tolist") else encoded)
+        return vectors
+
+    async def _fetch_page(
+        self,
+        client: httpx.AsyncClient,
+        after_id: int,
+        embedding_type: str,
+        only_missing: bool,
+    ) -> Dict[str, Any]:
+        response = await client.get(
+            f"{self.library_api_url}/api/tracks/embeddings/texts",
+            params={
+                "after_id": after_id,
+                "limit": self.page_size,
+                "embedding_type": embedding_type,
+                "only_missing": only_missing,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _write_page(
+        self,
+        client: httpx.AsyncClient,
+        track_ids: List[int],
+        vectors: List[List[float]],
+        embedding_type: str,
+    ) -> Dict[str, Any]:
+        response = await client.post(
+            f"{self.library_api_url}/api/tracks/embeddings/batch",
+            json={
+                "items": [
+                    {"track_id": track_id, "embedding": vector}
+                    for track_id, vector in zip(track_ids, vectors)
+                ],
+                "embedding_type": embedding_type,
+                "embedding_source": "sentence-transformers",
+                "embedding_model": self.embedding_service.MODEL_NAME,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def run(
+        self,
+        embedding_type: str = "semantic",
+        only_missing: bool = False,
+        resume: bool = True,
+        max_tracks: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Vectorise la bibliothèque page par page.
+
+        Args:
+            embedding_type: Type d'embedding produit
+            only_missing: Ne traiter que les pistes sans cet embedding
+            resume: Reprendre au dernier point de reprise enregistré
+            max_tracks: Arrêter après ce nombre de pistes (reprise possible ensuite)
+
+        Returns:
+            Résumé du parcours (compteurs, dernier ID, requêtes HTTP)
+        """
+        start_time = time.time()
+        checkpoint = await self.checkpoint_store.load(embedding_type) if resume else None
+        summary = {
+            "embedding_type": embedding_type,
+            "resumed_from": (checkpoint or {}).get("after_id", 0),
+            "processed": (checkpoint or {}).get("processed", 0),
+            "successful": (checkpoint or {}).get("successful", 0),
+            "failed": (checkpoint or {}).get("failed", 0),
+            "pages": 0,
+            "http_requests": 0,
+        }
+        after_id = summary["resumed_from"]
+        processed_this_run = 0
+        exhausted = False
+        loop = asyncio.get_running_loop()
+
+        logger.info(
+            f"[EMBEDDING PIPELINE] Démarrage type={embedding_type} depuis id>{after_id} "
+            f"(page={self.page_size}, micro-batch={self.micro_batch_size})"
+        )
+
+        async def commit_page(write_task: asyncio.Task, last_id: int, count: int) -> None:
+            result = await write_task
+            summary["successful"] += result.get("successful", 0)
+            summary["failed"] += result.get("failed", 0)
+            summary["processed"] += count
+            await self.checkpoint_store.save(
+                embedding_type,
+                {
+                    "after_id": last_id,
+                    "processed": summary["processed"],
+                    "successful": summary["successful"],
+                    "failed": summary["failed"],
+                    "updated_at": time.time(),
+                },
+            )
+
+        async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0)) as client:
+            pending_write = None
+            next_page = asyncio.create_task(
+                self._fetch_page(client, after_id, embedding_type, only_missing)
+            )
+            summary["http_requests"] += 1
+
+            try:
+                while next_page is not None:
+                    page = await next_page
+                    items = page.get("items", [])
+                    next_after_id = page.get("next_after_id")
+                    if next_after_id is None:
+                        exhausted = True
+                    if max_tracks is not None and len(items) > max_tracks - processed_this_run:
+                        items = items[:max_tracks - processed_this_run]
+                        exhausted = False
+                    if not items:
+                        break
+
+                    reached_limit = (
+                        max_tracks is not None and processed_this_run + len(items) >= max_tracks
+                    )
+                    next_page = None
+                    if next_after_id is not None and not reached_limit:
+                        # Lecture de la page suivante pendant l'encodage
+                        next_page = asyncio.create_task(
+                            self._fetch_page(client, next_after_id, embedding_type, only_missing)
+                        )
+                        summary["http_requests"] += 1
+
+                    texts = [self.embedding_service.format_track_text(item) for item in items]
+                    vectors = await loop.run_in_executor(
+                        self._executor, partial(self._encode_page, texts)
+                    )
+
+                    if pending_write is not None:
+                        await commit_page(*pending_write)
+                    track_ids = [item["id"] for item in items]
+                    write_task = asyncio.create_task(
+                        self._write_page(client, track_ids, vectors, embedding_type)
+                    )
+                    summary["http_requests"] += 1
+                    pending_write = (write_task, track_ids[-1], len(items))
+                    summary["pages"] += 1
+                    processed_this_run += len(items)
+                    after_id = track_ids[-1]
+
+                if pending_write is not None:
+                    await commit_page(*pending_write)
+                    pending_write = None
+            finally:
+                if next_page is not None and not next_page.done():
+                    next_page.cancel()
+                if pending_write is not None and not pending_write[0].done():
+                    # Terminer l'écriture en vol avant la fermeture du client HTTP ;
+                    # la page n'est pas checkpointée et sera réécrite à la reprise.
+                    await asyncio.gather(pending_write[0], return_exceptions=True)
+
+        completed = exhausted
+        if completed:
+            await self.checkpoint_store.clear(embedding_type)
+
+        summary["last_track_id"] = after_id
+        summary["completed"] = completed
+        summary["status"] = "success" if summary["failed"] == 0 else "partial"
+        summary["execution_time"] = time.time() - start_time
+        logger.info(
+            f"[EMBEDDING PIPELINE] Fin: {processed_this_run} pistes en {summary['pages']} pages, "
+            f"{summary['http_requests']} requêtes HTTP ({summary['execution_time']:.1f}s)"
+        )
+        return summary
+
+    async def close(self) -> None:
+        """Libère le thread d'encodage et la connexion Redis."""
+        self._executor.shutdown(wait=False)
+        await self.checkpoint_store.close()
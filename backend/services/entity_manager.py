@@ -486,59 +486,55 @@ async def create_or_get_artists_batch(client: httpx.AsyncClient, artists_data: L
             cleaned_artists_data.append(cleaned_artist)
 
         # Vérifier le cache avant les appels API
-        from backend.services.cache_service import cache_service
+        from backend.services.cache_service import artist_id_cache_key, cache_service
         cached_artists = {}
         artists_to_fetch = []
         artist_map = {}  # Initialiser artist_map
 
+        # Un seul aller-retour vers le cache partagé pour tout le lot
+        cached_by_key = await cache_service.aget_many(
+            "artist_ids", [artist_id_cache_key(artist['name']) for artist in cleaned_artists_data]
+        )
         for artist in cleaned_artists_data:
-            cache_key = f"artist:{artist['name'].lower()}"
-            cached = cache_service.get("lastfm", cache_key)
+            cached = cached_by_key.get(artist_id_cache_key(artist['name']))
             if cached:
                 cached_artists[artist['name'].lower()] = cached
                 logger.debug(f"[CACHE] Artiste trouvé en cache: {artist['name']}")
             else:
                 artists_to_fetch.append(artist)
 
-        # Traiter les artistes un par un avec upsert pour éviter les doublons
-        for artist in artists_to_fetch:
-            try:
-                mutation = """
-                mutation UpsertArtist($name: String!, $musicbrainzArtistid: String) {
-                    upsertArtist(data: {name: $name, musicbrainzArtistid: $musicbrainzArtistid}) {
-                        id
-                        name
-                        musicbrainzArtistid
-                    }
-                }
-                """
-
-                variables = {
-                    "name": artist['name'],
-                    "musicbrainzArtistid": artist.get('musicbrainzArtistid')
+        # Upsert de tous les artistes non cachés en une seule mutation (INSERT ... ON CONFLICT)
+        if artists_to_fetch:
+            mutation = """
+            mutation UpsertArtists($artists: [ArtistCreateInput!]!) {
+                upsertArtists(data: $artists) {
+                    id
+                    name
+                    musicbrainzArtistid
                 }
-                logger.debug(f"GraphQL variables for UpsertArtist: {variables}")
+            }
+            """
+            variables = {"artists": artists_to_fetch}
+            logger.debug(f"GraphQL variables for UpsertArtists: {variables}")
 
-                # Exécuter la requête GraphQL
+            try:
                 result = await execute_graphql_query(client, mutation, variables)
-
-                if "upsertArtist" in result:
-                    artist_result = result["upsertArtist"]
-                    key = (artist_result.get('musicbrainzArtistid') or artist_result['name'].lower())
-                    artist_map[key] = artist_result
-                    # Mettre en cache pour les futures requêtes
-                    cache_key = f"artist:{artist_result['name'].lower()}"
-                    cache_service.set("lastfm", cache_key, artist_result, ttl=3600)
-                    logger.debug(f"Artiste traité avec succès via upsert: {artist_result['name']}")
-                else:
-                    logger.error(f"Réponse GraphQL inattendue pour upsertArtist: {result}")
-
             except Exception as e:
-                logger.error(f"Erreur lors du upsert de l'artiste {artist.get('name')}: {str(e)}")
-                continue
+                logger.error(f"Erreur lors du upsert en batch des artistes: {str(e)}")
+                result = {}
+
+            if "upsertArtists" in result:
+                for artist_result in result["upsertArtists"]:
+                    artist_map[artist_result['name'].lower()] = artist_result
+                # Mettre en cache pour les futures requêtes (tous workers confondus)
+                await cache_service.aset_many("artist_ids", {
+                    artist_id_cache_key(name): artist_result for name, artist_result in artist_map.items()
+                })
+            else:
+                logger.error(f"Réponse GraphQL inattendue pour upsertArtists: {result}")
 
         if artist_map:
-            logger.info(f"{len(artist_map)} artistes traités avec succès via upsertArtist")
+            logger.info(f"{len(artist_map)} artistes traités avec succès via upsertArtists")
 
         # Combiner les résultats du cache et de l'API
         final_artist_map = {}
@@ -609,15 +605,19 @@ async def create_or_get_albums_batch(client: httpx.AsyncClient, albums_data: Lis
             return {}
 
         # Vérifier le cache avant les appels API
-        from backend.services.cache_service import cache_service
+        from backend.services.cache_service import album_id_cache_key, cache_service
         cached_albums = {}
         albums_to_fetch = []
         album_map = {}  # Initialiser album_map
 
+        # Clé de cache basée sur titre + artist_id, lue en un seul aller-retour
+        cached_by_key = await cache_service.aget_many("album_ids", [
+            album_id_cache_key(album['title'], album.get('album_artist_id', 'unknown'))
+            for album in cleaned_albums_data
+        ])
         for album in cleaned_albums_data:
-            # Créer une clé de cache basée sur titre + artist_id
-            cache_key = f"album:{album['title'].lower()}:{album.get('album_artist_id', 'unknown')}"
-            cached = cache_service.get("lastfm", cache_key)
+            cache_key = album_id_cache_key(album['title'], album.get('album_artist_id', 'unknown'))
+            cached = cached_by_key.get(cache_key)
             if cached:
                 cached_albums[cache_key] = cached
                 logger.debug(f"[CACHE] Album trouvé en cache: {album['title']} (clé: {cache_key})")
@@ -630,8 +630,8 @@ async def create_or_get_albums_batch(client: httpx.AsyncClient, albums_data: Lis
         # Construire la mutation GraphQL seulement pour les albums non cachés
         if albums_to_fetch:
             mutation = """
-            mutation CreateAlbums($albums: [AlbumCreateInput!]!) {
-                createAlbums(data: $albums) {
+            mutation UpsertAlbums($albums: [AlbumCreateInput!]!) {
+                upsertAlbums(data: $albums) {
                     id
                     title
                     albumArtistId
@@ -656,8 +656,9 @@ async def create_or_get_albums_batch(client: httpx.AsyncClient, albums_data: Lis
                 # Continuer avec les albums du cache si disponibles
                 result = {}
 
-            if "createAlbums" in result:
-                albums = result["createAlbums"]
+            if "upsertAlbums" in result:
+                albums = result["upsertAlbums"]
+                albums_to_cache = {}
                 # Clé: (titre, artist_id) ou mbid - UTILISER LES MÊMES CLÉS QUE DANS final_album_map
                 for album in albums:
                     # La réponse GraphQL retourne albumArtistId (camelCase)
@@ -672,10 +673,10 @@ async def create_or_get_albums_batch(client: httpx.AsyncClient, albums_data: Lis
                     
                     album_map[key] = album
                     # Mettre en cache pour les futures requêtes
-                    cache_key = f"album:{title}:{album_artist_id_from_response}"
-                    cache_service.set("lastfm", cache_key, album, ttl=3600)
+                    albums_to_cache[album_id_cache_key(title, album_artist_id_from_response)] = album
                     logger.debug(f"[ALBUM] Album ajouté au map: clé={key}, id={album.get('id')}")
-                
+
+                await cache_service.aset_many("album_ids", albums_to_cache)
                 logger.info(f"{len(albums)} albums traités avec succès en batch via GraphQL")
             else:
                 logger.error(f"[ALBUM] Réponse GraphQL inattendue ou erreur: {result}")
@@ -698,7 +699,7 @@ async def create_or_get_albums_batch(client: httpx.AsyncClient, albums_data: Lis
             else:
                 key = (title_lower, artist_id)
             
-            cache_key = f"album:{title_lower}:{artist_id}"
+            cache_key = album_id_cache_key(title_lower, artist_id)
             
             logger.debug(f"[ALBUM] Recherche album dans les résultats: titre='{album['title']}', key={key}, cache_key={cache_key}")
             
@@ -820,6 +821,10 @@ def clean_track_data(file: Dict) -> Dict:
         
         # Conserver les tags audio bruts pour l'enrichissement différé
         "tags": file.get("tags"),
+
+        # mtime/taille du fichier pour le scan incrémental
+        "file_mtime": safe_float(file.get("file_mtime")),
+        "file_size": file.get("file_size"),
     }
 
     # DIAGNOSTIC: Log pour vérifier les données entrantes
@@ -209,6 +209,51 @@ class HybridQueueService:
 
         return redis_success or local_success
 
+    def extend_lease(self, queue_name: str, task_id: str,
+                     seconds: Optional[int] = None) -> bool:
+        """Prolonge le bail d'une tâche, quel que soit le backend qui la détient."""
+        if self.redis_available and not self.fallback_active:
+            try:
+                if self._test_redis_connection() and self.redis_service.extend_lease(queue_name, task_id, seconds):
+                    return True
+            except Exception as e:
+                logger.warning(f"[HYBRID_QUEUE] Erreur prolongation bail Redis: {str(e)}")
+        return self.local_service.extend_lease(queue_name, task_id, seconds)
+
+    def reclaim_expired(self, queue_name: str, limit: int = 500) -> Dict[str, Any]:
+        """
+        Récupère les baux expirés sur les deux backends.
+
+        Returns:
+            {"requeued": n, "failed": n} cumulés Redis + local
+        """
+        totals = {"requeued": 0, "failed": 0}
+        results = []
+        if self.redis_available:
+            try:
+                if self._test_redis_connection():
+                    results.append(self.redis_service.reclaim_expired(queue_name, limit))
+            except Exception as e:
+                logger.warning(f"[HYBRID_QUEUE] Erreur récupération baux Redis: {str(e)}")
+        results.append(self.local_service.reclaim_expired(queue_name, limit))
+
+        for result in results:
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        return totals
+
+    def get_queue_metrics(self, queue_name: str) -> Dict[str, Any]:
+        """Métriques de débit et de retard des deux backends."""
+        metrics = {"queue_name": queue_name, "redis_metrics": {}, "local_metrics": {}}
+        if self.redis_available:
+            try:
+                if self._test_redis_connection():
+                    metrics["redis_metrics"] = self.redis_service.get_queue_metrics(queue_name)
+            except Exception as e:
+                logger.warning(f"[HYBRID_QUEUE] Erreur métriques Redis: {str(e)}")
+        metrics["local_metrics"] = self.local_service.get_queue_metrics(queue_name)
+        return metrics
+
     def get_queue_stats(self, queue_name: str) -> Dict[str, Any]:
         """
         Retourne les statistiques combinées.
@@ -1,14 +1,17 @@
 """
 Service de traitement d'images.
 Gère le traitement, la transformation et l'optimisation des images musicales.
+
+Le travail Pillow (décodage, redimensionnement, encodage) est exécuté dans le
+pool de processus image_transcode_pool pour ne pas bloquer la boucle asyncio
+des workers.
 """
 
-import io
 import base64
 import hashlib
 from typing import Dict, Any, Optional, Tuple
-from PIL import Image, ImageOps, ImageFilter
 import httpx
+from backend.api.utils.image_transcode_pool import image_transcode_pool, transcode_image
 from backend.api.utils.logging import logger
 from backend.services.image_service import read_image_file, process_cover_image, process_artist_image
 from backend.services.coverart_service import get_coverart_image
@@ -73,60 +76,48 @@ class ImageProcessingService:
             Dictionnaire avec les données traitées et métadonnées
         """
         try:
-            # Initialisation des variables
-            original_image = None
-            processed_data = None
-            mime_type = "image/jpeg"
-            
-            # Chargement de l'image
+            # Chargement des octets (le décodage Pillow se fait dans le pool)
             if image_data and image_data.startswith('data:image/'):
-                # Image en base64
-                original_image = await self._load_image_from_base64(image_data)
-                mime_type = image_data.split(';')[0].replace('data:', '')
+                image_bytes = self._decode_base64(image_data)
             elif image_path:
-                # Image depuis un fichier
                 image_bytes = await read_image_file(image_path)
-                if image_bytes:
-                    original_image = Image.open(io.BytesIO(image_bytes))
-                else:
+                if not image_bytes:
                     return {"error": "Impossible de charger l'image depuis le fichier"}
             else:
                 return {"error": "Aucune source d'image fournie"}
-            
-            if not original_image:
+
+            if not image_bytes:
                 return {"error": "Impossible de charger l'image"}
-            
-            # Traitement de l'image
-            processed_image = await self._process_image(
-                original_image, 
-                target_size, 
-                quality, 
-                apply_filters
-            )
-            
-            # Conversion en base64
-            processed_data, mime_type = await self._image_to_base64(
-                processed_image,
-                target_size,
-                quality
+
+            # Décodage, redimensionnement et encodage hors de la boucle asyncio
+            save_quality = quality or self.quality_settings.get(target_size, 85)
+            max_size = self.max_sizes.get(target_size) if target_size != "original" else None
+            transcoded = await image_transcode_pool.run(
+                transcode_image,
+                image_bytes,
+                max_size,
+                self.preferred_format,
+                save_quality,
+                apply_filters,
             )
-            
-            # Calcul des métadonnées
-            metadata = await self._extract_metadata(original_image, processed_image)
-            
+
+            mime_type = f"image/{self.preferred_format.lower()}"
+            encoded = base64.b64encode(transcoded["data"]).decode('utf-8')
+            metadata = self._build_metadata(transcoded["metadata"])
+
             return {
                 "status": "success",
-                "data": processed_data,
+                "data": f"data:{mime_type};base64,{encoded}",
                 "mime_type": mime_type,
                 "metadata": metadata,
                 "processing_info": {
-                    "original_size": original_image.size,
-                    "processed_size": processed_image.size,
+                    "original_size": metadata["original_dimensions"],
+                    "processed_size": metadata["processed_dimensions"],
                     "target_size": target_size,
-                    "quality": quality or self.quality_settings.get(target_size, 85)
+                    "quality": save_quality
                 }
             }
-            
+
         except Exception as e:
             logger.error(f"[IMAGE_PROCESSING] Erreur traitement image: {str(e)}")
             return {"error": str(e)}
@@ -247,42 +238,22 @@ class ImageProcessingService:
             Image optimisée et métadonnées
         """
         try:
-            original_image = await self._load_image_from_base64(image_data)
-            if not original_image:
+            image_bytes = self._decode_base64(image_data)
+            if not image_bytes:
                 return {"error": "Impossible de charger l'image"}
-            
-            # Redimensionnement si nécessaire
-            if max_size:
-                original_image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Conversion de format si nécessaire
-            if target_format.upper() != original_image.format:
-                if target_format.upper() == "JPEG":
-                    # Convertir en RGB pour JPEG
-                    if original_image.mode in ("RGBA", "P"):
-                        background = Image.new("RGB", original_image.size, (255, 255, 255))
-                        if original_image.mode == "P":
-                            original_image = original_image.convert("RGBA")
-                        background.paste(original_image, mask=original_image.split()[-1] if original_image.mode == "RGBA" else None)
-                        original_image = background
-                elif target_format.upper() == "WEBP":
-                    original_image = original_image.convert("RGB")
-            
-            # Sauvegarde optimisée
-            output_buffer = io.BytesIO()
-            save_kwargs = {
-                "format": target_format.upper(),
-                "optimize": True
-            }
-            
-            if target_format.upper() == "JPEG":
-                save_kwargs["quality"] = quality
-                save_kwargs["progressive"] = True
-            
-            original_image.save(output_buffer, **save_kwargs)
-            
+
+            # Redimensionnement et conversion de format dans le pool de transcodage
+            transcoded = await image_transcode_pool.run(
+                transcode_image,
+                image_bytes,
+                max_size,
+                target_format.upper(),
+                quality,
+                False,
+            )
+
             # Conversion en base64
-            optimized_data = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+            optimized_data = base64.b64encode(transcoded["data"]).decode('utf-8')
             optimized_mime_type = f"image/{target_format.lower()}"
             
             return {
@@ -299,17 +270,14 @@ class ImageProcessingService:
             logger.error(f"[IMAGE_PROCESSING] Erreur optimisation: {str(e)}")
             return {"error": str(e)}
     
-    async def _load_image_from_base64(self, image_data: str) -> Optional[Image.Image]:
-        """Charge une image depuis une chaîne base64."""
+    def _decode_base64(self, image_data: str) -> Optional[bytes]:
+        """Décode une image base64 (avec ou sans préfixe data:image/...)."""
         try:
             if image_data.startswith('data:image/'):
                 # Retirer le préfixe data:image/...;base64,
                 header, data = image_data.split(',', 1)
-                image_bytes = base64.b64decode(data)
-            else:
-                image_bytes = base64.b64decode(image_data)
-            
-            return Image.open(io.BytesIO(image_bytes))
+                return base64.b64decode(data)
+            return base64.b64decode(image_data)
             
         except Exception as e:
             logger.error(f"[IMAGE_PROCESSING] Erreur chargement base64: {e}")
@@ -327,100 +295,26 @@ class ImageProcessingService:
             logger.error(f"[IMAGE_PROCESSING] Erreur chargement local: {e}")
             return None
     
-    async def _process_image(
-        self, 
-        image: Image.Image, 
-        target_size: str, 
-        quality: Optional[int], 
-        apply_filters: bool
-    ) -> Image.Image:
-        """Traite l'image selon les paramètres."""
-        try:
-            processed_image = image.copy()
-            
-            # Redimensionnement
-            if target_size != "original" and target_size in self.max_sizes:
-                size = self.max_sizes[target_size]
-                if size:
-                    processed_image.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # Application de filtres si demandée
-            if apply_filters:
-                # Amélioration automatique du contraste
-                processed_image = ImageOps.autocontrast(processed_image)
-                # Réduction légère du bruit
-                processed_image = processed_image.filter(ImageFilter.SMOOTH_MORE)
-            
-            return processed_image
-            
-        except Exception as e:
-            logger.error(f"[IMAGE_PROCESSING] Erreur traitement: {e}")
-            return image
-    
-    async def _image_to_base64(self, image: Image.Image, target_size: str, quality: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
-        """Convertit une image PIL en base64 avec format complet."""
-        try:
-            output_buffer = io.BytesIO()
-
-            # Détermination du format et de la qualité
-            image_format = self.preferred_format
-            save_quality = quality or self.quality_settings.get(target_size, 85)
-
-            save_kwargs = {
-                "format": image_format,
-                "optimize": True
-            }
-
-            if image_format == "JPEG":
-                save_kwargs["quality"] = save_quality
-                save_kwargs["progressive"] = True
-
-            image.save(output_buffer, **save_kwargs)
-
-            # Conversion en base64 avec format complet
-            image_data = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-            mime_type = f"image/{image_format.lower()}"
-
-            # Retourner toujours le format complet data:image/...;base64,...
-            return f"data:{mime_type};base64,{image_data}", mime_type
-
-        except Exception as e:
-            logger.error(f"[IMAGE_PROCESSING] Erreur conversion base64: {e}")
-            return None, None
-    
-    async def _extract_metadata(
-        self, 
-        original_image: Image.Image, 
-        processed_image: Image.Image
-    ) -> Dict[str, Any]:
-        """Extrait les métadonnées d'une image."""
-        try:
-            metadata = {
-                "original_dimensions": original_image.size,
-                "processed_dimensions": processed_image.size,
-                "original_mode": original_image.mode,
-                "processed_mode": processed_image.mode,
-                "original_format": original_image.format,
-                "file_size_ratio": (
-                    processed_image.size[0] * processed_image.size[1] * len(processed_image.getbands()) /
-                    (original_image.size[0] * original_image.size[1] * len(original_image.getbands()))
-                    if original_image.size[0] * original_image.size[1] > 0 else 1.0
-                )
-            }
-            
-            # Informations EXF si disponibles
-            if hasattr(original_image, '_getexif') and original_image._getexif():  # type: ignore
-                exif_data = original_image._getexif()  # type: ignore
-                metadata["exif_available"] = True
-                metadata["exif_keys"] = list(exif_data.keys())
-            else:
-                metadata["exif_available"] = False
-            
-            return metadata
-            
-        except Exception as e:
-            logger.warning(f"[IMAGE_PROCESSING] Erreur extraction métadonnées: {e}")
-            return {"error": str(e)}
+    def _build_metadata(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Met en forme les métadonnées renvoyées par le pool de transcodage."""
+        original_w, original_h = info["original_dimensions"]
+        processed_w, processed_h = info["processed_dimensions"]
+        original_pixels = original_w * original_h * info["original_bands"]
+        metadata = {
+            "original_dimensions": info["original_dimensions"],
+            "processed_dimensions": info["processed_dimensions"],
+            "original_mode": info["original_mode"],
+            "processed_mode": info["processed_mode"],
+            "original_format": info["original_format"],
+            "file_size_ratio": (
+                processed_w * processed_h * info["processed_bands"] / original_pixels
+                if original_pixels > 0 else 1.0
+            ),
+            "exif_available": bool(info["exif_keys"]),
+        }
+        if info["exif_keys"]:
+            metadata["exif_keys"] = info["exif_keys"]
+        return metadata
 
 
 # Instance globale du service
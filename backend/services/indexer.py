@@ -3,6 +3,7 @@ import os
 import shutil
 from typing import Callable, Optional, Dict
 from backend.services.music_scan import scan_music_files
+from backend.services.metadata_extraction_engine import get_extraction_engine
 from backend.api.utils.logging import logger
 import httpx
 import json
@@ -59,7 +60,7 @@ class MusicIndexer:
             logger.info(f"Démarrage indexation Whoosh: {directory}")
             # Scan des fichiers
             files = []
-            async for file_data in scan_music_files(directory, scan_config):
+            async for file_data in scan_music_files(directory, scan_config, engine=get_extraction_engine()):
                 files.append(file_data)
             total_files = len(files)
 
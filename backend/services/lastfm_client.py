@@ -0,0 +1,442 @@
+# -*- coding: UTF-8 -*-
+"""
+Client Last.fm asynchrone à débit contrôlé.
+
+LastFMService enveloppe pylast, dont les appels sont bloquants : enrichir un
+lot d'artistes revenait à les traiter un par un, avec une pause fixe entre
+chacun. Ce client interroge directement l'API REST (JSON) avec httpx :
+
+- limiteur à seau de jetons partagé entre workers via Redis (script Lua,
+  horloge Redis) : les requêtes sont envoyées en parallèle mais jamais
+  au-delà de LASTFM_RATE_PER_SECOND ;
+- coalescence : des demandes simultanées pour le même artiste partagent
+  une seule requête ;
+- cache durable dans Redis, clé par MBID (ou nom normalisé), y compris les
+  réponses « artiste inconnu » pour une durée plus courte.
+
+Sans Redis, le limiteur retombe sur un seau local au processus et le cache
+durable est désactivé.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import redis.asyncio as redis
+
+from backend.api.utils.logging import logger
+
+LASTFM_API_URL = "https://ws.audioscrobbler.com/2.0/"
+
+# Les conditions d'utilisation de Last.fm demandent au plus 5 requêtes/s
+LASTFM_RATE_PER_SECOND = float(os.getenv("LASTFM_RATE_PER_SECOND", "5"))
+LASTFM_BURST = int(os.getenv("LASTFM_BURST", "5"))
+LASTFM_CONCURRENCY = int(os.getenv("LASTFM_CONCURRENCY", "16"))
+LASTFM_CACHE_TTL_SECONDS = int(os.getenv("LASTFM_CACHE_TTL_SECONDS", str(30 * 86400)))
+LASTFM_NEGATIVE_TTL_SECONDS = int(os.getenv("LASTFM_NEGATIVE_TTL_SECONDS", "86400"))
+LASTFM_REDIS_URL = os.getenv("LASTFM_REDIS_URL", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+LASTFM_MAX_ATTEMPTS = 3
+
+RATE_LIMIT_KEY = "lastfm:ratelimit"
+CACHE_PREFIX = "lastfm:v1"
+
+# Codes d'erreur Last.fm : 6 = ressource inconnue ; 8, 11, 16, 29 = erreurs
+# temporaires (échec, service indisponible, limite de débit dépassée)
+NOT_FOUND_ERRORS = {6}
+RETRYABLE_ERRORS = {8, 11, 16, 29}
+
+_MISSING = {"__missing__": True}
+
+# Seau de jetons avec réservation : un appel consomme toujours un jeton et
+# reçoit le délai (ms) à attendre avant d'envoyer sa requête. Le solde peut
+# devenir négatif, ce qui ordonne les requêtes sans boucle de réessai.
+# KEYS = seau ; ARGV = débit (jetons/s), capacité
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+local wait = 0
+if tokens < 0 then wait = math.ceil(-tokens * 1000 / rate) end
+redis.call('PEXPIRE', KEYS[1], wait + math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+
+class LastFMError(Exception):
+    """Erreur renvoyée par l'API Last.fm."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"Last.fm {code}: {message}")
+        self.code = code
+
+
+class TokenBucket:
+    """Seau de jetons partagé via Redis, avec repli local au processus."""
+
+    def __init__(self, rate: float, capacity: int, redis_client: Optional[redis.Redis] = None,
+                 key: str = RATE_LIMIT_KEY):
+        self.rate = rate
+        self.capacity = capacity
+        self.key = key
+        self.redis_client = redis_client
+        self._script = redis_client.register_script(_TOKEN_BUCKET_SCRIPT) if redis_client else None
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self.waited_seconds = 0.0
+
+    def _reserve_local(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate) - 1
+        self._updated = now
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> float:
+        """Réserve un jeton et attend son tour ; retourne l'attente en secondes."""
+        wait = None
+        if self._script is not None:
+            try:
+                wait = int(await self._script(keys=[self.key], args=[self.rate, self.capacity])) / 1000
+            except Exception as e:
+                logger.warning(f"[LASTFM] Limiteur Redis indisponible, repli local: {e}")
+        if wait is None:
+            wait = self._reserve_local()
+        if wait > 0:
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+        return wait
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Last.fm renvoie un objet seul au lieu d'une liste d'un élément."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _images(entries: Any) -> List[Dict[str, Any]]:
+    return [
+        {"size": image.get("size"), "url": image.get("#text")}
+        for image in _as_list(entries)
+        if image.get("size") and image.get("#text")
+    ]
+
+
+def parse_artist_info(data: Dict[str, Any], mb_artist_id: Optional[str] = None) -> Dict[str, Any]:
+    """Réponse artist.getInfo → format attendu par PUT /api/artists/{id}/lastfm-info."""
+    artist = data.get("artist", {})
+    stats = artist.get("stats", {})
+    return {
+        "url": artist.get("url"),
+        "listeners": int(stats.get("listeners") or 0),
+        "playcount": int(stats.get("playcount") or 0),
+        "tags": [tag.get("name") for tag in _as_list(artist.get("tags", {}).get("tag")) if tag.get("name")],
+        "bio": (artist.get("bio") or {}).get("content") or None,
+        "images": _images(artist.get("image")),
+        "fetched_at": datetime.utcnow().isoformat(),
+        "musicbrainz_id": mb_artist_id or artist.get("mbid") or None,
+    }
+
+
+def parse_similar_artists(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Réponse artist.getSimilar → [{"name", "url", "weight", "match"}]."""
+    similar = []
+    for entry in _as_list(data.get("similarartists", {}).get("artist")):
+        if not entry.get("name"):
+            continue
+        match = float(entry.get("match") or 0.0)
+        similar.append({"name": entry["name"], "url": entry.get("url"), "weight": match, "match": match})
+    return similar
+
+
+class LastFMClient:
+    """
+    Client REST Last.fm asynchrone (lecture seule).
+
+    Les instances sont partagées par les tâches d'un worker : le client HTTP,
+    la connexion Redis et la table des requêtes en vol sont créés à la demande.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        rate: float = LASTFM_RATE_PER_SECOND,
+        burst: int = LASTFM_BURST,
+        redis_url: Optional[str] = LASTFM_REDIS_URL,
+        redis_client: Optional[redis.Redis] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache_ttl: int = LASTFM_CACHE_TTL_SECONDS,
+        negative_ttl: int = LASTFM_NEGATIVE_TTL_SECONDS,
+    ):
+        self._api_key = api_key
+        self._api_key_lock: Optional[asyncio.Lock] = None
+        if redis_client is None and redis_url:
+            redis_client = redis.Redis.from_url(redis_url, socket_connect_timeout=2.0, socket_timeout=2.0)
+        self.redis_client = redis_client
+        self.bucket = TokenBucket(rate, burst, redis_client)
+        self._http = http_client
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    async def get_artist_info(self, artist_name: str, mb_artist_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Informations d'un artiste (None si inconnu de Last.fm)."""
+        params = self._artist_params(artist_name, mb_artist_id)
+        data = await self._cached(
+            self._cache_key("artist.getinfo", artist_name, mb_artist_id),
+            lambda: self._call("artist.getinfo", params),
+        )
+        return parse_artist_info(data, mb_artist_id) if data else None
+
+    async def get_similar_artists(self, artist_name: str, mb_artist_id: Optional[str] = None,
+                                  limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Artistes similaires (None si l'artiste est inconnu de Last.fm)."""
+        params = {**self._artist_params(artist_name, mb_artist_id), "limit": limit}
+        data = await self._cached(
+            self._cache_key("artist.getsimilar", artist_name, mb_artist_id, limit),
+            lambda: self._call("artist.getsimilar", params),
+        )
+        return parse_similar_artists(data) if data else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "rate_limit_wait_seconds": round(self.bucket.waited_seconds, 2)}
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # ------------------------------------------------------------------
+    # Cache durable et coalescence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _artist_params(artist_name: str, mb_artist_id: Optional[str]) -> Dict[str, Any]:
+        if mb_artist_id:
+            return {"mbid": mb_artist_id}
+        return {"artist": artist_name, "autocorrect": 1}
+
+    @staticmethod
+    def _cache_key(method: str, artist_name: str, mb_artist_id: Optional[str], *extra: Any) -> str:
+        identity = f"mbid:{mb_artist_id}" if mb_artist_id else f"name:{artist_name.strip().lower()}"
+        return ":".join([CACHE_PREFIX, method, identity, *map(str, extra)])
+
+    async def _cached(self, key: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._load(key, loader)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Évite « Future exception was never retrieved » sans attente concurrente
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        cached = await self._cache_get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return None if cached == _MISSING else cached
+
+        data = await loader()
+        await self._cache_set(key, data if data is not None else _MISSING,
+                              self.cache_ttl if data is not None else self.negative_ttl)
+        return data
+
+    async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.redis_client is None:
+            return None
+        try:
+            raw = await self.redis_client.get(key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"[LASTFM] Lecture du cache impossible ({key}): {e}")
+            return None
+
+    async def _cache_set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.set(key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning(f"[LASTFM] Écriture du cache impossible ({key}): {e}")
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _get_api_key(self) -> str:
+        if self._api_key:
+            return self._api_key
+        if self._api_key_lock is None:
+            self._api_key_lock = asyncio.Lock()
+        async with self._api_key_lock:
+            if not self._api_key:
+                api_url = os.getenv("API_URL", "http://api:8001")
+                async with httpx.AsyncClient(timeout=15.0) as client:
+                    response = await client.get(f"{api_url}/api/settings/lastfm_api_key")
+                    response.raise_for_status()
+                    self._api_key = response.json().get("value", "")
+                if not self._api_key:
+                    raise ValueError("Last.fm API key not configured in settings")
+        return self._api_key
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=15.0,
+                limits=httpx.Limits(max_connections=LASTFM_CONCURRENCY, max_keepalive_connections=LASTFM_CONCURRENCY),
+            )
+        return self._http
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Appel d'une méthode de l'API, à débit contrôlé.
+
+        Returns:
+            Corps JSON, ou None si la ressource est inconnue
+
+        Raises:
+            LastFMError: Erreur définitive ou persistante après LASTFM_MAX_ATTEMPTS essais
+        """
+        query = {**params, "method": method, "api_key": await self._get_api_key(), "format": "json"}
+        for attempt in range(1, LASTFM_MAX_ATTEMPTS + 1):
+            await self.bucket.acquire()
+            self.stats["requests"] += 1
+            try:
+                response = await self._client().get(LASTFM_API_URL, params=query)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise LastFMError(29 if response.status_code == 429 else 16, f"HTTP {response.status_code}")
+                data = response.json()
+                if "error" in data:
+                    raise LastFMError(int(data["error"]), data.get("message", ""))
+                return data
+            except LastFMError as e:
+                if e.code in NOT_FOUND_ERRORS:
+                    return None
+                if e.code not in RETRYABLE_ERRORS or attempt == LASTFM_MAX_ATTEMPTS:
+                    self.stats["errors"] += 1
+                    raise
+                error = e
+            except (httpx.TransportError, ValueError) as e:
+                if attempt == LASTFM_MAX_ATTEMPTS:
+                    self.stats["errors"] += 1
+                    raise LastFMError(16, str(e)) from e
+                error = e
+            self.stats["retries"] += 1
+            logger.warning(f"[LASTFM] {method} tentative {attempt} échouée ({error}), nouvel essai")
+            await asyncio.sleep(2 ** (attempt - 1))
+        return None
+
+
+async def fetch_and_store_artists(
+    artist_ids: List[int],
+    include_similar: bool = True,
+    client: Optional[LastFMClient] = None,
+    concurrency: int = LASTFM_CONCURRENCY,
+    similar_limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Enrichit un lot d'artistes depuis Last.fm et enregistre les résultats via l'API.
+
+    Les artistes sont traités en parallèle (au plus `concurrency` à la fois) ;
+    le rythme des requêtes Last.fm est fixé par le limiteur du client.
+
+    Args:
+        artist_ids: IDs des artistes
+        include_similar: Récupérer aussi les artistes similaires
+        client: Client Last.fm (défaut : instance partagée)
+        concurrency: Nombre d'artistes traités simultanément
+        similar_limit: Nombre d'artistes similaires demandés
+
+    Returns:
+        Compteurs et résultat par artiste
+    """
+    client = client or lastfm_client
+    library_url = os.getenv("API_URL", "http://api:8001")
+    slots = asyncio.Semaphore(max(1, concurrency))
+    started = time.monotonic()
+
+    async def process(api: httpx.AsyncClient, artist_id: int) -> Dict[str, Any]:
+        result = {"artist_id": artist_id, "info_fetched": False, "similar_fetched": False}
+        async with slots:
+            try:
+                response = await api.get(f"/api/artists/{artist_id}")
+                if response.status_code != 200:
+                    raise ValueError(f"Failed to get artist from API: {response.status_code}")
+                artist = response.json()
+                name, mb_artist_id = artist.get("name"), artist.get("musicbrainz_artistid")
+                if not name:
+                    raise ValueError(f"Artist {artist_id} not found in API")
+
+                info, similar = await asyncio.gather(
+                    client.get_artist_info(name, mb_artist_id),
+                    client.get_similar_artists(name, mb_artist_id, similar_limit) if include_similar else _none(),
+                )
+
+                if info:
+                    response = await api.put(f"/api/artists/{artist_id}/lastfm-info", json=info)
+                    result["info_fetched"] = response.status_code == 200
+                if similar:
+                    payload = [{"name": entry["name"], "weight": entry["weight"]} for entry in similar]
+                    response = await api.post(f"/api/artists/{artist_id}/similar", json=payload)
+                    result["similar_fetched"] = response.status_code == 200
+            except Exception as e:
+                logger.error(f"[LASTFM] Error processing artist {artist_id}: {e}")
+                result["error"] = str(e)
+        return result
+
+    async with httpx.AsyncClient(base_url=library_url, timeout=60.0) as api:
+        results = await asyncio.gather(*(process(api, artist_id) for artist_id in artist_ids))
+
+    successful = sum(
+        1 for result in results
+        if result["info_fetched"] and (result["similar_fetched"] or not include_similar)
+    )
+    duration = time.monotonic() - started
+    logger.info(
+        f"[LASTFM] Batch terminé: {successful}/{len(artist_ids)} artistes en {duration:.1f}s "
+        f"({client.get_stats()})"
+    )
+    return {
+        "success": True,
+        "total_artists": len(artist_ids),
+        "successful": successful,
+        "failed": len(artist_ids) - successful,
+        "duration_seconds": round(duration, 2),
+        "client_stats": client.get_stats(),
+        "results": list(results),
+    }
+
+
+async def _none() -> None:
+    return None
+
+
+lastfm_client = LastFMClient()
@@ -12,6 +12,20 @@ import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 from backend.api.utils.logging import logger
+from backend.services.queue_leases import (
+    METRICS_WINDOW_MINUTES,
+    VISIBILITY_TIMEOUT_SECONDS,
+    QueueThroughput,
+    reclaim_backoff,
+)
+
+# Colonnes ajoutées après la création initiale de la table
+_LATE_COLUMNS = {
+    "processing_started_at": "REAL",
+    "lease_expires_at": "REAL",
+    "completed_at": "REAL",
+    "migrated_at": "REAL",
+}
 
 
 class LocalFallbackQueueService:
@@ -23,6 +37,7 @@ class LocalFallbackQueueService:
     - Thread-safe avec locks
     - Auto-cleanup des tâches expirées
     - Monitoring mémoire
+    - Baux (visibility timeout) et récupération des tâches abandonnées
     - Migration automatique vers Redis quand disponible
     """
 
@@ -30,6 +45,7 @@ class LocalFallbackQueueService:
         """Initialise le service avec SQLite."""
         self.db_path = db_path
         self.lock = threading.Lock()
+        self.throughput = QueueThroughput()
         self._init_database()
         
         # Configuration RPi4
@@ -62,10 +78,25 @@ class LocalFallbackQueueService:
                     )
                 """)
                 
+                # Migration des bases créées avant ces colonnes
+                existing = {row[1] for row in conn.execute("PRAGMA table_info(deferred_tasks)")}
+                for column, column_type in _LATE_COLUMNS.items():
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE deferred_tasks ADD COLUMN {column} {column_type}")
+
+                # Tâches en cours antérieures aux baux : sans échéance, reclaim_expired
+                # ne les verrait jamais. Elles reçoivent un bail complet à partir de maintenant.
+                conn.execute(
+                    "UPDATE deferred_tasks SET lease_expires_at = ? "
+                    "WHERE status = 'processing' AND lease_expires_at IS NULL",
+                    (time.time() + VISIBILITY_TIMEOUT_SECONDS,),
+                )
+
                 # Index pour performance
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_status ON deferred_tasks(queue_name, status)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_process_at ON deferred_tasks(process_at)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_priority ON deferred_tasks(priority)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_lease ON deferred_tasks(status, lease_expires_at)")
                 
                 conn.commit()
                 logger.info("[LOCAL_QUEUE] Base de données initialisée avec succès")
@@ -169,6 +200,7 @@ class LocalFallbackQueueService:
                     ))
                     conn.commit()
 
+            self.throughput.record(queue_name, "enqueued")
             logger.info(f"[LOCAL_QUEUE] Tâche ajoutée: {queue_name} -> {task_id}")
             
             # Cleanup si nécessaire
@@ -208,15 +240,19 @@ class LocalFallbackQueueService:
                     
                     task_record = json.loads(row[0])
                     
-                    # Marquer comme en cours
+                    # Marquer comme en cours, sous bail
+                    now = time.time()
+                    task_record["lease_expires_at"] = now + VISIBILITY_TIMEOUT_SECONDS
                     conn.execute("""
                         UPDATE deferred_tasks 
                         SET status = 'processing', 
-                            processing_started_at = ?
+                            processing_started_at = ?,
+                            lease_expires_at = ?
                         WHERE id = ?
-                    """, (time.time(), task_record["id"]))
+                    """, (now, task_record["lease_expires_at"], task_record["id"]))
                     conn.commit()
                     
+                    self.throughput.record(queue_name, "dequeued")
                     logger.info(f"[LOCAL_QUEUE] Tâche défilée: {queue_name} -> {task_record['id']}")
                     return task_record
 
@@ -259,9 +295,11 @@ class LocalFallbackQueueService:
                         # Marquer comme terminée
                         conn.execute("""
                             UPDATE deferred_tasks 
-                            SET status = 'completed', completed_at = ?, error_message = ?
+                            SET status = 'completed', completed_at = ?, error_message = ?,
+                                lease_expires_at = NULL
                             WHERE id = ?
                         """, (time.time(), error_message, task_id))
+                        event = "completed"
                         logger.info(f"[LOCAL_QUEUE] Tâche terminée: {task_id}")
                     else:
                         # Retry si possible
@@ -271,26 +309,135 @@ class LocalFallbackQueueService:
                             
                             conn.execute("""
                                 UPDATE deferred_tasks 
-                                SET retries = ?, process_at = ?, status = 'pending', error_message = ?
+                                SET retries = ?, process_at = ?, status = 'pending', error_message = ?,
+                                    lease_expires_at = NULL
                                 WHERE id = ?
                             """, (new_retries, next_attempt, error_message, task_id))
+                            event = "retried"
                             logger.info(f"[LOCAL_QUEUE] Tâche retry: {task_id} (tentative {new_retries})")
                         else:
                             # Échec définitif
                             conn.execute("""
                                 UPDATE deferred_tasks 
-                                SET status = 'failed', completed_at = ?, error_message = ?
+                                SET status = 'failed', completed_at = ?, error_message = ?,
+                                    lease_expires_at = NULL
                                 WHERE id = ?
                             """, (time.time(), error_message, task_id))
+                            event = "failed"
                             logger.error(f"[LOCAL_QUEUE] Tâche échouée définitivement: {task_id}")
                     
                     conn.commit()
+                    self.throughput.record(queue_name, event)
                     return True
 
         except Exception as e:
             logger.error(f"[LOCAL_QUEUE] Erreur completion tâche: {str(e)}")
             return False
 
+    def extend_lease(self, queue_name: str, task_id: str,
+                     seconds: Optional[int] = None) -> bool:
+        """
+        Prolonge le bail d'une tâche en cours.
+
+        Returns:
+            False si la tâche n'est plus en cours (bail déjà récupéré)
+        """
+        try:
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.execute("""
+                        UPDATE deferred_tasks SET lease_expires_at = ?
+                        WHERE id = ? AND queue_name = ? AND status = 'processing'
+                    """, (time.time() + (seconds or VISIBILITY_TIMEOUT_SECONDS), task_id, queue_name))
+                    conn.commit()
+                    return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"[LOCAL_QUEUE] Erreur prolongation bail {task_id}: {str(e)}")
+            return False
+
+    def reclaim_expired(self, queue_name: str, limit: int = 500) -> Dict[str, Any]:
+        """
+        Remet en attente les tâches dont le bail a expiré.
+
+        Chaque expiration compte comme une tentative : la tâche repart avec un
+        délai croissant, ou passe en échec au-delà de max_retries.
+
+        Returns:
+            {"requeued": n, "failed": n}
+        """
+        try:
+            requeued = failed = 0
+            now = time.time()
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    rows = conn.execute("""
+                        SELECT id, retries, max_retries FROM deferred_tasks
+                        WHERE queue_name = ? AND status = 'processing' AND lease_expires_at <= ?
+                        LIMIT ?
+                    """, (queue_name, now, limit)).fetchall()
+
+                    for task_id, retries, max_retries in rows:
+                        if retries < max_retries:
+                            conn.execute("""
+                                UPDATE deferred_tasks
+                                SET status = 'pending', retries = ?, process_at = ?,
+                                    lease_expires_at = NULL, error_message = 'lease expired'
+                                WHERE id = ?
+                            """, (retries + 1, now + reclaim_backoff(retries + 1), task_id))
+                            requeued += 1
+                        else:
+                            conn.execute("""
+                                UPDATE deferred_tasks
+                                SET status = 'failed', completed_at = ?, lease_expires_at = NULL,
+                                    error_message = 'lease expired'
+                                WHERE id = ?
+                            """, (now, task_id))
+                            failed += 1
+                    conn.commit()
+
+            self.throughput.record(queue_name, "reclaimed", requeued)
+            self.throughput.record(queue_name, "failed", failed)
+            if requeued or failed:
+                logger.warning(
+                    f"[LOCAL_QUEUE] Baux expirés sur {queue_name}: {requeued} remise(s) en attente, {failed} échec(s)"
+                )
+            return {"requeued": requeued, "failed": failed}
+
+        except Exception as e:
+            logger.error(f"[LOCAL_QUEUE] Erreur récupération des baux: {str(e)}")
+            return {"error": str(e)}
+
+    def get_queue_metrics(self, queue_name: str,
+                          window_minutes: int = METRICS_WINDOW_MINUTES) -> Dict[str, Any]:
+        """Débit (compteurs en mémoire de ce processus) et retard de la queue."""
+        try:
+            now = time.time()
+            with self.lock:
+                with sqlite3.connect(self.db_path) as conn:
+                    pending, due, oldest_due = conn.execute("""
+                        SELECT COUNT(*), SUM(process_at <= ?), MIN(CASE WHEN process_at <= ? THEN process_at END)
+                        FROM deferred_tasks WHERE queue_name = ? AND status = 'pending'
+                    """, (now, now, queue_name)).fetchone()
+                    in_flight, expired = conn.execute("""
+                        SELECT COUNT(*), SUM(lease_expires_at <= ?)
+                        FROM deferred_tasks WHERE queue_name = ? AND status = 'processing'
+                    """, (now, queue_name)).fetchone()
+
+            return {
+                "queue_name": queue_name,
+                "backend": "local",
+                "pending": pending,
+                "due": due or 0,
+                "in_flight": in_flight,
+                "expired_leases": expired or 0,
+                "lag_seconds": round(now - oldest_due, 3) if oldest_due else 0.0,
+                "throughput": self.throughput.snapshot(queue_name, window_minutes),
+            }
+
+        except Exception as e:
+            logger.error(f"[LOCAL_QUEUE] Erreur métriques queue: {str(e)}")
+            return {"error": str(e)}
+
     def get_queue_stats(self, queue_name: str) -> Dict[str, Any]:
         """
         Retourne les statistiques d'une queue.
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur d'extraction de métadonnées basé sur un pool de processus.
+
+L'extraction Mutagen est essentiellement du parsing CPU (tags ID3/Vorbis/MP4) :
+exécutée dans des threads, elle reste sérialisée par le GIL. Ce moteur répartit
+les chemins par paquets (chunks) sur un ProcessPoolExecutor, borne le nombre de
+paquets en vol pour ne pas charger toute la bibliothèque en mémoire, et restitue
+les résultats au fil de l'eau sous forme de dictionnaires simples (picklables).
+
+Les fonctions d'extraction passées au moteur doivent être des fonctions
+module-level synchrones qui ouvrent Mutagen par chemin (aucun objet fichier,
+aucun objet Mutagen ne traverse la frontière de processus).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, List, Optional, Union
+
+from backend.api.utils.logging import logger
+
+DEFAULT_CHUNK_SIZE = 32
+
+
+def _extract_chunk(extract_fn: Callable[[str], Optional[dict]], paths: List[str]) -> List[dict]:
+    """
+    Extrait les métadonnées d'un paquet de chemins dans un processus du pool.
+
+    Args:
+        extract_fn: Fonction d'extraction module-level (chemin → dict ou None)
+        paths: Chemins du paquet
+
+    Returns:
+        Liste des métadonnées valides du paquet
+    """
+    results = []
+    for path in paths:
+        try:
+            metadata = extract_fn(path)
+        except Exception as e:
+            logger.error(f"[EXTRACT_ENGINE] Erreur extraction {path}: {e}")
+            continue
+        if metadata:
+            results.append(metadata)
+    return results
+
+
+class MetadataExtractionEngine:
+    """Pool de processus pour l'extraction de métadonnées par paquets."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_pending_chunks: Optional[int] = None,
+        mp_context: Optional[str] = None,
+    ):
+        """
+        Initialise le moteur (le pool est créé paresseusement).
+
+        Args:
+            max_workers: Nombre de processus (SCAN_EXTRACT_WORKERS ou os.cpu_count())
+            chunk_size: Nombre de fichiers par paquet (SCAN_EXTRACT_CHUNK_SIZE)
+            max_pending_chunks: Paquets en vol maximum (par défaut 2 × max_workers)
+            mp_context: Méthode de démarrage multiprocessing (SCAN_EXTRACT_MP_CONTEXT, "spawn")
+        """
+        self.max_workers = max_workers or int(os.getenv("SCAN_EXTRACT_WORKERS", 0)) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or int(os.getenv("SCAN_EXTRACT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+        self.max_pending_chunks = max_pending_chunks or self.max_workers * 2
+        self.mp_context = mp_context or os.getenv("SCAN_EXTRACT_MP_CONTEXT", "spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "files_submitted": 0,
+            "files_extracted": 0,
+            "chunks_completed": 0,
+            "chunks_failed": 0,
+            "extraction_time": 0.0,
+        }
+
+    def start(self) -> ProcessPoolExecutor:
+        """Démarre le pool de processus s'il ne l'est pas déjà."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+            )
+            logger.info(
+                f"[EXTRACT_ENGINE] Pool démarré: {self.max_workers} processus, "
+                f"paquets de {self.chunk_size} fichiers"
+            )
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de processus."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            logger.info("[EXTRACT_ENGINE] Pool arrêté")
+
+    async def __aenter__(self) -> "MetadataExtractionEngine":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+    async def _chunks(self, paths: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[List[str]]:
+        """Découpe un itérable (synchrone ou asynchrone) de chemins en paquets."""
+        chunk: List[str] = []
+        if hasattr(paths, "__aiter__"):
+            async for path in paths:
+                chunk.append(path)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        else:
+            for path in paths:
+                chunk.append(path)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    async def extract_paths(
+        self,
+        paths: Union[Iterable[str], AsyncIterable[str]],
+        extract_fn: Callable[[str], Optional[dict]],
+    ) -> AsyncIterator[dict]:
+        """
+        Extrait les métadonnées des chemins et les restitue au fil de l'eau.
+
+        Le nombre de paquets soumis au pool est borné par max_pending_chunks :
+        la lecture de la source de chemins est suspendue tant que le pool est plein.
+        L'ordre des résultats n'est pas garanti.
+
+        Args:
+            paths: Chemins (itérable ou itérable asynchrone)
+            extract_fn: Fonction module-level picklable (chemin → dict ou None)
+
+        Yields:
+            Dictionnaires de métadonnées
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.start()
+        pending: set[asyncio.Future] = set()
+        start_time = time.time()
+
+        async def drain(return_when) -> AsyncIterator[dict]:
+            nonlocal pending
+            done, pending = await asyncio.wait(pending, return_when=return_when)
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self.stats["chunks_failed"] += 1
+                    logger.error(f"[EXTRACT_ENGINE] Paquet en échec: {e}")
+                    continue
+                self.stats["chunks_completed"] += 1
+                self.stats["files_extracted"] += len(results)
+                for metadata in results:
+                    yield metadata
+
+        try:
+            async for chunk in self._chunks(paths):
+                self.stats["files_submitted"] += len(chunk)
+                pending.add(loop.run_in_executor(executor, _extract_chunk, extract_fn, chunk))
+                if len(pending) >= self.max_pending_chunks:
+                    async for metadata in drain(asyncio.FIRST_COMPLETED):
+                        yield metadata
+
+            while pending:
+                async for metadata in drain(asyncio.FIRST_COMPLETED):
+                    yield metadata
+        finally:
+            for future in pending:
+                future.cancel()
+            self.stats["extraction_time"] += time.time() - start_time
+
+    async def extract_all(
+        self,
+        paths: Union[Iterable[str], AsyncIterable[str]],
+        extract_fn: Callable[[str], Optional[dict]],
+    ) -> List[dict]:
+        """Variante de extract_paths qui collecte tous les résultats dans une liste."""
+        return [metadata async for metadata in self.extract_paths(paths, extract_fn)]
+
+
+_engine: Optional[MetadataExtractionEngine] = None
+
+
+def get_extraction_engine() -> MetadataExtractionEngine:
+    """Retourne le moteur d'extraction partagé du processus worker."""
+    global _engine
+    if _engine is None:
+        _engine = MetadataExtractionEngine()
+    return _engine
+
+
+def shutdown_extraction_engine() -> None:
+    """Arrête le moteur d'extraction partagé (appelé à l'arrêt du worker)."""
+    global _engine
+    if _engine is not None:
+        _engine.shutdown()
+        _engine = None
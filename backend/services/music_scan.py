@@ -18,6 +18,7 @@ Changements :
 from pathlib import Path
 from mutagen._file import File
 import mimetypes
+import io
 from mutagen.mp3 import MP3
 from mutagen.flac import FLAC
 import os
@@ -27,7 +28,17 @@ from backend.services.settings_service import SettingsService, ALBUM_COVER_FILES
 import json
 import aiofiles
 import asyncio
+import functools
 import psutil
+from backend.services.scan_manifest import ScanManifest, FILE_UNCHANGED
+from backend.services.metadata_extraction_engine import MetadataExtractionEngine
+from backend.services.scan_pipeline import ScanPipeline
+
+# Taille du tampon de lecture pour l'ouverture Mutagen bornée (lectures d'en-têtes)
+TAG_READ_BUFFER_SIZE = 16 * 1024
+
+# Nombre maximum de chemins/métadonnées en attente entre deux étapes du scan
+SCAN_QUEUE_SIZE = int(os.getenv("SCAN_QUEUE_SIZE", 100))
 
 
 
@@ -158,9 +169,9 @@ def get_file_type(file_path: str) -> str:
         return "unknown"
 
 
-async def secure_open_file(file_path: Path, mode: str = 'rb', allowed_base_paths: list[Path] | None = None) -> bytes | None:
+def validate_secure_path(file_path: Path, mode: str = 'rb', allowed_base_paths: list[Path] | None = None) -> Path | None:
     """
-    Ouvre un fichier de manière sécurisée avec validation complète et renforcée.
+    Valide un chemin de fichier avant ouverture (validation complète et renforcée).
 
     Args:
         file_path: Chemin du fichier à ouvrir
@@ -168,7 +179,7 @@ async def secure_open_file(file_path: Path, mode: str = 'rb', allowed_base_paths
         allowed_base_paths: Liste des répertoires de base autorisés (optionnel)
 
     Returns:
-        Contenu du fichier en bytes ou None si erreur ou validation échouée
+        Chemin résolu et validé, ou None si la validation échoue
     """
     try:
         logger.debug(f"[SECURE_OPEN_FILE] Début validation pour: {file_path}, allowed_base_paths: {allowed_base_paths}")
@@ -344,26 +355,129 @@ async def secure_open_file(file_path: Path, mode: str = 'rb', allowed_base_paths
             logger.warning(f"[SECURE_OPEN_FILE] Erreur lors de la double validation: {e}")
             return None
 
-        # ÉTAPE 11: Ouverture sécurisée du fichier
-        logger.info(f"[SECURE_OPEN_FILE] Ouverture sécurisée du fichier: {final_resolved_path} (mode: {mode})")
         # DIAGNOSTIC: Logger le chemin résolu pour détecter les traversées potentielles
         logger.debug(f"[SECURE_OPEN_FILE] DIAGNOSTIC: Chemin résolu avant ouverture: {final_resolved_path}")
         # LOG DEBUG: Diagnostic pour Path Traversal (niveau debug pour éviter le bruit)
         logger.debug(f"[PATH_TRAVERSAL_DIAG] Ouverture de fichier - Chemin final: {str(final_resolved_path)}, allowed_base_paths: {[str(p) for p in allowed_base_paths] if allowed_base_paths else 'None'}")
-        try:
-            async with aiofiles.open(final_resolved_path, mode=mode) as f:
-                content = await f.read()
-                logger.debug(f"[SECURE_OPEN_FILE] Fichier lu avec succès: {len(content)} bytes")
-                return content
-        except Exception as e:
-            logger.error(f"[SECURE_OPEN_FILE] Erreur lors de la lecture du fichier {final_resolved_path}: {e}")
-            return None
+        return final_resolved_path
 
     except Exception as e:
         logger.error(f"[SECURE_OPEN_FILE] Erreur inattendue lors du traitement de {file_path}: {e}")
         return None
 
 
+async def secure_open_file(file_path: Path, mode: str = 'rb', allowed_base_paths: list[Path] | None = None) -> bytes | None:
+    """
+    Ouvre un fichier de manière sécurisée avec validation complète et renforcée.
+
+    Args:
+        file_path: Chemin du fichier à ouvrir
+        mode: Mode d'ouverture du fichier (restreint aux modes sécurisés)
+        allowed_base_paths: Liste des répertoires de base autorisés (optionnel)
+
+    Returns:
+        Contenu du fichier en bytes ou None si erreur ou validation échouée
+    """
+    final_resolved_path = validate_secure_path(file_path, mode, allowed_base_paths)
+    if final_resolved_path is None:
+        return None
+
+    # ÉTAPE 11: Ouverture sécurisée du fichier
+    logger.info(f"[SECURE_OPEN_FILE] Ouverture sécurisée du fichier: {final_resolved_path} (mode: {mode})")
+    try:
+        async with aiofiles.open(final_resolved_path, mode=mode) as f:
+            content = await f.read()
+            logger.debug(f"[SECURE_OPEN_FILE] Fichier lu avec succès: {len(content)} bytes")
+            return content
+    except Exception as e:
+        logger.error(f"[SECURE_OPEN_FILE] Erreur lors de la lecture du fichier {final_resolved_path}: {e}")
+        return None
+
+
+class CountingFileIO(io.FileIO):
+    """FileIO en lecture seule qui comptabilise les octets réellement lus sur le disque."""
+
+    def __init__(self, file, mode: str = 'rb'):
+        super().__init__(file, mode)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = super().read(size)
+        if data:
+            self.bytes_read += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        data = super().readall()
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        count = super().readinto(buffer)
+        if count:
+            self.bytes_read += count
+        return count
+
+
+def open_audio_bounded(file_path: Path, allowed_base_paths: list[Path] | None = None):
+    """
+    Ouvre un fichier audio avec Mutagen en ne lisant que les blocs d'en-tête/tags.
+
+    Contrairement à secure_open_file, le fichier n'est pas chargé en mémoire :
+    Mutagen travaille directement sur un descripteur et ne lit que les blocs
+    dont il a besoin (ID3, blocs METADATA FLAC, atomes MP4...). Les mêmes
+    validations de chemin que secure_open_file sont appliquées.
+
+    Args:
+        file_path: Chemin du fichier audio
+        allowed_base_paths: Liste des répertoires de base autorisés
+
+    Returns:
+        Tuple (objet Mutagen ou None, nombre d'octets lus)
+    """
+    resolved_path = validate_secure_path(file_path, 'rb', allowed_base_paths)
+    if resolved_path is None:
+        return None, 0
+
+    raw = CountingFileIO(resolved_path)
+    try:
+        with io.BufferedReader(raw, buffer_size=TAG_READ_BUFFER_SIZE) as fileobj:
+            audio = File(fileobj, easy=False)
+    finally:
+        raw.close()
+    logger.debug(f"[SCAN_IO] {resolved_path}: {raw.bytes_read} octets lus")
+    return audio, raw.bytes_read
+
+
+class ScanIOStats:
+    """Compteurs d'I/O du scan : octets lus par Mutagen vs taille des fichiers."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.files = 0
+        self.bytes_read = 0
+        self.bytes_total = 0
+
+    def record(self, bytes_read: int, file_size: int | None) -> None:
+        self.files += 1
+        self.bytes_read += bytes_read
+        self.bytes_total += file_size or 0
+
+    def snapshot(self) -> dict:
+        ratio = self.bytes_read / self.bytes_total if self.bytes_total else 0.0
+        return {
+            "files": self.files,
+            "bytes_read": self.bytes_read,
+            "bytes_total": self.bytes_total,
+            "read_ratio": round(ratio, 4),
+        }
+
+
+scan_io_stats = ScanIOStats()
+
+
 async def get_cover_art(file_path_str: str, audio, allowed_base_paths: list[Path] | None = None):
     """Récupère la pochette d'album d'un objet audio Mutagen."""
     try:
@@ -570,6 +684,11 @@ def get_musicbrainz_tags(audio):
 
 async def extract_metadata(audio, file_path_str: str, allowed_base_paths: list[Path] | None = None):
     """Extrait les métadonnées d'un objet audio Mutagen (sans covers pour optimisation)."""
+    return build_metadata(audio, file_path_str)
+
+
+def build_metadata(audio, file_path_str: str) -> dict:
+    """Version synchrone de extract_metadata, utilisable hors boucle asyncio (process pool)."""
     try:
         # Extraire les métadonnées musicales de base (sans covers)
         # Récupérer les genres multiples et les splitter
@@ -955,18 +1074,12 @@ async def process_file(file_path_bytes, scan_config: dict):
                 logger.warning(f"Tentative de traversée de répertoire détectée: {file_path_str}")
                 return None
 
-            # DIAGNOSTIC: Log path before secure_open_file in process_file
+            # DIAGNOSTIC: Log path before open_audio_bounded in process_file
             logger.debug(f"[PATH_TRAVERSAL_DIAG] process_file - Avant ouverture sécurisée: current_path={str(current_path)}, allowed_base_paths={[str(p) for p in allowed_base_paths] if allowed_base_paths else 'None'}")
-            # SECURITY: Utiliser la fonction sécurisée pour ouvrir le fichier
-            file_content = await secure_open_file(current_path, 'rb', allowed_base_paths=allowed_base_paths)
-            if file_content is None:
-                logger.error(f"Impossible d'ouvrir le fichier de manière sécurisée: {file_path_str}")
-                return None
-
-            # Utiliser le contenu du fichier avec mutagen via un flux mémoire
-            from io import BytesIO
-            file_buffer = BytesIO(file_content)
-            audio = await loop.run_in_executor(None, lambda: File(file_buffer, easy=False))
+            # SECURITY: Ouverture validée, lecture bornée aux blocs d'en-tête/tags
+            audio, bytes_read = await loop.run_in_executor(
+                None, open_audio_bounded, current_path, allowed_base_paths
+            )
         except FileNotFoundError:
             logger.error(f"Fichier non trouvé: {file_path_str}")
             return None
@@ -989,6 +1102,15 @@ async def process_file(file_path_bytes, scan_config: dict):
 
         metadata = await extract_metadata(audio, file_path_str, allowed_base_paths=allowed_base_paths)
         metadata["artist_path"] = artist_path_str
+        metadata["bytes_read"] = bytes_read
+
+        # mtime/taille pour la détection des changements lors des scans incrémentaux
+        try:
+            stat_result = current_path.stat()
+            metadata["file_mtime"] = stat_result.st_mtime
+            metadata["file_size"] = stat_result.st_size
+        except OSError as e:
+            logger.debug(f"Stat impossible pour {file_path_str}: {e}")
 
         logger.debug(f"Métadonnées extraites pour {file_path_str} : {metadata.keys()}")
 
@@ -1012,12 +1134,85 @@ async def process_file(file_path_bytes, scan_config: dict):
         return None
 
 
+def read_file_metadata(file_path_str: str, scan_config: dict) -> dict | None:
+    """
+    Lit les métadonnées d'un fichier en ouvrant Mutagen directement sur le chemin.
+
+    Fonction synchrone et sans état, destinée à être exécutée dans un process
+    pool : Mutagen ne lit que les blocs dont il a besoin au lieu de charger le
+    fichier complet en mémoire (open_audio_bounded). Les mêmes validations de
+    chemin que process_file sont appliquées (sanitisation, répertoire de base, extension).
+
+    Args:
+        file_path_str: Chemin du fichier tel que découvert par le walk
+        scan_config: Configuration du scan (base_directory, music_extensions, artist_depth)
+
+    Returns:
+        Dictionnaire de métadonnées ou None si le fichier est rejeté/illisible
+    """
+    try:
+        sanitized_path = sanitize_path(file_path_str)
+    except ValueError as e:
+        logger.warning(f"Chemin rejeté par sanitisation: {file_path_str} - {e}")
+        return None
+
+    if not scan_config.get("base_directory"):
+        logger.error("Pas de répertoire de base configuré pour la validation de sécurité")
+        return None
+
+    if file_path_str.startswith('\\') or '/../' in file_path_str or file_path_str.endswith('/..'):
+        logger.warning(f"Chemin de fichier potentiellement dangereux: {file_path_str}")
+        return None
+
+    try:
+        base_dir = Path(scan_config["base_directory"]).resolve()
+        resolved_path = Path(sanitized_path)
+        if not resolved_path.is_relative_to(base_dir):
+            logger.warning(f"Tentative de traversée de répertoire détectée: {file_path_str}")
+            return None
+        if not resolved_path.is_file():
+            logger.warning(f"Fichier non trouvé ou invalide: {file_path_str}")
+            return None
+        if resolved_path.suffix.lower().encode('utf-8') not in scan_config["music_extensions"]:
+            logger.debug(f"Extension non musicale ignorée: {file_path_str}")
+            return None
+
+        audio, bytes_read = open_audio_bounded(resolved_path, allowed_base_paths=[base_dir])
+        if audio is None:
+            logger.warning(f"Impossible de lire les données audio du fichier: {file_path_str}")
+            return None
+
+        metadata = build_metadata(audio, file_path_str)
+        metadata["bytes_read"] = bytes_read
+
+        file_path = Path(file_path_str)
+        parts = file_path.parts
+        artist_depth = scan_config.get("artist_depth", 0)
+        artist_path = Path(*parts[:artist_depth]) if artist_depth > 0 and len(parts) > artist_depth else file_path.parent
+        metadata["artist_path"] = str(artist_path)
+
+        stat_result = resolved_path.stat()
+        metadata["file_mtime"] = stat_result.st_mtime
+        metadata["file_size"] = stat_result.st_size
+        return metadata
+
+    except Exception as e:
+        logger.error(f"Erreur de lecture Mutagen pour {file_path_str}: {e}")
+        return None
+
+
 async def async_walk(path: Path):
     """Générateur asynchrone pour parcourir les fichiers, basé sur os.walk."""
     loop = asyncio.get_running_loop()
     resolved_base = path.resolve()
-
-    for dirpath, dirnames, filenames in await loop.run_in_executor(None, os.walk, path):
+    walker = os.walk(path)
+
+    while True:
+        # Un répertoire à la fois hors de la boucle : le walk reste paresseux et non bloquant
+        entry = await loop.run_in_executor(None, next, walker, None)
+        if entry is None:
+            break
+        dirpath, dirnames, filenames = entry
         # SECURITY: Validate current directory is within base path
         current_dir = Path(dirpath).resolve()
         try:
@@ -1046,40 +1241,99 @@ async def async_walk(path: Path):
                 file_path = os.path.join(dirpath, filename)
                 yield file_path.encode('utf-8', 'surrogateescape')
 
-async def scan_music_files(directory: str, scan_config: dict):
-    """Générateur asynchrone ultra-optimisé qui scanne les fichiers musicaux."""
+async def scan_music_files(
+    directory: str,
+    scan_config: dict,
+    manifest: ScanManifest | None = None,
+    engine: MetadataExtractionEngine | None = None,
+):
+    """Générateur asynchrone ultra-optimisé qui scanne les fichiers musicaux.
+
+    Si un manifeste est fourni (scan incrémental), chaque fichier est d'abord
+    comparé au manifeste via un simple stat : seuls les fichiers nouveaux ou
+    modifiés sont ouverts par Mutagen. Les fichiers disparus sont ensuite
+    disponibles via manifest.vanished().
+
+    Si un moteur d'extraction est fourni, le parsing Mutagen est réparti sur
+    son pool de processus (read_file_metadata) ; les images d'artistes sont
+    ensuite récupérées dans le processus courant, une fois par dossier artiste.
+    """
     path = Path(directory)
+    scan_io_stats.reset()
 
-    # Réduire la parallélisation pour éviter surcharge mémoire RPi4
-    semaphore = asyncio.Semaphore(20)  # Réduit de 100 à 20 pour RPi4
+    if engine is not None:
+        source = _scan_with_engine(path, scan_config, manifest, engine)
+    else:
+        source = _scan_with_tasks(path, scan_config, manifest)
 
-    async def process_and_yield(file_path_bytes):
-        async with semaphore:
-            return await process_file(
-                file_path_bytes, scan_config
-            )
+    async for metadata in source:
+        scan_io_stats.record(metadata.get("bytes_read", 0), metadata.get("file_size"))
+        yield metadata
 
-    # Optimiser le batching pour réduire la surcharge asyncio
-    tasks = []
-    batch_size = 50  # Réduit de 200 à 50 pour RPi4
+    logger.info(f"[SCAN_IO] Octets lus par Mutagen: {scan_io_stats.snapshot()}")
+    if manifest is not None:
+        logger.info(f"[SCAN] Scan incrémental terminé: {manifest.stats}, {len(manifest.vanished())} fichiers disparus")
 
+
+async def _candidate_paths(path: Path, scan_config: dict, manifest: ScanManifest | None):
+    """Discovery : chemins (bytes) des fichiers musicaux à (ré)analyser."""
     async for file_path_bytes in async_walk(path):
         file_suffix = Path(file_path_bytes.decode('utf-8', 'surrogateescape')).suffix.lower().encode('utf-8')
-        if file_suffix in scan_config["music_extensions"]:
-            tasks.append(process_and_yield(file_path_bytes))
-            if len(tasks) >= batch_size:
-                results = await asyncio.gather(*tasks)
-                for res in results:
-                    if res:
-                        yield res
-                tasks = []
-
-    # Traiter les tâches restantes
-    if tasks:
-        results = await asyncio.gather(*tasks)
-        for res in results:
-            if res:
-                yield res
+        if file_suffix not in scan_config["music_extensions"]:
+            continue
+        if manifest is not None and not _needs_processing(file_path_bytes, manifest):
+            continue
+        yield file_path_bytes
+
+
+async def _scan_with_tasks(path: Path, scan_config: dict, manifest: ScanManifest | None):
+    """Walk + extraction Mutagen par des workers asyncio sur files bornées."""
+    async def extract(file_path_bytes):
+        return await process_file(file_path_bytes, scan_config)
+
+    # 20 workers d'extraction pour éviter la surcharge mémoire RPi4
+    pipeline = ScanPipeline(extract=extract, extract_workers=20, queue_size=SCAN_QUEUE_SIZE)
+    async for metadata in pipeline.stream(_candidate_paths(path, scan_config, manifest)):
+        yield metadata
+
+
+async def _scan_with_engine(path: Path, scan_config: dict, manifest: ScanManifest | None, engine):
+    """Walk + extraction Mutagen dans le pool de processus du moteur."""
+    async def candidate_paths():
+        async for file_path_bytes in _candidate_paths(path, scan_config, manifest):
+            yield file_path_bytes.decode('utf-8', 'surrogateescape')
+
+    allowed_base_paths = [Path(scan_config["base_directory"]).resolve()]
+    artist_images_cache: dict[str, list] = {}
+    pipeline = ScanPipeline(
+        engine=engine,
+        engine_extract_fn=functools.partial(read_file_metadata, scan_config=scan_config),
+        queue_size=SCAN_QUEUE_SIZE,
+    )
+
+    async for metadata in pipeline.stream(candidate_paths()):
+        # Les fichiers d'un même dossier partagent le même dossier artiste
+        folder = str(Path(metadata["path"]).parent)
+        if folder not in artist_images_cache:
+            artist_result = await extract_artist_images(metadata["path"], allowed_base_paths=allowed_base_paths)
+            artist_images_cache[folder] = (artist_result or {}).get("artist_images") or []
+        if artist_images_cache[folder]:
+            metadata["artist_images"] = artist_images_cache[folder]
+        yield metadata
+
+
+def _needs_processing(file_path_bytes: bytes, manifest: ScanManifest) -> bool:
+    """Indique si un fichier doit être (ré)analysé d'après le manifeste de scan."""
+    file_path_str = file_path_bytes.decode('utf-8', 'surrogateescape')
+    try:
+        stat_result = os.stat(file_path_bytes)
+    except OSError as e:
+        # Fichier présent mais illisible : ne pas le considérer comme disparu
+        logger.debug(f"Stat impossible pour {file_path_str}: {e}")
+        manifest.mark_seen(file_path_str)
+        return False
+    return manifest.classify(file_path_str, stat_result.st_mtime, stat_result.st_size) != FILE_UNCHANGED
+
 
 def get_tag_list(audio, tag_name: str) -> list:
     """Récupère une liste de tags."""
@@ -269,6 +269,37 @@ class OllamaEmbeddingService:
             logger.error(f"[EMBEDDING] Exception stockage track {track_id}: {e}")
             return False
 
+    async def store_embeddings_batch(
+        self, embeddings: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Stocke les embeddings d'un lot de tracks en un seul appel API.
+
+        Args:
+            embeddings: Dicts avec 'track_id' et 'embedding'
+
+        Returns:
+            Compteurs successful/failed renvoyés par l'API
+        """
+        try:
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                response = await client.post(
+                    f"{self.library_api_url}/api/tracks/embeddings/batch",
+                    json={
+                        "items": embeddings,
+                        "embedding_type": "semantic",
+                        "embedding_source": "sentence-transformers",
+                        "embedding_model": self.MODEL_NAME,
+                    },
+                )
+                if response.status_code == 200:
+                    return response.json()
+                logger.error(
+                    f"[EMBEDDING] Erreur stockage batch: {response.status_code}"
+                )
+        except Exception as e:
+            logger.error(f"[EMBEDDING] Exception stockage batch: {e}")
+        return {'successful': 0, 'failed': len(embeddings), 'total': len(embeddings)}
+
     async def vectorize_track(
         self, track_id: int, track_data: Dict[str, Any] = None
     ) -> Dict[str, Any]:
@@ -375,18 +406,14 @@ class OllamaEmbeddingService:
                 except Exception:
                     embeddings.append([0.0] * self.EMBEDDING_DIMENSION)
 
-        # Stocker les embeddings
-        successful = 0
-        failed = 0
-
-        for track, embedding in zip(tracks_data, embeddings):
-            track_id = track.get('id')
-            if track_id:
-                success = await self.store_embedding_to_database(track_id, embedding)
-                if success:
-                    successful += 1
-                else:
-                    failed += 1
+        # Stocker les embeddings en un seul appel
+        stored = await self.store_embeddings_batch([
+            {'track_id': track['id'], 'embedding': embedding}
+            for track, embedding in zip(tracks_data, embeddings)
+            if track.get('id')
+        ])
+        successful = stored.get('successful', 0)
+        failed = stored.get('failed', 0)
 
         result = {
             'status': 'success' if failed == 0 else 'partial',
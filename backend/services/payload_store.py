@@ -0,0 +1,292 @@
+"""
+Claim-check des gros payloads échangés entre étapes TaskIQ.
+
+La pipeline de scan (extract_metadata → batch.process_entities →
+insert.direct_batch) se passait les listes complètes de métadonnées (tags,
+références d'images) en arguments JSON dans les listes Redis du broker. Ici,
+un payload volumineux est écrit une seule fois, sérialisé en msgpack et
+compressé (zstd, zlib à défaut), dans un store à TTL ; seul un handle voyage
+dans le message :
+
+    {"__claim_check__": 1, "key": "...", "backend": "redis", "codec": "zstd", ...}
+
+Le consommateur récupère le payload à la demande (resolve) et le libère une
+fois le traitement terminé (release). Un payload non libéré (tâche en échec)
+expire avec son TTL.
+
+Backends :
+- redis : SET avec expiration (PAYLOAD_STORE_REDIS_URL) ;
+- local : fichiers dans PAYLOAD_STORE_DIR, pour des workers partageant un
+  volume, expiration encodée dans le nom du fichier.
+
+Si le store est indisponible, le payload voyage en ligne comme avant.
+"""
+
+import asyncio
+import os
+import random
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import msgpack
+import redis.asyncio as redis
+
+from backend.api.utils.logging import logger
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None  # type: ignore
+    ZSTD_AVAILABLE = False
+
+HANDLE_MARKER = "__claim_check__"
+HANDLE_VERSION = 1
+
+PAYLOAD_STORE_BACKEND = os.getenv("PAYLOAD_STORE_BACKEND", "redis")
+PAYLOAD_STORE_REDIS_URL = os.getenv("PAYLOAD_STORE_REDIS_URL", os.getenv("REDIS_URL", "redis://redis:6379/0"))
+PAYLOAD_STORE_DIR = os.getenv("PAYLOAD_STORE_DIR", "/app/data/payloads")
+PAYLOAD_STORE_TTL_SECONDS = int(os.getenv("PAYLOAD_STORE_TTL_SECONDS", "21600"))
+# En dessous de cette taille sérialisée, le payload reste dans le message
+PAYLOAD_STORE_THRESHOLD_BYTES = int(os.getenv("PAYLOAD_STORE_THRESHOLD_BYTES", "16384"))
+ZSTD_LEVEL = 3
+
+# Proportion des écritures locales qui purgent les fichiers expirés
+LOCAL_PURGE_RATE = 0.02
+
+
+class PayloadNotFound(KeyError):
+    """Le payload référencé a expiré ou a déjà été libéré."""
+
+
+def is_handle(value: Any) -> bool:
+    """True si la valeur est un handle de claim-check."""
+    return isinstance(value, dict) and HANDLE_MARKER in value
+
+
+def pack_payload(payload: Any) -> bytes:
+    """Sérialise un payload en msgpack (types inconnus convertis en str, comme json default=str)."""
+    return msgpack.packb(payload, use_bin_type=True, default=str)
+
+
+def compress_packed(packed: bytes, codec: Optional[str] = None) -> bytes:
+    """Compresse un payload déjà sérialisé."""
+    codec = codec or default_codec()
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(packed)
+    return zlib.compress(packed, 6)
+
+
+def decode_payload(blob: bytes, codec: str) -> Any:
+    """Décompresse puis désérialise un payload."""
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Payload compressé en zstd mais zstandard n'est pas installé")
+        packed = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        packed = zlib.decompress(blob)
+    return msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+
+def default_codec() -> str:
+    return "zstd" if ZSTD_AVAILABLE else "zlib"
+
+
+class PayloadStore:
+    """
+    Store de payloads à TTL adressés par handle.
+
+    Toutes les méthodes sont asynchrones : l'accès Redis passe par
+    redis.asyncio, l'accès disque du backend local par asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        backend: str = PAYLOAD_STORE_BACKEND,
+        redis_url: str = PAYLOAD_STORE_REDIS_URL,
+        directory: str = PAYLOAD_STORE_DIR,
+        ttl: int = PAYLOAD_STORE_TTL_SECONDS,
+        threshold: int = PAYLOAD_STORE_THRESHOLD_BYTES,
+    ):
+        self.backend = backend
+        self.redis_url = redis_url
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.threshold = threshold
+        self.redis_client: Optional[redis.Redis] = None
+        self.stats = {
+            "stored": 0,
+            "inline": 0,
+            "fetched": 0,
+            "released": 0,
+            "missing": 0,
+            "errors": 0,
+            "raw_bytes": 0,
+            "stored_bytes": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    async def offload(self, payload: Any, ttl: Optional[int] = None) -> Any:
+        """
+        Remplace un payload volumineux par un handle.
+
+        Returns:
+            Le handle, ou le payload lui-même s'il est petit ou si le store
+            est indisponible
+        """
+        packed = await asyncio.to_thread(pack_payload, payload)
+        if len(packed) < self.threshold:
+            self.stats["inline"] += 1
+            return payload
+        try:
+            return await self._put_packed(packed, ttl)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"[PAYLOAD_STORE] Store indisponible, payload envoyé en ligne: {e}")
+            return payload
+
+    async def put(self, payload: Any, ttl: Optional[int] = None) -> Dict[str, Any]:
+        """Écrit un payload et retourne son handle."""
+        return await self._put_packed(await asyncio.to_thread(pack_payload, payload), ttl)
+
+    async def _put_packed(self, packed: bytes, ttl: Optional[int]) -> Dict[str, Any]:
+        ttl = ttl or self.ttl
+        codec = default_codec()
+        blob = await asyncio.to_thread(compress_packed, packed, codec)
+        key = f"payload:{uuid.uuid4().hex}"
+
+        if self.backend == "local":
+            key = await asyncio.to_thread(self._write_local, key, blob, ttl)
+        else:
+            await self._client().set(key, blob, ex=ttl)
+
+        self.stats["stored"] += 1
+        self.stats["raw_bytes"] += len(packed)
+        self.stats["stored_bytes"] += len(blob)
+        logger.debug(f"[PAYLOAD_STORE] {key}: {len(packed)} → {len(blob)} octets ({codec})")
+        return {
+            HANDLE_MARKER: HANDLE_VERSION,
+            "key": key,
+            "backend": self.backend,
+            "codec": codec,
+            "size": len(blob),
+            "expires_at": time.time() + ttl,
+        }
+
+    async def get(self, handle: Dict[str, Any]) -> Any:
+        """
+        Lit le payload d'un handle.
+
+        Raises:
+            PayloadNotFound: Payload expiré ou déjà libéré
+        """
+        if handle.get("backend") == "local":
+            blob = await asyncio.to_thread(self._read_local, handle["key"])
+        else:
+            blob = await self._client().get(handle["key"])
+        if blob is None:
+            self.stats["missing"] += 1
+            raise PayloadNotFound(handle["key"])
+        self.stats["fetched"] += 1
+        return await asyncio.to_thread(decode_payload, blob, handle.get("codec", "zlib"))
+
+    async def resolve(self, value: Any) -> Any:
+        """Retourne le payload d'un handle, ou la valeur telle quelle."""
+        return await self.get(value) if is_handle(value) else value
+
+    async def release(self, value: Any) -> None:
+        """Libère le payload d'un handle (sans effet sur une valeur en ligne)."""
+        if not is_handle(value):
+            return
+        try:
+            if value.get("backend") == "local":
+                await asyncio.to_thread(self._delete_local, value["key"])
+            else:
+                await self._client().delete(value["key"])
+            self.stats["released"] += 1
+        except Exception as e:
+            # Le TTL finira par libérer le payload
+            self.stats["errors"] += 1
+            logger.warning(f"[PAYLOAD_STORE] Libération échouée pour {value['key']}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stored_bytes = self.stats["stored_bytes"]
+        return {
+            **self.stats,
+            "backend": self.backend,
+            "codec": default_codec(),
+            "compression_ratio": round(self.stats["raw_bytes"] / stored_bytes, 2) if stored_bytes else None,
+        }
+
+    async def close(self) -> None:
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+    # ------------------------------------------------------------------
+    # Backends
+    # ------------------------------------------------------------------
+
+    def _client(self) -> redis.Redis:
+        if self.redis_client is None:
+            self.redis_client = redis.Redis.from_url(self.redis_url)
+        return self.redis_client
+
+    def _write_local(self, key: str, blob: bytes, ttl: int) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if random.random() < LOCAL_PURGE_RATE:
+            self.purge_expired()
+        # L'expiration fait partie de la clé : pas de métadonnées à relire
+        key = f"{key.replace(':', '_')}.{int(time.time() + ttl)}"
+        path = self.directory / key
+        tmp_path = self.directory / f".tmp_{key}"
+        tmp_path.write_bytes(blob)
+        os.replace(tmp_path, path)
+        return key
+
+    def _local_path(self, key: str) -> Optional[Path]:
+        name = Path(key).name
+        if name != key or not name.startswith("payload_"):
+            return None
+        return self.directory / name
+
+    def _read_local(self, key: str) -> Optional[bytes]:
+        path = self._local_path(key)
+        if path is None or _expired(path.name):
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _delete_local(self, key: str) -> None:
+        path = self._local_path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def purge_expired(self) -> int:
+        """Supprime les fichiers expirés du backend local."""
+        purged = 0
+        if not self.directory.is_dir():
+            return 0
+        for path in self.directory.glob("payload_*"):
+            if _expired(path.name):
+                path.unlink(missing_ok=True)
+                purged += 1
+        if purged:
+            logger.info(f"[PAYLOAD_STORE] {purged} payloads expirés purgés")
+        return purged
+
+
+def _expired(name: str) -> bool:
+    _, _, expires_at = name.rpartition(".")
+    return not expires_at.isdigit() or int(expires_at) < time.time()
+
+
+payload_store = PayloadStore()
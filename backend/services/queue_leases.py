@@ -0,0 +1,85 @@
+"""
+Baux (visibility timeout) et métriques communs aux queues différées.
+
+Une tâche défilée n'appartient à son consommateur que pour la durée de son
+bail. Si le worker meurt (OOM pendant un gros scan, redémarrage), le bail
+expire et le worker suivant remet la tâche en attente avec un délai croissant
+avant de défiler son lot ; au-delà de max_retries récupérations, la tâche part en échec
+définitif au lieu de tuer les workers en boucle.
+
+Partagé par DeferredQueueService (Redis), LocalFallbackQueueService (SQLite)
+et HybridQueueService.
+"""
+
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+# Durée d'un bail : un worker qui dépasse doit appeler extend_lease()
+VISIBILITY_TIMEOUT_SECONDS = int(os.environ.get("DEFERRED_QUEUE_VISIBILITY_TIMEOUT", "900"))
+
+# Délai de remise en attente après expiration : base * 2^(tentative - 1), plafonné
+RECLAIM_BASE_BACKOFF_SECONDS = 30
+RECLAIM_MAX_BACKOFF_SECONDS = 1800
+
+# Événements comptés par queue et par minute
+METRIC_EVENTS = ("enqueued", "dequeued", "completed", "retried", "failed", "reclaimed")
+METRICS_WINDOW_MINUTES = 5
+METRICS_RETENTION_SECONDS = 3600
+
+
+def reclaim_backoff(attempt: int) -> float:
+    """Délai avant nouvelle tentative après la `attempt`-ième expiration de bail."""
+    return min(
+        RECLAIM_BASE_BACKOFF_SECONDS * (2 ** max(0, attempt - 1)),
+        RECLAIM_MAX_BACKOFF_SECONDS,
+    )
+
+
+def minute_bucket(timestamp: Optional[float] = None) -> int:
+    """Index de la minute (epoch // 60) d'un instant."""
+    return int((timestamp if timestamp is not None else time.time()) // 60)
+
+
+def summarize_throughput(
+    buckets: Iterable[Dict[str, Any]], minutes: int = METRICS_WINDOW_MINUTES
+) -> Dict[str, Any]:
+    """Totaux et débits par minute sur une fenêtre, à partir de compteurs par minute."""
+    totals = {event: 0 for event in METRIC_EVENTS}
+    for bucket in buckets:
+        for event, value in (bucket or {}).items():
+            event = event.decode() if isinstance(event, bytes) else event
+            if event in totals:
+                totals[event] += int(value)
+    return {
+        "window_minutes": minutes,
+        "totals": totals,
+        "per_minute": {event: round(count / minutes, 2) for event, count in totals.items()},
+    }
+
+
+class QueueThroughput:
+    """Compteurs par minute en mémoire (backend local, un seul processus)."""
+
+    def __init__(self, retention_minutes: int = METRICS_RETENTION_SECONDS // 60):
+        self.retention_minutes = retention_minutes
+        self._buckets: Dict[str, Dict[int, Dict[str, int]]] = defaultdict(dict)
+
+    def record(self, queue_name: str, event: str, count: int = 1) -> None:
+        if count <= 0:
+            return
+        now = minute_bucket()
+        buckets = self._buckets[queue_name]
+        bucket = buckets.setdefault(now, defaultdict(int))
+        bucket[event] += count
+        for minute in [m for m in buckets if m <= now - self.retention_minutes]:
+            del buckets[minute]
+
+    def snapshot(self, queue_name: str, minutes: int = METRICS_WINDOW_MINUTES) -> Dict[str, Any]:
+        now = minute_bucket()
+        buckets = self._buckets.get(queue_name, {})
+        return summarize_throughput(
+            (buckets.get(minute, {}) for minute in range(now - minutes + 1, now + 1)), minutes
+        )
+
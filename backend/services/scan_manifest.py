@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Manifeste de scan incrémental.
+
+Charge en une seule requête le manifeste compact path → (mtime, size, track_id)
+des pistes déjà connues, puis classe chaque fichier rencontré pendant le walk
+à partir d'un simple stat : seuls les fichiers nouveaux ou modifiés doivent
+ensuite être ouverts par Mutagen. Les chemins du manifeste qui n'ont pas été
+vus pendant le walk correspondent à des fichiers disparus.
+
+La suppression des disparus est refusée quand le walk n'est pas fiable (racine
+absente ou non montée, erreur d'accès pendant le walk) ou quand elle toucherait
+une part anormale de la bibliothèque, sauf forçage explicite.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.api.utils.logging import logger
+
+# Statuts renvoyés par ScanManifest.classify()
+FILE_NEW = "new"
+FILE_CHANGED = "changed"
+FILE_UNCHANGED = "unchanged"
+
+# Tolérance sur le mtime (float stocké en base, arrondis des systèmes de fichiers réseau)
+MTIME_TOLERANCE = 1e-3
+
+# Part maximale des pistes connues supprimable en un scan sans forçage
+MAX_VANISHED_RATIO = float(os.getenv("SCAN_MAX_VANISHED_RATIO", "0.5"))
+
+api_url = os.getenv("API_URL", "http://api:8001")
+
+
+class ScanManifest:
+    """Manifeste path → (mtime, size, track_id) utilisé par le scan incrémental."""
+
+    def __init__(self, entries: Optional[List[Tuple[str, Optional[float], Optional[int], int]]] = None):
+        """
+        Initialise le manifeste.
+
+        Args:
+            entries: Tuples (path, file_mtime, file_size, track_id)
+        """
+        self._entries: Dict[str, Tuple[Optional[float], Optional[int], int]] = {}
+        for path, mtime, size, track_id in entries or []:
+            self._entries[path] = (mtime, size, track_id)
+        self._seen: set[str] = set()
+        self.stats = {FILE_NEW: 0, FILE_CHANGED: 0, FILE_UNCHANGED: 0}
+        self.walk_errors: List[Tuple[str, str]] = []
+        self.deletion_skipped: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    @classmethod
+    async def fetch(cls, client: httpx.AsyncClient, directory: str) -> "ScanManifest":
+        """
+        Récupère le manifeste des pistes d'un répertoire via l'API.
+
+        Args:
+            client: Client HTTP asynchrone
+            directory: Répertoire scanné (préfixe des chemins)
+
+        Returns:
+            Manifeste chargé (vide en cas d'erreur, ce qui revient à un scan complet)
+        """
+        try:
+            response = await client.get(
+                f"{api_url}/api/tracks/scan-manifest",
+                params={"path_prefix": directory},
+                timeout=httpx.Timeout(300.0),
+            )
+            response.raise_for_status()
+            entries = response.json().get("entries", [])
+            logger.info(f"[SCAN_MANIFEST] {len(entries)} pistes connues sous {directory}")
+            return cls(entries)
+        except Exception as e:
+            logger.error(f"[SCAN_MANIFEST] Impossible de charger le manifeste, scan complet: {e}")
+            return cls()
+
+    def classify(self, path: str, mtime: float, size: int) -> str:
+        """
+        Classe un fichier rencontré pendant le walk et le marque comme vu.
+
+        Args:
+            path: Chemin du fichier tel que stocké en base
+            mtime: st_mtime du fichier
+            size: st_size du fichier
+
+        Returns:
+            FILE_NEW, FILE_CHANGED ou FILE_UNCHANGED
+        """
+        self._seen.add(path)
+        entry = self._entries.get(path)
+
+        if entry is None:
+            status = FILE_NEW
+        else:
+            known_mtime, known_size, _ = entry
+            if (
+                known_mtime is not None
+                and known_size is not None
+                and known_size == size
+                and abs(known_mtime - mtime) < MTIME_TOLERANCE
+            ):
+                status = FILE_UNCHANGED
+            else:
+                status = FILE_CHANGED
+
+        self.stats[status] += 1
+        return status
+
+    def mark_seen(self, path: str) -> None:
+        """Marque un chemin comme présent sans le classer (ex: stat en échec)."""
+        self._seen.add(path)
+
+    def record_walk_error(self, path: str, error: Exception) -> None:
+        """Enregistre une erreur d'accès rencontrée pendant le walk."""
+        self.walk_errors.append((path, str(error)))
+
+    def deletion_blocker(
+        self,
+        directory: str,
+        force: bool = False,
+        max_ratio: float = MAX_VANISHED_RATIO,
+    ) -> Optional[str]:
+        """
+        Indique pourquoi les pistes disparues ne doivent pas être supprimées.
+
+        Args:
+            directory: Racine du walk
+            force: Ignore le plafond de pistes disparues
+            max_ratio: Part maximale des pistes connues supprimable
+
+        Returns:
+            Raison du refus, ou None si la suppression est sûre
+        """
+        if not os.path.exists(directory):
+            return f"racine introuvable: {directory}"
+        if not os.path.isdir(directory):
+            return f"racine n'est pas un répertoire: {directory}"
+        if self.walk_errors:
+            path, error = self.walk_errors[0]
+            return f"{len(self.walk_errors)} erreur(s) pendant le walk (ex: {path}: {error})"
+        if not force and self._entries:
+            ratio = len(self.vanished()) / len(self._entries)
+            if ratio > max_ratio:
+                return f"{ratio:.0%} des pistes connues disparues (plafond {max_ratio:.0%})"
+        return None
+
+    def track_id(self, path: str) -> Optional[int]:
+        """Retourne l'ID de piste connu pour un chemin, ou None."""
+        entry = self._entries.get(path)
+        return entry[2] if entry else None
+
+    def vanished(self) -> List[Tuple[str, int]]:
+        """
+        Retourne les pistes du manifeste qui n'ont pas été vues pendant le walk.
+
+        Returns:
+            Liste de tuples (path, track_id)
+        """
+        return [
+            (path, entry[2])
+            for path, entry in self._entries.items()
+            if path not in self._seen
+        ]
+
+    async def delete_vanished(
+        self,
+        client: httpx.AsyncClient,
+        directory: str,
+        batch_size: int = 500,
+        force: bool = False,
+        max_ratio: float = MAX_VANISHED_RATIO,
+    ) -> int:
+        """
+        Supprime via l'API les pistes dont le fichier a disparu.
+
+        Rien n'est supprimé si deletion_blocker() refuse la suppression ;
+        la raison est alors conservée dans deletion_skipped.
+
+        Args:
+            client: Client HTTP asynchrone
+            directory: Racine du walk
+            batch_size: Nombre d'IDs envoyés par requête
+            force: Ignore le plafond de pistes disparues
+            max_ratio: Part maximale des pistes connues supprimable
+
+        Returns:
+            Nombre de pistes supprimées
+        """
+        self.deletion_skipped = self.deletion_blocker(directory, force=force, max_ratio=max_ratio)
+        if self.deletion_skipped:
+            logger.warning(
+                f"[SCAN_MANIFEST] Suppression des {len(self.vanished())} pistes disparues annulée: "
+                f"{self.deletion_skipped}"
+            )
+            return 0
+
+        track_ids = [track_id for _, track_id in self.vanished()]
+        deleted = 0
+        for i in range(0, len(track_ids), batch_size):
+            chunk = track_ids[i:i + batch_size]
+            try:
+                response = await client.post(
+                    f"{api_url}/api/tracks/batch/delete",
+                    json={"track_ids": chunk},
+                )
+                response.raise_for_status()
+                deleted += response.json().get("deleted", 0)
+            except Exception as e:
+                logger.error(f"[SCAN_MANIFEST] Erreur suppression de {len(chunk)} pistes disparues: {e}")
+
+        if track_ids:
+            logger.info(f"[SCAN_MANIFEST] {deleted}/{len(track_ids)} pistes disparues supprimées")
+        return deleted
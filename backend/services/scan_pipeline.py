@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de scan en flux avec back-pressure.
+
+discovery → extraction → batching des entités → insertion
+
+Chaque étape communique avec la suivante par une asyncio.Queue bornée : une
+étape rapide est suspendue dès que la file de l'étape suivante est pleine, si
+bien qu'aucune étape ne retient plus de `queue_size` éléments et que la mémoire
+reste constante quelle que soit la taille de la bibliothèque. L'extraction est
+assurée par plusieurs workers indépendants (ou par le pool de processus du
+MetadataExtractionEngine) : un fichier lent ne bloque plus tout un lot.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+from backend.api.utils.logging import logger
+from backend.services.metadata_extraction_engine import MetadataExtractionEngine
+
+# Marqueur de fin de flux propagé d'une étape à la suivante
+_DONE = object()
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_EXTRACT_WORKERS = 20
+
+
+async def iterate_in_executor(iterator: Iterable, chunk_size: int = 256) -> AsyncIterator:
+    """
+    Consomme un itérateur synchrone bloquant (walk disque) hors de la boucle asyncio.
+
+    Les éléments sont tirés par paquets de chunk_size dans le thread pool par
+    défaut : l'itérateur reste paresseux, seul un paquet est en mémoire.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterator)
+    while True:
+        chunk = await loop.run_in_executor(None, lambda: list(itertools.islice(iterator, chunk_size)))
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
+
+class ScanPipeline:
+    """Pipeline discovery → extraction → batching → insertion sur files bornées."""
+
+    def __init__(
+        self,
+        extract: Optional[Callable[[Any], Awaitable[Optional[dict]]]] = None,
+        engine: Optional[MetadataExtractionEngine] = None,
+        engine_extract_fn: Optional[Callable[[str], Optional[dict]]] = None,
+        extract_workers: int = DEFAULT_EXTRACT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_pending_batches: int = 2,
+    ):
+        """
+        Initialise le pipeline.
+
+        L'extraction est faite soit par `extract` (coroutine par fichier, exécutée
+        par `extract_workers` workers), soit par `engine` avec `engine_extract_fn`
+        (fonction synchrone module-level exécutée dans le pool de processus).
+
+        Args:
+            extract: Coroutine chemin → métadonnées (ou None)
+            engine: Moteur d'extraction en pool de processus
+            engine_extract_fn: Fonction d'extraction picklable pour le moteur
+            extract_workers: Nombre de workers d'extraction concurrents (mode coroutine)
+            queue_size: Taille maximale des files chemins et métadonnées
+            batch_size: Nombre de métadonnées par lot envoyé à l'insertion
+            max_pending_batches: Lots en attente d'insertion au maximum
+        """
+        if extract is None and (engine is None or engine_extract_fn is None):
+            raise ValueError("Une coroutine d'extraction ou un moteur avec sa fonction d'extraction est requis")
+
+        self.extract = extract
+        self.engine = engine
+        self.engine_extract_fn = engine_extract_fn
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.stats = {
+            "discovered": 0,
+            "extracted": 0,
+            "extract_failed": 0,
+            "batches": 0,
+            "batches_failed": 0,
+            "peak_paths_queue": 0,
+            "peak_metadata_queue": 0,
+            "duration": 0.0,
+        }
+
+    @staticmethod
+    async def _iterate(source: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+        """Itère de façon uniforme sur une source synchrone ou asynchrone."""
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                yield item
+        else:
+            for item in source:
+                yield item
+
+    async def _put(self, queue: asyncio.Queue, item: Any, peak_key: str) -> None:
+        """Ajoute un élément (suspendu si la file est pleine) et suit son remplissage."""
+        await queue.put(item)
+        if queue.qsize() > self.stats[peak_key]:
+            self.stats[peak_key] = queue.qsize()
+
+    async def _discover(self, source, paths_queue: asyncio.Queue) -> None:
+        """Étape 1 : pousse les chemins découverts dans la file bornée."""
+        async with self._closing(paths_queue):
+            async for path in self._iterate(source):
+                self.stats["discovered"] += 1
+                await self._put(paths_queue, path, "peak_paths_queue")
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _closing(queue: asyncio.Queue):
+        """
+        Propage le marqueur de fin à l'étape suivante quand l'étape se termine.
+
+        En cas d'annulation, le marqueur n'est pas envoyé : l'étape suivante est
+        annulée elle aussi et une file pleine bloquerait l'arrêt.
+        """
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    async def _drain(self, queue: asyncio.Queue) -> AsyncIterator:
+        """Consomme une file jusqu'au marqueur de fin."""
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    async def _extract_with_workers(self, paths_queue: asyncio.Queue, metadata_queue: asyncio.Queue) -> None:
+        """Étape 2 (mode coroutine) : workers indépendants, sans attente du plus lent d'un lot."""
+        async def worker():
+            while True:
+                path = await paths_queue.get()
+                if path is _DONE:
+                    # Laisser le marqueur aux autres workers
+                    await paths_queue.put(_DONE)
+                    return
+                try:
+                    metadata = await self.extract(path)
+                except Exception as e:
+                    self.stats["extract_failed"] += 1
+                    logger.error(f"[SCAN_PIPELINE] Erreur extraction {path}: {e}")
+                    continue
+                if metadata:
+                    self.stats["extracted"] += 1
+                    await self._put(metadata_queue, metadata, "peak_metadata_queue")
+
+        async with self._closing(metadata_queue):
+            await asyncio.gather(*(worker() for _ in range(self.extract_workers)))
+
+    async def _extract_with_engine(self, paths_queue: asyncio.Queue, metadata_queue: asyncio.Queue) -> None:
+        """Étape 2 (mode pool de processus) : paquets bornés dans le MetadataExtractionEngine."""
+        async with self._closing(metadata_queue):
+            async for metadata in self.engine.extract_paths(self._drain(paths_queue), self.engine_extract_fn):
+                self.stats["extracted"] += 1
+                await self._put(metadata_queue, metadata, "peak_metadata_queue")
+
+    def _start_extraction(self, source) -> tuple[asyncio.Queue, List[asyncio.Task]]:
+        """Démarre les étapes discovery et extraction, retourne la file des métadonnées."""
+        paths_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        metadata_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        extract_stage = self._extract_with_engine if self.engine is not None else self._extract_with_workers
+        tasks = [
+            asyncio.create_task(self._discover(source, paths_queue)),
+            asyncio.create_task(extract_stage(paths_queue, metadata_queue)),
+        ]
+        return metadata_queue, tasks
+
+    @staticmethod
+    async def _cancel(tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream(self, source: Union[Iterable, AsyncIterable]) -> AsyncIterator[dict]:
+        """
+        Exécute discovery + extraction et restitue les métadonnées au fil de l'eau.
+
+        Args:
+            source: Chemins à traiter (itérable synchrone ou asynchrone)
+
+        Yields:
+            Métadonnées extraites, dans l'ordre de fin d'extraction
+        """
+        start_time = time.time()
+        metadata_queue, tasks = self._start_extraction(source)
+        try:
+            async for metadata in self._drain(metadata_queue):
+                yield metadata
+            # Remonter une éventuelle erreur des étapes amont
+            await asyncio.gather(*tasks)
+        finally:
+            await self._cancel(tasks)
+            self.stats["duration"] = time.time() - start_time
+
+    async def run(
+        self,
+        source: Union[Iterable, AsyncIterable],
+        process_batch: Callable[[List[dict]], Awaitable[Any]],
+        insert_batch: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ) -> dict:
+        """
+        Exécute le pipeline complet discovery → extraction → batching → insertion.
+
+        Args:
+            source: Chemins à traiter (itérable synchrone ou asynchrone)
+            process_batch: Coroutine de batching des entités (liste de métadonnées → lot)
+            insert_batch: Coroutine d'insertion d'un lot (optionnelle)
+
+        Returns:
+            Statistiques du pipeline
+        """
+        start_time = time.time()
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_batches)
+        metadata_queue, tasks = self._start_extraction(source)
+
+        async def emit(batch: List[dict]) -> None:
+            """Prépare un lot ; un lot en échec est compté sans arrêter le batching."""
+            try:
+                payload = await process_batch(batch)
+            except Exception as e:
+                self.stats["batches"] += 1
+                self.stats["batches_failed"] += 1
+                logger.error(f"[SCAN_PIPELINE] Erreur batching lot {self.stats['batches']}: {e}")
+                return
+            await batch_queue.put(payload)
+
+        async def batcher():
+            """Étape 3 : regroupe les métadonnées en lots de batch_size."""
+            batch: List[dict] = []
+            async with self._closing(batch_queue):
+                async for metadata in self._drain(metadata_queue):
+                    batch.append(metadata)
+                    if len(batch) >= self.batch_size:
+                        await emit(batch)
+                        batch = []
+                if batch:
+                    await emit(batch)
+
+        async def inserter():
+            """Étape 4 : insère les lots un par un (la file bornée freine le batching)."""
+            async for payload in self._drain(batch_queue):
+                self.stats["batches"] += 1
+                if insert_batch is None or payload is None:
+                    continue
+                try:
+                    await insert_batch(payload)
+                except Exception as e:
+                    self.stats["batches_failed"] += 1
+                    logger.error(f"[SCAN_PIPELINE] Erreur insertion lot {self.stats['batches']}: {e}")
+
+        tasks += [asyncio.create_task(batcher()), asyncio.create_task(inserter())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await self._cancel(tasks)
+            self.stats["duration"] = time.time() - start_time
+
+        logger.info(f"[SCAN_PIPELINE] Pipeline terminé: {self.stats}")
+        return dict(self.stats)
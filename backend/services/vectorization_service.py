@@ -241,40 +241,39 @@ async def vectorize_single_track_util(track_id: int) -> Dict[str, Any]:
     return await service.vectorize_and_store(track_id)
 
 
-async def vectorize_all_tracks() -> Dict[str, Any]:
+async def vectorize_all_tracks(
+    only_missing: bool = False, resume: bool = True
+) -> Dict[str, Any]:
     """
     Vectorise toutes les tracks de la bibliothèque.
 
+    Les pistes sont lues par pages, encodées par micro-batches et écrites par
+    lots via EmbeddingPipelineService ; un parcours interrompu reprend au
+    dernier point de reprise.
+
+    Args:
+        only_missing: Ne vectoriser que les tracks sans embedding
+        resume: Reprendre au dernier point de reprise
+
     Returns:
         Résultats complets de la vectorisation
     """
-    service = OptimizedVectorizationService()
-
-    try:
-        # Récupérer tous les IDs de tracks
-        tracks_data = await service.fetch_tracks_from_api()
-        track_ids = [track["id"] for track in tracks_data if track.get("id")]
+    from backend.services.embedding_pipeline_service import EmbeddingPipelineService
 
-        if not track_ids:
-            return {
-                'status': 'warning',
-                'message': 'Aucune track à vectoriser',
-                'total_tracks': 0
-            }
+    pipeline = EmbeddingPipelineService()
 
-        logger.info(
-            f"[VECTORIZATION] Début vectorisation: {len(track_ids)} tracks"
+    try:
+        result = await pipeline.run(
+            embedding_type="semantic", only_missing=only_missing, resume=resume
         )
-
-        # Vectoriser par batches
-        result = await service.vectorize_and_store_batch(track_ids)
         result['embedding_model'] = OllamaEmbeddingService.MODEL_NAME
-
         return result
 
     except Exception as e:
         logger.error(f"[VECTORIZATION] Erreur: {e}")
         return {'status': 'error', 'message': str(e)}
+    finally:
+        await pipeline.close()
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ import asyncio
 from typing import List, Dict, Any
 from backend.tasks.taskiq_app import broker
 from backend.utils.logging import logger
+from backend.services.payload_store import is_handle, payload_store
 from collections import defaultdict
 from pathlib import Path
 import time
@@ -17,12 +18,14 @@ async def process_entities_task(metadata_list: List[Dict[str, Any]], batch_id: s
     Converti en async pour TaskIQ.
 
     Args:
-        metadata_list: Liste des métadonnées à traiter
+        metadata_list: Liste des métadonnées à traiter, ou handle du payload_store
         batch_id: ID optionnel du batch pour tracking
 
     Returns:
         Données groupées prêtes pour insertion
     """
+    payload_handle = metadata_list if is_handle(metadata_list) else None
+    metadata_list = await payload_store.resolve(metadata_list)
     logger.info(f"[TASKIQ|BATCH] Démarrage batching: {len(metadata_list)} métadonnées")
     start_time = time.time()
     if batch_id:
@@ -123,4 +126,5 @@ async def process_entities_task(metadata_list: List[Dict[str, Any]], batch_id: s
         'success': True
     }
 
+    await payload_store.release(payload_handle)
     return insertion_data
\ No newline at end of file
@@ -552,4 +552,4 @@ async def extract_artist_images(file_paths: List[str]) -> Dict[str, Any]:
             "artist_folders_processed": len(artist_folders),
             "artist_images_found": 0,
             "message": "Aucune image d'artiste trouvée"
-        }
\ No newline at end of file
+        }
@@ -1,13 +1,15 @@
 from backend.tasks.taskiq_app import broker
 from backend.feature_flags import WORKER_DIRECT_DB_ENABLED
 from backend.utils.logging import logger
+from backend.services.payload_store import is_handle, payload_store
 
 @broker.task
 async def insert_direct_batch_task(insertion_data: dict) -> dict:
     """Insertion directe en DB via TaskIQ.
     
     Args:
-        insertion_data: Données à insérer (artists, albums, tracks)
+        insertion_data: Données à insérer (artists, albums, tracks), ou handle
+            du payload_store libéré après le commit
         
     Returns:
         Résultat de l'insertion
@@ -25,6 +27,9 @@ async def insert_direct_batch_task(insertion_data: dict) -> dict:
     from backend.db.repositories.track_repository import TrackRepository
     from backend.db.session import get_worker_session
 
+    payload_handle = insertion_data if is_handle(insertion_data) else None
+    insertion_data = await payload_store.resolve(insertion_data)
+
     logger.info("[TASKIQ|INSERT] Démarrage insertion directe batch")
     session_factory = get_worker_session()
     async with session_factory() as session:
@@ -34,6 +39,7 @@ async def insert_direct_batch_task(insertion_data: dict) -> dict:
         track_ids = await repo.bulk_insert_tracks(insertion_data['tracks'])
         
         await session.commit()
+        await payload_store.release(payload_handle)
         
         result = {
             "tracks_inserted": len(track_ids),
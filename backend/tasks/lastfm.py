@@ -2,8 +2,8 @@
 
 from backend.tasks.taskiq_app import broker
 from backend.services.lastfm_service import lastfm_service
+from backend.services.lastfm_client import fetch_and_store_artists
 from backend.utils.logging import logger
-import asyncio
 import httpx
 import os
 
@@ -177,6 +177,9 @@ async def batch_fetch_lastfm_info_task(artist_ids: list, include_similar: bool =
     """
     Batch fetch Last.fm information for multiple artists.
     
+    Artists are processed concurrently, paced by the shared Redis token
+    bucket of the async Last.fm client.
+    
     Args:
         artist_ids: List of artist IDs to process
         include_similar: Whether to also fetch similar artists
@@ -187,63 +190,9 @@ async def batch_fetch_lastfm_info_task(artist_ids: list, include_similar: bool =
     logger.info(f"[TASKIQ] Starting batch fetch: {len(artist_ids)} artists")
     
     try:
-        results = []
-        success_count = 0
-        error_count = 0
-        
-        # Process artists sequentially to avoid overwhelming the API
-        for artist_id in artist_ids:
-            try:
-                # Fetch artist info
-                info_result = await fetch_artist_lastfm_info_task(artist_id)
-                info_success = info_result.get('success', False)
-                
-                artist_result = {
-                    "artist_id": artist_id,
-                    "info_fetched": info_success,
-                    "similar_fetched": False
-                }
-                
-                if info_success and include_similar:
-                    # Fetch similar artists
-                    similar_result = await fetch_similar_artists_task(artist_id)
-                    similar_success = similar_result.get('success', False)
-                    artist_result["similar_fetched"] = similar_success
-                    
-                    if similar_success:
-                        success_count += 1
-                    else:
-                        error_count += 1
-                elif info_success:
-                    success_count += 1
-                else:
-                    error_count += 1
-                
-                results.append(artist_result)
-                
-                # Small delay to be respectful to Last.fm API
-                await asyncio.sleep(0.5)
-            
-            except Exception as e:
-                logger.error(f"[TASKIQ] Error processing artist {artist_id}: {e}")
-                results.append({
-                    "artist_id": artist_id,
-                    "info_fetched": False,
-                    "similar_fetched": False,
-                    "error": str(e)
-                })
-                error_count += 1
-        
-        logger.info(f"[TASKIQ] Batch fetch completed: {success_count} success, {error_count} errors")
-        
-        return {
-            "task_id": "taskiq-generated",
-            "success": True,
-            "total_artists": len(artist_ids),
-            "successful": success_count,
-            "failed": error_count,
-            "results": results
-        }
+        result = await fetch_and_store_artists(artist_ids, include_similar=include_similar)
+        logger.info(f"[TASKIQ] Batch fetch completed: {result['successful']} success, {result['failed']} errors")
+        return {"task_id": "taskiq-generated", **result}
     
     except Exception as e:
         logger.error(f"[TASKIQ] Batch fetch failed: {e}")
@@ -251,4 +200,4 @@ async def batch_fetch_lastfm_info_task(artist_ids: list, include_similar: bool =
             "task_id": "taskiq-generated",
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
@@ -3,9 +3,10 @@ Migration de celery_tasks.py et deferred_enrichment_worker.py vers TaskIQ.
 """
 import asyncio
 from typing import List, Dict, Any
-from backend.tasks.taskiq_app import broker
-from backend.utils.logging import logger
-from backend.metadata.enrichment_worker import extract_single_file_metadata
+from backend.workers.taskiq_app import broker
+from backend.workers.utils.logging import logger
+from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+from backend.services.metadata_extraction_engine import get_extraction_engine
 from backend.services.enrichment_service import enrich_artist, enrich_album
 from backend.services.deferred_queue_service import deferred_queue_service
 
@@ -14,7 +15,8 @@ from backend.services.deferred_queue_service import deferred_queue_service
 async def extract_metadata_batch_task(file_paths: List[str], batch_id: str = None) -> Dict[str, Any]:
     """
     Extrait les métadonnées de fichiers en parallèle.
-    Converti en async pour TaskIQ, utilise asyncio.to_thread pour les opérations CPU-bound.
+    Converti en async pour TaskIQ, le parsing CPU-bound est exécuté dans le
+    pool de processus du MetadataExtractionEngine.
 
     Args:
         file_paths: Liste des chemins de fichiers à traiter
@@ -27,28 +29,9 @@ async def extract_metadata_batch_task(file_paths: List[str], batch_id: str = Non
     if batch_id:
         logger.info(f"[TASKIQ|METADATA] Batch ID: {batch_id}")
 
-    extracted_metadata = []
-    # Limiter la concurrence à 2 comme dans l'implémentation ThreadPoolExecutor d'origine
-    semaphore = asyncio.Semaphore(2)
-
-    async def process_file(file_path: str) -> Dict[str, Any] | None:
-        async with semaphore:
-            try:
-                # Exécuter la fonction CPU-bound dans un thread
-                metadata = await asyncio.to_thread(extract_single_file_metadata, file_path)
-                return metadata
-            except Exception as e:
-                logger.error(f"[TASKIQ|METADATA] Erreur traitement fichier {file_path}: {e}")
-                return None
-
-    # Créer les tâches pour chaque fichier
-    tasks = [process_file(file_path) for file_path in file_paths]
-    # Exécuter toutes les tâches et collecter les résultats
-    results = await asyncio.gather(*tasks)
-
-    for metadata in results:
-        if metadata:
-            extracted_metadata.append(metadata)
+    # Parsing Mutagen réparti sur le pool de processus partagé
+    engine = get_extraction_engine()
+    extracted_metadata = await engine.extract_all(file_paths, extract_single_file_metadata)
 
     # Métriques de performance (simplifiées, sans timing détaillé pour l'instant)
     logger.info(f"[TASKIQ|METADATA] Extraction terminée: {len(extracted_metadata)}/{len(file_paths)} fichiers")
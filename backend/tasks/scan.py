@@ -3,26 +3,43 @@ Migration de celery_tasks.py vers TaskIQ.
 """
 import asyncio
 import time
-from pathlib import Path
 from typing import List, Optional, Callable, Dict, Any
-from backend.tasks.taskiq_app import broker
-from backend.utils.logging import logger
+
+import httpx
+
+from backend.workers.taskiq_app import broker
+from backend.workers.utils.logging import logger
+from backend.services.scan_manifest import ScanManifest
+from backend.services.scan_pipeline import iterate_in_executor
+from backend.workers.scan.scan_worker import iter_music_files
 # Note: We avoid importing from backend.workers.utils.pubsub to keep the TaskIQ worker independent
 # Instead, we will mimic the progress callback by calling it if provided (it's a function from Celery context)
 # In the TaskIQ version, we will just call the progress_callback if it's provided (same as Celery)
 
 
 @broker.task
-async def discovery_task(directory: str, progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+async def discovery_task(
+    directory: str,
+    progress_callback: Optional[Callable] = None,
+    incremental: bool = False,
+    force_delete: bool = False,
+) -> Dict[str, Any]:
     """
     Découverte de fichiers musicaux et lancement de la pipeline complète.
     Converti en async pour TaskIQ.
 
     Pipeline : discovery → extract_metadata → batch_entities → insert_batch
 
+    En mode incrémental, le manifeste path → (mtime, size, track_id) est chargé
+    depuis l'API avant le walk : seuls les fichiers nouveaux ou modifiés sont
+    envoyés à l'extraction, et les pistes dont le fichier a disparu sont supprimées.
+
     Args:
         directory: Répertoire à scanner
         progress_callback: Fonction de callback pour la progression
+        incremental: Active le scan incrémental basé sur le manifeste
+        force_delete: Supprimer les disparues même au-delà du plafond
+            SCAN_MAX_VANISHED_RATIO (jamais si le walk a échoué)
 
     Returns:
         Résultat de la découverte et lancement de la pipeline
@@ -32,26 +49,43 @@ async def discovery_task(directory: str, progress_callback: Optional[Callable] =
     start_time = time.time()
     task_id = None  # TaskIQ doesn't provide task_id in the same way, but we can generate one or leave None
 
-    # Extensions musicales supportées
-    music_extensions = {'.mp3', '.flac', '.m4a', '.ogg', '.wav'}
+    manifest = None
+    if incremental:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            manifest = await ScanManifest.fetch(client, directory)
 
-    # Découverte des fichiers
-    discovered_files = []
-    base_path = Path(directory)
+    # Envoyer les batches d'extraction au fil du walk (50 fichiers par batch) :
+    # seul le batch courant est gardé en mémoire
+    from backend.tasks.metadata import extract_metadata_batch_task
 
-    def scan_recursive(current_path: Path):
-        """Scan récursif simple pour discovery."""
-        try:
-            for file_path in current_path.rglob('*'):
-                if file_path.is_file() and file_path.suffix.lower() in music_extensions:
-                    discovered_files.append(str(file_path))
-        except (OSError, PermissionError) as e:
-            logger.warning(f"[TASKIQ|SCAN] Erreur accès {current_path}: {e}")
+    batch_size = 50
+    total_files = 0
+    batches_created = 0
+    batch_files: List[str] = []
 
-    scan_recursive(base_path)
+    async def send_batch(files: List[str]) -> None:
+        nonlocal batches_created
+        batches_created += 1
+        batch_id = f"batch_{batches_created}"
+        logger.info(f"[TASKIQ|SCAN] Envoi batch {batches_created}: {len(files)} fichiers")
+        await extract_metadata_batch_task.kiq(file_paths=files, batch_id=batch_id)
 
-    total_files = len(discovered_files)
-    logger.info(f"[TASKIQ|SCAN] Discovery terminée: {total_files} fichiers trouvés")
+    async for file_path in iterate_in_executor(iter_music_files(directory, manifest)):
+        total_files += 1
+        batch_files.append(file_path)
+        if len(batch_files) >= batch_size:
+            await send_batch(batch_files)
+            batch_files = []
+    if batch_files:
+        await send_batch(batch_files)
+
+    logger.info(f"[TASKIQ|SCAN] Discovery terminée: {total_files} fichiers trouvés, {batches_created} batches envoyés")
+
+    tracks_deleted = 0
+    if manifest is not None:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            tracks_deleted = await manifest.delete_vanished(client, directory, force=force_delete)
+        logger.info(f"[TASKIQ|SCAN] Incrémental: {manifest.stats}, {tracks_deleted} pistes disparues supprimées")
 
     # Publier la progression
     if progress_callback:
@@ -63,33 +97,19 @@ async def discovery_task(directory: str, progress_callback: Optional[Callable] =
             "files_discovered": total_files
         })
 
-    # Si des fichiers ont été trouvés, lancer la pipeline complète
-    if discovered_files:
-        logger.info(f"[TASKIQ|SCAN] Lancement de la pipeline d'extraction pour {total_files} fichiers")
-        
-        # Diviser en batches pour l'extraction (50 fichiers par batch)
-        batch_size = 50
-        batches = [discovered_files[i:i + batch_size] for i in range(0, len(discovered_files), batch_size)]
-        
-        logger.info(f"[TASKIQ|SCAN] Création de {len(batches)} batches d'extraction")
-        
-        # Envoyer chaque batch vers l'extraction (via TaskIQ)
-        for i, batch_files in enumerate(batches):
-            batch_id = f"batch_{i+1}_{len(batches)}"
-            logger.info(f"[TASKIQ|SCAN] Envoi batch {i+1}/{len(batches)}: {len(batch_files)} fichiers")
-            
-            # Envoi du batch vers l'extraction via TaskIQ
-            from backend.tasks.metadata import extract_metadata_batch_task
-            await extract_metadata_batch_task.kiq(file_paths=batch_files, batch_id=batch_id)
-
     result = {
         "directory": directory,
         "files_discovered": total_files,
-        "file_paths": discovered_files,
         "discovery_time": time.time() - start_time,
-        "batches_created": len(batches) if discovered_files else 0,
+        "batches_created": batches_created,
         "success": True
     }
+    if manifest is not None:
+        result["incremental"] = {
+            **manifest.stats,
+            "tracks_deleted": tracks_deleted,
+            "deletion_skipped": manifest.deletion_skipped,
+        }
     
     logger.info(f"[TASKIQ|SCAN] Discovery et pipeline lancée: {result}")
     return result
\ No newline at end of file
@@ -13,31 +13,38 @@ Architecture :
 import time
 from collections import defaultdict
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
 import uuid
+from backend.services.payload_store import is_handle, payload_store
 from backend.workers.utils.logging import logger
 from backend.workers.utils.pubsub import publish_event
 from backend.workers.taskiq_app import broker
 
 
 @broker.task(name="batch.process_entities", queue="batch")
-async def batch_entities(metadata_list: List[Dict[str, Any]], batch_id: str | None = None):
+async def batch_entities(metadata_list: Union[List[Dict[str, Any]], Dict[str, Any]], batch_id: str | None = None, dispatch_insert: bool = True):
     """Regroupe les métadonnées par artistes et albums pour insertion optimisée.
     
     Optimisée pour Raspberry Pi : batches plus petits, traitement séquentiel.
     
     Args:
-        metadata_list: Liste des métadonnées à traiter
+        metadata_list: Liste des métadonnées à traiter, ou handle du
+            payload_store (libéré une fois le lot transmis)
         batch_id: ID optionnel du batch pour tracking
+        dispatch_insert: Envoyer la tâche insert.direct_batch (False quand le
+            pipeline de scan en flux insère lui-même le lot)
         
     Returns:
-        Données groupées prêtes pour insertion
+        Données groupées prêtes pour insertion (résumé des compteurs quand le
+        lot est transmis à insert.direct_batch)
     """
     start_time = time.time()
     task_id = uuid.uuid4().hex
+    payload_handle = metadata_list if is_handle(metadata_list) else None
 
     try:
+        metadata_list = await payload_store.resolve(metadata_list)
         logger.info(f"[BATCH] Démarrage batching: {len(metadata_list)} métadonnées")
         logger.info(f"[BATCH] Task ID: {task_id}")
         if batch_id:
@@ -240,16 +247,32 @@ async def batch_entities(metadata_list: List[Dict[str, Any]], batch_id: str | No
             'success': True
         }
 
+        if not dispatch_insert:
+            await payload_store.release(payload_handle)
+            return insertion_data
+
         # Envoyer vers l'insertion directe via API uniquement
         logger.info(f"[BATCH] Envoi vers insertion: {len(artists_data)} artistes, {len(albums_data)} albums, {len(tracks_data)} tracks")
         try:
             from backend.workers.insert.insert_batch_worker import insert_batch_direct
-            insert_batch_direct.kiq(insertion_data=insertion_data)
+            await insert_batch_direct.kiq(insertion_data=await payload_store.offload(insertion_data))
             logger.info(f"[BATCH] Tâche insert.direct_batch envoyée")
         except Exception as e:
             logger.error(f"[BATCH] ERREUR lors de l'envoi de la tâche insert.direct_batch: {str(e)}")
+            raise
 
-        return insertion_data
+        # Le lot est transmis : le payload d'entrée n'est plus utile, et le
+        # résultat stocké par le result backend se limite aux compteurs
+        await payload_store.release(payload_handle)
+        return {
+            'task_id': task_id,
+            'batch_id': batch_id,
+            'artists_count': len(artists_data),
+            'albums_count': len(albums_data),
+            'tracks_count': len(tracks_data),
+            'batching_time': total_time,
+            'success': True
+        }
 
     except Exception as e:
         error_time = time.time() - start_time
@@ -1 +1,5 @@
-"""Workers de covers et images."""
\ No newline at end of file
+"""Workers de covers et images."""
+
+from .covers_worker import migrate_covers_to_store
+
+__all__ = ["migrate_covers_to_store"]
@@ -0,0 +1,65 @@
+# -*- coding: UTF-8 -*-
+"""
+Covers Worker
+
+Worker TaskIQ de migration des covers base64 vers le store adressé par contenu.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict
+
+import httpx
+
+from backend.workers.taskiq_app import broker
+from backend.workers.utils.logging import logger
+
+# Pause après un lot sans progrès (lignes verrouillées ou pool de transcodage saturé)
+LOCKED_RETRY_DELAY = 1.0
+
+
+@broker.task(name="covers.migrate_to_store", queue="deferred")
+async def migrate_covers_to_store(batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Vide les covers base64 de la table covers vers le store adressé par contenu.
+
+    Appelle POST /api/covers/store/migrate par lots (parcours par ID croissant)
+    jusqu'à ce qu'il ne reste plus de ligne base64 ; relancer la tâche après une
+    interruption reprend simplement depuis le début des lignes restantes.
+
+    Args:
+        batch_size: Nombre de covers déplacées par appel
+
+    Returns:
+        Compteurs cumulés de la migration
+    """
+    api_url = os.getenv("API_URL", "http://api:8001")
+    logger.info(f"[COVERS] Début migration des covers base64 vers le store (lots de {batch_size})")
+
+    totals = {"processed": 0, "migrated": 0, "failed": 0, "batches": 0}
+    after_id = 0
+
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        while after_id is not None:
+            response = await client.post(
+                f"{api_url}/api/covers/store/migrate",
+                params={"after_id": after_id, "batch_size": batch_size},
+            )
+            if response.status_code != 200:
+                logger.error(f"[COVERS] Migration interrompue: {response.status_code} - {response.text}")
+                return {"success": False, **totals, "last_after_id": after_id}
+
+            batch = response.json()
+            totals["batches"] += 1
+            for key in ("processed", "migrated", "failed"):
+                totals[key] += batch.get(key, 0)
+            after_id = batch.get("next_after_id")
+            if after_id is not None and batch.get("processed", 0) == batch.get("deferred", 0):
+                # Aucun progrès (lignes verrouillées ou pool saturé) : laisser respirer
+                await asyncio.sleep(LOCKED_RETRY_DELAY)
+
+    logger.info(
+        f"[COVERS] Migration terminée: {totals['migrated']} covers déplacées, "
+        f"{totals['failed']} illisibles"
+    )
+    return {"success": True, **totals}
@@ -6,9 +6,8 @@ Traite les tâches d'enrichissement (artistes, albums, tracks) de manière diff
 from typing import Dict, Any
 from backend.workers.utils.logging import logger
 from backend.workers.taskiq_app import broker
-from backend.workers.services.enrichment_service import enrich_artist, enrich_album
-from backend.workers.services.audio_features_service import analyze_audio_with_librosa
-from backend.workers.services.deferred_queue_service import deferred_queue_service
+from backend.services.enrichment_service import enrich_artist, enrich_album
+from backend.services.deferred_queue_service import deferred_queue_service
 
 
 @broker.task(name="worker_deferred_enrichment.process_enrichment_batch", queue="deferred_enrichment")
@@ -31,14 +30,16 @@ async def process_enrichment_batch_task(batch_size: int = 10) -> Dict[str, Any]:
         failed = 0
         results = []
 
-        for _ in range(batch_size):
-            # Récupère la prochaine tâche
-            task = deferred_queue_service.dequeue_task("deferred_enrichment")
+        # Tâches abandonnées par un worker mort : remises en attente avant le défilement
+        deferred_queue_service.reclaim_expired("deferred_enrichment")
 
-            if not task:
-                break  # Plus de tâches
+        # Défilement atomique du lot en un aller-retour Redis
+        tasks = deferred_queue_service.dequeue_tasks("deferred_enrichment", batch_size)
 
+        for task in tasks:
             processed += 1
+            # Le bail court depuis le défilement du lot : on le renouvelle avant chaque tâche
+            deferred_queue_service.extend_lease("deferred_enrichment", task["id"])
             task_result = await _process_single_enrichment_task(task)
 
             results.append(task_result)
@@ -95,6 +96,8 @@ async def _process_single_enrichment_task(task: Dict[str, Any]) -> Dict[str, Any
 
         elif task_type == "track_audio":
             # Analyse audio de la track
+            from backend.services.audio_features_service import analyze_audio_with_librosa
+
             file_path = task_data.get("file_path")
             tags = task_data.get("tags")  # Tags audio extraits lors du scan
             
@@ -103,7 +106,7 @@ async def _process_single_enrichment_task(task: Dict[str, Any]) -> Dict[str, Any
                 if tags:
                     logger.info(f"[ENRICHMENT] Track {entity_id}: utilisation des {len(tags)} tags audio transmis")
                     # Utiliser extract_audio_features avec les tags déjà extraits
-                    from backend.workers.services.audio_features_service import extract_audio_features
+                    from backend.services.audio_features_service import extract_audio_features
                     result = await extract_audio_features(None, tags, file_path, entity_id)
                     success = result is not None and bool(result)
                     if success:
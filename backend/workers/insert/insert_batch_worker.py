@@ -31,6 +31,7 @@ import asyncio
 import uuid
 from typing import Dict, Any, List
 
+from backend.services.payload_store import is_handle, payload_store
 from backend.workers.utils.logging import logger
 from backend.workers.utils.pubsub import publish_event
 from backend.workers.taskiq_app import broker
@@ -54,7 +55,11 @@ from backend.workers.deferred.deferred_enrichment_worker import process_enrichme
 
 @broker.task(name="insert.direct_batch", queue="insert")
 async def insert_batch_direct(insertion_data: Dict[str, Any]):
-    """Insère en base de données via l'API HTTP uniquement."""
+    """Insère en base de données via l'API HTTP uniquement.
+
+    insertion_data peut être un handle du payload_store : le lot est alors
+    lu à la demande et libéré après une insertion réussie.
+    """
     # Vérifier le feature flag
     if USE_TASKIQ_FOR_INSERT:
         logger.info("[TASKIQ] Délégation à TaskIQ pour insert_direct_batch")
@@ -84,11 +89,14 @@ async def insert_batch_direct(insertion_data: Dict[str, Any]):
     
     # Code TaskIQ existant (ne pas modifier)
     task_id = str(uuid.uuid4())
+    payload_handle = insertion_data if is_handle(insertion_data) else None
+    insertion_data = await payload_store.resolve(insertion_data)
     logger.info(f"[INSERT TASK] Démarrage tâche insert.direct_batch - Task ID: {task_id}")
     logger.info(f"[INSERT TASK] Données reçues: {len(insertion_data.get('artists', []))} artistes, {len(insertion_data.get('albums', []))} albums, {len(insertion_data.get('tracks', []))} tracks")
     
     try:
         result = await _insert_batch_direct_async(insertion_data, task_id)
+        await payload_store.release(payload_handle)
         logger.info(f"[INSERT TASK] Tâche terminée avec succès - Task ID: {task_id}")
         return result
     except Exception as e:
@@ -104,7 +112,7 @@ async def enqueue_enrichment_tasks_for_artists(client: httpx.AsyncClient, artist
             return
 
         logger.info(f"[ENRICHMENT] Vérification covers pour {len(artist_ids)} artistes")
-        enqueued_count = 0
+        tasks_data = []
 
         for artist_id in artist_ids:
             try:
@@ -113,15 +121,13 @@ async def enqueue_enrichment_tasks_for_artists(client: httpx.AsyncClient, artist
                     logger.debug(f"[ENRICHMENT] Artiste {artist_id} a déjà une cover, skip")
                     continue
 
-                task_data = {"type": "artist", "id": artist_id}
-                success = deferred_queue_service.enqueue_task(
-                    "deferred_enrichment", task_data, priority="normal", delay_seconds=60
-                )
-                if success:
-                    enqueued_count += 1
+                tasks_data.append({"type": "artist", "id": artist_id})
             except Exception as e:
                 logger.error(f"[ENRICHMENT] Erreur vérification artiste {artist_id}: {str(e)}")
 
+        enqueued_count = deferred_queue_service.enqueue_many(
+            "deferred_enrichment", tasks_data, priority="normal", delay_seconds=60
+        )
         logger.info(f"[ENRICHMENT] Total tâches enqueued pour artistes: {enqueued_count}/{len(artist_ids)}")
 
     except Exception as e:
@@ -135,7 +141,7 @@ async def enqueue_enrichment_tasks_for_albums(client: httpx.AsyncClient, album_i
             return
 
         logger.info(f"[ENRICHMENT] Vérification covers pour {len(album_ids)} albums")
-        enqueued_count = 0
+        tasks_data = []
 
         for album_id in album_ids:
             try:
@@ -148,19 +154,17 @@ async def enqueue_enrichment_tasks_for_albums(client: httpx.AsyncClient, album_i
                     continue
 
                 album_data = album_response.json()
-                task_data = {
+                tasks_data.append({
                     "type": "album",
                     "id": album_id,
                     "mb_release_id": album_data.get("musicbrainz_albumid")
-                }
-                success = deferred_queue_service.enqueue_task(
-                    "deferred_enrichment", task_data, priority="normal", delay_seconds=120
-                )
-                if success:
-                    enqueued_count += 1
+                })
             except Exception as e:
                 logger.error(f"[ENRICHMENT] Erreur vérification album {album_id}: {str(e)}")
 
+        enqueued_count = deferred_queue_service.enqueue_many(
+            "deferred_enrichment", tasks_data, priority="normal", delay_seconds=120
+        )
         logger.info(f"[ENRICHMENT] Total tâches enqueued pour albums: {enqueued_count}/{len(album_ids)}")
 
     except Exception as e:
@@ -430,28 +434,26 @@ async def _insert_batch_direct_async(insertion_data: Dict[str, Any], task_id: st
                     if processed_tracks:
                         await on_tracks_inserted_callback(processed_tracks)
 
-                        # Enqueue audio enrichment tasks
-                        enqueued_count = 0
+                        # Enqueue audio enrichment tasks (un seul pipeline Redis)
+                        audio_tasks = []
                         for track in processed_tracks:
                             track_id = track.get('id')
                             file_path = track.get('path')
                             tags = track.get('tags') or track.get('audio_tags')
                             
                             if track_id and file_path:
-                                task_data = {
+                                audio_tasks.append({
                                     "type": "track_audio",
                                     "id": track_id,
                                     "file_path": file_path,
                                     "tags": tags
-                                }
-                                success = deferred_queue_service.enqueue_task(
-                                    "deferred_enrichment",
-                                    task_data,
-                                    priority="low",
-                                    delay_seconds=30 + (enqueued_count % 10) * 5
-                                )
-                                if success:
-                                    enqueued_count += 1
+                                })
+                        enqueued_count = deferred_queue_service.enqueue_many(
+                            "deferred_enrichment",
+                            audio_tasks,
+                            priority="low",
+                            delays=[30 + (index % 10) * 5 for index in range(len(audio_tasks))]
+                        )
                         
                         logger.info(f"[ENRICHMENT] ✅ {enqueued_count}/{len(processed_tracks)} tâches audio enqueued")
                         
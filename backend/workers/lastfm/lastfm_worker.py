@@ -5,7 +5,6 @@ Last.fm Worker
 TaskIQ worker for fetching artist information from Last.fm API using pylast.
 """
 
-import asyncio
 import uuid
 from typing import List, Dict, Any
 from backend.workers.taskiq_app import broker
@@ -185,6 +184,10 @@ async def batch_fetch_lastfm_info(artist_ids: List[int], include_similar: bool =
     """
     Batch fetch Last.fm information for multiple artists.
 
+    Artists are processed concurrently; the request rate is capped by the
+    shared Redis token bucket of the async Last.fm client instead of a fixed
+    pause between artists.
+
     Args:
         artist_ids: List of artist IDs to process
         include_similar: Whether to also fetch similar artists
@@ -192,69 +195,21 @@ async def batch_fetch_lastfm_info(artist_ids: List[int], include_similar: bool =
     Returns:
         Batch processing results
     """
+    task_id = uuid.uuid4().hex
     try:
-        task_id = uuid.uuid4().hex
         logger.info(f"[LASTFM] Starting batch fetch: {len(artist_ids)} artists, task_id={task_id}")
 
-        results = []
-        success_count = 0
-        error_count = 0
-
-        for artist_id in artist_ids:
-            try:
-                info_result = await fetch_artist_lastfm_info(artist_id)
-                info_success = info_result.get('success', False)
-
-                artist_result = {
-                    "artist_id": artist_id,
-                    "info_fetched": info_success,
-                    "similar_fetched": False
-                }
-
-                if info_success and include_similar:
-                    similar_result = await fetch_similar_artists(artist_id)
-                    similar_success = similar_result.get('success', False)
-                    artist_result["similar_fetched"] = similar_success
-
-                    if similar_success:
-                        success_count += 1
-                    else:
-                        error_count += 1
-                elif info_success:
-                    success_count += 1
-                else:
-                    error_count += 1
-
-                results.append(artist_result)
-
-                import time
-                time.sleep(0.5)
+        from backend.services.lastfm_client import fetch_and_store_artists
 
-            except Exception as e:
-                logger.error(f"[LASTFM] Error processing artist {artist_id}: {e}")
-                results.append({
-                    "artist_id": artist_id,
-                    "info_fetched": False,
-                    "similar_fetched": False,
-                    "error": str(e)
-                })
-                error_count += 1
+        result = await fetch_and_store_artists(artist_ids, include_similar=include_similar)
 
-        logger.info(f"[LASTFM] Batch fetch completed: {success_count} success, {error_count} errors")
-
-        return {
-            "task_id": task_id,
-            "success": True,
-            "total_artists": len(artist_ids),
-            "successful": success_count,
-            "failed": error_count,
-            "results": results
-        }
+        logger.info(f"[LASTFM] Batch fetch completed: {result['successful']} success, {result['failed']} errors")
+        return {"task_id": task_id, **result}
 
     except Exception as e:
         logger.error(f"[LASTFM] Batch fetch failed: {e}")
         return {
-            "task_id": uuid.uuid4().hex,
+            "task_id": task_id,
             "success": False,
             "error": str(e)
         }
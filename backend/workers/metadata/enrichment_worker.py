@@ -21,32 +21,30 @@ import json
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from backend.workers.services.lastfm_service import lastfm_service
 
 from backend.workers.utils.logging import logger
-from backend.workers.services.audio_features_service import analyze_audio_with_librosa
-from backend.workers.services.enrichment_service import enrich_artist, enrich_album
 
 library_api_url = os.getenv("API_URL", "http://api:8001")
 
 
-def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
+def extract_single_file_metadata(file_path: str, base_directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Extrait les métadonnées d'un fichier unique (fonction asynchrone pour ThreadPoolExecutor).
 
     Optimisée pour Raspberry Pi : extraction simple, pas d'analyse audio.
+    Seuls les blocs d'en-tête/tags sont lus (open_audio_bounded).
 
     Args:
         file_path: Chemin du fichier à traiter
+        base_directory: Racine du scan autorisée (répertoire du fichier si absent)
 
     Returns:
         Dictionnaire de métadonnées ou None si erreur
     """
     try:
         # Import ici pour éviter les problèmes d'import dans les threads
-        from mutagen import File
-        from backend.workers.services.music_scan import (
-            get_file_type, get_tag, sanitize_path, get_musicbrainz_tags,
+        from backend.services.music_scan import (
+            get_file_type, get_tag, sanitize_path, get_musicbrainz_tags, open_audio_bounded,
         )
 
         # Validation et sanitisation du chemin
@@ -57,14 +55,19 @@ def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
             logger.warning(f"[METADATA] Chemin invalide {file_path}: {e}")
             return None
 
-        # Vérification existence fichier
-        if not file_path_obj.exists() or not file_path_obj.is_file():
+        # Vérification existence fichier (le stat sert aussi au manifeste du scan incrémental)
+        try:
+            stat_result = file_path_obj.stat()
+        except OSError:
+            stat_result = None
+        if stat_result is None or not file_path_obj.is_file():
             logger.warning(f"[METADATA] Fichier inexistant: {file_path}")
             return None
 
         # Ouverture et lecture du fichier
         try:
-            audio = File(file_path, easy=False)
+            allowed_base = Path(base_directory) if base_directory else file_path_obj.parent
+            audio, bytes_read = open_audio_bounded(file_path_obj, allowed_base_paths=[allowed_base])
             if audio is None:
                 logger.warning(f"[METADATA] Impossible de lire: {file_path}")
                 return None
@@ -133,7 +136,7 @@ def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
                         logger.info(f"[GENRE_CHECK] Genre suspect '{single_genre}' non trouvé dans la bibliothèque. Appel API /api/artists/search?name={cleaned} pour vérifier si c'est un artiste")
 
                         # Utilisation du service de cache pour éviter les appels API répétés
-                        from backend.workers.services.cache_service import cache_service
+                        from backend.services.cache_service import cache_service
 
                         async def check_artist_in_api_cached():
                             # Générer une clé de cache unique
@@ -247,6 +250,9 @@ def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
                 "track_number": get_tag(audio, "tracknumber") or get_tag(audio, "TRCK"),
                 "disc_number": get_tag(audio, "discnumber") or get_tag(audio, "TPOS"),
                 "file_type": get_file_type(file_path),
+                "file_mtime": stat_result.st_mtime,
+                "file_size": stat_result.st_size,
+                "bytes_read": bytes_read,
             }
 
             # Ajouter durée si disponible
@@ -292,7 +298,7 @@ def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
                     cover_mime_type = apic.mime
                     # Convertir les données binaires en base64 de manière synchrone
                     try:
-                        from backend.workers.services.image_service import convert_to_base64_sync
+                        from backend.services.image_service import convert_to_base64_sync
                         # Appeler la version synchrone
                         cover_data, _ = convert_to_base64_sync(apic.data, cover_mime_type)
                         logger.info(f"[METADATA] Cover MP3 extraite avec succès pour: {file_path}")
@@ -310,7 +316,7 @@ def extract_single_file_metadata(file_path: str) -> Optional[Dict[str, Any]]:
                         logger.debug(f"[METADATA] Avant conversion base64, données disponibles: {len(picture.data) if picture.data else 0}")
 
                         # Utiliser la fonction existante convert_to_base64_sync de manière synchrone
-                        from backend.workers.services.image_service import convert_to_base64_sync
+                        from backend.services.image_service import convert_to_base64_sync
                         cover_data, _ = convert_to_base64_sync(picture.data, cover_mime_type)
 
                         logger.debug(f"[METADATA] Conversion base64 réussie, longueur: {len(cover_data) if cover_data else 0}")
@@ -385,6 +391,11 @@ async def enrich_tracks_batch(track_ids: List[int], enrichment_types: List[str]
     Returns:
         Résultats de l'enrichissement
     """
+    # Import ici : les processus d'extraction chargent ce module sans librosa ni Last.fm
+    from backend.services.lastfm_service import lastfm_service
+    from backend.services.audio_features_service import analyze_audio_with_librosa
+    from backend.services.enrichment_service import enrich_artist, enrich_album
+
     processed = 0
     audio_enriched = 0
     artists_enriched = 0
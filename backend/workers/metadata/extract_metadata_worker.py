@@ -2,7 +2,7 @@
 
 Responsabilités :
 - Extraction des métadonnées de fichiers audio
-- Traitement par lots avec ThreadPoolExecutor (max_workers=2)
+- Traitement par paquets dans le pool de processus du MetadataExtractionEngine
 - Envoi vers la phase de batching
 - Publication de la progression
 
@@ -12,7 +12,6 @@ Architecture :
 
 import time
 import os
-from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 import uuid
@@ -20,13 +19,16 @@ from backend.workers.utils.logging import logger
 from backend.workers.utils.pubsub import publish_event
 from backend.workers.taskiq_app import broker
 from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+from backend.services.metadata_extraction_engine import get_extraction_engine
+from backend.services.payload_store import payload_store
 
 
 @broker.task(name="metadata.extract_batch", queue="extract")
 async def extract_metadata_batch(file_paths: List[str], batch_id: str = None):
     """Extraction des métadonnées de fichiers en parallèle.
     
-    Optimisée pour Raspberry Pi : max_workers=2, timeout=60s, batches=25.
+    Le parsing Mutagen est réparti sur le pool de processus partagé
+    (SCAN_EXTRACT_WORKERS processus, paquets de SCAN_EXTRACT_CHUNK_SIZE fichiers).
     
     Args:
         file_paths: Liste des chemins de fichiers à traiter
@@ -65,47 +67,28 @@ async def extract_metadata_batch(file_paths: List[str], batch_id: str = None):
 
         logger.info(f"[EXTRACT] Fichiers valides: {len(valid_paths)}/{len(file_paths)}")
 
-        # Configuration ThreadPoolExecutor optimisée pour Raspberry Pi
-        max_workers = 2  # Fixé à 2 pour Raspberry Pi (4 cœurs max)
-
-        # Extraction massive avec ThreadPoolExecutor
+        # Extraction massive dans le pool de processus (résultats au fil de l'eau)
+        engine = get_extraction_engine()
         extracted_metadata = []
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Soumettre tous les fichiers en parallèle
-            future_to_path = {
-                executor.submit(extract_single_file_metadata, file_path): file_path
-                for file_path in valid_paths
-            }
-
-            # Collecter les résultats au fur et à mesure
-            completed = 0
-            for future in future_to_path:
-                try:
-                    metadata = future.result(timeout=60)  # 1 minute timeout par fichier
-                    if metadata:
-                        extracted_metadata.append(metadata)
-
-                    completed += 1
-
-                    # Update progression toutes les 50 fichiers
-                    if completed % 50 == 0:
-                        progress = min(90, (completed / len(valid_paths)) * 90)
-
-                        # Publier la progression vers le frontend
-                        publish_event("progress", {
-                            "type": "progress",
-                            "task_id": task_id,
-                            "step": f'Extraction {completed}/{len(valid_paths)} fichiers',
-                            "current": completed,
-                            "total": len(valid_paths),
-                            "percent": progress,
-                            "batch_id": batch_id
-                        }, channel="progress")
-
-                except Exception as e:
-                    logger.error(f"[EXTRACT] Erreur traitement fichier: {e}")
-                    completed += 1
+        async for metadata in engine.extract_paths(valid_paths, extract_single_file_metadata):
+            extracted_metadata.append(metadata)
+            completed = len(extracted_metadata)
+
+            # Update progression toutes les 50 fichiers
+            if completed % 50 == 0:
+                progress = min(90, (completed / len(valid_paths)) * 90)
+
+                # Publier la progression vers le frontend
+                publish_event("progress", {
+                    "type": "progress",
+                    "task_id": task_id,
+                    "step": f'Extraction {completed}/{len(valid_paths)} fichiers',
+                    "current": completed,
+                    "total": len(valid_paths),
+                    "percent": progress,
+                    "batch_id": batch_id
+                }, channel="progress")
 
         # Métriques de performance
         total_time = time.time() - start_time
@@ -129,11 +112,12 @@ async def extract_metadata_batch(file_paths: List[str], batch_id: str = None):
             "files_per_second": files_per_second
         }, channel="progress")
 
-        # Envoyer vers le batching si on a des résultats
+        # Envoyer vers le batching si on a des résultats (handle de claim-check
+        # à la place de la liste complète quand elle est volumineuse)
         if extracted_metadata:
             from backend.workers.batch.process_entities_worker import batch_entities
             await batch_entities.kiq(
-                metadata_list=extracted_metadata,
+                metadata_list=await payload_store.offload(extracted_metadata),
                 batch_id=batch_id
             )
 
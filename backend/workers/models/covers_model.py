@@ -21,6 +21,9 @@ class Cover(Base):
     entity_type: Mapped[EntityCoverType] = mapped_column(Enum(EntityCoverType, name='covertype'), nullable=False)
     entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
     cover_data: Mapped[str] = mapped_column(String, nullable=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    width: Mapped[int] = mapped_column(Integer, nullable=True)
+    height: Mapped[int] = mapped_column(Integer, nullable=True)
     mime_type: Mapped[str] = mapped_column(String, nullable=True)
     url: Mapped[str] = mapped_column(String, nullable=True)
     date_added: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -28,7 +31,8 @@ class Cover(Base):
 
     __table_args__ = (
         UniqueConstraint('entity_type', 'entity_id', name='uq_entity_cover'),
-        Index('idx_entity_lookup', 'entity_type', 'entity_id')
+        Index('idx_entity_lookup', 'entity_type', 'entity_id'),
+        Index('idx_covers_content_hash', 'content_hash')
     )
 
     def __repr__(self):
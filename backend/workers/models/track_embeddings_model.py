@@ -23,7 +23,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.workers.models.base import Base, TimestampMixin
@@ -32,6 +32,19 @@ if TYPE_CHECKING:
     from backend.api.models.tracks_model import Track
 
 
+# Types d'embeddings disposant d'un index HNSW partiel
+TRACK_EMBEDDING_TYPES = ('semantic', 'audio', 'text', 'combined')
+
+# Paramètres de construction HNSW par défaut (pgvector)
+HNSW_DEFAULT_M = 16
+HNSW_DEFAULT_EF_CONSTRUCTION = 64
+
+
+def hnsw_index_name(embedding_type: str) -> str:
+    """Nom de l'index HNSW partiel d'un type d'embedding."""
+    return f"idx_track_embeddings_vector_{embedding_type}"
+
+
 class TrackEmbeddings(Base, TimestampMixin):
     """
     Embeddings vectoriels pour une piste musicale.
@@ -111,15 +124,19 @@ class TrackEmbeddings(Base, TimestampMixin):
             'embedding_type',
             unique=True
         ),
-        # Index HNSW pour recherche vectorielle rapide (avec operator class)
-        Index(
-            'idx_track_embeddings_vector',
-            'vector',
-            postgresql_using='hnsw',
-            postgresql_with={'m': 16, 'ef_construction': 64},
-            postgresql_ops={'vector': 'vector_l2_ops'}
+        # Index HNSW partiels, un par type d'embedding : les recherches filtrent
+        # toujours sur embedding_type, un index global perdrait en rappel
+        *(
+            Index(
+                hnsw_index_name(embedding_type),
+                'vector',
+                postgresql_using='hnsw',
+                postgresql_with={'m': HNSW_DEFAULT_M, 'ef_construction': HNSW_DEFAULT_EF_CONSTRUCTION},
+                postgresql_ops={'vector': 'vector_l2_ops'},
+                postgresql_where=text(f"embedding_type = '{embedding_type}'"),
+            )
+            for embedding_type in TRACK_EMBEDDING_TYPES
         ),
-
     )
 
     def __repr__(self) -> str:
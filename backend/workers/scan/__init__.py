@@ -1 +1,5 @@
-"""Workers de scan et découverte de fichiers musicaux."""
\ No newline at end of file
+"""Workers de scan et découverte de fichiers musicaux."""
+
+from .scan_worker import start_scan_task
+
+__all__ = ["start_scan_task"]
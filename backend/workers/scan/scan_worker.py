@@ -2,13 +2,13 @@
 Worker de scan - Découverte et extraction de métadonnées optimisée pour Raspberry Pi
 
 Responsabilités :
-- Discovery des fichiers musicaux (scan récursif optimisé)
-- Extraction des métadonnées (avec ThreadPoolExecutor limité à 2 workers)
-- Envoi vers batching et insertion
+- Discovery des fichiers musicaux (scan récursif paresseux)
+- Pipeline en flux discovery → extraction → batching → insertion (files bornées)
 - Auto-queueing du clustering GMM après scan réussi
 
 Optimisations Raspberry Pi :
-- max_workers = 2 pour éviter surcharge CPU/mémoire
+- Processus d'extraction configurables (SCAN_EXTRACT_WORKERS)
+- Mémoire bornée par SCAN_QUEUE_SIZE quelle que soit la taille de la bibliothèque
 - Timeouts réduits (120s par fichier)
 - Batches plus petits (50-100 fichiers)
 - Barre de progression fonctionnelle via pubsub
@@ -16,45 +16,87 @@ Optimisations Raspberry Pi :
 
 import time
 import os
+import uuid
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any
+from stat import S_ISREG
+from typing import List, Dict, Any, Iterator, Optional
 import httpx
 
 from backend.workers.utils.logging import logger
+from backend.workers.taskiq_app import broker
+from backend.services.scan_manifest import ScanManifest, FILE_UNCHANGED
+from backend.services.scan_pipeline import ScanPipeline, iterate_in_executor
+from backend.services.metadata_extraction_engine import get_extraction_engine
 
+# Taille des files entre étapes et des lots envoyés à l'insertion
+SCAN_QUEUE_SIZE = int(os.getenv("SCAN_QUEUE_SIZE", 100))
+SCAN_BATCH_SIZE = int(os.getenv("SCAN_BATCH_SIZE", 50))
 
-def scan_music_files(directory: str) -> List[str]:
+
+# Extensions musicales supportées
+MUSIC_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.ogg', '.wav'}
+
+
+def iter_music_files(directory: str, manifest: Optional[ScanManifest] = None) -> Iterator[str]:
+    """
+    Scan récursif paresseux pour discovery des fichiers musicaux.
+
+    Les chemins sont produits au fil du walk, sans liste intermédiaire.
+    En mode incrémental (manifest fourni), seuls les fichiers nouveaux ou
+    modifiés (mtime/taille) sont produits, et les erreurs d'accès (racine
+    absente, répertoire illisible) sont enregistrées dans le manifeste pour
+    bloquer la suppression des pistes disparues.
+
+    Args:
+        directory: Répertoire à scanner
+        manifest: Manifeste des pistes connues (scan incrémental)
+
+    Yields:
+        Chemins des fichiers découverts
+    """
+    def on_walk_error(error: OSError) -> None:
+        logger.warning(f"[SCAN] Erreur accès {error.filename or directory}: {error}")
+        if manifest is not None:
+            manifest.record_walk_error(error.filename or directory, error)
+
+    for dirpath, _dirnames, filenames in os.walk(directory, onerror=on_walk_error):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() not in MUSIC_EXTENSIONS:
+                continue
+            file_path = os.path.join(dirpath, filename)
+            if manifest is None:
+                if os.path.isfile(file_path):
+                    yield file_path
+                continue
+            try:
+                stat_result = os.stat(file_path)
+            except OSError:
+                manifest.mark_seen(file_path)
+                continue
+            if not S_ISREG(stat_result.st_mode):
+                continue
+            if manifest.classify(file_path, stat_result.st_mtime, stat_result.st_size) != FILE_UNCHANGED:
+                yield file_path
+
+
+def scan_music_files(directory: str, manifest: Optional[ScanManifest] = None) -> List[str]:
     """
     Scan récursif simple pour discovery des fichiers musicaux.
     
     Optimisé pour Raspberry Pi : scan récursif simple, pas d'extraction.
+    En mode incrémental (manifest fourni), seuls les fichiers nouveaux ou
+    modifiés (mtime/taille) sont retournés.
 
     Args:
         directory: Répertoire à scanner
+        manifest: Manifeste des pistes connues (scan incrémental)
 
     Returns:
         Liste des chemins de fichiers découverts
     """
     try:
-        # Extensions musicales supportées
-        music_extensions = {'.mp3', '.flac', '.m4a', '.ogg', '.wav'}
-
-        # Découverte des fichiers
-        discovered_files = []
-        base_path = Path(directory)
-
-        def scan_recursive(current_path: Path):
-            """Scan récursif simple pour discovery."""
-            try:
-                for file_path in current_path.rglob('*'):
-                    if file_path.is_file() and file_path.suffix.lower() in music_extensions:
-                        discovered_files.append(str(file_path))
-            except (OSError, PermissionError) as e:
-                logger.warning(f"[SCAN] Erreur accès {current_path}: {e}")
-
-        scan_recursive(base_path)
-        return discovered_files
-
+        return list(iter_music_files(directory, manifest))
     except Exception as e:
         logger.error(f"[SCAN] Erreur scan: {str(e)}")
         return []
@@ -93,14 +135,72 @@ def get_file_type(file_path: str) -> str:
         return ""
 
 
+async def run_scan_pipeline(directory: str, manifest: Optional[ScanManifest] = None) -> Dict[str, Any]:
+    """
+    Exécute le pipeline de scan en flux : discovery → extraction → batching → insertion.
+
+    Les étapes sont reliées par des files bornées (SCAN_QUEUE_SIZE) : la mémoire
+    reste constante quelle que soit la taille de la bibliothèque et l'insertion
+    freine l'extraction quand l'API ne suit pas.
+
+    Args:
+        directory: Répertoire à scanner
+        manifest: Manifeste des pistes connues (scan incrémental)
+
+    Returns:
+        Statistiques du pipeline
+    """
+    from backend.workers.batch.process_entities_worker import batch_entities
+    from backend.workers.insert.insert_batch_worker import _insert_batch_direct_async
+    from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+    from backend.services.music_scan import scan_io_stats
+
+    batch_count = 0
+    scan_io_stats.reset()
+
+    async def process_batch(metadata_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        nonlocal batch_count
+        batch_count += 1
+        for metadata in metadata_list:
+            scan_io_stats.record(metadata.get("bytes_read", 0), metadata.get("file_size"))
+        return await batch_entities(metadata_list, batch_id=f"stream_{batch_count}", dispatch_insert=False)
+
+    async def insert_batch(insertion_data: Dict[str, Any]) -> None:
+        await _insert_batch_direct_async(insertion_data, uuid.uuid4().hex)
+
+    pipeline = ScanPipeline(
+        engine=get_extraction_engine(),
+        # partial reste picklable pour le pool de processus du moteur
+        engine_extract_fn=partial(extract_single_file_metadata, base_directory=directory),
+        queue_size=SCAN_QUEUE_SIZE,
+        batch_size=SCAN_BATCH_SIZE,
+    )
+    stats = await pipeline.run(
+        iterate_in_executor(iter_music_files(directory, manifest)),
+        process_batch,
+        insert_batch,
+    )
+    logger.info(f"[SCAN_IO] Octets lus par Mutagen: {scan_io_stats.snapshot()}")
+    return stats
+
+
 # Task dispatcher function - called by tasks
-async def start_scan(directory: str, callback=None) -> Dict[str, Any]:
+async def start_scan(
+    directory: str,
+    callback=None,
+    incremental: bool = False,
+    force_delete: bool = False,
+) -> Dict[str, Any]:
     """
     Point d'entrée pour démarrer le scan.
     
     Args:
         directory: Répertoire à scanner
         callback: Fonction de callback pour progression
+        incremental: Ne retenir que les fichiers nouveaux/modifiés et
+            supprimer les pistes dont le fichier a disparu
+        force_delete: Supprimer les disparues même au-delà du plafond
+            SCAN_MAX_VANISHED_RATIO (jamais si le walk a échoué)
         
     Returns:
         Résultat du scan
@@ -108,12 +208,25 @@ async def start_scan(directory: str, callback=None) -> Dict[str, Any]:
     start_time = time.time()
     
     try:
-        logger.info(f"[SCAN] Démarrage discovery: {directory}")
+        logger.info(f"[SCAN] Démarrage scan en flux: {directory} (incrémental={incremental})")
         
-        music_files = scan_music_files(directory)
-        total_files = len(music_files)
+        manifest = None
+        tracks_deleted = 0
+        if incremental:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                manifest = await ScanManifest.fetch(client, directory)
+
+        pipeline_stats = await run_scan_pipeline(directory, manifest)
+        total_files = pipeline_stats["discovered"]
+
+        if manifest is not None:
+            # Les disparus ne sont connus qu'une fois le walk terminé
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                tracks_deleted = await manifest.delete_vanished(client, directory, force=force_delete)
         
-        logger.info(f"[SCAN] Discovery terminée: {total_files} fichiers trouvés")
+        logger.info(f"[SCAN] Scan terminé: {total_files} fichiers découverts")
+        if manifest is not None:
+            logger.info(f"[SCAN] Incrémental: {manifest.stats}, {tracks_deleted} pistes disparues supprimées")
         
         # Publier la progression
         if callback:
@@ -121,19 +234,27 @@ async def start_scan(directory: str, callback=None) -> Dict[str, Any]:
                 "current": total_files,
                 "total": total_files,
                 "percent": 100,
-                "step": "Discovery terminée",
+                "step": "Scan terminé",
                 "files_discovered": total_files
             })
         
         result = {
             "directory": directory,
             "files_discovered": total_files,
-            "file_paths": music_files,
+            "files_extracted": pipeline_stats["extracted"],
+            "batches_inserted": pipeline_stats["batches"] - pipeline_stats["batches_failed"],
+            "pipeline": pipeline_stats,
             "discovery_time": time.time() - start_time,
             "success": True
         }
+        if manifest is not None:
+            result["incremental"] = {
+                **manifest.stats,
+                "tracks_deleted": tracks_deleted,
+                "deletion_skipped": manifest.deletion_skipped,
+            }
         
-        logger.info(f"[SCAN] Discovery terminée: {result}")
+        logger.info(f"[SCAN] Scan terminé: {result}")
         
         # Vérifier si le clustering GMM doit être déclenché
         await _maybe_trigger_gmm_clustering(result)
@@ -142,7 +263,7 @@ async def start_scan(directory: str, callback=None) -> Dict[str, Any]:
         
     except Exception as e:
         error_time = time.time() - start_time
-        logger.error(f"[SCAN] Erreur découverte après {error_time:.2f}s: {str(e)}")
+        logger.error(f"[SCAN] Erreur scan après {error_time:.2f}s: {str(e)}")
         
         error_result = {
             "error": str(e),
@@ -153,6 +274,26 @@ async def start_scan(directory: str, callback=None) -> Dict[str, Any]:
         return error_result
 
 
+@broker.task(name="scan.start", queue="scan")
+async def start_scan_task(
+    directory: str,
+    incremental: bool = False,
+    force_delete: bool = False,
+) -> Dict[str, Any]:
+    """
+    Tâche TaskIQ envoyée par ScanService : exécute start_scan sur le worker.
+
+    Args:
+        directory: Répertoire à scanner
+        incremental: Scan incrémental basé sur le manifeste
+        force_delete: Supprimer les disparues même au-delà du plafond
+
+    Returns:
+        Résultat du scan
+    """
+    return await start_scan(directory, incremental=incremental, force_delete=force_delete)
+
+
 # === Auto-queueing GMM ===
 
 def _get_clustering_stats_via_api() -> Dict[str, int]:
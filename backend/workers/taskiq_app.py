@@ -83,6 +83,10 @@ async def worker_startup_handler(_event):
 
 @broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
 async def worker_shutdown_handler(_event):
+    from backend.services.metadata_extraction_engine import shutdown_extraction_engine
+    shutdown_extraction_engine()
+    from backend.services.cache_service import cache_service
+    await cache_service.aclose()
     logger.info("[TASKIQ] Worker arrêté")
 
 # Client events for task sending/receiving
@@ -7,7 +7,8 @@ from taskiq.api import run_receiver_task
 import asyncio
 
 # Import des tâches TaskIQ (à migrer progressivement)
-from backend.workers.taskiq_tasks import covers
+from backend.workers import covers  # noqa: F401
+from backend.workers import scan  # noqa: F401
 
 
 async def main() -> None:
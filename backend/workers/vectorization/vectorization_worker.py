@@ -16,7 +16,7 @@ Architecture : backend_worker (CPU) → library_api (données) → recommender_a
 
 import asyncio
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import time
 
 from backend.workers.taskiq_app import broker
@@ -127,6 +127,50 @@ async def vectorize_tracks_batch_optimized(track_ids: List[int]) -> Dict[str, An
         }
 
 
+@broker.task
+async def revectorize_library_task(
+    embedding_type: str = "semantic",
+    only_missing: bool = False,
+    resume: bool = True,
+    page_size: Optional[int] = None,
+    micro_batch_size: Optional[int] = None,
+    max_tracks: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Tâche TaskIQ de revectorisation de la bibliothèque par pages.
+
+    Une requête de lecture et une requête d'écriture par page (et non par
+    piste) ; le dernier ID écrit est enregistré comme point de reprise.
+
+    Args:
+        embedding_type: Type d'embedding produit
+        only_missing: Ne traiter que les pistes sans cet embedding
+        resume: Reprendre au dernier point de reprise
+        page_size: Pistes par page (EMBEDDING_PIPELINE_PAGE_SIZE par défaut)
+        micro_batch_size: Textes par passe du modèle (EMBEDDING_PIPELINE_MICRO_BATCH_SIZE par défaut)
+        max_tracks: Nombre maximum de pistes pour cette exécution
+
+    Returns:
+        Résumé du parcours
+    """
+    from backend.services.embedding_pipeline_service import EmbeddingPipelineService
+
+    logger.info(f"[TASKIQ] Démarrage revectorisation bibliothèque (type={embedding_type}, resume={resume})")
+    pipeline = EmbeddingPipelineService(page_size=page_size, micro_batch_size=micro_batch_size)
+    try:
+        return await pipeline.run(
+            embedding_type=embedding_type,
+            only_missing=only_missing,
+            resume=resume,
+            max_tracks=max_tracks,
+        )
+    except Exception as e:
+        logger.error(f"[TASKIQ] Erreur revectorisation bibliothèque: {e}")
+        return {"status": "error", "message": str(e), "embedding_type": embedding_type}
+    finally:
+        await pipeline.close()
+
+
 @broker.task
 async def train_vectorizer_optimized(force_retrain: bool = False) -> Dict[str, Any]:
     """
@@ -412,13 +456,24 @@ async def validate_vectors_advanced_task(track_ids: List[int] = [], sample_size:
 
 
 @broker.task(name="worker_vector_optimized.rebuild_index_advanced")
-async def rebuild_index_advanced_task(entity_type: str = "track", batch_size: int = 1000) -> Dict[str, Any]:
+async def rebuild_index_advanced_task(
+    entity_type: str = "track",
+    batch_size: int = 1000,
+    rebuild_ann_index: bool = True,
+    embedding_types: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """
     Tâche de reconstruction complète de l'index vectoriel (version avancée).
 
+    Après la revectorisation des pistes, les index HNSW partiels de
+    track_embeddings sont reconstruits (un par type d'embedding) pour
+    repartir d'un graphe compact.
+
     Args:
         entity_type: Type d'entité à indexer ("track", "artist", "album")
         batch_size: Taille des batches de traitement
+        rebuild_ann_index: Reconstruire les index HNSW après vectorisation
+        embedding_types: Types d'embeddings à réindexer (tous par défaut)
 
     Returns:
         Résultats de la reconstruction
@@ -467,6 +522,9 @@ async def rebuild_index_advanced_task(entity_type: str = "track", batch_size: in
             "worker_type": "optimized"
         }
 
+        if entity_type == "track" and rebuild_ann_index and not _is_test_mode():
+            result["ann_indexes"] = await _rebuild_ann_indexes_optimized(embedding_types)
+
         logger.info(f"[VECTOR_OPTIMIZED] Reconstruction index terminée: {total_successful}/{total_processed} succès")
         return result
 
@@ -505,6 +563,25 @@ async def _filter_tracks_without_vectors_optimized(track_ids: List[int]) -> List
         return track_ids
 
 
+async def _rebuild_ann_indexes_optimized(embedding_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Demande à l'API la reconstruction des index HNSW partiels de track_embeddings."""
+    try:
+        # La construction HNSW peut durer plusieurs minutes sur une grosse bibliothèque
+        async with httpx.AsyncClient(timeout=httpx.Timeout(3600.0, connect=10.0)) as client:
+            response = await client.post(
+                "http://api:8001/api/embeddings/indexes/rebuild",
+                json={"embedding_types": embedding_types},
+            )
+            response.raise_for_status()
+            rebuilt = response.json().get("rebuilt", [])
+            logger.info(f"[VECTOR_OPTIMIZED] {len(rebuilt)} index HNSW reconstruits")
+            return {"rebuilt": rebuilt}
+
+    except Exception as e:
+        logger.error(f"[VECTOR_OPTIMIZED] Erreur reconstruction index HNSW: {str(e)}")
+        return {"error": str(e)}
+
+
 async def _get_all_entity_ids_optimized(entity_type: str) -> List[int]:
     """Récupère tous les IDs d'entités d'un type donné (version optimisée)."""
     try:
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour les upserts ensemblistes d'artistes et d'albums.
+
+Ce module vérifie qu'un lot complet est traité avec une requête de
+préchargement et une seule instruction INSERT, sans boucle par entité.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from backend.api.schemas.albums_schema import AlbumCreate
+from backend.api.schemas.artists_schema import ArtistCreate
+from backend.api.services.album_service import AlbumService
+from backend.api.services.artist_service import ArtistService
+
+
+def _result(rows):
+    """Construit un résultat SQLAlchemy simulé."""
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+def _row(**values):
+    """Construit une ligne simulée exposant attributs et _mapping."""
+    return SimpleNamespace(_mapping=values, **values)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_upsert_artists_batch_single_insert_on_conflict():
+    """Les artistes sont dédupliqués puis insérés via un seul INSERT ... ON CONFLICT."""
+    service = ArtistService(AsyncMock())
+    service._execute = AsyncMock(side_effect=[
+        _result([("Van Halen",)]),
+        _result([
+            _row(id=1, name="Van Halen", musicbrainz_artistid="mb-1"),
+            _row(id=2, name="Queen", musicbrainz_artistid=None),
+        ]),
+    ])
+    service._commit = AsyncMock()
+
+    results = await service.upsert_artists_batch([
+        ArtistCreate(name="van halen", musicbrainz_artistid="mb-1"),
+        ArtistCreate(name="VAN HALEN"),
+        ArtistCreate(name="Queen"),
+    ])
+
+    assert service._execute.await_count == 2
+    insert_stmt = service._execute.await_args_list[1].args[0]
+    sql = _sql(insert_stmt)
+    assert "ON CONFLICT (name) DO UPDATE" in sql
+    assert "RETURNING" in sql
+    # Le nom stocké est réutilisé pour déclencher le conflit
+    params = insert_stmt.compile(dialect=postgresql.dialect()).params
+    assert "Van Halen" in params.values()
+    assert [r["id"] for r in results] == [1, 2]
+    service._commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_upsert_albums_batch_single_insert_on_conflict():
+    """Les albums sont dédupliqués puis insérés via un seul INSERT ... ON CONFLICT."""
+    service = AlbumService(AsyncMock())
+    service._execute = AsyncMock(side_effect=[
+        _result([("Album A", 1)]),
+        _result([
+            _row(id=10, title="Album A", album_artist_id=1, release_year="2020", musicbrainz_albumid=None),
+            _row(id=11, title="Album B", album_artist_id=1, release_year="2021", musicbrainz_albumid="mb-b"),
+        ]),
+    ])
+    service._commit = AsyncMock()
+
+    results = await service.upsert_albums_batch([
+        AlbumCreate(title="album a", album_artist_id=1),
+        AlbumCreate(title="Album B", album_artist_id=1, release_year="2021", musicbrainz_albumid="mb-b"),
+        AlbumCreate(title="ALBUM B", album_artist_id=1),
+    ])
+
+    assert service._execute.await_count == 2
+    insert_stmt = service._execute.await_args_list[1].args[0]
+    sql = _sql(insert_stmt)
+    assert "ON CONFLICT (title, album_artist_id) DO UPDATE" in sql
+    assert "RETURNING" in sql
+    # Le titre stocké est réutilisé pour déclencher le conflit
+    params = insert_stmt.compile(dialect=postgresql.dialect()).params
+    assert "Album A" in params.values()
+    assert "album a" not in params.values()
+    assert [r["id"] for r in results] == [10, 11]
+    service._commit.assert_awaited_once()
@@ -0,0 +1,115 @@
+"""
+Tests unitaires pour les loaders du catalogue (CatalogLoaders).
+
+Ce module vérifie que chaque relation est servie par une requête IN par
+niveau, que les covers de tous types partagent une requête et que les
+statistiques de lots sont tenues.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.api.graphql.dataloader import CatalogLoaders
+from backend.api.models.covers_model import EntityCoverType
+
+
+class FakeSession:
+    """Renvoie, pour chaque requête, les lignes de la file fournie."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        rows = self.batches.pop(0)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+@pytest.mark.asyncio
+async def test_nested_relations_cost_one_query_per_level():
+    """Albums de 3 artistes puis leurs pistes : deux requêtes au total."""
+    albums = [SimpleNamespace(id=10, album_artist_id=1), SimpleNamespace(id=11, album_artist_id=1),
+              SimpleNamespace(id=20, album_artist_id=2)]
+    tracks = [SimpleNamespace(id=100, album_id=10), SimpleNamespace(id=200, album_id=20)]
+    session = FakeSession(albums, tracks)
+    loaders = CatalogLoaders(session)
+
+    by_artist = await asyncio.gather(*(loaders.albums_by_artist(i) for i in (1, 2, 3)))
+    assert [[a.id for a in group] for group in by_artist] == [[10, 11], [20], []]
+
+    by_album = await asyncio.gather(*(loaders.tracks_by_album(a.id) for group in by_artist for a in group))
+    assert [[t.id for t in group] for group in by_album] == [[100], [], [200]]
+
+    assert len(session.statements) == 2
+    assert "albums.album_artist_id IN" in session.statements[0]
+    assert "tracks.album_id IN" in session.statements[1]
+    stats = loaders.get_stats()
+    assert stats["queries"] == 2 and stats["keys"] == 6
+    assert stats["loaders"]["tracks_by_album"]["max_batch"] == 3
+
+
+@pytest.mark.asyncio
+async def test_covers_of_all_entity_types_share_one_query():
+    """Covers d'album, d'artiste et de piste : une seule requête."""
+    covers = [
+        SimpleNamespace(id=1, entity_type=EntityCoverType.ALBUM, entity_id=5),
+        SimpleNamespace(id=2, entity_type=EntityCoverType.ARTIST, entity_id=5),
+    ]
+    session = FakeSession(covers)
+    loaders = CatalogLoaders(session)
+
+    album, artist, track = await asyncio.gather(
+        loaders.covers_by_entity("album", 5),
+        loaders.covers_by_entity(EntityCoverType.ARTIST, 5),
+        loaders.track_relations.load("covers", 5),
+    )
+
+    assert [c.id for c in album] == [1] and [c.id for c in artist] == [2] and track == []
+    assert len(session.statements) == 1
+
+
+class SyncSessionAdapter:
+    """Expose une session synchrone (SQLite de test) avec l'API asynchrone attendue par les loaders."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+@pytest.mark.asyncio
+async def test_loaded_orm_tracks_resolve_relations_through_the_loaders(test_db_engine):
+    """Les pistes ORM des loaders ne portent pas de relation vide : _relation renvoie les vraies valeurs."""
+    from unittest.mock import MagicMock
+
+    from sqlalchemy.orm import Session
+
+    from backend.api.graphql.types.tracks_type import _relation
+    from backend.api.models.covers_model import Cover
+    from backend.api.models.track_audio_features_model import TrackAudioFeatures
+    from backend.api.models.tracks_model import Track
+
+    with Session(test_db_engine) as session:
+        session.add(Track(id=1, title="Airbag", path="/music/airbag.flac", album_id=7, track_artist_id=3))
+        session.add(TrackAudioFeatures(track_id=1, bpm=120.0))
+        session.add(Cover(id=5, entity_type=EntityCoverType.TRACK, entity_id=1, url="/covers/1.jpg"))
+        session.commit()
+
+    with Session(test_db_engine) as session:
+        loaders = CatalogLoaders(SyncSessionAdapter(session))
+        loaders.track_relations.load = MagicMock(side_effect=loaders.track_relations.load)
+        info = SimpleNamespace(context=SimpleNamespace(loaders=loaders))
+
+        [track] = await loaders.tracks_by_album(7)
+        assert isinstance(track, Track)
+        assert "audio_features" not in vars(track) and "covers" not in vars(track)
+        assert await loaders.track_by_id(1) is track
+
+        assert [cover.id for cover in await _relation(track, info, "covers")] == [5]
+        assert (await _relation(track, info, "audio_features")).bpm == 120.0
+        assert [call.args[0] for call in loaders.track_relations.load.call_args_list] == ["covers", "audio_features"]
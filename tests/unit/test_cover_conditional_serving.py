@@ -0,0 +1,116 @@
+"""
+Tests unitaires pour le service conditionnel des covers (ETag / 304).
+
+Ce module vérifie que les revalidations sont résolues depuis les validateurs
+Redis sans requête SQL, et que la planche de vignettes est mise en cache.
+"""
+
+from datetime import datetime, timezone
+from email.utils import formatdate
+from io import BytesIO
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.responses import FileResponse
+from PIL import Image
+from starlette.requests import Request
+
+from backend.api.models.covers_model import EntityCoverType
+from backend.api.routers import covers_api
+from backend.api.services.cover_store_service import CoverStore, variant_etag
+from backend.api.services.cover_validator_service import CoverValidator
+
+
+class FakeValidators:
+    """Validateurs en mémoire à la place du hash Redis."""
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+
+    async def get(self, entity_type, entity_id):
+        return self.entries.get((entity_type, entity_id))
+
+    async def get_many(self, entity_type, entity_ids):
+        return {
+            entity_id: self.entries[(entity_type, entity_id)]
+            for entity_id in entity_ids
+            if (entity_type, entity_id) in self.entries
+        }
+
+    async def remember_many(self, entries):
+        for entity_type, entity_id, content_hash, modified in entries:
+            self.entries[(entity_type, entity_id)] = CoverValidator(
+                content_hash or "", int(modified.timestamp()) if modified else 0
+            )
+
+
+def _request(**headers):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    out = BytesIO()
+    Image.new("RGB", (300, 300), (10, 120, 200)).save(out, "PNG")
+    store = CoverStore(root=tmp_path, sizes=(128, 256))
+    stored = store.put(out.getvalue())
+    with patch.object(covers_api, "cover_store", store):
+        yield store, stored.content_hash
+
+
+@pytest.mark.asyncio
+async def test_revalidation_returns_304_without_database(store):
+    """If-None-Match sur l'ETag courant : 304, la session n'est jamais utilisée."""
+    _, hash_value = store
+    validators = FakeValidators({("album", 5): CoverValidator(hash_value, 1_700_000_000)})
+    db = AsyncMock()
+
+    with patch.object(covers_api, "cover_validator_service", validators):
+        response = await covers_api.serve_cover(
+            "album", 5, _request(if_none_match=variant_etag(hash_value, 256)), size=None, db=db
+        )
+        by_date = await covers_api.serve_cover(
+            "album", 5, _request(if_modified_since=formatdate(1_700_000_000, usegmt=True)), size=None, db=db
+        )
+        fresh = await covers_api.serve_cover("album", 5, _request(), size=100, db=db)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == variant_etag(hash_value, 256)
+    assert by_date.status_code == 304
+    assert isinstance(fresh, FileResponse)
+    assert fresh.headers["etag"] == variant_etag(hash_value, 128)
+    db.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sprite_is_cached_and_revalidated(store):
+    """La planche liste les cellules vides puis se revalide par son ETag."""
+    cover_store, hash_value = store
+    validators = FakeValidators()
+    modified = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    with patch.object(covers_api, "cover_validator_service", validators), \
+            patch.object(covers_api.CoverService, "get_content_hashes",
+                         AsyncMock(return_value={1: (hash_value, modified)})) as lookup, \
+            patch.object(cover_store, "abuild_sprite",
+                         AsyncMock(side_effect=lambda key, hashes, size, columns:
+                                   cover_store.build_sprite(key, hashes, size, columns))):
+        first = await covers_api.serve_cover_sprite(
+            EntityCoverType.ALBUM, _request(), ids="1,2", size=128, columns=10, db=AsyncMock()
+        )
+        second = await covers_api.serve_cover_sprite(
+            EntityCoverType.ALBUM, _request(if_none_match=first.headers["etag"]),
+            ids="1,2", size=128, columns=10, db=AsyncMock(),
+        )
+
+    assert first.headers["x-sprite-missing"] == "2"
+    with Image.open(first.path) as sprite:
+        assert sprite.size == (256, 128)
+    assert second.status_code == 304
+    lookup.assert_awaited_once()
@@ -0,0 +1,176 @@
+"""
+Tests unitaires pour le store de covers adressé par contenu.
+
+Ce module vérifie le rendu des variantes, la déduplication par hash et le
+déplacement des covers base64 hors de la base.
+"""
+
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from backend.api.schemas.covers_schema import CoverCreate
+from backend.api.services.cover_store_service import (
+    CoverStore,
+    content_hash,
+    cover_content_url,
+    nearest_variant_size,
+)
+from backend.api.services.covers_service import CoverService
+from backend.api.utils.image_transcode_pool import ImageTranscodePool, TranscodeQueueFull
+
+
+def _thread_pool():
+    return ImageTranscodePool(executor_factory=lambda n: ThreadPoolExecutor(max_workers=n))
+
+
+def _png(width=800, height=600, color=(200, 30, 30)):
+    out = BytesIO()
+    Image.new("RGB", (width, height), color).save(out, "PNG")
+    return out.getvalue()
+
+
+def test_put_renders_every_variant_from_one_decode(tmp_path):
+    """Une insertion produit toutes les tailles, nommées par le SHA-256 de la source."""
+    store = CoverStore(root=tmp_path, sizes=(64, 256))
+    binary = _png()
+
+    stored = store.put(binary)
+
+    assert stored.content_hash == content_hash(binary)
+    assert (stored.width, stored.height) == (800, 600)
+    with Image.open(store.variant_path(stored.content_hash, 64)) as small:
+        assert max(small.size) == 64
+    with Image.open(store.variant_path(stored.content_hash, 256)) as large:
+        assert large.size == (256, 192)
+
+
+def test_put_is_idempotent_for_identical_images(tmp_path):
+    """Deux covers identiques partagent les mêmes fichiers."""
+    store = CoverStore(root=tmp_path, sizes=(64,))
+    binary = _png()
+
+    first = store.put(binary)
+    with patch.object(store, "render_variants", wraps=store.render_variants) as render:
+        second = store.put(binary)
+
+    assert first == second
+    render.assert_not_called()
+    assert len(list(tmp_path.rglob("*.webp"))) == 1
+
+
+def test_variant_lookup_rejects_invalid_hash(tmp_path):
+    """Un hash non hexadécimal ne peut pas sortir de la racine du store."""
+    store = CoverStore(root=tmp_path)
+    assert store.get_variant("../../etc/passwd", 256) is None
+    assert nearest_variant_size(100) == 128
+    assert nearest_variant_size(4096) == 512
+
+
+@pytest.mark.asyncio
+async def test_apply_cover_payload_keeps_only_hash_in_database(tmp_path):
+    """La ligne en base garde hash, dimensions et URL, jamais le base64."""
+    binary = _png(300, 300)
+    cover = CoverCreate(
+        entity_type="album",
+        entity_id=3,
+        cover_data=base64.b64encode(binary).decode(),
+        mime_type="image/png",
+    )
+    db_cover = SimpleNamespace()
+
+    with patch("backend.api.services.covers_service.cover_store", CoverStore(root=tmp_path)), \
+            patch("backend.api.services.cover_store_service.image_transcode_pool", _thread_pool()):
+        await CoverService.apply_cover_payload(db_cover, cover)
+
+    assert db_cover.cover_data is None
+    assert db_cover.content_hash == content_hash(binary)
+    assert (db_cover.width, db_cover.height) == (300, 300)
+    assert db_cover.url == cover_content_url(db_cover.content_hash)
+    assert db_cover.mime_type == "image/webp"
+
+
+@pytest.mark.asyncio
+async def test_migrate_base64_covers_drains_batch(tmp_path):
+    """Les lignes lisibles sont vidées, les illisibles restent sans bloquer le lot."""
+    good = SimpleNamespace(id=1, entity_type="album", entity_id=10, date_modified=None,
+                           cover_data=base64.b64encode(_png(64, 64)).decode(), content_hash=None)
+    broken = SimpleNamespace(id=2, entity_type="album", entity_id=11, date_modified=None,
+                             cover_data="pas-une-image", content_hash=None)
+    validators = AsyncMock()
+    session = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [good, broken]
+    session.execute.return_value = result
+    session.scalar.return_value = True
+
+    with patch("backend.api.services.covers_service.cover_store", CoverStore(root=tmp_path)), \
+            patch("backend.api.services.cover_store_service.image_transcode_pool", _thread_pool()), \
+            patch("backend.api.services.covers_service.cover_validator_service", validators):
+        summary = await CoverService(session).migrate_base64_covers(batch_size=2)
+
+    assert summary == {"processed": 2, "migrated": 1, "failed": 1, "deferred": 0, "next_after_id": 2}
+    assert good.cover_data is None and good.content_hash
+    assert broken.cover_data == "pas-une-image"
+    session.commit.assert_awaited_once()
+    published = list(validators.remember_many.await_args.args[0])
+    assert published == [("album", 10, good.content_hash, None)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("remaining, expected", [(True, 5), (False, None)])
+async def test_migrate_base64_covers_stops_only_when_nothing_remains(tmp_path, remaining, expected):
+    """Un lot incomplet (lignes verrouillées écartées) ne termine pas la migration à lui seul."""
+    cover = SimpleNamespace(id=5, entity_type="album", entity_id=10, date_modified=None,
+                            cover_data=base64.b64encode(_png(64, 64)).decode(), content_hash=None)
+    session = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [cover]
+    session.execute.return_value = result
+    session.scalar.return_value = remaining
+
+    with patch("backend.api.services.covers_service.cover_store", CoverStore(root=tmp_path)), \
+            patch("backend.api.services.cover_store_service.image_transcode_pool", _thread_pool()), \
+            patch("backend.api.services.covers_service.cover_validator_service", AsyncMock()):
+        summary = await CoverService(session).migrate_base64_covers(batch_size=100)
+
+    assert summary["next_after_id"] == expected
+
+
+@pytest.mark.asyncio
+async def test_migrate_base64_covers_bounds_concurrency_and_defers_on_full_pool():
+    """Au plus max_workers rendus simultanés ; une file pleine repousse la ligne sans échouer le lot."""
+    covers = [SimpleNamespace(id=i, entity_type="album", entity_id=i, date_modified=None,
+                              cover_data="x", content_hash=None) for i in range(1, 11)]
+    session = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = covers
+    session.execute.return_value = result
+    session.scalar.return_value = True
+    service = CoverService(session)
+    running = peak = 0
+
+    async def migrate(db_cover):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        if db_cover.id in (4, 7):
+            raise TranscodeQueueFull()
+        return True
+
+    service.migrate_cover_to_store = migrate
+    with patch("backend.api.services.covers_service.image_transcode_pool", SimpleNamespace(max_workers=2)), \
+            patch("backend.api.services.covers_service.cover_validator_service", AsyncMock()):
+        summary = await service.migrate_base64_covers(batch_size=10)
+
+    assert peak == 2
+    assert summary == {"processed": 10, "migrated": 8, "failed": 0, "deferred": 2, "next_after_id": 3}
+    session.commit.assert_awaited_once()
@@ -11,6 +11,20 @@ from unittest.mock import AsyncMock, MagicMock
 import httpx
 
 
+@pytest.fixture(autouse=True)
+def isolated_entity_manager(monkeypatch):
+    """Vide les caches d'entités et coupe Redis (cache partagé et pub/sub)."""
+    from backend.services import entity_manager
+    from backend.services.cache_service import cache_service
+
+    entity_manager.genre_tag_cache.clear()
+    entity_manager.mood_tag_cache.clear()
+    cache_service.invalidate("artist_ids")
+    cache_service.invalidate("album_ids")
+    monkeypatch.setattr(cache_service, "redis_url", None)
+    monkeypatch.setattr(entity_manager, "publish_library_update", MagicMock())
+
+
 class TestEntityManagerURLs:
     """Tests pour valider les URLs des endpoints API."""
 
@@ -41,10 +55,10 @@ class TestEntityManagerURLs:
         )
 
         # Importer la fonction à tester
-        from backend_worker.services.entity_manager import create_or_get_genre_tag
+        from backend.services.entity_manager import create_or_get_genre_tag
 
         # Appeler la fonction
-        result = await create_or_get_genre_tag(mock_client, "Test Genre")
+        await create_or_get_genre_tag(mock_client, "Test Genre")
 
         # Vérifier que l'URL correcte est utilisée pour GET
         mock_client.get.assert_called_once()
@@ -71,10 +85,10 @@ class TestEntityManagerURLs:
         )
 
         # Importer la fonction à tester
-        from backend_worker.services.entity_manager import create_or_get_mood_tag
+        from backend.services.entity_manager import create_or_get_mood_tag
 
         # Appeler la fonction
-        result = await create_or_get_mood_tag(mock_client, "Test Mood")
+        await create_or_get_mood_tag(mock_client, "Test Mood")
 
         # Vérifier que l'URL correcte est utilisée pour GET
         mock_client.get.assert_called_once()
@@ -101,25 +115,25 @@ class TestArtistCreation:
     @pytest.mark.asyncio
     async def test_create_or_get_artists_batch_uses_upsert(self, mock_client):
         """
-        Test que create_or_get_artists_batch utilise upsertArtist au lieu de createArtists
+        Test que create_or_get_artists_batch utilise upsertArtists au lieu de createArtists
         pour éviter les violations de contrainte d'unicité.
         """
-        # Mock la réponse GraphQL pour upsertArtist
+        # Mock la réponse GraphQL pour upsertArtists
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             "data": {
-                "upsertArtist": {
+                "upsertArtists": [{
                     "id": 1,
                     "name": "Van Halen",
                     "musicbrainzArtistid": "b665b768-0d83-4363-950c-31ed39317c15"
-                }
+                }]
             }
         }
         mock_client.post.return_value = mock_response
 
         # Importer la fonction à tester
-        from backend_worker.services.entity_manager import create_or_get_artists_batch
+        from backend.services.entity_manager import create_or_get_artists_batch
 
         # Données d'artistes à tester
         artists_data = [
@@ -130,20 +144,20 @@ class TestArtistCreation:
         ]
 
         # Appeler la fonction
-        result = await create_or_get_artists_batch(mock_client, artists_data)
+        await create_or_get_artists_batch(mock_client, artists_data)
 
-        # Vérifier que la mutation upsertArtist est utilisée
-        mock_client.post.assert_called()
+        # Vérifier qu'une seule mutation upsertArtists est envoyée
+        mock_client.post.assert_called_once()
         post_call = mock_client.post.call_args
         
-        # Vérifier que le corps de la requête contient upsertArtist
+        # Vérifier que le corps de la requête contient upsertArtists
         call_kwargs = post_call.kwargs if post_call.kwargs else post_call[1]
         json_data = call_kwargs.get('json', {})
         
-        # Vérifier que c'est bien upsertArtist et non createArtists
+        # Vérifier que c'est bien upsertArtists et non createArtists
         query = json_data.get('query', '')
-        assert 'upsertArtist' in query, \
-            f"La mutation upsertArtist n'est pas utilisée. Query: {query}"
+        assert 'upsertArtists' in query, \
+            f"La mutation upsertArtists n'est pas utilisée. Query: {query}"
         assert 'createArtists' not in query, \
             f"La mutation createArtists (qui cause les doublons) est encore utilisée. Query: {query}"
 
@@ -153,22 +167,22 @@ class TestArtistCreation:
         Test que create_or_get_artists_batch gère correctement un artiste existant
         sans lever d'exception de contrainte d'unicité.
         """
-        # Mock la réponse GraphQL pour upsertArtist (qui retourne l'artiste existant)
+        # Mock la réponse GraphQL pour upsertArtists (qui retourne l'artiste existant)
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             "data": {
-                "upsertArtist": {
+                "upsertArtists": [{
                     "id": 1,
                     "name": "Van Halen",
                     "musicbrainzArtistid": "b665b768-0d83-4363-950c-31ed39317c15"
-                }
+                }]
             }
         }
         mock_client.post.return_value = mock_response
 
         # Importer la fonction à tester
-        from backend_worker.services.entity_manager import create_or_get_artists_batch
+        from backend.services.entity_manager import create_or_get_artists_batch
 
         # Données d'artistes à tester (artiste qui existe déjà)
         artists_data = [
@@ -192,39 +206,23 @@ class TestArtistCreation:
     @pytest.mark.asyncio
     async def test_create_or_get_artists_batch_processes_multiple_artists(self, mock_client):
         """
-        Test que create_or_get_artists_batch traite correctement plusieurs artistes
-        en utilisant upsertArtist pour chacun.
+        Test que create_or_get_artists_batch traite plusieurs artistes
+        en un seul appel upsertArtists.
         """
-        # Mock les réponses GraphQL pour upsertArtist
-        responses = [
-            {
-                "data": {
-                    "upsertArtist": {
-                        "id": 1,
-                        "name": "Artist 1",
-                        "musicbrainzArtistid": None
-                    }
-                }
-            },
-            {
+        mock_client.post.return_value = MagicMock(
+            status_code=200,
+            json=MagicMock(return_value={
                 "data": {
-                    "upsertArtist": {
-                        "id": 2,
-                        "name": "Artist 2",
-                        "musicbrainzArtistid": None
-                    }
+                    "upsertArtists": [
+                        {"id": 1, "name": "Artist 1", "musicbrainzArtistid": None},
+                        {"id": 2, "name": "Artist 2", "musicbrainzArtistid": None},
+                    ]
                 }
-            }
-        ]
-        
-        # Configurer le mock pour retourner des réponses différentes à chaque appel
-        mock_client.post.side_effect = [
-            MagicMock(status_code=200, json=MagicMock(return_value=resp))
-            for resp in responses
-        ]
+            })
+        )
 
         # Importer la fonction à tester
-        from backend_worker.services.entity_manager import create_or_get_artists_batch
+        from backend.services.entity_manager import create_or_get_artists_batch
 
         # Données d'artistes à tester
         artists_data = [
@@ -235,15 +233,57 @@ class TestArtistCreation:
         # Appeler la fonction
         result = await create_or_get_artists_batch(mock_client, artists_data)
 
-        # Vérifier que upsertArtist a été appelé pour chaque artiste
-        assert mock_client.post.call_count == 2, \
-            f"upsertArtist devrait être appelé 2 fois, mais appelé {mock_client.post.call_count} fois"
+        # Vérifier qu'une seule requête a été envoyée pour tous les artistes
+        assert mock_client.post.call_count == 1, \
+            f"upsertArtists devrait être appelé 1 fois, mais appelé {mock_client.post.call_count} fois"
+        payload = mock_client.post.call_args.kwargs["json"]
+        assert "upsertArtists" in payload["query"]
+        assert [artist["name"] for artist in payload["variables"]["artists"]] == ["Artist 1", "Artist 2"]
 
         # Vérifier que tous les artistes sont dans le résultat
         assert "artist 1" in result, "Artist 1 n'est pas dans le résultat"
         assert "artist 2" in result, "Artist 2 n'est pas dans le résultat"
 
 
+class TestAlbumCreation:
+    """Tests pour valider la création des albums en une seule mutation."""
+
+    @pytest.mark.asyncio
+    async def test_create_or_get_albums_batch_sends_single_upsert(self):
+        """
+        Test que create_or_get_albums_batch envoie tous les albums
+        dans un seul appel upsertAlbums.
+        """
+        mock_client = AsyncMock(spec=httpx.AsyncClient)
+        mock_client.post.return_value = MagicMock(
+            status_code=200,
+            json=MagicMock(return_value={
+                "data": {
+                    "upsertAlbums": [
+                        {"id": 10, "title": "Album 1", "albumArtistId": 1, "releaseYear": None, "musicbrainzAlbumid": None},
+                        {"id": 11, "title": "Album 2", "albumArtistId": 2, "releaseYear": None, "musicbrainzAlbumid": None},
+                    ]
+                }
+            })
+        )
+
+        from backend.services.entity_manager import create_or_get_albums_batch
+
+        albums_data = [
+            {"title": "Album 1", "album_artist_id": 1},
+            {"title": "Album 2", "album_artist_id": 2},
+        ]
+
+        result = await create_or_get_albums_batch(mock_client, albums_data)
+
+        mock_client.post.assert_called_once()
+        payload = mock_client.post.call_args.kwargs["json"]
+        assert "upsertAlbums" in payload["query"]
+        assert [album["title"] for album in payload["variables"]["albums"]] == ["Album 1", "Album 2"]
+        assert result[("album 1", 1)]["id"] == 10
+        assert result[("album 2", 2)]["id"] == 11
+
+
 class TestURLPatterns:
     """Tests pour valider les patterns d'URLs utilisés."""
 
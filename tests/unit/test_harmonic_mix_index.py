@@ -0,0 +1,132 @@
+"""
+Tests unitaires pour l'index de mix harmonique (clé Camelot + BPM).
+
+Ce module vérifie les voisins compatibles sur la roue de Camelot, les
+correspondances demi-tempo / double tempo, les mises à jour incrémentales
+et qu'une playlist entière ne coûte qu'une requête de chargement.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.api.services.harmonic_mix_index_service import (
+    HarmonicMixIndex,
+    harmonic_mix_index_service,
+)
+from backend.api.services.track_audio_features_service import TrackAudioFeaturesService
+
+
+def _index(rows):
+    index = HarmonicMixIndex()
+    for track_id, bpm, camelot_key in rows:
+        index.upsert(track_id, bpm, camelot_key)
+    return index
+
+
+def test_neighbours_use_each_compatible_key_once():
+    index = _index([
+        (1, 124.0, "12A"),
+        (2, 125.0, "1A"),   # +1 (bord de la roue)
+        (3, 123.0, "11A"),  # -1
+        (4, 124.5, "12B"),  # relative
+        (5, 124.0, "2A"),   # incompatible
+        (6, 140.0, "12A"),  # hors tolérance
+    ])
+
+    neighbours = index.neighbours(1, 10, bpm_tolerance=5.0)
+
+    assert [track_id for track_id, _ in neighbours] == [4, 2, 3]
+    assert [gap for _, gap in neighbours] == [0.5, 1.0, 1.0]
+    assert {track_id for track_id, _ in index.neighbours(1, 10, 5.0, harmonic=False)} == {2, 3, 4, 5}
+
+
+def test_half_and_double_time_matches():
+    index = _index([(1, 128.0, "8B"), (2, 64.5, "8B"), (3, 255.0, "8A"), (4, 96.0, "8B")])
+
+    assert index.neighbours(1, 10, 2.0) == []
+    neighbours = index.neighbours(1, 10, 2.0, half_double_time=True)
+    assert neighbours == [(3, 0.5), (2, 1.0)]
+
+
+def test_incremental_updates_move_tracks_between_buckets():
+    index = _index([(1, 120.0, "5A"), (2, 121.0, "5A")])
+
+    index.upsert(2, 121.0, "9B")
+    assert index.neighbours(1, 5, 3.0) == []
+    index.upsert(2, 119.0, "5B")
+    assert index.neighbours(1, 5, 3.0) == [(2, 1.0)]
+    index.upsert(2, None, "5B")
+    assert 2 not in index and index.neighbours(1, 5, 3.0) == []
+
+
+class FakeSession:
+    """Session synchrone : lignes d'index, puis caractéristiques audio."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if "MAX(date_modified)" in sql:
+            return SimpleNamespace(scalar=lambda: None)
+        if sql.lstrip().startswith("SELECT track_id, bpm, camelot_key"):
+            return SimpleNamespace(fetchall=lambda: self.rows)
+        features = [SimpleNamespace(track_id=row[0], bpm=row[1], camelot_key=row[2]) for row in self.rows]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: features))
+
+
+@pytest.mark.asyncio
+async def test_playlist_transitions_and_mix_cost_one_feature_query(monkeypatch):
+    monkeypatch.setattr(harmonic_mix_index_service, "_last_rebuild", 0.0)
+    rows = [(1, 120.0, "8A"), (2, 121.0, "9A"), (3, 122.0, "10A"), (4, 120.5, "3B")]
+    session = FakeSession(rows)
+    service = TrackAudioFeaturesService(session)
+
+    neighbours = await service.get_next_tracks_batch([1, 2, 3], bpm_tolerance=3.0)
+
+    assert {k: [f.track_id for f in v] for k, v in neighbours.items()} == {1: [2], 2: [1, 3], 3: [2]}
+    assert len(session.statements) == 3
+
+    mix = await service.build_harmonic_mix(1, length=5, bpm_tolerance=3.0)
+    assert [f.track_id for f in mix] == [1, 2, 3]
+    assert len(session.statements) == 4
+
+
+def test_keyless_reference_is_not_filtered_by_key():
+    index = _index([(1, 120.0, None), (2, 121.0, "5A"), (3, 119.0, "Unknown"), (4, 121.0, "9B")])
+
+    assert index.neighbours(1, 5, 3.0) == [(2, 1.0), (3, 1.0), (4, 1.0)]
+    assert index.neighbours(2, 5, 3.0) == []
+
+
+@pytest.mark.asyncio
+async def test_keyless_references_fall_back_to_raw_key_or_all_keys(monkeypatch):
+    monkeypatch.setattr(harmonic_mix_index_service, "_last_rebuild", 0.0)
+    rows = [(1, 120.0, None), (2, 121.0, "5A"), (3, 122.0, None), (4, 140.0, None)]
+    session = FakeSession(rows)
+    service = TrackAudioFeaturesService(session)
+    raw_key_match = SimpleNamespace(track_id=9, bpm=120.5, camelot_key=None)
+
+    async def similar_by_raw_key(reference, bpm_tolerance, limit):
+        return [raw_key_match] if reference.track_id == 1 else []
+
+    features = {row[0]: SimpleNamespace(track_id=row[0], bpm=row[1], camelot_key=row[2], key=None) for row in rows}
+    features[1].key = "C"
+    service.get_by_track_ids = lambda ids: _resolved([features[i] for i in ids if i in features])
+    service._similar_by_raw_key = similar_by_raw_key
+
+    neighbours = await service.get_next_tracks_batch([1, 3], bpm_tolerance=3.0)
+    assert {k: [f.track_id for f in v] for k, v in neighbours.items()} == {1: [raw_key_match.track_id], 3: [2, 1]}
+
+    mix = await service.build_harmonic_mix(4, length=3, bpm_tolerance=3.0)
+    assert [f.track_id for f in mix] == [4]
+    mix = await service.build_harmonic_mix(3, length=3, bpm_tolerance=3.0)
+    assert [f.track_id for f in mix] == [3, 2]
+
+
+async def _resolved(value):
+    return value
@@ -0,0 +1,107 @@
+"""
+Tests unitaires pour la recherche hybride de SearchService.
+
+Ce module vérifie la fusion des classements (HybridScorer), la récupération
+des infos de piste en une seule requête par l'étape vectorielle et
+l'exécution concurrente des étapes texte et vecteur.
+"""
+
+import asyncio
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.api.schemas.search_schema import SearchQuery
+from backend.api.services.hybrid_scorer import HybridScorer
+from backend.api.services.search_service import SearchService
+
+
+def _hit(track_id, stage, score):
+    return {"id": track_id, "title": f"T{track_id}", "type": "track", f"{stage}_score": score}
+
+
+class TestHybridScorer:
+    """Tests pour la fusion des résultats des étapes de recherche."""
+
+    def test_weighted_fusion_merges_duplicates(self):
+        """Un résultat présent dans les deux étapes cumule les deux contributions."""
+        scorer = HybridScorer(weights={"text": 0.7, "vector": 0.3})
+
+        ranked = scorer.fuse({
+            "text": [_hit(1, "text", 1.0), _hit(2, "text", 0.5)],
+            "vector": [_hit(2, "vector", 1.0), _hit(3, "vector", 0.9)],
+        })
+
+        assert [r["id"] for r in ranked] == [1, 2, 3]
+        assert ranked[1]["hybrid_score"] == pytest.approx(0.35 + 0.3)
+        assert "text_score" not in ranked[0] and "vector_score" not in ranked[1]
+
+    def test_rrf_fusion_uses_ranks(self):
+        """En mode RRF, seul le rang compte, pas l'échelle des scores."""
+        scorer = HybridScorer(weights={"text": 1.0, "vector": 1.0}, mode="rrf", rrf_k=60)
+
+        ranked = scorer.fuse(
+            {
+                "text": [_hit(1, "text", 100.0), _hit(2, "text", 99.0)],
+                "vector": [_hit(2, "vector", 0.01)],
+            },
+            keep_stage_scores=True,
+        )
+
+        assert ranked[0]["id"] == 2
+        assert ranked[0]["hybrid_score"] == pytest.approx(1 / 62 + 1 / 61)
+        assert ranked[0]["vector_score"] == 0.01
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            HybridScorer(mode="max")
+
+
+@pytest.mark.asyncio
+async def test_vector_search_fetches_track_details_in_one_query():
+    """L'étape vectorielle n'exécute qu'une requête jointe (plus ef_search)."""
+    db = AsyncMock()
+    result = MagicMock()
+    result.fetchall.return_value = [
+        SimpleNamespace(id=i, title=f"T{i}", artist="A", album="B", genre="rock", path=f"/m/{i}", distance=0.5)
+        for i in range(100)
+    ]
+    db.execute.return_value = result
+
+    with patch.object(SearchService, "_generate_query_embedding", AsyncMock(return_value=[0.1] * 512)):
+        hits = await SearchService._vector_search(SearchQuery(query="jazz"), db)
+
+    assert len(hits) == 100
+    assert db.execute.await_count == 2
+    assert hits[0]["artist"] == "A" and hits[0]["vector_score"] == pytest.approx(1 / 1.5)
+
+
+@pytest.mark.asyncio
+async def test_search_stages_run_concurrently_on_separate_sessions():
+    """Les étapes texte et vecteur se recouvrent, chacune sur sa propre session."""
+    sessions = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            sessions.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def slow_stage(query, session):
+        await asyncio.sleep(0.1)
+        return [session]
+
+    with patch("backend.api.utils.database.AsyncSessionLocal", FakeSession), \
+            patch.object(SearchService, "_text_search", slow_stage), \
+            patch.object(SearchService, "_vector_search", slow_stage):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        text_results, vector_results = await SearchService._run_search_stages(SearchQuery(query="jazz"), None)
+        elapsed = loop.time() - start
+
+    assert elapsed < 0.18
+    assert len(sessions) == 2
+    assert text_results[0] is not vector_results[0]
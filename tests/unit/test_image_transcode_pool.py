@@ -0,0 +1,89 @@
+"""
+Tests unitaires pour le pool de transcodage d'images.
+
+Ce module vérifie le rendu multi-tailles en un décodage, la file bornée et
+les métriques du pool (exécuteur à threads pour rester rapide en test).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from backend.api.utils.image_transcode_pool import (
+    ImageTranscodePool,
+    TranscodeQueueFull,
+    render_variants,
+    transcode_image,
+)
+
+
+def _png(width=640, height=480, mode="RGB"):
+    out = BytesIO()
+    Image.new(mode, (width, height)).save(out, "PNG")
+    return out.getvalue()
+
+
+def _thread_pool(**kwargs):
+    return ImageTranscodePool(executor_factory=lambda n: ThreadPoolExecutor(max_workers=n), **kwargs)
+
+
+def test_render_variants_produces_every_size_from_one_decode():
+    """Chaque taille demandée est rendue, la source garde ses dimensions."""
+    dimensions, variants = render_variants(_png(), (64, 256), "WEBP", 80)
+
+    assert dimensions == (640, 480)
+    assert sorted(variants) == [64, 256]
+    with Image.open(BytesIO(variants[256])) as img:
+        assert img.format == "WEBP" and img.size == (256, 192)
+
+
+def test_transcode_image_flattens_alpha_for_jpeg():
+    """Une source RGBA est aplatie en RGB avant l'encodage JPEG."""
+    result = transcode_image(_png(400, 400, "RGBA"), (100, 100), "JPEG", 85)
+
+    assert result["metadata"]["original_mode"] == "RGBA"
+    assert result["metadata"]["processed_dimensions"] == (100, 100)
+    with Image.open(BytesIO(result["data"])) as img:
+        assert img.format == "JPEG" and img.mode == "RGB"
+
+
+@pytest.mark.asyncio
+async def test_run_records_metrics():
+    """Les soumissions réussies alimentent compteurs et latences."""
+    pool = _thread_pool(max_workers=2)
+    try:
+        results = await asyncio.gather(*(pool.run(pow, n, 2) for n in range(4)))
+    finally:
+        pool.shutdown()
+
+    metrics = pool.get_metrics()
+    assert results == [0, 1, 4, 9]
+    assert metrics["submitted"] == metrics["completed"] == 4
+    assert metrics["queue_depth"] == 0
+    assert 1 <= metrics["max_queue_depth"] <= 4
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_instead_of_piling_up():
+    """Au-delà de max_pending, la soumission échoue après queue_timeout."""
+    pool = _thread_pool(max_workers=1, max_pending=1, queue_timeout=0.05)
+    release = threading.Event()
+    try:
+        blocked = asyncio.create_task(pool.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(TranscodeQueueFull):
+            await pool.run(pow, 2, 2)
+
+        release.set()
+        assert await blocked is True
+    finally:
+        pool.shutdown()
+
+    metrics = pool.get_metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["completed"] == 1
@@ -0,0 +1,104 @@
+"""
+Tests unitaires pour l'index en mémoire des scores MIR.
+
+Ce module vérifie que la recherche top-k est exacte (comparée à un calcul
+naïf), que les masques BPM et Camelot s'appliquent et que la matrice suit
+les écritures incrémentales.
+"""
+
+import math
+import random
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.api.services.mir_score_index_service import (
+    MIRScoreIndexService,
+    MIRScoreMatrix,
+)
+from backend.api.utils.camelot import camelot_code, compatible_codes, compatible_keys
+
+
+def _brute_force(rows, query, k, exclude):
+    scored = []
+    for track_id, scores in rows.items():
+        if track_id in exclude:
+            continue
+        shared = [(a, b) for a, b in zip(query, scores) if a is not None and b is not None]
+        if shared:
+            scored.append((math.sqrt(sum((a - b) ** 2 for a, b in shared)), track_id))
+    return [track_id for _, track_id in sorted(scored)[:k]]
+
+
+def test_top_k_matches_brute_force_with_missing_scores():
+    rng = random.Random(7)
+    rows = {}
+    matrix = MIRScoreMatrix(capacity=4)
+    for track_id in range(1, 501):
+        scores = [None if rng.random() < 0.1 else rng.random() for _ in range(6)]
+        rows[track_id] = scores
+        matrix.upsert(track_id, scores=scores)
+
+    query = rows[42]
+    result = matrix.top_k(query, 15, exclude=(42,))
+
+    assert [track_id for track_id, _ in result] == _brute_force(rows, query, 15, {42})
+    assert [d for _, d in result] == sorted(d for _, d in result)
+
+
+def test_bpm_and_camelot_masks():
+    matrix = MIRScoreMatrix()
+    matrix.upsert(1, scores=[0.5] * 6, bpm=128.0, camelot_key="8B")
+    matrix.upsert(2, scores=[0.5] * 6, bpm=140.0, camelot_key="8B")
+    matrix.upsert(3, scores=[0.6] * 6, bpm=126.0, camelot_key="3A")
+    matrix.upsert(4, scores=[0.7] * 6, bpm=129.0, camelot_key="9B")
+    matrix.upsert(5, scores=[0.5] * 6, bpm=None, camelot_key="Unknown")
+
+    in_tempo = matrix.top_k([0.5] * 6, 10, exclude=(1,), bpm_range=(124.0, 132.0))
+    assert [track_id for track_id, _ in in_tempo] == [3, 4]
+
+    harmonic = matrix.top_k(
+        [0.5] * 6, 10, exclude=(1,), key_codes=compatible_codes(camelot_code("8B"))
+    )
+    assert [track_id for track_id, _ in harmonic] == [2, 4]
+
+
+def test_camelot_neighbours_wrap_around_the_wheel():
+    assert compatible_keys("12A") == ["12A", "1A", "11A", "12B"]
+    assert compatible_keys("1B") == ["1B", "2B", "12B", "1A"]
+    assert compatible_keys("Unknown") == []
+
+
+def test_incremental_updates_and_compaction():
+    matrix = MIRScoreMatrix(capacity=2)
+    for track_id in range(1, 2001):
+        matrix.upsert(track_id, scores=[track_id / 2000] * 6)
+    for track_id in range(1, 1500):
+        matrix.remove(track_id)
+
+    assert len(matrix) == 501
+    assert matrix.get_stats()["rows"] < 2000
+    assert matrix.top_k([1.0] * 6, 2)[0][0] == 2000
+
+    matrix.upsert(2000, scores=[0.0] * 6)
+    assert matrix.top_k([1.0] * 6, 1)[0][0] == 1999
+
+
+@pytest.mark.asyncio
+async def test_service_callbacks_update_the_loaded_matrix():
+    service = MIRScoreIndexService()
+    service._last_refresh = service._last_rebuild = float("inf")
+    service.index.upsert(1, scores=[0.2] * 6, bpm=120.0, camelot_key="5A")
+
+    class Scores:
+        energy_score = mood_valence = dance_score = 0.25
+        acousticness = complexity_score = emotional_intensity = 0.25
+
+    service.on_scores_written(2, Scores())
+    service.on_normalized_written(2, 121.0, "5B")
+    assert await service.similar(AsyncMock(), 1, 5, bpm_tolerance=2.0, harmonic=True) == [
+        (2, pytest.approx(math.sqrt(6 * 0.05 ** 2), rel=1e-4))
+    ]
+
+    service.on_scores_deleted(2)
+    assert await service.similar(AsyncMock(), 1, 5) == []
@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour le cache Redis asynchrone de la recherche.
+
+Ce module vérifie les clés versionnées par génération, l'invalidation en O(1)
+et les compteurs exposés par /search/cache/stats.
+"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+
+from backend.api.services.redis_cache_service import GENERATION_KEY, RedisCacheService
+
+
+class FakeRedis:
+    """Client redis.asyncio minimal en mémoire."""
+
+    def __init__(self):
+        self.data = {}
+        self.incr_calls = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.incr_calls += 1
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def info(self, section=None):
+        return {"used_memory_human": "1M"}
+
+
+@pytest.fixture
+def cache():
+    service = RedisCacheService(redis_url="redis://localhost:6379/15")
+    service.redis_client = FakeRedis()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_keys_embed_generation(cache):
+    """Les clés de recherche portent la génération courante."""
+    await cache.cache_search_result("jazz", 1, 10, None, {"total": 1})
+
+    assert list(cache.redis_client.data) == [cache._get_cache_key("jazz", 1, 10, None, 0)]
+    assert next(iter(cache.redis_client.data)).startswith("search:v0:")
+    assert await cache.get_cached_search_result("jazz", 1, 10) == {"total": 1}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_only_bumps_generation(cache):
+    """Invalider incrémente le compteur sans parcourir ni supprimer de clés."""
+    await cache.cache_search_result("jazz", 1, 10, None, {"total": 1})
+    stored = dict(cache.redis_client.data)
+
+    generation = await cache.invalidate_search_cache()
+
+    assert generation == 1
+    assert cache.redis_client.incr_calls == 1
+    assert {k: v for k, v in cache.redis_client.data.items() if k != GENERATION_KEY} == stored
+    assert await cache.get_cached_search_result("jazz", 1, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_stats_count_hits_misses_and_latency(cache):
+    """Les statistiques agrègent hits, misses et latences par opération."""
+    cache.redis_client.data[cache._get_cache_key("rock", 1, 10, None, 0)] = json.dumps({"total": 2})
+
+    await cache.get_cached_search_result("rock", 1, 10)
+    await cache.get_cached_search_result("pop", 1, 10)
+    stats = await cache.get_cache_stats()
+
+    assert stats["status"] == "connected"
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["latency_ms"]["get"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_connection_error_disables_cache_temporarily(cache):
+    """Après une erreur de connexion, Redis n'est plus sollicité pendant le délai de reprise."""
+    import redis.asyncio as redis
+
+    cache.redis_client.get = AsyncMock(side_effect=redis.ConnectionError("down"))
+
+    assert await cache.get_cached_search_result("jazz", 1, 10) is None
+    assert await cache.get_cached_search_result("jazz", 1, 10) is None
+
+    assert cache.redis_client.get.await_count == 1
+    assert (await cache.get_cache_stats())["status"] == "disconnected"
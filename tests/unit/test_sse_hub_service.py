@@ -0,0 +1,85 @@
+"""
+Tests unitaires pour le hub de diffusion SSE.
+
+Ce module vérifie le filtrage par tâche, la fusion des événements de
+progression, la déconnexion des clients trop lents et l'abonnement Redis
+unique partagé par les clients.
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.api.services.sse_hub_service import SSEClient, SSEHub
+
+
+def _progress(task_id, current):
+    return json.dumps({"type": "progress", "task_id": task_id, "current": current})
+
+
+@pytest.mark.asyncio
+async def test_topic_filter_keeps_matching_and_global_events():
+    """Un client suivant une tâche ignore les autres, garde les événements globaux."""
+    hub = SSEHub()
+    client = SSEClient(topics=["task-1"])
+    hub.clients.add(client)
+
+    hub.dispatch(json.dumps({"type": "scan_done", "task_id": "task-2"}).encode())
+    hub.dispatch(json.dumps({"type": "scan_done", "batch_id": "task-1"}).encode())
+    hub.dispatch(b'{"type": "library_update"}')
+
+    frames = await client.next_frames(timeout=0)
+    assert [json.loads(frame[6:])["type"] for frame in frames] == ["scan_done", "library_update"]
+    assert client.stats["filtered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_events_are_coalesced_and_rate_limited():
+    """Seule la dernière progression par tâche part, au plus max_rate fois par seconde."""
+    client = SSEClient(max_rate=2)
+    for current in range(50):
+        client.offer(_progress("t1", current), json.loads(_progress("t1", current)))
+    client.offer(_progress("t2", 7), json.loads(_progress("t2", 7)))
+
+    frames = await client.next_frames(timeout=0)
+    assert [json.loads(frame[6:])["current"] for frame in frames] == [49, 7]
+    assert client.stats["coalesced"] == 49
+
+    client.offer(_progress("t1", 50), json.loads(_progress("t1", 50)))
+    # L'intervalle de 0,5 s n'est pas écoulé
+    assert await client.next_frames(timeout=0.05) == []
+    assert len(await client.next_frames(timeout=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_client_is_dropped_on_overflow():
+    """Une file d'événements discrets pleine déconnecte le client sans toucher aux autres."""
+    hub = SSEHub()
+    slow = SSEClient(max_queue=3)
+    fast = SSEClient(max_queue=100)
+    hub.clients.update({slow, fast})
+
+    for i in range(5):
+        hub.dispatch(json.dumps({"type": "notification", "n": i}))
+
+    assert slow.closed and slow.close_reason == "overflow"
+    assert hub.clients == {fast}
+    assert hub.get_stats()["dropped_clients"] == 1
+    assert len(await fast.next_frames(timeout=0)) == 5
+
+
+@pytest.mark.asyncio
+async def test_single_subscription_shared_by_clients():
+    """Le premier client démarre l'abonné, le dernier l'arrête."""
+    hub = SSEHub()
+    with patch.object(hub, "_listen", new=AsyncMock()) as listen:
+        first = await hub.register()
+        second = await hub.register(topics=["t1"])
+        assert listen.await_count <= 1 and hub._task is not None
+
+        await hub.unregister(first)
+        assert hub._task is not None
+        await hub.unregister(second)
+        assert hub._task is None and hub.clients == set()
+    assert listen.call_count == 1
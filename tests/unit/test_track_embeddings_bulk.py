@@ -0,0 +1,62 @@
+"""
+Tests unitaires pour l'écriture groupée des embeddings de pistes.
+
+Ce module vérifie qu'un lot est écrit en un seul INSERT ... ON CONFLICT et
+que les lignes invalides sont comptées en échec sans bloquer le lot.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api.services.track_embeddings_service import TrackEmbeddingsService
+from backend.api.services.vector_search_service import VectorSearchService
+
+
+def _session(existing_ids):
+    session = AsyncMock(spec=AsyncSession)
+    existing = MagicMock()
+    existing.scalars.return_value.all.return_value = existing_ids
+    session.execute.side_effect = [existing, MagicMock()]
+    return session
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_writes_batch_in_one_statement():
+    """Une requête de contrôle des pistes puis un seul upsert pour tout le lot."""
+    session = _session([1, 2])
+    service = TrackEmbeddingsService(session)
+
+    result = await service.bulk_upsert(
+        [
+            {"track_id": 1, "embedding": [0.1] * 512},
+            {"track_id": 2, "embedding": [0.2] * 512},
+            {"track_id": 3, "embedding": [0.3] * 512},
+            {"track_id": 4, "embedding": [0.4] * 768},
+        ],
+        embedding_model="test-model",
+    )
+
+    assert session.execute.await_count == 2
+    upsert = session.execute.await_args_list[1].args[0]
+    sql = str(upsert.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (track_id, embedding_type) DO UPDATE" in sql
+    assert result["successful"] == 2
+    assert sorted(result["failed_track_ids"]) == [3, 4]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_add_track_embeddings_async_delegates_to_bulk_upsert():
+    """VectorSearchService n'effectue plus un create_or_update par piste."""
+    session = _session([7])
+    service = VectorSearchService(session)
+
+    result = await service.batch_add_track_embeddings_async(
+        [{"track_id": 7, "embedding": [0.0] * 512}]
+    )
+
+    assert result["successful"] == 1 and result["failed"] == 0
+    assert session.execute.await_count == 2
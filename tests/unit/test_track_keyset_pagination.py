@@ -0,0 +1,82 @@
+"""
+Tests unitaires pour la pagination par curseur des pistes de TrackService.
+
+Ce module vérifie que les filtres sont compilés dans le WHERE, que la page
+suivante repart du curseur sans OFFSET et que le total sans filtre provient
+de l'estimation du planificateur.
+"""
+
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.api.services.track_service import (
+    TrackService,
+    decode_track_cursor,
+    encode_track_cursor,
+)
+
+
+def _scalars_result(items):
+    result = MagicMock()
+    result.scalars.return_value.unique.return_value.all.return_value = items
+    return result
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.asyncio
+async def test_filters_and_cursor_are_compiled_into_sql():
+    """Filtres et curseur deviennent des prédicats SQL ; aucun OFFSET."""
+    rows = [SimpleNamespace(id=i, title=f"Song {i}") for i in (11, 12, 13)]
+    service = TrackService(AsyncMock())
+    service._execute = AsyncMock(return_value=_scalars_result(rows))
+    after = encode_track_cursor("title", SimpleNamespace(id=10, title="Song 10"))
+
+    tracks, has_next = await service.list_tracks_keyset(
+        {"artist_id": 4, "genre": "rock", "year": "1997"},
+        sort="title",
+        first=2,
+        after=after,
+        include=(),
+        fields=["id"],
+    )
+
+    assert [t.id for t in tracks] == [11, 12] and has_next is True
+    sql = _sql(service._execute.await_args.args[0])
+    assert "tracks.track_artist_id = 4" in sql
+    assert "tracks.genre ILIKE '%%' || 'rock'" in sql
+    assert "tracks.year = '1997'" in sql
+    assert "(coalesce(tracks.title, ''), tracks.id) > ('Song 10', 10)" in sql
+    assert "ORDER BY coalesce(tracks.title, '') ASC, tracks.id ASC" in sql
+    assert "LIMIT 3" in sql and "OFFSET" not in sql
+
+
+def test_cursor_round_trip_and_sort_mismatch():
+    """Le curseur conserve la clé de tri ; il est refusé pour un autre tri."""
+    added = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    cursor = encode_track_cursor("date_added", SimpleNamespace(id=7, date_added=added))
+
+    assert decode_track_cursor("date_added", cursor) == (added, 7)
+    with pytest.raises(ValueError):
+        decode_track_cursor("title", cursor)
+    with pytest.raises(ValueError):
+        decode_track_cursor("id", "not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_total_uses_planner_estimate_without_filters():
+    """Sans filtre : pg_class.reltuples ; avec filtres : comptage plafonné."""
+    service = TrackService(AsyncMock())
+    service._execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=400000)))
+    assert await service.estimate_tracks_count() == (400000, True)
+    assert "pg_class" in str(service._execute.await_args.args[0])
+
+    service._execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=42)))
+    assert await service.estimate_tracks_count({"album_id": 3}) == (42, False)
+    assert "LIMIT" in _sql(service._execute.await_args.args[0])
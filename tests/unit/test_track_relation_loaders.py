@@ -0,0 +1,93 @@
+"""
+Tests unitaires pour le chargement à la demande des relations de piste.
+
+Ce module vérifie le regroupement des relations en une requête IN par
+relation, l'utilisation des valeurs pré-renseignées par TrackType et les
+options de projection de TrackService.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api.graphql.dataloader.track_relations import TrackRelationLoaders
+from backend.api.graphql.queries.queries.track_queries import TRACK_TYPE_FIELDS
+from backend.api.graphql.types.tracks_type import TrackType
+from backend.api.services.track_service import track_load_options
+
+
+class FakeSession:
+    """Session minimale : renvoie les lignes fournies et compte les requêtes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        rows = self.rows
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+
+def _track(track_id, **relations):
+    fields = dict.fromkeys(TRACK_TYPE_FIELDS)
+    fields.update(id=track_id, path=f"/music/{track_id}.flac", track_artist_id=1)
+    track = TrackType(**fields)
+    for name, value in relations.items():
+        setattr(track, f"_{name}", value)
+    return track
+
+
+@pytest.mark.asyncio
+async def test_relations_of_a_page_are_loaded_in_one_query():
+    """Trois pistes, deux relations demandées : deux requêtes, pas six."""
+    features = [SimpleNamespace(track_id=1, bpm=120.0), SimpleNamespace(track_id=3, bpm=90.0)]
+    session = FakeSession(features)
+    loaders = TrackRelationLoaders(session)
+
+    results = await asyncio.gather(*(loaders.load("audio_features", track_id) for track_id in (1, 2, 3)))
+    assert [r.bpm if r else None for r in results] == [120.0, None, 90.0]
+
+    session.rows = [SimpleNamespace(track_id=2, id=7)]
+    tags = await asyncio.gather(*(loaders.load("mir_synthetic_tags", track_id) for track_id in (1, 2)))
+    assert tags == [[], [session.rows[0]]]
+
+    assert len(session.statements) == 2
+    assert loaders.stats["track_audio_features"] == {"batches": 1, "keys": 3, "max_batch": 3}
+
+
+@pytest.mark.asyncio
+async def test_track_type_uses_preset_relation_before_loader():
+    """Une relation pré-renseignée ne déclenche aucune requête."""
+    session = FakeSession([SimpleNamespace(track_id=2, bpm=128.0, key="A")])
+    info = SimpleNamespace(context=SimpleNamespace(loaders=SimpleNamespace(
+        track_relations=TrackRelationLoaders(session))))
+
+    preset = _track(1, audio_features=SimpleNamespace(bpm=100.0, key="C"))
+    assert await preset.bpm(info) == 100.0
+    assert session.statements == []
+
+    lazy = _track(2)
+    assert await lazy.bpm(info) == 128.0
+    assert await lazy.key(info) == "A"
+    assert len(session.statements) == 1
+
+
+def test_track_load_options_only_loads_included_relations():
+    """Les relations non incluses sont désactivées, y compris celles en selectin."""
+    options = track_load_options(include=("audio_features",), fields=("title",))
+    strategies = {
+        load.path[1].key: dict(load.strategy)
+        for option in options
+        for load in option.context
+        if load.strategy and "lazy" in dict(load.strategy)
+    }
+    assert strategies["audio_features"] == {"lazy": "selectin"}
+    assert strategies["covers"] == {"lazy": "noload"}
+    assert strategies["embeddings"] == {"lazy": "noload"}
+
+    with pytest.raises(ValueError):
+        track_load_options(include=("vectors",))
+    with pytest.raises(ValueError):
+        track_load_options(fields=("not_a_column",))
@@ -0,0 +1,215 @@
+"""
+Tests unitaires pour l'insertion ensembliste des pistes de TrackService.
+
+Ce module vérifie qu'un lot de pistes est traité avec une requête de
+préchargement et un seul INSERT ... ON CONFLICT ... RETURNING, sans
+requête ni refresh par piste.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from backend.api.schemas.tracks_schema import TrackCreate
+from backend.api.services.track_service import TrackService
+
+
+def _scalars_result(items):
+    """Construit un résultat SQLAlchemy simulé pour result.scalars().all()."""
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = items
+    return result
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def track_service():
+    service = TrackService(AsyncMock())
+    service._commit = AsyncMock()
+    service._rollback = AsyncMock()
+    service._refresh = AsyncMock()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_single_prefetch_and_single_upsert(track_service):
+    """Un lot de nouvelles pistes coûte deux requêtes, quel que soit sa taille."""
+    tracks_data = [
+        TrackCreate(title=f"Track {i}", path=f"/music/{i}.flac", track_artist_id=1, musicbrainz_id=f"mb-{i}")
+        for i in range(50)
+    ]
+    inserted = [
+        SimpleNamespace(id=i + 1, path=f"/music/{i}.flac", genre_tags=[], mood_tags=[])
+        for i in range(50)
+    ]
+    track_service._execute = AsyncMock(side_effect=[_scalars_result([]), _scalars_result(inserted)])
+
+    result = await track_service.create_or_update_tracks_batch(tracks_data)
+
+    assert len(result) == 50
+    assert track_service._execute.await_count == 2
+    prefetch_sql = _sql(track_service._execute.await_args_list[0].args[0])
+    assert "tracks.path = ANY" in prefetch_sql
+    assert "OR tracks.musicbrainz_id = ANY" in prefetch_sql
+    upsert_sql = _sql(track_service._execute.await_args_list[1].args[0])
+    assert "ON CONFLICT (path) DO UPDATE" in upsert_sql
+    assert "RETURNING" in upsert_sql
+    track_service._refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_skips_existing_and_in_batch_duplicates(track_service):
+    """Les pistes existantes inchangées et les doublons du lot ne sont pas réinsérés."""
+    existing = SimpleNamespace(id=7, path="/music/old.flac", musicbrainz_id=None, file_mtime=1.0, file_size=10)
+    tracks_data = [
+        TrackCreate(title="Old", path="/music/old.flac", track_artist_id=1, file_mtime=1.0, file_size=10),
+        TrackCreate(title="New", path="/music/new.flac", track_artist_id=1),
+        TrackCreate(title="New bis", path="/music/new.flac", track_artist_id=1),
+    ]
+    new_track = SimpleNamespace(id=8, path="/music/new.flac", genre_tags=[], mood_tags=[])
+    track_service._execute = AsyncMock(side_effect=[_scalars_result([existing]), _scalars_result([new_track])])
+
+    result = await track_service.create_or_update_tracks_batch(tracks_data)
+
+    assert {track.id for track in result} == {7, 8}
+    upsert_stmt = track_service._execute.await_args_list[1].args[0]
+    params = upsert_stmt.compile(dialect=postgresql.dialect()).params
+    assert list(params.values()).count("/music/new.flac") == 1
+    assert "/music/old.flac" not in params.values()
+
+
+@pytest.mark.asyncio
+async def test_batch_attaches_tags_with_one_lookup_per_tag_type(track_service):
+    """Les tags du lot sont recherchés en une requête par type de tag."""
+    tracks_data = [
+        TrackCreate(title="A", path="/music/a.flac", track_artist_id=1, genre_tags=["rock", "pop"]),
+        TrackCreate(title="B", path="/music/b.flac", track_artist_id=1, genre_tags=["rock"]),
+    ]
+    track_a = SimpleNamespace(id=1, path="/music/a.flac", genre_tags=[], mood_tags=[])
+    track_b = SimpleNamespace(id=2, path="/music/b.flac", genre_tags=[], mood_tags=[])
+    rock = SimpleNamespace(name="rock")
+    track_service._execute = AsyncMock(side_effect=[
+        _scalars_result([]),
+        _scalars_result([track_b, track_a]),
+        _scalars_result([rock]),
+    ])
+    track_service.session.add = MagicMock()
+
+    await track_service.create_or_update_tracks_batch(tracks_data)
+
+    assert track_service._execute.await_count == 3
+    assert track_a.genre_tags[0] is rock and track_a.genre_tags[1].name == "pop"
+    assert track_b.genre_tags == [rock]
+    track_service.session.add.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_updates_changed_tracks_with_one_upsert(track_service):
+    """Les pistes modifiées passent par un seul INSERT ... ON CONFLICT (id), sans refresh."""
+    from backend.api.models.tracks_model import Track as TrackModel
+
+    existing_a = TrackModel(id=7, title="A", path="/music/a.flac", track_artist_id=1, album_id=3, file_mtime=1.0, file_size=10)
+    existing_b = TrackModel(id=8, title="B", path="/music/b.flac", track_artist_id=1, album_id=3, file_mtime=1.0, file_size=10)
+    tracks_data = [
+        TrackCreate(title="A v2", path="/music/a.flac", track_artist_id=1, file_mtime=2.0, file_size=10, genre_tags=["rock"]),
+        TrackCreate(title="B v2", path="/music/b.flac", track_artist_id=1, file_mtime=2.0, file_size=12),
+    ]
+    old_tag = SimpleNamespace(name="old")
+    rock = SimpleNamespace(name="rock")
+    updated_a = SimpleNamespace(id=7, path="/music/a.flac", genre_tags=[old_tag], mood_tags=[])
+    updated_b = SimpleNamespace(id=8, path="/music/b.flac", genre_tags=[old_tag], mood_tags=[])
+    track_service._execute = AsyncMock(side_effect=[
+        _scalars_result([existing_a, existing_b]),
+        _scalars_result([updated_a, updated_b]),
+        _scalars_result([rock]),
+    ])
+
+    result = await track_service.create_or_update_tracks_batch(tracks_data)
+
+    assert {track.id for track in result} == {7, 8}
+    assert track_service._execute.await_count == 3
+    upsert_stmt = track_service._execute.await_args_list[1].args[0]
+    assert "ON CONFLICT (id) DO UPDATE" in _sql(upsert_stmt)
+    params = upsert_stmt.compile(dialect=postgresql.dialect()).params
+    # album_id absent du lot : la valeur existante est conservée
+    assert [v for k, v in params.items() if k.startswith("album_id")] == [3, 3]
+    assert "A v2" in params.values() and "B v2" in params.values()
+    # Les tags fournis remplacent les anciens ; sans tags, ils sont conservés
+    assert updated_a.genre_tags == [rock]
+    assert updated_b.genre_tags == [old_tag]
+    track_service._refresh.assert_not_awaited()
+    track_service._commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_audio_features_with_one_upsert(track_service):
+    """Les caractéristiques audio du lot sont écrites en un seul INSERT ... ON CONFLICT (track_id)."""
+    tracks_data = [
+        TrackCreate(title=f"T{i}", path=f"/music/{i}.flac", track_artist_id=1, bpm=120.0 + i, key="C")
+        for i in range(3)
+    ] + [TrackCreate(title="Sans tags", path="/music/plain.flac", track_artist_id=1)]
+    inserted = [
+        SimpleNamespace(id=i + 1, path=f"/music/{i}.flac", genre_tags=[], mood_tags=[])
+        for i in range(3)
+    ] + [SimpleNamespace(id=4, path="/music/plain.flac", genre_tags=[], mood_tags=[])]
+    track_service._execute = AsyncMock(side_effect=[_scalars_result([]), _scalars_result(inserted)])
+    features_service = track_service.audio_features_service
+    features_service._execute = AsyncMock(return_value=_scalars_result([]))
+
+    await track_service.create_or_update_tracks_batch(tracks_data)
+
+    features_service._execute.assert_awaited_once()
+    upsert_stmt = features_service._execute.await_args.args[0]
+    assert "ON CONFLICT (track_id) DO UPDATE" in _sql(upsert_stmt)
+    params = upsert_stmt.compile(dialect=postgresql.dialect()).params
+    assert sorted(v for k, v in params.items() if k.startswith("track_id")) == [1, 2, 3]
+    track_service._commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_retries_without_concurrently_inserted_mbids(track_service):
+    """Un conflit musicbrainz_id concurrent écarte les lignes fautives puis réinsère le reste."""
+    from sqlalchemy.exc import IntegrityError
+
+    tracks_data = [
+        TrackCreate(title="A", path="/music/a.flac", track_artist_id=1, musicbrainz_id="mb-a"),
+        TrackCreate(title="B", path="/music/b.flac", track_artist_id=1, musicbrainz_id="mb-b"),
+    ]
+    track_b = SimpleNamespace(id=2, path="/music/b.flac", genre_tags=[], mood_tags=[])
+    conflict = IntegrityError("INSERT", {}, Exception('duplicate key value violates unique constraint "tracks_musicbrainz_id_key"'))
+    existing_mbids = MagicMock()
+    existing_mbids.all.return_value = [("mb-a", 99)]
+    track_service._execute = AsyncMock(side_effect=[
+        _scalars_result([]),
+        conflict,
+        existing_mbids,
+        _scalars_result([track_b]),
+    ])
+
+    result = await track_service.create_or_update_tracks_batch(tracks_data)
+
+    assert [track.id for track in result] == [2]
+    track_service._rollback.assert_awaited_once()
+    retry_params = track_service._execute.await_args_list[3].args[0].compile(dialect=postgresql.dialect()).params
+    assert "mb-a" not in retry_params.values()
+    assert "mb-b" in retry_params.values()
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_removes_tracks_from_typeahead_index(track_service, monkeypatch):
+    """Les pistes supprimées disparaissent des suggestions sans attendre la reconstruction."""
+    import sys
+
+    typeahead = MagicMock()
+    monkeypatch.setattr(sys.modules["backend.api.services.track_service"], "typeahead_service", typeahead)
+    track_service._execute = AsyncMock(return_value=_scalars_result([SimpleNamespace(id=3), SimpleNamespace(id=5)]))
+    track_service._delete = AsyncMock()
+
+    assert await track_service.delete_tracks_batch([3, 5, 9]) == 2
+
+    typeahead.on_deleted.assert_called_once_with("track", [3, 5])
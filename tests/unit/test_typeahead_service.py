@@ -0,0 +1,126 @@
+"""
+Tests unitaires pour l'index de typeahead en mémoire.
+
+Ce module vérifie la correspondance par préfixe (mots partiels, accents,
+plusieurs mots), le classement par popularité, la mise à jour incrémentale
+et les callbacks d'insertion.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.api.services.typeahead_service import (
+    TypeaheadEntry,
+    TypeaheadIndex,
+    TypeaheadService,
+)
+
+
+def _index():
+    index = TypeaheadIndex()
+    index.upsert([
+        TypeaheadEntry("artist", 1, "Radiohead", artist="Radiohead", popularity=5.0),
+        TypeaheadEntry("artist", 2, "Radio Birdman", artist="Radio Birdman", popularity=1.0),
+        TypeaheadEntry("album", 10, "OK Computer", artist="Radiohead", popularity=3.0),
+        TypeaheadEntry("track", 100, "Paranoid Android", artist="Radiohead", album="OK Computer"),
+        TypeaheadEntry("track", 101, "Radio Gaga", artist="Queen", popularity=2.0),
+        TypeaheadEntry("artist", 3, "Beyoncé", artist="Beyoncé"),
+        TypeaheadEntry("artist", 4, "AC/DC", artist="AC/DC"),
+    ])
+    return index
+
+
+def test_partial_words_match_across_entity_types():
+    """« radi » trouve artistes et pistes, classés par pertinence et popularité."""
+    results = _index().search("radi", limit=10)
+
+    assert [(r["type"], r["id"]) for r in results] == [
+        ("artist", 1), ("artist", 2), ("track", 101),
+    ]
+    assert results[0] == {"id": 1, "title": "Radiohead", "artist": "Radiohead", "album": "", "type": "artist"}
+
+
+def test_multi_word_accents_and_compact_forms():
+    """Chaque mot est un préfixe ; accents et ponctuation sont ignorés."""
+    index = _index()
+
+    assert [r["id"] for r in index.search("ok comp")] == [10]
+    assert [r["id"] for r in index.search("para andr")] == [100]
+    assert [r["id"] for r in index.search("beyonce")] == [3]
+    assert [r["id"] for r in index.search("acdc")] == [4]
+    assert [r["id"] for r in index.search("radi", types=["track"])] == [101]
+    assert index.search("zzz") == []
+
+
+def test_upsert_replaces_terms_and_invalidates_cached_results():
+    """Renommer une entrée retire ses anciens mots et vide le cache de résultats."""
+    index = _index()
+    assert [r["id"] for r in index.search("gaga")] == [101]
+
+    index.upsert([TypeaheadEntry("track", 101, "Bohemian Rhapsody", artist="Queen")])
+
+    assert index.search("gaga") == []
+    assert [r["id"] for r in index.search("bohem")] == [101]
+    index.remove("artist", [1])
+    assert [r["id"] for r in index.search("radioh")] == []
+
+
+def test_insert_callbacks_update_loaded_index():
+    """Les callbacks des services enrichissent l'index une fois celui-ci construit."""
+    service = TypeaheadService()
+    service.on_artists_upserted([{"id": 1, "name": "Portishead"}])
+    assert len(service.index) == 0
+
+    service._last_rebuild = service._last_refresh = time.monotonic()
+    service.on_artists_upserted([{"id": 1, "name": "Portishead"}])
+    service.on_albums_upserted([{"id": 5, "title": "Dummy", "album_artist_id": 1}])
+    service.on_tracks_upserted([SimpleNamespace(id=9, title="Roads", track_artist_id=1, album_id=5)])
+
+    results = service.index.search("port")
+    assert [r["type"] for r in results] == ["artist"]
+    assert service.index.search("roa")[0] == {
+        "id": 9, "title": "Roads", "artist": "Portishead", "album": "Dummy", "type": "track",
+    }
+
+
+@pytest.mark.asyncio
+async def test_periodic_rebuild_runs_in_background_and_replays_deletions(monkeypatch):
+    """La reconstruction périodique ne bloque pas la frappe ; une suppression pendant celle-ci est conservée."""
+    from backend.api.utils import database
+
+    monkeypatch.setattr(TypeaheadService, "refresh_seconds", 0)
+    monkeypatch.setattr(TypeaheadService, "rebuild_seconds", 0)
+    service = TypeaheadService()
+    service.index = _index()
+    service._last_rebuild = service._last_refresh = time.monotonic()
+    loading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load(execute, index, since):
+        loading.set()
+        await release.wait()
+        return index.upsert(_index().entries.values())
+
+    service._load = slow_load
+    service._fetch_watermark = AsyncMock(return_value=None)
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: session)
+
+    request_db = AsyncMock()
+    assert [r["id"] for r in await service.search(request_db, "radioh")] == [1]
+    assert service.rebuilding
+    request_db.execute.assert_not_awaited()
+
+    await loading.wait()
+    service.on_deleted("artist", [1])
+    assert service.index.search("radioh") == []
+    release.set()
+    await service._rebuild_task
+
+    assert not service.rebuilding
+    assert service.index.search("radioh") == []
+    assert [r["id"] for r in service.index.search("gaga")] == [101]
@@ -0,0 +1,104 @@
+"""
+Tests unitaires pour la gestion des index HNSW partiels de track_embeddings.
+
+Ce module vérifie le DDL généré, la reconstruction sans interruption et
+l'application de hnsw.ef_search par requête.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from backend.api.services.track_embeddings_service import TrackEmbeddingsService
+from backend.api.services.vector_index_service import (
+    VectorIndexService,
+    apply_ef_search,
+    build_hnsw_index_sql,
+    validate_embedding_type,
+)
+
+
+def test_build_hnsw_index_sql_is_partial_per_type():
+    """Le DDL crée un index HNSW partiel restreint au type d'embedding."""
+    sql = build_hnsw_index_sql("audio", m=32, ef_construction=128)
+
+    assert sql.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_track_embeddings_vector_audio")
+    assert "USING hnsw (vector vector_l2_ops)" in sql
+    assert "WITH (m = 32, ef_construction = 128)" in sql
+    assert sql.endswith("WHERE embedding_type = 'audio'")
+
+
+def test_validate_embedding_type_rejects_injection():
+    """Un type interpolé dans le DDL ne peut contenir que [a-z0-9_]."""
+    assert validate_embedding_type("semantic") == "semantic"
+    with pytest.raises(ValueError):
+        validate_embedding_type("semantic'; DROP TABLE tracks; --")
+
+
+@pytest.mark.asyncio
+async def test_rebuild_index_swaps_before_dropping_old():
+    """L'ancien index n'est supprimé qu'après la permutation avec le nouveau."""
+    service = VectorIndexService(MagicMock())
+    service._run_ddl = AsyncMock()
+    service._run_in_transaction = AsyncMock()
+
+    summary = await service.rebuild_index("semantic", m=24)
+
+    build, drop = (call.args[0] for call in service._run_ddl.await_args_list)
+    assert build[-1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_track_embeddings_vector_semantic_rebuild")
+    assert "DROP INDEX CONCURRENTLY IF EXISTS idx_track_embeddings_vector_semantic" not in build
+    assert service._run_in_transaction.await_args.args[0] == [
+        "ALTER INDEX IF EXISTS idx_track_embeddings_vector_semantic RENAME TO idx_track_embeddings_vector_semantic_old",
+        "ALTER INDEX idx_track_embeddings_vector_semantic_rebuild RENAME TO idx_track_embeddings_vector_semantic",
+    ]
+    assert drop == ["DROP INDEX CONCURRENTLY IF EXISTS idx_track_embeddings_vector_semantic_old"]
+    assert summary["m"] == 24
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_only_creates_missing():
+    """ensure_indexes émet un CREATE ... IF NOT EXISTS par type, sans suppression."""
+    service = VectorIndexService(MagicMock())
+    service._run_ddl = AsyncMock()
+
+    names = await service.ensure_indexes(["semantic", "audio"])
+
+    statements = service._run_ddl.await_args.args[0]
+    assert names == ["idx_track_embeddings_vector_semantic", "idx_track_embeddings_vector_audio"]
+    assert all(s.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS") for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_apply_ef_search_is_transaction_local():
+    """ef_search est fixé via set_config(..., true), limité à la transaction."""
+    session = AsyncMock()
+
+    value = await apply_ef_search(session, 200)
+
+    assert value == 200
+    statement, params = session.execute.await_args.args
+    assert "set_config('hnsw.ef_search', :value, true)" in str(statement)
+    assert params == {"value": "200"}
+
+
+@pytest.mark.asyncio
+async def test_find_similar_targets_partial_index_with_literal_type():
+    """La recherche rend le type en littéral (index partiel) et applique ef_search."""
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = []
+    session.execute.return_value = result
+    service = TrackEmbeddingsService(session)
+
+    await service.find_similar([0.0] * 512, embedding_type="audio", limit=5, ef_search=120)
+
+    set_config_call, search_call = session.execute.await_args_list
+    assert set_config_call.args[1] == {"value": "120"}
+    sql = str(
+        search_call.args[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}
+        )
+    )
+    assert "track_embeddings.embedding_type = 'audio'" in sql
+    assert "ORDER BY distance" in sql
@@ -0,0 +1,217 @@
+"""
+Tests unitaires pour la queue différée Redis.
+
+Ce module vérifie l'ajout groupé en pipeline, le défilement multiple par
+script Lua atomique, la complétion depuis le hash de traitement, les baux
+(visibility timeout) et leur récupération sur les backends Redis et SQLite.
+"""
+
+import json
+import sqlite3
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.services.deferred_queue_service import (
+    _POP_DUE_SCRIPT,
+    _RECLAIM_SCRIPT,
+    PRIORITY_WIDTH,
+    DeferredQueueService,
+)
+from backend.services.local_fallback_queue_service import LocalFallbackQueueService
+from backend.services.queue_leases import reclaim_backoff
+
+
+# backend.services ré-exporte une instance homonyme du module
+queue_module = sys.modules["backend.services.deferred_queue_service"]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("TESTING", "true")
+    service = DeferredQueueService()
+    service.redis = MagicMock()
+    service._pop_due = MagicMock()
+    service._reclaim = MagicMock()
+    return service
+
+
+@pytest.fixture
+def redis_service(monkeypatch):
+    """Service branché sur un Redis simulé exécutant les vrais scripts Lua."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setenv("TESTING", "true")
+    monkeypatch.setattr(queue_module, "STATS_SAMPLE_RATE", 0.0)
+    service = DeferredQueueService()
+    service.redis = fakeredis.FakeRedis()
+    service._pop_due = service.redis.register_script(_POP_DUE_SCRIPT)
+    service._reclaim = service.redis.register_script(_RECLAIM_SCRIPT)
+    return service
+
+
+def test_enqueue_many_uses_one_pipeline_without_diagnostics(service, monkeypatch):
+    """Un lot = un pipeline ; plus de ZCARD ni d'INFO à chaque ajout."""
+    monkeypatch.setattr(queue_module, "STATS_SAMPLE_RATE", 0.0)
+    pipe = service.redis.pipeline.return_value
+    pipe.execute.return_value = [3, 3, True]  # ZADD puis compteurs (HINCRBY, EXPIRE)
+
+    added = service.enqueue_many(
+        "deferred_enrichment", [{"id": 1}, {"id": 2}, {"id": 3}], priority="low", delays=[0, 5, 10]
+    )
+
+    assert added == 3
+    (queue_key, mapping), _ = pipe.zadd.call_args
+    assert queue_key == "deferred_queue:deferred_enrichment"
+    tasks = [json.loads(member) for member in mapping]
+    assert len({task["id"] for task in tasks}) == 3
+    assert all(score > 2 * PRIORITY_WIDTH for score in mapping.values())
+    service.redis.info.assert_not_called()
+    service.redis.zcard.assert_not_called()
+
+
+def test_dequeue_tasks_pops_batch_atomically(service):
+    """Le script reçoit queue, hash de traitement et baux ; les tâches sont marquées en cours."""
+    members = [json.dumps({"id": f"q:1:{i}", "data": {}, "process_at": 0}).encode() for i in range(2)]
+    service._pop_due.return_value = [0, members]
+
+    tasks = service.dequeue_tasks("deferred_enrichment", 50)
+
+    kwargs = service._pop_due.call_args.kwargs
+    assert kwargs["keys"][:3] == [
+        "deferred_queue:deferred_enrichment",
+        "deferred_processing:deferred_enrichment",
+        "deferred_leases:deferred_enrichment",
+    ]
+    assert kwargs["args"][1] == 50
+    assert [task["id"] for task in tasks] == ["q:1:0", "q:1:1"]
+    assert all(task["status"] == "processing" for task in tasks)
+    assert all(task["lease_expires_at"] > time.time() for task in tasks)
+    assert service.counters["dequeued"] == 2
+
+
+def test_pop_due_script_pops_due_tasks_by_priority(redis_service):
+    """Le script Lua prend les tâches échues par priorité, les met sous bail et purge les illisibles."""
+    redis_service.enqueue_many("deferred_enrichment", [{"n": 1}], priority="low")
+    redis_service.enqueue_many("deferred_enrichment", [{"n": 2}], priority="high")
+    redis_service.enqueue_many("deferred_enrichment", [{"n": 3}], priority="high", delay_seconds=3600)
+    redis_service.redis.zadd("deferred_queue:deferred_enrichment", {b"pas du json": PRIORITY_WIDTH + time.time() - 1})
+
+    tasks = redis_service.dequeue_tasks("deferred_enrichment", 10)
+
+    assert [task["data"]["n"] for task in tasks] == [2, 1]
+    assert redis_service.counters["corrupt"] == 1
+    assert redis_service.redis.zcard("deferred_queue:deferred_enrichment") == 1
+    assert redis_service.redis.hlen("deferred_processing:deferred_enrichment") == 2
+    leases = redis_service.redis.zrange("deferred_leases:deferred_enrichment", 0, -1, withscores=True)
+    assert {member.decode() for member, _ in leases} == {task["id"] for task in tasks}
+    assert all(score > time.time() for _, score in leases)
+    assert redis_service.dequeue_tasks("deferred_enrichment", 10) == []
+
+
+def test_reclaim_script_requeues_expired_lease(redis_service, monkeypatch):
+    """Le script Lua de récupération remet en attente une tâche au bail expiré, puis l'archive."""
+    redis_service.enqueue_many("deferred_enrichment", [{"n": 1}], max_retries=1)
+    monkeypatch.setattr(queue_module, "VISIBILITY_TIMEOUT_SECONDS", -1)
+    task = redis_service.dequeue_tasks("deferred_enrichment", 1)[0]
+
+    assert redis_service.reclaim_expired("deferred_enrichment") == {"requeued": 1, "failed": 0}
+    assert redis_service.redis.hlen("deferred_processing:deferred_enrichment") == 0
+    assert redis_service.redis.zcard("deferred_queue:deferred_enrichment") == 1
+
+    monkeypatch.setattr(queue_module.time, "time", lambda: task["created_at"] + 3600)
+    assert redis_service.dequeue_tasks("deferred_enrichment", 1)[0]["id"] == task["id"]
+    assert redis_service.reclaim_expired("deferred_enrichment") == {"requeued": 0, "failed": 1}
+    assert redis_service.redis.exists(f"deferred_failed:deferred_enrichment:{task['id']}")
+
+
+def test_complete_task_reads_processing_hash(service):
+    """La complétion lit l'entrée du hash de traitement puis retire tâche et bail."""
+    task = {"id": "q:1:a", "priority": "normal", "retries": 0, "max_retries": 3}
+    service.redis.hget.return_value = json.dumps(task)
+    pipe = service.redis.pipeline.return_value
+
+    assert service.complete_task("deferred_enrichment", "q:1:a", success=True)
+
+    service.redis.hget.assert_called_once_with("deferred_processing:deferred_enrichment", "q:1:a")
+    pipe.hdel.assert_any_call("deferred_processing:deferred_enrichment", "q:1:a")
+    pipe.zrem.assert_called_once_with("deferred_leases:deferred_enrichment", "q:1:a")
+    assert pipe.hincrby.call_args.args[1:] == ("completed", 1)
+    pipe.execute.assert_called_once()
+
+
+def test_reclaim_expired_passes_backoff_and_counts(service):
+    """La récupération confie baux, tentatives et backoff au script atomique."""
+    service._reclaim.return_value = [4, 1]
+
+    result = service.reclaim_expired("deferred_enrichment", limit=100)
+
+    assert result == {"requeued": 4, "failed": 1}
+    kwargs = service._reclaim.call_args.kwargs
+    assert kwargs["keys"][2:4] == ["deferred_leases:deferred_enrichment", "deferred_reclaims:deferred_enrichment"]
+    assert kwargs["args"][1] == 100
+    assert kwargs["args"][5] == "deferred_failed:deferred_enrichment:"
+
+
+def test_local_queue_reclaims_expired_lease(tmp_path, monkeypatch):
+    """SQLite : un bail expiré remet la tâche en attente, puis en échec après max_retries."""
+    queue = LocalFallbackQueueService(db_path=str(tmp_path / "queue.db"))
+    assert queue.enqueue_task("deferred_enrichment", {"id": 7}, max_retries=1)
+    monkeypatch.setattr("backend.services.local_fallback_queue_service.VISIBILITY_TIMEOUT_SECONDS", -1)
+
+    first = queue.dequeue_task("deferred_enrichment")
+    assert first["lease_expires_at"] < time.time()
+    assert queue.reclaim_expired("deferred_enrichment") == {"requeued": 1, "failed": 0}
+
+    metrics = queue.get_queue_metrics("deferred_enrichment")
+    assert (metrics["pending"], metrics["due"], metrics["in_flight"]) == (1, 0, 0)
+    assert metrics["throughput"]["totals"]["reclaimed"] == 1
+    assert reclaim_backoff(1) > 0
+
+    monkeypatch.setattr("time.time", lambda: first["created_at"] + 3600)
+    assert queue.dequeue_task("deferred_enrichment")["id"] == first["id"]
+    assert queue.reclaim_expired("deferred_enrichment") == {"requeued": 0, "failed": 1}
+    assert queue.get_queue_stats("deferred_enrichment")["failed"] == 1
+
+
+def test_local_queue_backfills_leases_of_legacy_processing_rows(tmp_path):
+    """Les tâches 'processing' d'une base antérieure aux baux reçoivent une échéance."""
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE deferred_tasks (
+                id TEXT PRIMARY KEY, queue_name TEXT NOT NULL, task_data TEXT NOT NULL,
+                priority TEXT NOT NULL DEFAULT 'normal', created_at REAL NOT NULL,
+                process_at REAL NOT NULL, retries INTEGER NOT NULL DEFAULT 0,
+                max_retries INTEGER NOT NULL DEFAULT 3, status TEXT NOT NULL DEFAULT 'pending',
+                error_message TEXT, UNIQUE(id)
+            )
+        """)
+        conn.execute(
+            "INSERT INTO deferred_tasks (id, queue_name, task_data, created_at, process_at, status) "
+            "VALUES ('old', 'deferred_enrichment', '{}', 0, 0, 'processing')"
+        )
+
+    LocalFallbackQueueService(db_path=db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        (lease,) = conn.execute("SELECT lease_expires_at FROM deferred_tasks WHERE id = 'old'").fetchone()
+    assert lease is not None and lease > time.time()
+
+
+@pytest.mark.asyncio
+async def test_enrichment_batch_reclaims_expired_leases_before_dequeue(monkeypatch):
+    """Le worker remet en attente les baux expirés avant de défiler son lot."""
+    from backend.workers.deferred import deferred_enrichment_worker as worker
+
+    queue = MagicMock()
+    queue.dequeue_tasks.return_value = []
+    monkeypatch.setattr(worker, "deferred_queue_service", queue)
+
+    result = await worker.process_enrichment_batch_task.original_func(batch_size=5)
+
+    assert result["processed"] == 0
+    assert [call[0] for call in queue.method_calls] == ["reclaim_expired", "dequeue_tasks"]
+    queue.reclaim_expired.assert_called_once_with("deferred_enrichment")
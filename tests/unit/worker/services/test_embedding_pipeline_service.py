@@ -0,0 +1,136 @@
+"""
+Tests unitaires pour le pipeline de vectorisation par lots.
+
+Ce module vérifie l'écriture d'une requête par page (et non par piste),
+l'encodage par micro-batches et la reprise au point de reprise enregistré.
+"""
+
+import asyncio
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from backend.services.embedding_pipeline_service import EmbeddingPipelineService
+
+
+def _library(n):
+    return [{"id": i, "title": f"T{i}", "artist_name": "A"} for i in range(1, n + 1)]
+
+
+class FakeCheckpointStore:
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+        self.saved = []
+        self.cleared = False
+
+    async def load(self, embedding_type):
+        return self.checkpoint
+
+    async def save(self, embedding_type, checkpoint):
+        self.saved.append(checkpoint)
+
+    async def clear(self, embedding_type):
+        self.cleared = True
+
+    async def close(self):
+        pass
+
+
+def _make_pipeline(tracks, checkpoint=None, page_size=4, micro_batch_size=2):
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: [[0.0] * 512 for _ in texts]
+    embedding_service = SimpleNamespace(
+        model=model,
+        library_api_url="http://api:8001",
+        MODEL_NAME="test-model",
+        format_track_text=lambda track: track["title"],
+    )
+    store = FakeCheckpointStore(checkpoint)
+    pipeline = EmbeddingPipelineService(
+        embedding_service=embedding_service,
+        page_size=page_size,
+        micro_batch_size=micro_batch_size,
+        checkpoint_store=store,
+    )
+
+    async def fetch_page(client, after_id, embedding_type, only_missing):
+        items = [t for t in tracks if t["id"] > after_id][:page_size]
+        return {"items": items, "next_after_id": items[-1]["id"] if len(items) == page_size else None}
+
+    pipeline._fetch_page = AsyncMock(side_effect=fetch_page)
+    pipeline._write_page = AsyncMock(
+        side_effect=lambda client, ids, vectors, embedding_type: {"successful": len(ids), "failed": 0}
+    )
+    return pipeline, store, model
+
+
+@pytest.mark.asyncio
+async def test_pipeline_writes_one_request_per_page():
+    """10 pistes en pages de 4 : 3 écritures groupées, encodage par micro-batches de 2."""
+    pipeline, store, model = _make_pipeline(_library(10))
+
+    summary = await pipeline.run()
+    await pipeline.close()
+
+    assert pipeline._write_page.await_count == 3
+    assert [len(call.args[1]) for call in pipeline._write_page.await_args_list] == [4, 4, 2]
+    assert model.encode.call_count == 5
+    assert summary["successful"] == 10 and summary["completed"] is True
+    assert [c["after_id"] for c in store.saved] == [4, 8, 10]
+    assert store.cleared is True
+
+
+@pytest.mark.asyncio
+async def test_pipeline_resumes_from_checkpoint():
+    """Une exécution reprend après le dernier ID écrit."""
+    checkpoint = {"after_id": 8, "processed": 8, "successful": 8, "failed": 0}
+    pipeline, store, _ = _make_pipeline(_library(10), checkpoint=checkpoint)
+
+    summary = await pipeline.run()
+    await pipeline.close()
+
+    assert pipeline._fetch_page.await_args_list[0].args[1] == 8
+    written = pipeline._write_page.await_args_list[0].args[1]
+    assert written == [9, 10]
+    assert summary["processed"] == 10
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_at_max_tracks_and_keeps_checkpoint():
+    """Un parcours limité garde son point de reprise pour l'exécution suivante."""
+    pipeline, store, _ = _make_pipeline(_library(10))
+
+    summary = await pipeline.run(max_tracks=6)
+    await pipeline.close()
+
+    assert summary["completed"] is False
+    assert store.saved[-1]["after_id"] == 6
+    assert store.cleared is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_awaits_in_flight_write_on_error():
+    """Une erreur de lecture n'abandonne pas l'écriture de la page précédente."""
+    pipeline, store, _ = _make_pipeline(_library(10))
+    write_finished = asyncio.Event()
+
+    async def slow_write(client, ids, vectors, embedding_type):
+        await asyncio.sleep(0.01)
+        write_finished.set()
+        return {"successful": len(ids), "failed": 0}
+
+    async def failing_fetch(client, after_id, embedding_type, only_missing):
+        if after_id:
+            raise RuntimeError("API indisponible")
+        return {"items": _library(4), "next_after_id": 4}
+
+    pipeline._write_page = AsyncMock(side_effect=slow_write)
+    pipeline._fetch_page = AsyncMock(side_effect=failing_fetch)
+
+    with pytest.raises(RuntimeError):
+        await pipeline.run()
+    await pipeline.close()
+
+    assert write_finished.is_set()
+    assert store.saved == []
@@ -0,0 +1,101 @@
+"""
+Tests unitaires pour le client Last.fm asynchrone.
+
+Ce module vérifie la coalescence des requêtes simultanées, le cache durable
+(réponses positives et « artiste inconnu »), les réessais sur limite de débit
+et le seau de jetons local.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from backend.services.lastfm_client import LastFMClient, TokenBucket
+
+ARTIST_INFO = {
+    "artist": {
+        "name": "Daft Punk",
+        "mbid": "056e4f3e",
+        "url": "https://www.last.fm/music/Daft+Punk",
+        "stats": {"listeners": "100", "playcount": "2000"},
+        "tags": {"tag": {"name": "electronic"}},
+        "bio": {"content": "French duo"},
+        "image": [{"size": "large", "#text": "https://img/large.png"}, {"size": "mega", "#text": ""}],
+    }
+}
+
+
+def _client(handler, redis_client=None):
+    calls = []
+
+    async def transport(request):
+        calls.append(dict(request.url.params))
+        await asyncio.sleep(0)
+        return handler(request)
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+    client = LastFMClient(api_key="key", rate=1000, burst=100, redis_url=None,
+                          redis_client=redis_client, http_client=http)
+    return client, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_request():
+    """Dix demandes simultanées du même artiste = une requête Last.fm."""
+    client, calls = _client(lambda request: httpx.Response(200, json=ARTIST_INFO))
+
+    results = await asyncio.gather(*(client.get_artist_info("Daft Punk") for _ in range(10)))
+
+    assert len(calls) == 1
+    assert calls[0]["method"] == "artist.getinfo" and calls[0]["autocorrect"] == "1"
+    assert len({result["url"] for result in results}) == 1
+    assert results[0]["tags"] == ["electronic"]
+    assert results[0]["images"] == [{"size": "large", "url": "https://img/large.png"}]
+    assert client.stats["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_durable_cache_keyed_by_mbid_with_negative_entries():
+    """Le cache Redis est lu avant l'API ; un artiste inconnu est mémorisé aussi."""
+    redis_client = AsyncMock()
+    redis_client.register_script = lambda script: AsyncMock(return_value=0)
+    redis_client.get.return_value = json.dumps(ARTIST_INFO)
+    client, calls = _client(lambda request: httpx.Response(200, json={"error": 6, "message": "not found"}),
+                            redis_client=redis_client)
+
+    info = await client.get_artist_info("Daft Punk", mb_artist_id="056e4f3e")
+    assert info["listeners"] == 100 and calls == []
+    assert redis_client.get.await_args.args[0] == "lastfm:v1:artist.getinfo:mbid:056e4f3e"
+
+    redis_client.get.return_value = None
+    assert await client.get_similar_artists("Unknown Band") is None
+    key, value = redis_client.set.await_args.args
+    assert key == "lastfm:v1:artist.getsimilar:name:unknown band:10"
+    assert json.loads(value) == {"__missing__": True}
+    assert redis_client.set.await_args.kwargs["ex"] == client.negative_ttl
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_is_retried():
+    """L'erreur 29 (limite dépassée) est réessayée après une pause."""
+    responses = iter([httpx.Response(200, json={"error": 29, "message": "Rate limit"}),
+                      httpx.Response(200, json=ARTIST_INFO)])
+    client, calls = _client(lambda request: next(responses))
+
+    with patch("backend.services.lastfm_client.asyncio.sleep", new=AsyncMock()):
+        info = await client.get_artist_info("Daft Punk")
+
+    assert info["playcount"] == 2000
+    assert len(calls) == 2 and client.stats["retries"] == 1
+
+
+def test_local_token_bucket_spaces_requests_at_rate():
+    """Au-delà de la rafale, chaque réservation attend 1/débit de plus."""
+    bucket = TokenBucket(rate=10, capacity=2)
+    waits = [bucket._reserve_local() for _ in range(5)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.1, 0.2, 0.3], abs=0.01)
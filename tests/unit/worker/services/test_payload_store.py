@@ -0,0 +1,77 @@
+"""
+Tests unitaires pour le claim-check des payloads inter-étapes.
+
+Ce module vérifie le passage en ligne des petits payloads, l'aller-retour
+compressé sur les backends local et Redis, et la libération des payloads.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.services.payload_store import (
+    PayloadNotFound,
+    PayloadStore,
+    compress_packed,
+    is_handle,
+    pack_payload,
+)
+
+
+def _metadata(count):
+    return [
+        {"path": f"/music/Artist/Album/{i:02d}.flac", "artist": "Artist", "title": f"Track {i}",
+         "tags": {"comment": "x" * 200, "bpm": 120 + i}}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_small_payload_stays_inline(tmp_path):
+    """Sous le seuil, le message garde le payload tel quel."""
+    store = PayloadStore(backend="local", directory=str(tmp_path), threshold=1_000_000)
+    payload = _metadata(2)
+
+    assert await store.offload(payload) is payload
+    assert await store.resolve(payload) is payload
+    assert store.stats["inline"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_round_trip_and_release(tmp_path):
+    """Le handle est petit, le payload revient intact puis disparaît à la libération."""
+    store = PayloadStore(backend="local", directory=str(tmp_path), threshold=1024)
+    payload = _metadata(200)
+
+    handle = await store.offload(payload)
+
+    assert is_handle(handle)
+    assert len(pack_payload(handle)) < 256
+    assert handle["size"] < len(pack_payload(payload))
+    assert await store.resolve(handle) == payload
+
+    await store.release(handle)
+    with pytest.raises(PayloadNotFound):
+        await store.get(handle)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_sets_ttl_and_falls_back_inline():
+    """Redis : SET avec TTL ; en cas d'erreur le payload repart en ligne."""
+    store = PayloadStore(backend="redis", ttl=600, threshold=1024)
+    client = AsyncMock()
+    store.redis_client = client
+    payload = _metadata(50)
+
+    handle = await store.offload(payload)
+    key, blob = client.set.await_args.args
+    assert key == handle["key"] and client.set.await_args.kwargs["ex"] == 600
+    assert blob == compress_packed(pack_payload(payload), handle["codec"])
+
+    client.get.return_value = blob
+    assert await store.resolve(handle) == payload
+
+    client.set.side_effect = ConnectionError("redis down")
+    assert await store.offload(payload) is payload
+    assert store.stats["errors"] == 1
@@ -0,0 +1,126 @@
+"""
+Tests unitaires pour le cache à deux niveaux du CacheService.
+
+Ce module vérifie la promotion Redis → mémoire locale, l'écriture en lot,
+le cache négatif et le repli sur le niveau local quand Redis est en panne.
+"""
+
+import asyncio
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import msgpack
+import pytest
+
+from backend.services.cache_service import (
+    CacheNamespace,
+    CacheService,
+    album_id_cache_key,
+    artist_id_cache_key,
+)
+
+
+def _service(redis_client):
+    service = CacheService(redis_url="redis://test", namespaces=(
+        CacheNamespace("artist_ids", maxsize=100, ttl=3600, negative_ttl=60),
+        CacheNamespace("artist_search", maxsize=100, ttl=3600, shared=False),
+    ))
+    service._client = lambda: redis_client
+    return service
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_promotes_redis_hits_to_local_tier():
+    """Un seul MGET pour les clés absentes localement ; les hits Redis sont promus."""
+    redis_client = AsyncMock()
+    redis_client.mget.return_value = [msgpack.packb({"id": 7}), None]
+    service = _service(redis_client)
+    service.set("artist_ids", "artist:local", {"id": 1})
+
+    found = await service.aget_many("artist_ids", ["artist:local", "artist:shared", "artist:new"])
+
+    assert found == {"artist:local": {"id": 1}, "artist:shared": {"id": 7}}
+    assert redis_client.mget.await_args.args[0] == ["cache:v1:artist_ids:artist:shared",
+                                                    "cache:v1:artist_ids:artist:new"]
+    assert service.get("artist_ids", "artist:shared") == {"id": 7}
+    stats = service.get_cache_stats()["artist_ids"]
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_negative_results_are_cached_with_their_own_ttl():
+    """Un résultat None n'est pas redemandé et part dans Redis avec negative_ttl."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis_client = AsyncMock()
+    redis_client.pipeline = MagicMock(return_value=pipe)
+    redis_client.mget.return_value = [None]
+    service = _service(redis_client)
+    func = AsyncMock(return_value=None)
+
+    assert await service.call_with_cache_and_circuit_breaker("artist_ids", "artist:ghost", func) is None
+    assert await service.call_with_cache_and_circuit_breaker("artist_ids", "artist:ghost", func) is None
+
+    func.assert_awaited_once()
+    pipe.set.assert_called_once_with("cache:v1:artist_ids:artist:ghost", msgpack.packb(None), ex=60)
+    assert service.get_cache_stats()["artist_ids"]["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_local_tier():
+    """Redis en panne : la valeur reste servie par le niveau local, l'erreur est comptée."""
+    redis_client = AsyncMock()
+    redis_client.pipeline = MagicMock(side_effect=ConnectionError("redis down"))
+    service = _service(redis_client)
+
+    await service.aset("artist_ids", "artist:a", {"id": 3})
+    assert await service.aget("artist_ids", "artist:a") == {"id": 3}
+    assert service.get_cache_stats()["artist_ids"]["l2_errors"] == 1
+
+    # Les caches non partagés ne touchent jamais Redis
+    await service.aset("artist_search", "q", object())
+    assert await service.aget("artist_search", "missing") is None
+    redis_client.mget.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_forget_artist_invalidates_artist_and_album_keys():
+    """La suppression d'un artiste retire son nom et ses albums des caches nom → ID, dans Redis aussi."""
+    redis_client = AsyncMock()
+    service = CacheService(redis_url="redis://test")
+    service._client = lambda: redis_client
+    service.set("artist_ids", artist_id_cache_key("Daft Punk"), {"id": 4})
+    service.set("album_ids", album_id_cache_key("Discovery", 4), {"id": 9})
+
+    await service.forget_artist("Daft Punk", ["Discovery"], 4)
+
+    assert service.get("artist_ids", "artist:daft punk") is None
+    assert service.get("album_ids", "album:discovery:4") is None
+    deleted = [call.args[0] for call in redis_client.delete.await_args_list]
+    assert deleted == ["cache:v1:artist_ids:artist:daft punk", "cache:v1:album_ids:album:discovery:4"]
+
+
+def test_secondary_loop_gets_a_disposable_client_closed_after_use(monkeypatch):
+    """Une boucle éphémère (asyncio.run par appel) ne remplace ni ne fuit le client partagé."""
+    clients = []
+
+    def from_url(*args, **kwargs):
+        client = AsyncMock()
+        client.mget.return_value = [None]
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(sys.modules["backend.services.cache_service"].redis.Redis, "from_url", from_url)
+    service = CacheService(redis_url="redis://test")
+    main_loop = asyncio.new_event_loop()
+    try:
+        main_loop.run_until_complete(service.aget("artist_ids", "artist:a"))
+        asyncio.run(service.aget("artist_ids", "artist:b"))
+        main_loop.run_until_complete(service.aget("artist_ids", "artist:c"))
+    finally:
+        main_loop.close()
+
+    shared, disposable = clients
+    assert shared.mget.await_count == 2
+    shared.aclose.assert_not_awaited()
+    disposable.aclose.assert_awaited_once()
@@ -0,0 +1,33 @@
+"""Tests unitaires pour le worker de migration des covers vers le store."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.workers.covers.covers_worker import migrate_covers_to_store
+
+
+def _response(payload):
+    response = MagicMock(status_code=200)
+    response.json.return_value = payload
+    return response
+
+
+@pytest.mark.asyncio
+async def test_migration_follows_next_after_id_until_none():
+    """La tâche enchaîne les lots jusqu'à next_after_id = None, même après un lot vide."""
+    client = AsyncMock()
+    client.post.side_effect = [
+        _response({"processed": 2, "migrated": 2, "failed": 0, "next_after_id": 7}),
+        _response({"processed": 0, "migrated": 0, "failed": 0, "next_after_id": 7}),
+        _response({"processed": 1, "migrated": 0, "failed": 1, "next_after_id": None}),
+    ]
+    http_client = MagicMock()
+    http_client.__aenter__ = AsyncMock(return_value=client)
+    http_client.__aexit__ = AsyncMock(return_value=False)
+
+    with patch("backend.workers.covers.covers_worker.httpx.AsyncClient", return_value=http_client), \
+            patch("backend.workers.covers.covers_worker.LOCKED_RETRY_DELAY", 0):
+        result = await migrate_covers_to_store.original_func(batch_size=2)
+
+    assert result == {"success": True, "processed": 3, "migrated": 2, "failed": 1, "batches": 3}
+    assert [call.kwargs["params"]["after_id"] for call in client.post.await_args_list] == [0, 7, 7]
@@ -0,0 +1,108 @@
+"""Tests unitaires pour le moteur d'extraction de métadonnées en pool de processus.
+
+Auteur: SoniqueBay Team
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from backend.services.metadata_extraction_engine import MetadataExtractionEngine
+from backend.services.music_scan import read_file_metadata
+
+
+def fake_extract(path: str):
+    """Extraction factice : ignore les chemins 'skip', échoue sur 'boom'."""
+    if "skip" in path:
+        return None
+    if "boom" in path:
+        raise RuntimeError("fichier corrompu")
+    return {"path": path, "title": Path(path).stem}
+
+
+@pytest.fixture
+def engine():
+    """Moteur à deux processus, paquets de 3 fichiers (fork pour les fonctions de test)."""
+    engine = MetadataExtractionEngine(max_workers=2, chunk_size=3, mp_context="fork")
+    yield engine
+    engine.shutdown()
+
+
+class TestMetadataExtractionEngine:
+    """Tests pour l'extraction par paquets dans le pool de processus."""
+
+    @pytest.mark.asyncio
+    async def test_extract_paths_streams_valid_results(self, engine):
+        """Tous les résultats valides sont restitués, les None et erreurs ignorés."""
+        paths = [f"/music/{i}.mp3" for i in range(10)] + ["/music/skip.mp3", "/music/boom.mp3"]
+
+        results = await engine.extract_all(paths, fake_extract)
+
+        assert sorted(r["path"] for r in results) == sorted(paths[:10])
+        assert engine.stats["files_submitted"] == 12
+        assert engine.stats["files_extracted"] == 10
+        assert engine.stats["chunks_completed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_extract_paths_accepts_async_iterable(self, engine):
+        """La source de chemins peut être un générateur asynchrone (walk)."""
+        async def walk():
+            for i in range(5):
+                yield f"/music/{i}.flac"
+
+        results = [m async for m in engine.extract_paths(walk(), fake_extract)]
+
+        assert len(results) == 5
+
+    def test_default_configuration_from_env(self, monkeypatch):
+        """Le nombre de processus et la taille des paquets sont configurables par env."""
+        monkeypatch.setenv("SCAN_EXTRACT_WORKERS", "16")
+        monkeypatch.setenv("SCAN_EXTRACT_CHUNK_SIZE", "64")
+
+        engine = MetadataExtractionEngine()
+
+        assert engine.max_workers == 16
+        assert engine.chunk_size == 64
+        assert engine.max_pending_chunks == 32
+
+
+class TestReadFileMetadata:
+    """Tests pour la lecture de métadonnées par chemin (exécutée dans le pool)."""
+
+    def test_rejects_path_outside_base_directory(self):
+        """Un fichier hors du répertoire de base est rejeté."""
+        with tempfile.TemporaryDirectory() as base, tempfile.TemporaryDirectory() as other:
+            track = Path(other) / "a.mp3"
+            track.write_bytes(b"x")
+            scan_config = {"base_directory": base, "music_extensions": {b".mp3"}, "artist_depth": 0}
+
+            assert read_file_metadata(str(track), scan_config) is None
+
+    def test_rejects_non_music_extension(self):
+        """Une extension non musicale est ignorée."""
+        with tempfile.TemporaryDirectory() as base:
+            doc = Path(base) / "notes.txt"
+            doc.write_text("x")
+            scan_config = {"base_directory": base, "music_extensions": {b".mp3"}, "artist_depth": 0}
+
+            assert read_file_metadata(str(doc), scan_config) is None
+
+
+class TestExtractMetadataBatchTask:
+    """Tests pour la tâche TaskIQ d'extraction branchée sur le moteur."""
+
+    @pytest.mark.asyncio
+    async def test_task_extracts_through_engine(self, engine, monkeypatch):
+        """La tâche s'importe et délègue le parsing au pool du moteur."""
+        from backend.tasks import metadata
+
+        monkeypatch.setattr(metadata, "get_extraction_engine", lambda: engine)
+        monkeypatch.setattr(metadata, "extract_single_file_metadata", fake_extract)
+
+        result = await metadata.extract_metadata_batch_task.original_func(
+            ["/music/a.mp3", "/music/skip.mp3"], batch_id="b1"
+        )
+
+        assert result["files_processed"] == 1
+        assert result["files_total"] == 2
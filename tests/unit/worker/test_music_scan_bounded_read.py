@@ -0,0 +1,91 @@
+"""Tests unitaires pour la lecture Mutagen bornée aux en-têtes/tags.
+
+Auteur: SoniqueBay Team
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from mutagen.id3 import ID3, TIT2
+
+from backend.services.music_scan import (
+    ScanIOStats,
+    open_audio_bounded,
+    read_file_metadata,
+)
+
+# Trame MPEG-1 Layer III 128 kbps / 44.1 kHz (417 octets)
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+@pytest.fixture
+def music_dir():
+    """Répertoire temporaire avec un MP3 de ~2 Mo tagué ID3."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir).resolve()
+        track = base / "track.mp3"
+        track.write_bytes(MP3_FRAME * 5000)
+        tags = ID3()
+        tags.add(TIT2(encoding=3, text="Titre"))
+        tags.save(str(track))
+        yield base
+
+
+class TestOpenAudioBounded:
+    """Tests pour l'ouverture Mutagen sans chargement complet du fichier."""
+
+    def test_reads_only_a_fraction_of_the_file(self, music_dir):
+        """Les tags sont lus sans parcourir le fichier entier."""
+        track = music_dir / "track.mp3"
+
+        audio, bytes_read = open_audio_bounded(track, allowed_base_paths=[music_dir])
+
+        assert str(audio["TIT2"]) == "Titre"
+        assert 0 < bytes_read < track.stat().st_size // 10
+
+    def test_rejects_path_outside_allowed_directories(self, music_dir):
+        """Les validations de secure_open_file s'appliquent toujours."""
+        with tempfile.TemporaryDirectory() as other:
+            audio, bytes_read = open_audio_bounded(music_dir / "track.mp3", allowed_base_paths=[Path(other)])
+
+        assert audio is None
+        assert bytes_read == 0
+
+    def test_read_file_metadata_reports_bytes_read(self, music_dir):
+        """Le compteur d'octets lus est remonté dans les métadonnées."""
+        scan_config = {"base_directory": str(music_dir), "music_extensions": {b".mp3"}, "artist_depth": 0}
+
+        metadata = read_file_metadata(str(music_dir / "track.mp3"), scan_config)
+
+        assert metadata["path"] == str(music_dir / "track.mp3")
+        assert 0 < metadata["bytes_read"] < metadata["file_size"]
+
+
+def test_scan_io_stats_snapshot():
+    """Le ratio octets lus / taille totale est calculé sur l'ensemble du scan."""
+    stats = ScanIOStats()
+    stats.record(100, 1000)
+    stats.record(300, 3000)
+
+    assert stats.snapshot() == {"files": 2, "bytes_read": 400, "bytes_total": 4000, "read_ratio": 0.1}
+
+
+def test_worker_extractor_reads_only_tag_blocks(music_dir):
+    """L'extracteur du scan en flux passe aussi par la lecture bornée."""
+    from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+
+    metadata = extract_single_file_metadata(str(music_dir / "track.mp3"), base_directory=str(music_dir))
+
+    assert metadata["path"] == str(music_dir / "track.mp3")
+    assert 0 < metadata["bytes_read"] < metadata["file_size"] // 10
+
+
+def test_worker_extractor_rejects_file_outside_scan_root(music_dir):
+    """Un fichier hors de la racine du scan n'est pas ouvert."""
+    from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+
+    with tempfile.TemporaryDirectory() as other:
+        metadata = extract_single_file_metadata(str(music_dir / "track.mp3"), base_directory=other)
+
+    assert metadata is None
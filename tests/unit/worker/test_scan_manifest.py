@@ -0,0 +1,251 @@
+"""Tests unitaires pour le scan incrémental basé sur le manifeste path → (mtime, size, id).
+
+Auteur: SoniqueBay Team
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.services.scan_manifest import (
+    FILE_CHANGED,
+    FILE_NEW,
+    FILE_UNCHANGED,
+    ScanManifest,
+)
+from backend.workers.scan.scan_worker import scan_music_files
+
+
+class TestScanManifest:
+    """Tests pour la classification des fichiers par le manifeste."""
+
+    def test_classify_new_changed_unchanged(self):
+        """Un fichier inconnu est nouveau, un mtime/taille différent est modifié."""
+        manifest = ScanManifest([
+            ("/music/a.mp3", 100.0, 1000, 1),
+            ("/music/b.mp3", 200.0, 2000, 2),
+        ])
+
+        assert manifest.classify("/music/a.mp3", 100.0, 1000) == FILE_UNCHANGED
+        assert manifest.classify("/music/b.mp3", 201.0, 2000) == FILE_CHANGED
+        assert manifest.classify("/music/c.mp3", 300.0, 3000) == FILE_NEW
+        assert manifest.stats == {FILE_NEW: 1, FILE_CHANGED: 1, FILE_UNCHANGED: 1}
+
+    def test_classify_missing_stat_columns_is_changed(self):
+        """Une piste sans mtime/taille en base doit être ré-analysée."""
+        manifest = ScanManifest([("/music/a.mp3", None, None, 1)])
+
+        assert manifest.classify("/music/a.mp3", 100.0, 1000) == FILE_CHANGED
+
+    def test_vanished_excludes_seen_paths(self):
+        """Seules les pistes non rencontrées pendant le walk sont disparues."""
+        manifest = ScanManifest([
+            ("/music/a.mp3", 100.0, 1000, 1),
+            ("/music/b.mp3", 200.0, 2000, 2),
+            ("/music/c.mp3", 300.0, 3000, 3),
+        ])
+        manifest.classify("/music/a.mp3", 100.0, 1000)
+        manifest.mark_seen("/music/c.mp3")
+
+        assert manifest.vanished() == [("/music/b.mp3", 2)]
+
+    @pytest.mark.asyncio
+    async def test_fetch_falls_back_to_empty_manifest(self):
+        """Une erreur API revient à un scan complet (manifeste vide)."""
+        client = AsyncMock()
+        client.get.side_effect = Exception("API indisponible")
+
+        manifest = await ScanManifest.fetch(client, "/music")
+
+        assert len(manifest) == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_vanished_batches_ids(self, tmp_path):
+        """Les IDs disparus sont envoyés par lots à l'API."""
+        manifest = ScanManifest([(f"/music/{i}.mp3", 1.0, 1, i) for i in range(5)])
+        response = MagicMock()
+        response.json.return_value = {"deleted": 2}
+        client = AsyncMock()
+        client.post.return_value = response
+
+        deleted = await manifest.delete_vanished(client, str(tmp_path), batch_size=2, force=True)
+
+        assert client.post.await_count == 3
+        assert deleted == 6
+
+    @pytest.mark.asyncio
+    async def test_delete_vanished_skipped_when_root_missing(self, tmp_path):
+        """Une racine absente (NAS non monté) ne supprime rien, même forcé."""
+        manifest = ScanManifest([("/music/a.mp3", 1.0, 1, 1)])
+        client = AsyncMock()
+
+        deleted = await manifest.delete_vanished(client, str(tmp_path / "absent"), force=True)
+
+        assert deleted == 0
+        client.post.assert_not_awaited()
+        assert "introuvable" in manifest.deletion_skipped
+
+    @pytest.mark.asyncio
+    async def test_delete_vanished_skipped_after_walk_error(self, tmp_path):
+        """Une erreur d'accès pendant le walk bloque la suppression, même forcée."""
+        manifest = ScanManifest([("/music/a.mp3", 1.0, 1, 1)])
+        manifest.record_walk_error(str(tmp_path / "locked"), PermissionError("denied"))
+        client = AsyncMock()
+
+        deleted = await manifest.delete_vanished(client, str(tmp_path), force=True)
+
+        assert deleted == 0
+        client.post.assert_not_awaited()
+        assert "walk" in manifest.deletion_skipped
+
+    @pytest.mark.asyncio
+    async def test_delete_vanished_respects_ratio_cap_unless_forced(self, tmp_path):
+        """Au-delà du plafond de disparues, seule une suppression forcée passe."""
+        manifest = ScanManifest([(f"/music/{i}.mp3", 1.0, 1, i) for i in range(4)])
+        manifest.mark_seen("/music/0.mp3")
+        response = MagicMock()
+        response.json.return_value = {"deleted": 3}
+        client = AsyncMock()
+        client.post.return_value = response
+
+        assert await manifest.delete_vanished(client, str(tmp_path), max_ratio=0.5) == 0
+        assert "plafond" in manifest.deletion_skipped
+        client.post.assert_not_awaited()
+
+        assert await manifest.delete_vanished(client, str(tmp_path), max_ratio=0.5, force=True) == 3
+        assert manifest.deletion_skipped is None
+
+
+class TestIncrementalDiscovery:
+    """Tests pour la discovery incrémentale du scan worker."""
+
+    @pytest.fixture
+    def music_dir(self):
+        """Crée un répertoire temporaire avec trois fichiers musicaux."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base = Path(tmpdir)
+            for name in ("a.mp3", "b.flac", "c.mp3"):
+                (base / name).write_bytes(b"x" * 10)
+            yield base
+
+    def test_full_scan_without_manifest(self, music_dir):
+        """Sans manifeste, tous les fichiers sont retournés."""
+        assert len(scan_music_files(str(music_dir))) == 3
+
+    def test_incremental_scan_skips_unchanged(self, music_dir):
+        """Les fichiers inchangés ne sont pas renvoyés à l'extraction."""
+        a = music_dir / "a.mp3"
+        b = music_dir / "b.flac"
+        manifest = ScanManifest([
+            (str(a), a.stat().st_mtime, a.stat().st_size, 1),
+            (str(b), b.stat().st_mtime, 999, 2),
+            (str(music_dir / "gone.mp3"), 1.0, 1, 3),
+        ])
+
+        files = scan_music_files(str(music_dir), manifest)
+
+        assert sorted(os.path.basename(f) for f in files) == ["b.flac", "c.mp3"]
+        assert manifest.vanished() == [(str(music_dir / "gone.mp3"), 3)]
+        assert manifest.walk_errors == []
+
+    def test_missing_root_records_walk_error(self, music_dir):
+        """Un walk sur une racine absente est enregistré, pas ignoré."""
+        missing = str(music_dir / "unmounted")
+        manifest = ScanManifest([(f"{missing}/a.mp3", 1.0, 1, 1)])
+
+        assert scan_music_files(missing, manifest) == []
+        assert manifest.walk_errors
+        assert manifest.deletion_blocker(missing, force=True) is not None
+
+    @pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root ignore les permissions")
+    def test_unreadable_directory_records_walk_error(self, music_dir):
+        """Un sous-répertoire illisible bloque la suppression des disparues."""
+        locked = music_dir / "locked"
+        locked.mkdir()
+        (locked / "d.mp3").write_bytes(b"x")
+        manifest = ScanManifest([(str(locked / "d.mp3"), 1.0, 1, 4)])
+        locked.chmod(0)
+        try:
+            scan_music_files(str(music_dir), manifest)
+        finally:
+            locked.chmod(0o755)
+
+        assert manifest.vanished() == [(str(locked / "d.mp3"), 4)]
+        assert manifest.deletion_blocker(str(music_dir), force=True) is not None
+
+
+class _FakeAudio(dict):
+    """Fichier Mutagen minimal : pas de tags ni de pochette."""
+
+    tags = None
+    info = SimpleNamespace(length=180.0, bitrate=320000)
+
+
+class TestStatForwarding:
+    """Le stat pris à l'extraction doit atteindre l'upsert des pistes."""
+
+    @pytest.mark.asyncio
+    async def test_extracted_mtime_and_size_reach_track_upsert(self, tmp_path, monkeypatch):
+        """extract → batch_entities → clean_track_data conserve mtime/taille."""
+        from backend.services.entity_manager import clean_track_data
+        from backend.workers.batch import process_entities_worker
+        from backend.workers.metadata.enrichment_worker import extract_single_file_metadata
+
+        audio_file = tmp_path / "a.mp3"
+        audio_file.write_bytes(b"x" * 42)
+        monkeypatch.setattr("backend.services.music_scan.File", lambda *args, **kwargs: _FakeAudio())
+        monkeypatch.setattr(process_entities_worker, "publish_event", MagicMock())
+
+        metadata = extract_single_file_metadata(str(audio_file))
+
+        stat_result = audio_file.stat()
+        assert metadata["file_mtime"] == stat_result.st_mtime
+        assert metadata["file_size"] == 42
+
+        insertion_data = await process_entities_worker.batch_entities(
+            [metadata], batch_id="stat", dispatch_insert=False
+        )
+        track_data = clean_track_data(insertion_data["tracks"][0])
+
+        assert track_data["file_mtime"] == stat_result.st_mtime
+        assert track_data["file_size"] == 42
+
+
+class TestScanLaunch:
+    """Tests pour le lancement d'un scan depuis l'API jusqu'à la tâche du worker."""
+
+    @pytest.mark.asyncio
+    async def test_launch_forwards_incremental_flags_to_scan_task(self, tmp_path, monkeypatch):
+        """La tâche s'importe depuis ScanService et reçoit les options du scan incrémental."""
+        from backend.api.services.scan_service import ScanService
+        from backend.workers.scan import start_scan_task
+
+        kiq = AsyncMock(return_value=SimpleNamespace(task_id="t-1"))
+        monkeypatch.setattr(start_scan_task, "kiq", kiq)
+        monkeypatch.setattr(ScanService, "validate_base_directory", staticmethod(lambda directory: None))
+        monkeypatch.setenv("MUSIC_PATH", str(tmp_path))
+
+        result = await ScanService.launch_scan(incremental=True, force_delete=True)
+
+        assert result["task_id"] == "t-1"
+        kiq.assert_awaited_once_with(str(tmp_path.resolve()), incremental=True, force_delete=True)
+
+    @pytest.mark.asyncio
+    async def test_scan_task_is_registered_and_runs_start_scan(self, monkeypatch):
+        """La tâche de scan est enregistrée sur le broker du worker et délègue à start_scan."""
+        from backend.workers.scan import scan_worker
+        from backend.workers.taskiq_app import broker
+
+        start_scan = AsyncMock(return_value={"success": True})
+        monkeypatch.setattr(scan_worker, "start_scan", start_scan)
+
+        task = broker.find_task(scan_worker.start_scan_task.task_name)
+        result = await task.original_func("/music", incremental=True)
+
+        assert task is scan_worker.start_scan_task
+        assert result == {"success": True}
+        start_scan.assert_awaited_once_with("/music", incremental=True, force_delete=False)
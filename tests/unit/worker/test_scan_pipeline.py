@@ -0,0 +1,132 @@
+"""Tests unitaires pour le pipeline de scan en flux avec back-pressure.
+
+Auteur: SoniqueBay Team
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.scan_pipeline import ScanPipeline, iterate_in_executor
+
+
+async def fake_extract(path: str):
+    """Extraction factice : 'slow' prend du temps, 'bad' échoue."""
+    if "slow" in path:
+        await asyncio.sleep(0.2)
+    if "bad" in path:
+        raise RuntimeError("fichier corrompu")
+    return {"path": path}
+
+
+class TestScanPipelineStream:
+    """Tests pour les étapes discovery + extraction."""
+
+    @pytest.mark.asyncio
+    async def test_slow_file_does_not_block_others(self):
+        """Un fichier lent ne retarde pas les fichiers suivants (pas de lot bloquant)."""
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=4, queue_size=5)
+        paths = ["/music/slow.mp3"] + [f"/music/{i}.mp3" for i in range(20)]
+
+        results = [m["path"] async for m in pipeline.stream(paths)]
+
+        assert len(results) == 21
+        assert results[-1] == "/music/slow.mp3"
+
+    @pytest.mark.asyncio
+    async def test_queues_stay_bounded(self):
+        """Aucune file ne dépasse queue_size, même avec un consommateur lent."""
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=2, queue_size=3)
+        paths = (f"/music/{i}.mp3" for i in range(50))
+
+        count = 0
+        async for _ in pipeline.stream(paths):
+            await asyncio.sleep(0.001)
+            count += 1
+
+        assert count == 50
+        assert pipeline.stats["peak_paths_queue"] <= 3
+        assert pipeline.stats["peak_metadata_queue"] <= 3
+
+    @pytest.mark.asyncio
+    async def test_extraction_errors_are_counted(self):
+        """Une erreur d'extraction est comptée sans interrompre le flux."""
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=2)
+
+        results = [m async for m in pipeline.stream(["/music/a.mp3", "/music/bad.mp3"])]
+
+        assert len(results) == 1
+        assert pipeline.stats["extract_failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_discovery_error_is_raised(self):
+        """Une erreur du walk remonte au consommateur."""
+        async def broken_walk():
+            yield "/music/a.mp3"
+            raise OSError("disque indisponible")
+
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=2)
+
+        with pytest.raises(OSError):
+            async for _ in pipeline.stream(broken_walk()):
+                pass
+
+
+class TestScanPipelineRun:
+    """Tests pour le pipeline complet avec batching et insertion."""
+
+    @pytest.mark.asyncio
+    async def test_run_batches_and_inserts(self):
+        """Les métadonnées sont regroupées en lots puis insérées une à une."""
+        inserted = []
+
+        async def process_batch(batch):
+            return {"tracks": list(batch)}
+
+        async def insert_batch(payload):
+            if len(inserted) == 1:
+                inserted.append(None)
+                raise RuntimeError("API indisponible")
+            inserted.append(len(payload["tracks"]))
+
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=3, batch_size=10, max_pending_batches=1)
+        stats = await pipeline.run(
+            iterate_in_executor(iter(f"/music/{i}.mp3" for i in range(25)), chunk_size=4),
+            process_batch,
+            insert_batch,
+        )
+
+        assert stats["discovered"] == 25
+        assert stats["extracted"] == 25
+        assert stats["batches"] == 3
+        assert stats["batches_failed"] == 1
+        assert inserted[0] == 10 and inserted[2] == 5
+
+    @pytest.mark.asyncio
+    async def test_failing_batch_does_not_stall_producers(self):
+        """Un lot en échec au batching est compté ; les étapes amont ne restent pas bloquées."""
+        inserted = []
+
+        async def process_batch(batch):
+            if any(m["path"] == "/music/0.mp3" for m in batch):
+                raise RuntimeError("batching impossible")
+            return {"tracks": list(batch)}
+
+        async def insert_batch(payload):
+            inserted.append(len(payload["tracks"]))
+
+        pipeline = ScanPipeline(extract=fake_extract, extract_workers=1, queue_size=2, batch_size=5, max_pending_batches=1)
+        stats = await asyncio.wait_for(
+            pipeline.run((f"/music/{i}.mp3" for i in range(20)), process_batch, insert_batch),
+            timeout=5,
+        )
+
+        assert stats["extracted"] == 20
+        assert stats["batches"] == 4
+        assert stats["batches_failed"] == 1
+        assert inserted == [5, 5, 5]
+
+    def test_requires_an_extraction_strategy(self):
+        """Une coroutine ou un moteur d'extraction est obligatoire."""
+        with pytest.raises(ValueError):
+            ScanPipeline()